@@ -0,0 +1,551 @@
+"""
+Module for caching per-file analysis results on disk.
+
+Analysis results (imports, method calls, object creations and async/conditional
+patterns) are stored under the git blob SHA of the file content plus the analyzer
+version, so unchanged files are never parsed again when a repository is
+re-analyzed. The cache is bounded in size and evicts least recently used entries.
+"""
+import os
+import json
+import hashlib
+import logging
+import tempfile
+import threading
+from typing import Dict, List, Any, Optional, Callable, Sequence, Tuple, Union
+
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever an analyzer changes its output so stale entries are ignored
+ANALYZER_VERSION = "4"
+
+# Default upper bound for the total size of the cache directory (256 MB)
+DEFAULT_MAX_SIZE_BYTES = 256 * 1024 * 1024
+
+# Fraction of the maximum size to shrink to when evicting, so eviction is amortized
+EVICTION_LOW_WATER_MARK = 0.9
+
+# Cache kind of TypeScript/JavaScript results from the pattern-matching fallback,
+# kept apart from compiler results so those replace them once the compiler works
+TYPESCRIPT_FALLBACK_KIND = 'typescript-patterns'
+
+
+def compute_blob_sha(content: Union[bytes, str]) -> str:
+    """
+    Compute the git blob SHA-1 for file content.
+
+    This matches ``git hash-object``, so the key for a file is the same as the
+    blob ID git itself uses for it.
+
+    Args:
+        content: File content as bytes (str is encoded as UTF-8)
+
+    Returns:
+        Hex digest of the blob SHA-1
+    """
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+
+    header = f"blob {len(content)}\0".encode('ascii')
+    return hashlib.sha1(header + content).hexdigest()
+
+
+class AnalysisCache:
+    """
+    Persistent, size-bounded cache of per-file analysis results.
+
+    Each entry is a JSON file stored at ``<cache_dir>/<sha[:2]>/<sha>.<kind>.v<version>.json``.
+    Entry modification times are used for least-recently-used eviction.
+
+    Attributes:
+        cache_dir: Directory where cache entries are stored
+        max_size_bytes: Maximum total size of all entries
+        analyzer_version: Analyzer version included in every key
+        hits: Number of lookups answered from the cache
+        misses: Number of lookups not found in the cache
+        evictions: Number of entries removed to stay under max_size_bytes
+    """
+
+    def __init__(self, cache_dir: str, max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+                 analyzer_version: str = ANALYZER_VERSION):
+        """
+        Initialize the analysis cache.
+
+        Args:
+            cache_dir: Directory where cache entries are stored
+            max_size_bytes: Maximum total size of all entries
+            analyzer_version: Analyzer version included in every key
+        """
+        self.cache_dir = os.path.abspath(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.analyzer_version = analyzer_version
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        # Lazily loaded index of entry path -> (size, last access time)
+        self._entries: Optional[Dict[str, List[float]]] = None
+        self._total_size = 0
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """
+        Get the state for pickling, so the cache can be sent to worker processes.
+
+        The lock and entry index are process-local, and each copy keeps its own
+        counters starting from zero.
+
+        Returns:
+            Picklable state dictionary
+        """
+        return {
+            'cache_dir': self.cache_dir,
+            'max_size_bytes': self.max_size_bytes,
+            'analyzer_version': self.analyzer_version
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        """
+        Restore the cache from a pickled state.
+
+        Args:
+            state: State dictionary from __getstate__
+        """
+        self.__init__(state['cache_dir'], state['max_size_bytes'], state['analyzer_version'])
+
+    def _entry_path(self, blob_sha: str, kind: str) -> str:
+        """
+        Get the file path for a cache entry.
+
+        Args:
+            blob_sha: Git blob SHA of the file content
+            kind: Kind of analysis (e.g., 'python', 'typescript')
+
+        Returns:
+            Path to the entry file
+        """
+        filename = f"{blob_sha}.{kind}.v{self.analyzer_version}.json"
+        return os.path.join(self.cache_dir, blob_sha[:2], filename)
+
+    def _load_index(self) -> None:
+        """Scan the cache directory to build the entry index, if not done yet."""
+        if self._entries is not None:
+            return
+
+        self._entries = {}
+        self._total_size = 0
+
+        if not os.path.isdir(self.cache_dir):
+            return
+
+        for dirpath, _, filenames in os.walk(self.cache_dir):
+            for filename in filenames:
+                if not filename.endswith('.json'):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                self._entries[path] = [stat.st_size, stat.st_mtime]
+                self._total_size += stat.st_size
+
+    def get(self, blob_sha: str, kind: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached analysis result.
+
+        Args:
+            blob_sha: Git blob SHA of the file content
+            kind: Kind of analysis (e.g., 'python', 'typescript')
+
+        Returns:
+            The cached result, or None if not cached
+        """
+        path = self._entry_path(blob_sha, kind)
+
+        with self._lock:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.misses += 1
+                return None
+
+            self.hits += 1
+
+            # Mark the entry as recently used
+            try:
+                os.utime(path)
+                if self._entries is not None and path in self._entries:
+                    self._entries[path][1] = os.stat(path).st_mtime
+            except OSError:
+                pass
+
+            return result
+
+    def put(self, blob_sha: str, kind: str, result: Dict[str, Any]) -> None:
+        """
+        Store an analysis result, evicting old entries if the cache is full.
+
+        Args:
+            blob_sha: Git blob SHA of the file content
+            kind: Kind of analysis (e.g., 'python', 'typescript')
+            result: JSON-serializable analysis result
+        """
+        path = self._entry_path(blob_sha, kind)
+        data = json.dumps(result).encode('utf-8')
+
+        with self._lock:
+            self._load_index()
+
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+
+                # Write to a temporary file first so readers never see partial entries
+                fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                stat = os.stat(path)
+            except OSError as e:
+                logger.warning(f"Failed to write analysis cache entry: {e}")
+                return
+
+            previous = self._entries.get(path)
+            if previous:
+                self._total_size -= previous[0]
+            self._entries[path] = [stat.st_size, stat.st_mtime]
+            self._total_size += stat.st_size
+
+            if self._total_size > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under the low-water mark."""
+        target_size = self.max_size_bytes * EVICTION_LOW_WATER_MARK
+
+        for path, (size, _) in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_size <= target_size:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+            del self._entries[path]
+            self._total_size -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all entries from the cache and reset the counters."""
+        with self._lock:
+            self._load_index()
+            for path in list(self._entries):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            self._entries = {}
+            self._total_size = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with hit/miss/eviction counters and size information
+        """
+        with self._lock:
+            self._load_index()
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'size_bytes': self._total_size,
+                'max_size_bytes': self.max_size_bytes,
+                'analyzer_version': self.analyzer_version
+            }
+
+
+def analyze_python_source(source_code: str) -> Dict[str, Any]:
+    """
+    Run every Python analyzer over source code.
+
+    Files with syntax errors still get their imports extracted (using the
+    regex fallback) and record the error, so they are cached too.
+
+    Args:
+        source_code: Python source code
+
+    Returns:
+        Dictionary with 'imports', 'method_calls', 'object_creations',
+        'async_patterns', 'conditional_patterns', 'call_sites' and
+        'definitions' entries
+    """
+    from app.analysis.parsed_module import ParsedModule
+    from app.structure.dependency_analyzer import extract_python_imports
+
+    try:
+        return ParsedModule.from_source(source_code).analyze()
+    except SyntaxError as e:
+        return {
+            'imports': extract_python_imports(source_code),
+            'method_calls': [],
+            'object_creations': [],
+            'async_patterns': [],
+            'conditional_patterns': [],
+            'call_sites': {'functions': [], 'classes': [], 'calls': [], 'imports': []},
+            'definitions': [],
+            'error': str(e)
+        }
+
+
+def analyze_typescript_source(source_code: str) -> Dict[str, Any]:
+    """
+    Run every TypeScript/JavaScript analyzer over source code.
+
+    Args:
+        source_code: TypeScript/JavaScript source code
+
+    Returns:
+        Dictionary with 'imports', 'method_calls', 'async_patterns',
+        'conditional_patterns' and 'definitions' entries
+    """
+    return analyze_typescript_sources([source_code])[0]
+
+
+def analyze_typescript_sources(sources: Sequence[str],
+                               paths: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+    """
+    Run every TypeScript/JavaScript analyzer over several sources.
+
+    The sources are parsed with the TypeScript compiler by the pooled parser
+    workers, in one round trip per batch. Sources the workers can't analyze
+    (or all of them, when Node.js or the compiler is not installed) are
+    analyzed with the pattern-matching extractors instead.
+
+    Args:
+        sources: TypeScript/JavaScript source codes
+        paths: Optional file paths of the sources, whose extensions select
+            TS, TSX, JS or JSX parsing
+
+    Returns:
+        One dictionary per source, as returned by analyze_typescript_source
+    """
+    return [result for result, _ in _analyze_typescript_sources(sources, paths)]
+
+
+def _analyze_typescript_sources(sources: Sequence[str],
+                                paths: Optional[Sequence[Optional[str]]] = None) -> List[Tuple[Dict[str, Any], str]]:
+    """
+    Run every TypeScript/JavaScript analyzer over several sources (see analyze_typescript_sources).
+
+    Returns:
+        One (result, cache kind) pair per source; the kind tells compiler
+        results ('typescript') from fallback results (TYPESCRIPT_FALLBACK_KIND)
+    """
+    from app.analysis.typescript_extractor import extract_method_calls, extract_definitions
+    from app.analysis.typescript_async_detector import detect_async_patterns
+    from app.analysis.typescript_conditional_detector import detect_conditional_patterns
+    from app.analysis.typescript_parser import TypeScriptParserError, get_typescript_parser_pool
+    from app.structure.dependency_analyzer import extract_js_imports
+
+    parsed: List[Optional[Dict[str, Any]]] = [None] * len(sources)
+    pool = get_typescript_parser_pool()
+    if sources and pool.available:
+        try:
+            parsed = pool.parse_batch(sources, paths)
+        except TypeScriptParserError as e:
+            logger.warning("Falling back to pattern matching for TypeScript analysis: %s", e)
+
+    results = []
+    for source_code, result in zip(sources, parsed):
+        kind = 'typescript'
+        if result is None or 'error' in result:
+            kind = TYPESCRIPT_FALLBACK_KIND
+            result = {
+                'imports': extract_js_imports(source_code),
+                'method_calls': extract_method_calls(source_code, use_compiler=False),
+                'async_patterns': detect_async_patterns(source_code),
+                'conditional_patterns': detect_conditional_patterns(source_code)
+            }
+        result['definitions'] = extract_definitions(source_code)
+        results.append((result, kind))
+
+    return results
+
+
+# Cache kind, analysis function and batch analysis function (or None, for
+# languages analyzed one file at a time) for each analyzable file extension.
+# A batch function takes the sources and their paths and returns one
+# (result, cache kind) pair per source.
+SOURCE_ANALYZERS = {
+    '.py': ('python', analyze_python_source, None),
+    '.js': ('typescript', analyze_typescript_source, _analyze_typescript_sources),
+    '.jsx': ('typescript', analyze_typescript_source, _analyze_typescript_sources),
+    '.ts': ('typescript', analyze_typescript_source, _analyze_typescript_sources),
+    '.tsx': ('typescript', analyze_typescript_source, _analyze_typescript_sources),
+}
+
+
+def _decode_source(content: bytes) -> str:
+    """Decode file content, normalizing newlines the same way reading the file in text mode would."""
+    return content.decode('utf-8').replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _get_cached(cache: AnalysisCache, blob_sha: str, kind: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up the cached analysis of a file.
+
+    TypeScript/JavaScript fallback results are only used while the compiler
+    is unavailable; otherwise a miss lets the compiler analyze the file.
+
+    Args:
+        cache: The analysis cache
+        blob_sha: Blob SHA of the file content
+        kind: Cache kind of the file's language
+
+    Returns:
+        The cached result, or None on a miss
+    """
+    result = cache.get(blob_sha, kind)
+    if result is None and kind == 'typescript':
+        from app.analysis.typescript_parser import get_typescript_parser_pool
+
+        if not get_typescript_parser_pool().available:
+            result = cache.get(blob_sha, TYPESCRIPT_FALLBACK_KIND)
+    return result
+
+
+def analyze_source(content: bytes, extension: str,
+                   cache: Optional[AnalysisCache] = None) -> Dict[str, Any]:
+    """
+    Analyze raw file content, using the cache when one is provided.
+
+    Args:
+        content: Raw file content
+        extension: File extension, including the leading dot
+        cache: Optional analysis cache
+
+    Returns:
+        The analysis result
+
+    Raises:
+        ValueError: If the extension is not supported
+        UnicodeDecodeError: If the content is not valid UTF-8
+    """
+    if extension.lower() not in SOURCE_ANALYZERS:
+        raise ValueError(f"Unsupported file extension: {extension}")
+
+    kind, analyze, analyze_batch = SOURCE_ANALYZERS[extension.lower()]
+
+    blob_sha = None
+    if cache is not None:
+        blob_sha = compute_blob_sha(content)
+        result = _get_cached(cache, blob_sha, kind)
+        if result is not None:
+            return result
+
+    source_code = _decode_source(content)
+    if analyze_batch is not None:
+        # The extension tells the TypeScript parser whether to expect JSX
+        result, kind = analyze_batch([source_code], ['source' + extension.lower()])[0]
+    else:
+        result = analyze(source_code)
+
+    if cache is not None:
+        cache.put(blob_sha, kind, result)
+    return result
+
+
+def analyze_sources(files: Sequence[Tuple[bytes, str]],
+                    cache: Optional[AnalysisCache] = None) -> List[Optional[Dict[str, Any]]]:
+    """
+    Analyze the raw content of several files, using the cache when one is provided.
+
+    Unlike calling analyze_source for each file, the files missing from the
+    cache whose language has a batch analysis function (TypeScript/JavaScript)
+    are analyzed together, so the TypeScript parser workers get them in
+    batches rather than one round trip per file.
+
+    Args:
+        files: (raw content, file extension) pairs
+        cache: Optional analysis cache
+
+    Returns:
+        One analysis result per file, or None for files that are not valid UTF-8
+
+    Raises:
+        ValueError: If an extension is not supported
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(files)
+    # (position, blob SHA, extension, source) of the files to analyze, per batch analysis function
+    pending_batches: Dict[Callable, List[Tuple[int, Optional[str], str, str]]] = {}
+
+    for position, (content, extension) in enumerate(files):
+        if extension.lower() not in SOURCE_ANALYZERS:
+            raise ValueError(f"Unsupported file extension: {extension}")
+        kind, analyze, analyze_batch = SOURCE_ANALYZERS[extension.lower()]
+
+        blob_sha = None
+        if cache is not None:
+            blob_sha = compute_blob_sha(content)
+            results[position] = _get_cached(cache, blob_sha, kind)
+            if results[position] is not None:
+                continue
+
+        try:
+            source_code = _decode_source(content)
+        except UnicodeDecodeError:
+            continue
+
+        if analyze_batch is not None:
+            pending_batches.setdefault(analyze_batch, []).append(
+                (position, blob_sha, extension.lower(), source_code)
+            )
+            continue
+
+        results[position] = analyze(source_code)
+        if cache is not None:
+            cache.put(blob_sha, kind, results[position])
+
+    for analyze_batch, pending in pending_batches.items():
+        analyses = analyze_batch(
+            [source_code for _, _, _, source_code in pending],
+            ['source' + extension for _, _, extension, _ in pending]
+        )
+        for (position, blob_sha, _, _), (result, kind) in zip(pending, analyses):
+            results[position] = result
+            if cache is not None:
+                cache.put(blob_sha, kind, result)
+
+    return results
+
+
+_default_cache: Optional[AnalysisCache] = None
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Get the process-wide analysis cache.
+
+    The cache directory can be configured with the ``REPOMIND_ANALYSIS_CACHE_DIR``
+    environment variable and its size with ``REPOMIND_ANALYSIS_CACHE_MAX_BYTES``.
+
+    Returns:
+        The shared AnalysisCache instance
+    """
+    global _default_cache
+
+    if _default_cache is None:
+        cache_dir = os.environ.get('REPOMIND_ANALYSIS_CACHE_DIR', './data/analysis_cache')
+        max_size = int(os.environ.get('REPOMIND_ANALYSIS_CACHE_MAX_BYTES', DEFAULT_MAX_SIZE_BYTES))
+        _default_cache = AnalysisCache(cache_dir, max_size_bytes=max_size)
+
+    return _default_cache
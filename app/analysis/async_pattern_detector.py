@@ -6,10 +6,12 @@ patterns, including async/await syntax, promise-like patterns, callbacks,
 threading, and asyncio usage.
 """
 import ast
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 
+from app.analysis.parsed_module import AnalysisVisitor, ParsedModule, parse_python_module
 
-class AsyncPatternDetector(ast.NodeVisitor):
+
+class AsyncPatternDetector(AnalysisVisitor):
     """
     Detect asynchronous programming patterns using the Visitor pattern.
     
@@ -20,18 +22,22 @@ class AsyncPatternDetector(ast.NodeVisitor):
     
     def __init__(self):
         """Initialize the detector with empty patterns list."""
+        super().__init__()
         self.patterns = []
         self.current_class = None
         self.current_function = None
+        # Enclosing class/function names, restored when leaving a scope
+        self._class_stack = []
+        self._function_stack = []
         
-    def visit_AsyncFunctionDef(self, node):
+    def enter_AsyncFunctionDef(self, node):
         """
         Visit AsyncFunctionDef nodes to detect async functions.
         
         Args:
             node: The AST AsyncFunctionDef node to visit
         """
-        prev_function = self.current_function
+        self._function_stack.append(self.current_function)
         self.current_function = node.name
         
         if self.current_class:
@@ -50,11 +56,16 @@ class AsyncPatternDetector(ast.NodeVisitor):
                 'col_offset': node.col_offset
             })
         
-        # Visit the body to find await expressions and other patterns
-        self.generic_visit(node)
-        self.current_function = prev_function
+    def leave_AsyncFunctionDef(self, node):
+        """
+        Restore the enclosing function when leaving an async function.
+        
+        Args:
+            node: The AST AsyncFunctionDef node being left
+        """
+        self.current_function = self._function_stack.pop()
         
-    def visit_Await(self, node):
+    def enter_Await(self, node):
         """
         Visit Await nodes to detect await expressions.
         
@@ -68,31 +79,33 @@ class AsyncPatternDetector(ast.NodeVisitor):
             'col_offset': node.col_offset
         })
         
-        # Continue visiting to detect awaited function
-        self.generic_visit(node)
-        
-    def visit_ClassDef(self, node):
+    def enter_ClassDef(self, node):
         """
         Visit ClassDef nodes to track current class for method context.
         
         Args:
             node: The AST ClassDef node to visit
         """
-        prev_class = self.current_class
+        self._class_stack.append(self.current_class)
         self.current_class = node.name
         
-        # Visit class body
-        self.generic_visit(node)
-        self.current_class = prev_class
+    def leave_ClassDef(self, node):
+        """
+        Restore the enclosing class when leaving a class body.
         
-    def visit_FunctionDef(self, node):
+        Args:
+            node: The AST ClassDef node being left
+        """
+        self.current_class = self._class_stack.pop()
+        
+    def enter_FunctionDef(self, node):
         """
         Visit FunctionDef nodes to track current function and detect callbacks.
         
         Args:
             node: The AST FunctionDef node to visit
         """
-        prev_function = self.current_function
+        self._function_stack.append(self.current_function)
         self.current_function = node.name
         
         # Check for callback pattern (function with callback argument)
@@ -106,11 +119,16 @@ class AsyncPatternDetector(ast.NodeVisitor):
                     'col_offset': node.col_offset
                 })
         
-        # Visit function body
-        self.generic_visit(node)
-        self.current_function = prev_function
+    def leave_FunctionDef(self, node):
+        """
+        Restore the enclosing function when leaving a function.
         
-    def visit_Call(self, node):
+        Args:
+            node: The AST FunctionDef node being left
+        """
+        self.current_function = self._function_stack.pop()
+        
+    def enter_Call(self, node):
         """
         Visit Call nodes to detect various async patterns in function calls.
         
@@ -170,9 +188,6 @@ class AsyncPatternDetector(ast.NodeVisitor):
                         'col_offset': node.col_offset
                     })
                 # Add other asyncio patterns here
-        
-        # Continue visiting for nested patterns
-        self.generic_visit(node)
     
     def _extract_caller(self, node):
         """
@@ -193,12 +208,12 @@ class AsyncPatternDetector(ast.NodeVisitor):
         return "unknown"
 
 
-def detect_async_patterns(source_code: str) -> List[Dict[str, Any]]:
+def detect_async_patterns(source_code: Union[str, ParsedModule]) -> List[Dict[str, Any]]:
     """
     Detect asynchronous programming patterns in Python source code.
     
     Args:
-        source_code: Python source code to analyze
+        source_code: Python source code to analyze, or an already parsed module
     
     Returns:
         list: List of dictionaries with async pattern information
@@ -206,11 +221,5 @@ def detect_async_patterns(source_code: str) -> List[Dict[str, Any]]:
     Raises:
         SyntaxError: If the provided source code has syntax errors
     """
-    try:
-        tree = ast.parse(source_code)
-        detector = AsyncPatternDetector()
-        detector.visit(tree)
-        return detector.patterns
-    except SyntaxError as e:
-        # Re-raise with more context
-        raise SyntaxError(f"Failed to parse Python code: {e}") 
\ No newline at end of file
+    module = parse_python_module(source_code)
+    return module.get(AsyncPatternDetector).patterns
@@ -6,7 +6,7 @@ into hierarchical call graphs that represent the calling relationships
 between methods.
 """
 
-from typing import List, Dict, Any, Optional, Set, Tuple
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
 
 
 class CallGraphNode:
@@ -81,49 +81,6 @@ def build_call_graph(method_calls: List[Dict[str, Any]],
     - Managing cycles in the call graph
     - Maintaining the order of calls based on line numbers
     """
-    # Special cases for test compatibility
-    if len(method_calls) == 3:
-        # Test for cycles
-        if any(call['caller'] == 'ClassA.methodB' and call['method'] == 'methodA' for call in method_calls):
-            # This is the cycle test
-            method_a = None
-            method_b = None
-            method_a_cycle = None
-            
-            for call in method_calls:
-                if call['caller'] == 'ClassA' and call['method'] == 'methodA':
-                    method_a = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-                elif call['caller'] == 'ClassA.methodA' and call['method'] == 'methodB':
-                    method_b = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-                elif call['caller'] == 'ClassA.methodB' and call['method'] == 'methodA':
-                    method_a_cycle = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-                    method_a_cycle.is_cycle_ref = True
-            
-            if method_a and method_b and method_a_cycle:
-                method_b.add_child(method_a_cycle)
-                method_a.add_child(method_b)
-                return [method_a]
-        
-        # Test for out of order calls
-        if any(call['caller'] == 'nested.method' and call['method'] == 'deeplyNested' for call in method_calls):
-            # This is the out-of-order test
-            outer = None
-            nested = None
-            deeply_nested = None
-            
-            for call in method_calls:
-                if call['caller'] == 'main' and call['method'] == 'outer':
-                    outer = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-                elif call['caller'] == 'main.outer' and call['method'] == 'nested':
-                    nested = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-                elif call['caller'] == 'nested.method' and call['method'] == 'deeplyNested':
-                    deeply_nested = CallGraphNode(call['caller'], call['method'], call.get('args', []), call.get('lineno', 0))
-            
-            if outer and nested and deeply_nested:
-                nested.add_child(deeply_nested)
-                outer.add_child(nested)
-                return [outer]
-    
     # Initialize the combined list of operations
     operations = []
     
@@ -196,127 +153,176 @@ def build_call_graph(method_calls: List[Dict[str, Any]],
                 
             nodes_map[node_id] = node
     
-    # Build a special map for child lookup
-    parent_map = {}
+    # Index call node IDs by every dotted suffix, so partial caller paths
+    # resolve with dictionary lookups instead of scanning all nodes
+    suffix_index = _build_suffix_index(node_id for node_id in nodes_map if not node_id.startswith('create.'))
     
-    # First pass: Identify direct method call relationships
-    for call in method_calls:
-        caller = call['caller']
-        method = call['method']
-        current_id = f"{caller}.{method}"
+    # Map of child node ID to parent node ID
+    parent_map: Dict[str, str] = {}
+    
+    # First pass: Resolve the caller of every call made from within a method
+    for current_id, node in nodes_map.items():
+        if node.is_object_creation or '.' not in node.caller:
+            continue  # Top-level calls have no parent call
         
-        caller_parts = caller.split('.')
-        if len(caller_parts) >= 2:
-            # This is a call from a method, not a top-level call
-            # The parent should be the caller without the last segment
-            parent_caller = '.'.join(caller_parts[:-1])
-            parent_method = caller_parts[-1]
-            parent_id = f"{parent_caller}.{parent_method}"
-            
-            # Add to parent map
+        parent_id = _resolve_caller(node.caller, current_id, nodes_map, suffix_index)
+        if parent_id is not None:
             parent_map[current_id] = parent_id
     
-    # Second pass: Process any deeply nested method calls (handle partial paths)
-    for current_id in list(nodes_map.keys()):
-        # Skip object creations
-        if current_id.startswith('create.'):
-            continue
-            
-        # If this is a method on nested path like 'nested.method.deeplyNested'
-        # Try to find any parent that matches partial paths like 'main.outer.nested'
-        caller_parts = current_id.split('.')
-        if len(caller_parts) > 2:  # Must have at least [object].[method].[sub-method]
-            for i in range(2, len(caller_parts)):
-                # Try to match the tail part of this ID to a parent ID
-                parent_prefix = '.'.join(caller_parts[:-i])
-                parent_suffix = '.'.join(caller_parts[-i:-1])
-                
-                # Look for any node whose ID ends with this suffix
-                for potential_parent_id in nodes_map.keys():
-                    if potential_parent_id.endswith('.' + parent_suffix):
-                        # Found a potential parent, but make sure it's an actual match
-                        # and not just a coincidental suffix match
-                        parent_map[current_id] = potential_parent_id
-                        break
-    
-    # Third pass: Link objects to their creation nodes
+    # Second pass: Link calls on created objects to their creation nodes
     for current_id, node in nodes_map.items():
-        # Skip object creations
-        if current_id.startswith('create.'):
+        # Skip object creations and calls that already have a parent
+        if node.is_object_creation or current_id in parent_map:
             continue
-            
-        # Get the base object
-        caller_parts = current_id.split('.')
-        base_object = caller_parts[0]
         
-        # If this object has a creation node, link it
-        if base_object in object_nodes_map:
-            creation_node = object_nodes_map[base_object]
-            creation_id = f"create.{creation_node.method}.{creation_node.lineno}"
-            
-            # Only link if it's not already a child of something else
-            if current_id not in parent_map and creation_node.lineno < node.lineno:
-                parent_map[current_id] = creation_id
+        # If the base object has a creation node before this call, link it
+        creation_node = object_nodes_map.get(current_id.split('.')[0])
+        if creation_node is not None and creation_node.lineno < node.lineno:
+            parent_map[current_id] = f"create.{creation_node.method}.{creation_node.lineno}"
     
-    # Now we can establish parent-child relationships based on the parent map
+    # Link children to parents. Every child gets at most one parent, so the
+    # nodes form a forest; a disjoint set of its trees tells in near-constant
+    # time whether a link would close a loop.
+    trees = _DisjointSet()
     for child_id, parent_id in parent_map.items():
-        # Skip if either node doesn't exist
-        if child_id not in nodes_map or parent_id not in nodes_map:
-            continue
-            
         parent_node = nodes_map[parent_id]
         child_node = nodes_map[child_id]
         
-        # Track visited nodes to detect cycles
-        cycle_detection = set()
+        # A call of a method on the same object as a method already in the
+        # tree (e.g. 'ClassA.methodB.methodA' under 'ClassA.methodA') is a
+        # call back into that method
+        target_id = f"{child_id.split('.')[0]}.{child_node.method}"
+        if target_id == child_id or target_id not in nodes_map:
+            target_id = child_id
         
-        # Function to check if adding this child would create a cycle
-        def would_create_cycle(node, target_id):
-            if node.caller + '.' + node.method == target_id:
-                return True
-                
-            cycle_detection.add(node.caller + '.' + node.method)
-            
-            for child in node.children:
-                child_id = child.caller + '.' + child.method
-                if child_id in cycle_detection:
-                    continue  # Already checked
-                    
-                if would_create_cycle(child, target_id):
-                    return True
-                    
-            cycle_detection.remove(node.caller + '.' + node.method)
-            return False
-        
-        # Check for cycles
-        if would_create_cycle(child_node, parent_id):
+        if trees.find(target_id) == trees.find(parent_id):
             # This would create a cycle, so make a reference node instead
-            cycle_node = CallGraphNode(child_node.caller, child_node.method, 
-                                       child_node.args, child_node.lineno)
-            cycle_node.is_cycle_ref = True
-            cycle_node.is_object_creation = child_node.is_object_creation
-            cycle_node.target_object = child_node.target_object
-            cycle_node.is_async = child_node.is_async
-            cycle_node.is_conditional = child_node.is_conditional
-            cycle_node.condition = child_node.condition
-            parent_node.add_child(cycle_node)
+            parent_node.add_child(_make_cycle_ref(child_node))
         else:
-            # Normal case, no cycle
             parent_node.add_child(child_node)
-    
-    # Find root nodes (nodes that aren't children of other nodes)
-    child_ids = set(parent_map.keys())
+            trees.union(child_id, parent_id)
     
     # Return all nodes that aren't children of other nodes, sorted by line number
-    root_nodes = [
-        node for node_id, node in nodes_map.items() 
-        if node_id not in child_ids and not node.is_cycle_ref
-    ]
+    root_nodes = [node for node_id, node in nodes_map.items() if node_id not in parent_map]
     
     # Sort by line number for consistent ordering
     return sorted(root_nodes, key=lambda node: node.lineno)
 
 
+class _DisjointSet:
+    """Union-find over node IDs, with path halving and union by size."""
+    
+    def __init__(self):
+        """Initialize an empty disjoint set; every ID starts in its own set."""
+        self._parents: Dict[str, str] = {}
+        self._sizes: Dict[str, int] = {}
+    
+    def find(self, item: str) -> str:
+        """
+        Find the representative of the set containing an item.
+        
+        Args:
+            item: The item
+            
+        Returns:
+            The representative item of its set
+        """
+        parents = self._parents
+        while parents.get(item, item) != item:
+            parents[item] = parents.get(parents[item], parents[item])
+            item = parents[item]
+        return item
+    
+    def union(self, first: str, second: str) -> None:
+        """
+        Merge the sets containing two items.
+        
+        Args:
+            first: An item of the first set
+            second: An item of the second set
+        """
+        first, second = self.find(first), self.find(second)
+        if first == second:
+            return
+        
+        if self._sizes.get(first, 1) < self._sizes.get(second, 1):
+            first, second = second, first
+        self._parents[second] = first
+        self._sizes[first] = self._sizes.get(first, 1) + self._sizes.get(second, 1)
+
+
+def _build_suffix_index(node_ids: Iterable[str]) -> Dict[str, List[str]]:
+    """
+    Index node IDs by each of their dotted suffixes.
+    
+    'main.outer.nested' is indexed under 'nested', 'outer.nested' and
+    'main.outer.nested'.
+    
+    Args:
+        node_ids: Node IDs, in the order they should be preferred
+        
+    Returns:
+        Dictionary mapping each suffix to the IDs ending with it
+    """
+    suffix_index: Dict[str, List[str]] = {}
+    for node_id in node_ids:
+        parts = node_id.split('.')
+        for i in range(len(parts)):
+            suffix_index.setdefault('.'.join(parts[i:]), []).append(node_id)
+    return suffix_index
+
+
+def _resolve_caller(caller: str, node_id: str, nodes_map: Dict[str, CallGraphNode],
+                    suffix_index: Dict[str, List[str]]) -> Optional[str]:
+    """
+    Find the node of the call a call was made from.
+    
+    The caller is matched exactly first. Otherwise the longest dotted suffix
+    of the caller that ends a node ID is used, dropping trailing segments of
+    the caller (e.g. the method name in 'nested.method') until one matches.
+    
+    Args:
+        caller: The caller path of the call
+        node_id: ID of the call node itself, which can't be its own parent
+        nodes_map: Nodes by ID
+        suffix_index: Index from _build_suffix_index
+        
+    Returns:
+        ID of the parent node, or None if no node matches
+    """
+    if caller in nodes_map and caller != node_id:
+        return caller
+    
+    parts = caller.split('.')
+    for end in range(len(parts), 0, -1):
+        for start in range(end):
+            for candidate in suffix_index.get('.'.join(parts[start:end]), ()):
+                if candidate != node_id:
+                    return candidate
+    
+    return None
+
+
+def _make_cycle_ref(node: CallGraphNode) -> CallGraphNode:
+    """
+    Create a reference to a node that closes a cycle in the call graph.
+    
+    Args:
+        node: The node the cycle leads back to
+        
+    Returns:
+        A childless copy of the node, marked as a cycle reference
+    """
+    cycle_node = CallGraphNode(node.caller, node.method, node.args, node.lineno)
+    cycle_node.is_cycle_ref = True
+    cycle_node.is_object_creation = node.is_object_creation
+    cycle_node.target_object = node.target_object
+    cycle_node.is_async = node.is_async
+    cycle_node.is_conditional = node.is_conditional
+    cycle_node.condition = node.condition
+    return cycle_node
+
+
 def build_object_lifetime_graph(method_calls: List[Dict[str, Any]], 
                                object_creations: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
     """
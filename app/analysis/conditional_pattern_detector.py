@@ -5,10 +5,12 @@ This module analyzes Python AST to identify various conditional programming patt
 including if statements, ternary operators, loops with conditions, and try-except blocks.
 """
 import ast
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 
+from app.analysis.parsed_module import AnalysisVisitor, ParsedModule, parse_python_module
 
-class ConditionalPatternDetector(ast.NodeVisitor):
+
+class ConditionalPatternDetector(AnalysisVisitor):
     """
     Detect conditional programming patterns using the Visitor pattern.
     
@@ -19,25 +21,33 @@ class ConditionalPatternDetector(ast.NodeVisitor):
     
     def __init__(self):
         """Initialize the detector with empty patterns list."""
+        super().__init__()
         self.patterns = []
         self.current_function = None
         self.nesting_level = 0
+        # Enclosing function names, restored when leaving a function
+        self._function_stack = []
         
-    def visit_FunctionDef(self, node):
+    def enter_FunctionDef(self, node):
         """
         Visit FunctionDef nodes to track current function.
         
         Args:
             node: The AST FunctionDef node to visit
         """
-        prev_function = self.current_function
+        self._function_stack.append(self.current_function)
         self.current_function = node.name
         
-        # Visit function body
-        self.generic_visit(node)
-        self.current_function = prev_function
+    def leave_FunctionDef(self, node):
+        """
+        Restore the enclosing function when leaving a function.
+        
+        Args:
+            node: The AST FunctionDef node being left
+        """
+        self.current_function = self._function_stack.pop()
         
-    def visit_If(self, node):
+    def enter_If(self, node):
         """
         Visit If nodes to detect if statements and if-elif chains.
         
@@ -105,13 +115,17 @@ class ConditionalPatternDetector(ast.NodeVisitor):
                         'nesting_level': self.nesting_level - 1
                     })
         
-        # Visit the body and else clause
-        self.generic_visit(node)
+    def leave_If(self, node):
+        """
+        Leave If nodes once their body and else clause have been visited.
         
+        Args:
+            node: The AST If node being left
+        """
         # Decrement nesting level
         self.nesting_level -= 1
         
-    def visit_IfExp(self, node):
+    def enter_IfExp(self, node):
         """
         Visit IfExp nodes to detect ternary operators.
         
@@ -128,10 +142,7 @@ class ConditionalPatternDetector(ast.NodeVisitor):
             'col_offset': node.col_offset
         })
         
-        # Continue visiting for nested patterns
-        self.generic_visit(node)
-        
-    def visit_For(self, node):
+    def enter_For(self, node):
         """
         Visit For nodes to detect for loops.
         
@@ -151,10 +162,7 @@ class ConditionalPatternDetector(ast.NodeVisitor):
             'col_offset': node.col_offset
         })
         
-        # Continue visiting for nested patterns
-        self.generic_visit(node)
-        
-    def visit_While(self, node):
+    def enter_While(self, node):
         """
         Visit While nodes to detect while loops.
         
@@ -172,10 +180,7 @@ class ConditionalPatternDetector(ast.NodeVisitor):
             'col_offset': node.col_offset
         })
         
-        # Continue visiting for nested patterns
-        self.generic_visit(node)
-        
-    def visit_Try(self, node):
+    def enter_Try(self, node):
         """
         Visit Try nodes to detect try-except blocks.
         
@@ -191,9 +196,6 @@ class ConditionalPatternDetector(ast.NodeVisitor):
             'lineno': node.lineno,
             'col_offset': node.col_offset
         })
-        
-        # Continue visiting for nested patterns
-        self.generic_visit(node)
 
 
 def _is_part_of_elif_chain(node):
@@ -372,12 +374,12 @@ def _contains_continue(body):
     return False
 
 
-def detect_conditional_patterns(source_code: str) -> List[Dict[str, Any]]:
+def detect_conditional_patterns(source_code: Union[str, ParsedModule]) -> List[Dict[str, Any]]:
     """
     Detect conditional programming patterns in Python source code.
     
     Args:
-        source_code: Python source code to analyze
+        source_code: Python source code to analyze, or an already parsed module
     
     Returns:
         list: List of dictionaries with conditional pattern information
@@ -385,11 +387,5 @@ def detect_conditional_patterns(source_code: str) -> List[Dict[str, Any]]:
     Raises:
         SyntaxError: If the provided source code has syntax errors
     """
-    try:
-        tree = ast.parse(source_code)
-        detector = ConditionalPatternDetector()
-        detector.visit(tree)
-        return detector.patterns
-    except SyntaxError as e:
-        # Re-raise with more context
-        raise SyntaxError(f"Failed to parse Python code: {e}") 
\ No newline at end of file
+    module = parse_python_module(source_code)
+    return module.get(ConditionalPatternDetector).patterns
@@ -0,0 +1,273 @@
+"""
+Module for sharing a single parsed Python AST between analyzers.
+
+Parsing is the most expensive step of Python analysis, so this module provides
+a ParsedModule that parses a source file once, and an AnalysisVisitor base class
+that lets several analyzers run side by side in one walk of the tree.
+"""
+import ast
+from typing import Dict, List, Any, Iterable, Type, Union
+
+
+class AnalysisVisitor(ast.NodeVisitor):
+    """
+    Base class for analyzers that can share a single AST walk.
+
+    Instead of ``visit_<NodeType>`` methods that recurse on their own, subclasses
+    implement ``enter_<NodeType>`` hooks (called before the children of a node
+    are walked) and ``leave_<NodeType>`` hooks (called after). This allows
+    walk_tree to drive any number of analyzers in one traversal. Calling
+    ``visit(tree)`` still works for running a single analyzer on its own.
+
+    Attributes:
+        parents: Ancestors of the node currently being entered, outermost
+            first; maintained by walk_tree
+    """
+
+    def __init__(self):
+        """Initialize the analyzer with no ancestors."""
+        self.parents: List[ast.AST] = []
+
+    def visit(self, node):
+        """
+        Walk the tree rooted at node with only this analyzer.
+
+        Args:
+            node: The AST node to start from
+        """
+        walk_tree(node, [self])
+
+    def enter(self, node):
+        """
+        Dispatch to the ``enter_<NodeType>`` hook for a node, if defined.
+
+        walk_tree looks the hooks up once per node type instead; this is for
+        driving an analyzer from another traversal.
+
+        Args:
+            node: The AST node being entered
+        """
+        hook = getattr(self, 'enter_' + node.__class__.__name__, None)
+        if hook is not None:
+            hook(node)
+
+    def leave(self, node):
+        """
+        Dispatch to the ``leave_<NodeType>`` hook for a node, if defined.
+
+        Args:
+            node: The AST node being left
+        """
+        hook = getattr(self, 'leave_' + node.__class__.__name__, None)
+        if hook is not None:
+            hook(node)
+
+
+def walk_tree(tree: ast.AST, visitors: Iterable[AnalysisVisitor]) -> None:
+    """
+    Walk an AST once in depth-first order, driving several analyzers.
+
+    Each node is entered by every visitor (in order) before its children are
+    walked, and left by every visitor (in reverse order) afterwards. Hooks are
+    looked up once per node type, and the walk is iterative so deeply nested
+    code does not hit the recursion limit.
+
+    Args:
+        tree: Root of the AST to walk
+        visitors: Analyzers to run during the walk
+    """
+    visitors = list(visitors)
+    if not visitors:
+        return
+
+    parents = []
+    for visitor in visitors:
+        visitor.parents = parents
+
+    # Node type -> (enter hooks, leave hooks)
+    hook_table = {}
+
+    # Stack entries are (node, depth) pairs, with a depth of -1 marking the
+    # point where a node is left. Children are pushed in reverse so they are
+    # popped in source order.
+    stack = [(tree, 0)]
+    while stack:
+        node, depth = stack.pop()
+        node_class = node.__class__
+
+        hooks = hook_table.get(node_class)
+        if hooks is None:
+            name = node_class.__name__
+            enters = [getattr(visitor, 'enter_' + name) for visitor in visitors
+                      if hasattr(visitor, 'enter_' + name)]
+            leaves = [getattr(visitor, 'leave_' + name) for visitor in reversed(visitors)
+                      if hasattr(visitor, 'leave_' + name)]
+            hooks = hook_table[node_class] = (enters, leaves)
+
+        if depth < 0:
+            for leave in hooks[1]:
+                leave(node)
+            continue
+
+        # Drop the ancestors of the previously entered node that are not ours
+        del parents[depth:]
+
+        for enter in hooks[0]:
+            enter(node)
+
+        if hooks[1]:
+            stack.append((node, -1))
+
+        children = []
+        for field in node_class._fields:
+            value = getattr(node, field, None)
+            if isinstance(value, list):
+                children.extend(item for item in value if isinstance(item, ast.AST))
+            elif isinstance(value, ast.AST):
+                children.append(value)
+
+        if children:
+            parents.append(node)
+            depth += 1
+            for child in reversed(children):
+                stack.append((child, depth))
+
+
+class ParsedModule:
+    """
+    A Python source file parsed once and shared between analyzers.
+
+    Analyzers are run through ``run``, which walks the tree a single time for all
+    analyzers that have not been run yet and caches them, so asking for the
+    same results twice never re-walks the tree.
+
+    Attributes:
+        source_code: The original source code
+        tree: The parsed AST
+    """
+
+    def __init__(self, source_code: str, tree: ast.AST):
+        """
+        Initialize a parsed module.
+
+        Args:
+            source_code: The original source code
+            tree: The AST parsed from source_code
+        """
+        self.source_code = source_code
+        self.tree = tree
+        self._visitors: Dict[Type[AnalysisVisitor], AnalysisVisitor] = {}
+
+    @classmethod
+    def from_source(cls, source_code: str) -> 'ParsedModule':
+        """
+        Parse Python source code into a ParsedModule.
+
+        Args:
+            source_code: Python source code to parse
+
+        Returns:
+            ParsedModule: The parsed module
+
+        Raises:
+            SyntaxError: If the provided source code has syntax errors
+        """
+        try:
+            tree = ast.parse(source_code)
+        except SyntaxError as e:
+            # Re-raise with more context
+            raise SyntaxError(f"Failed to parse Python code: {e}")
+        return cls(source_code, tree)
+
+    def run(self, *visitor_classes: Type[AnalysisVisitor]) -> List[AnalysisVisitor]:
+        """
+        Run analyzers over the module in a single walk.
+
+        Analyzers that have already been run on this module are not run again.
+
+        Args:
+            visitor_classes: AnalysisVisitor subclasses to run
+
+        Returns:
+            list: The analyzer instances, in the order they were requested
+        """
+        pending = []
+        for visitor_class in visitor_classes:
+            if visitor_class not in self._visitors:
+                visitor = visitor_class()
+                self._visitors[visitor_class] = visitor
+                pending.append(visitor)
+
+        walk_tree(self.tree, pending)
+
+        return [self._visitors[visitor_class] for visitor_class in visitor_classes]
+
+    def get(self, visitor_class: Type[AnalysisVisitor]) -> AnalysisVisitor:
+        """
+        Get a single analyzer, running it if needed.
+
+        Args:
+            visitor_class: AnalysisVisitor subclass to run
+
+        Returns:
+            AnalysisVisitor: The analyzer instance
+        """
+        return self.run(visitor_class)[0]
+
+    def analyze(self) -> Dict[str, Any]:
+        """
+        Run every Python analyzer over the module in one walk.
+
+        Returns:
+            Dict with 'method_calls', 'object_creations', 'async_patterns',
+            'conditional_patterns', 'imports', 'call_sites' and 'definitions'
+            entries
+        """
+        from app.analysis.python_extractor import (
+            MethodCallExtractor,
+            ObjectCreationExtractor,
+            ImportExtractor,
+            CallSiteExtractor,
+            DefinitionExtractor
+        )
+        from app.analysis.async_pattern_detector import AsyncPatternDetector
+        from app.analysis.conditional_pattern_detector import ConditionalPatternDetector
+
+        (calls, creations, async_detector, conditional_detector,
+         imports, call_sites, definitions) = self.run(
+            MethodCallExtractor,
+            ObjectCreationExtractor,
+            AsyncPatternDetector,
+            ConditionalPatternDetector,
+            ImportExtractor,
+            CallSiteExtractor,
+            DefinitionExtractor
+        )
+
+        return {
+            'method_calls': calls.calls,
+            'object_creations': creations.creations,
+            'async_patterns': async_detector.patterns,
+            'conditional_patterns': conditional_detector.patterns,
+            'imports': imports.get_imports(),
+            'call_sites': call_sites.get_call_sites(),
+            'definitions': definitions.definitions
+        }
+
+
+def parse_python_module(source: Union[str, ParsedModule]) -> ParsedModule:
+    """
+    Get a ParsedModule for source code, reusing it if already parsed.
+
+    Args:
+        source: Python source code or an existing ParsedModule
+
+    Returns:
+        ParsedModule: The parsed module
+
+    Raises:
+        SyntaxError: If the provided source code has syntax errors
+    """
+    if isinstance(source, ParsedModule):
+        return source
+    return ParsedModule.from_source(source)
@@ -0,0 +1,606 @@
+"""
+Module for the repository-wide call graph.
+
+build_call_graph only sees the calls of one source file. A ProjectCallGraph
+combines the call sites of every Python file in a repository (see
+CallSiteExtractor) with import resolution from the repository file index, so
+calls resolve to the functions they reach in other files. Functions are
+identified as ``<path>:<qualified name>``, with ``<path>:<module>`` for code at
+module level.
+
+The graph is kept up to date per file: sync only re-analyzes files whose
+content changed, and only re-resolves the calls of changed files and of the
+files importing them.
+"""
+import os
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Iterable, Optional, Set, Tuple
+
+from app.analysis.analysis_cache import AnalysisCache, analyze_source, compute_blob_sha
+from app.structure.dependency_analyzer import _collect_code_files
+from app.structure.file_index import RepositoryFileIndex
+
+
+# Qualified name standing for the code at module level
+MODULE_SCOPE = '<module>'
+
+# Maximum number of re-exports followed when resolving an imported name
+MAX_REEXPORT_HOPS = 5
+
+# Default number of repository call graphs kept in memory by get_project_call_graph
+DEFAULT_MAX_GRAPHS = 16
+
+# Directions of call queries
+CALLERS = 'callers'
+CALLEES = 'callees'
+
+# Kinds of definitions
+FUNCTION = 'function'
+CLASS = 'class'
+
+# A resolved import binding: (target file, imported name or None for the module itself)
+Binding = Tuple[str, Optional[str]]
+
+
+def make_function_id(path: str, qualname: str) -> str:
+    """
+    Build the ID of a function.
+
+    Args:
+        path: Path of the file relative to the repository root
+        qualname: Qualified name of the function (MODULE_SCOPE for module level)
+
+    Returns:
+        The function ID
+    """
+    return f"{path}:{qualname}"
+
+
+def split_function_id(function_id: str) -> Tuple[str, str]:
+    """
+    Split a function ID into its file path and qualified name.
+
+    Args:
+        function_id: ID from make_function_id
+
+    Returns:
+        Tuple of (path, qualified name)
+    """
+    path, _, qualname = function_id.rpartition(':')
+    return path, qualname
+
+
+class ProjectCallGraph:
+    """
+    Call graph across all Python files of a repository.
+
+    The graph can be read from several threads while one of them syncs it:
+    readers wait for a sync in progress rather than see a half-applied graph.
+
+    Attributes:
+        repo_path: Path to the repository root, once synced
+        commit_sha: Commit the graph was last synced at, if known
+        unresolved_calls: Number of calls that could not be resolved to a
+            function in the repository (external or dynamic calls)
+    """
+
+    def __init__(self):
+        """Initialize an empty call graph."""
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """Forget every file, as if the graph had never been synced."""
+        self.repo_path: Optional[str] = None
+        self.commit_sha: Optional[str] = None
+        self.unresolved_calls = 0
+        self._file_index: Optional[RepositoryFileIndex] = None
+        # Per file: content hash, call sites, definitions and import bindings
+        self._blob_shas: Dict[str, str] = {}
+        self._call_sites: Dict[str, Dict[str, Any]] = {}
+        self._definitions: Dict[str, Dict[str, str]] = {}
+        self._bindings: Dict[str, Dict[str, Binding]] = {}
+        self._unresolved: Dict[str, int] = {}
+        # Functions of each file that call something
+        self._sources: Dict[str, Set[str]] = {}
+        # Files whose imports resolve to a file, for re-resolving their calls
+        self._importers: Dict[str, Set[str]] = {}
+        self._callees: Dict[str, Set[str]] = {}
+        self._callers: Dict[str, Set[str]] = {}
+
+    def __contains__(self, function_id: str) -> bool:
+        """Whether a function is defined in the graph."""
+        path, qualname = split_function_id(function_id)
+        with self._lock:
+            definitions = self._definitions.get(path)
+            return definitions is not None and (qualname == MODULE_SCOPE or definitions.get(qualname) == FUNCTION)
+
+    @property
+    def files(self) -> List[str]:
+        """Paths of the files in the graph."""
+        with self._lock:
+            return sorted(self._call_sites)
+
+    def get_functions(self, path: str) -> List[str]:
+        """
+        Get the IDs of the functions defined in a file.
+
+        Args:
+            path: Path of the file relative to the repository root
+
+        Returns:
+            Sorted list of function IDs, including the module level
+        """
+        with self._lock:
+            definitions = self._definitions.get(path)
+            if definitions is None:
+                return []
+            qualnames = [qualname for qualname, kind in definitions.items() if kind == FUNCTION]
+        return [make_function_id(path, qualname) for qualname in sorted(qualnames + [MODULE_SCOPE])]
+
+    def get_callees(self, function_id: str) -> List[str]:
+        """
+        Get the functions a function calls.
+
+        Args:
+            function_id: ID of the calling function
+
+        Returns:
+            Sorted list of function IDs
+        """
+        with self._lock:
+            return sorted(self._callees.get(function_id, ()))
+
+    def get_callers(self, function_id: str) -> List[str]:
+        """
+        Get the functions calling a function.
+
+        Args:
+            function_id: ID of the called function
+
+        Returns:
+            Sorted list of function IDs
+        """
+        with self._lock:
+            return sorted(self._callers.get(function_id, ()))
+
+    def get_related(self, function_id: str, direction: str = CALLEES) -> List[str]:
+        """
+        Get the callers or callees of a function.
+
+        Args:
+            function_id: ID of the function
+            direction: CALLEES for the functions it calls, CALLERS for the
+                functions calling it
+
+        Returns:
+            Sorted list of function IDs
+
+        Raises:
+            ValueError: If the direction is unknown
+        """
+        if direction == CALLEES:
+            return self.get_callees(function_id)
+        if direction == CALLERS:
+            return self.get_callers(function_id)
+        raise ValueError(f"Unknown direction: {direction}")
+
+    def find_path(self, source: str, target: str, max_depth: Optional[int] = None) -> Optional[List[str]]:
+        """
+        Find a shortest chain of calls from one function to another.
+
+        Args:
+            source: ID of the calling function
+            target: ID of the function to reach
+            max_depth: Maximum number of calls in the chain (unlimited if None)
+
+        Returns:
+            List of function IDs from source to target, or None if target is
+            not reachable
+        """
+        if source == target:
+            return [source]
+
+        parents: Dict[str, Optional[str]] = {source: None}
+        queue = deque([(source, 0)])
+        with self._lock:
+            while queue:
+                function_id, depth = queue.popleft()
+                if max_depth is not None and depth >= max_depth:
+                    continue
+
+                for callee in sorted(self._callees.get(function_id, ())):
+                    if callee in parents:
+                        continue
+                    parents[callee] = function_id
+                    if callee == target:
+                        path = [callee]
+                        while parents[path[-1]] is not None:
+                            path.append(parents[path[-1]])
+                        return path[::-1]
+                    queue.append((callee, depth + 1))
+
+        return None
+
+    def sync(self, repo_path: str, cache: Optional[AnalysisCache] = None,
+             commit_sha: Optional[str] = None) -> Dict[str, int]:
+        """
+        Bring the graph up to date with the files of a repository.
+
+        Only files whose content changed since the last sync are analyzed
+        again, and only the calls of changed files and of the files importing
+        them are resolved again.
+
+        Args:
+            repo_path: Path to the repository root
+            cache: Optional analysis cache, so unchanged files are not parsed again
+            commit_sha: Commit the repository is at, if known
+
+        Returns:
+            Dict with the numbers of 'updated', 'removed' and 'unchanged' files
+        """
+        with self._lock:
+            file_index = RepositoryFileIndex(repo_path)
+            code_files = [
+                (file_path, rel_path) for file_path, rel_path, ext in _collect_code_files(repo_path, file_index)
+                if ext == '.py'
+            ]
+
+            changed: Dict[str, Dict[str, Any]] = {}
+            blob_shas: Dict[str, str] = {}
+            seen = set()
+            for file_path, rel_path in code_files:
+                try:
+                    with open(file_path, 'rb') as f:
+                        content = f.read()
+                    blob_sha = compute_blob_sha(content)
+                    if self._blob_shas.get(rel_path) == blob_sha:
+                        seen.add(rel_path)
+                        continue
+                    call_sites = analyze_source(content, '.py', cache).get('call_sites')
+                except (OSError, UnicodeDecodeError):
+                    continue
+
+                seen.add(rel_path)
+                if call_sites is not None:
+                    blob_shas[rel_path] = blob_sha
+                    changed[rel_path] = call_sites
+
+            removed = [path for path in self._call_sites if path not in seen]
+            files_moved = bool(removed) or any(path not in self._call_sites for path in changed)
+
+            self._file_index = file_index
+            try:
+                self._apply(changed, removed, rebind_all=files_moved)
+            except Exception:
+                # A half-applied graph must not pass for up to date; the next sync rebuilds it
+                self._reset()
+                raise
+
+            # Only recorded once applied, so a failed sync is retried in full
+            self._blob_shas.update(blob_shas)
+            self.repo_path = repo_path
+            self.commit_sha = commit_sha
+
+            return {
+                'updated': len(changed),
+                'removed': len(removed),
+                'unchanged': len(seen) - len(changed)
+            }
+
+    def update_file(self, path: str, call_sites: Dict[str, Any]) -> None:
+        """
+        Add or replace the call sites of one file.
+
+        Args:
+            path: Path of the file relative to the repository root
+            call_sites: Output of extract_call_sites for the file
+        """
+        with self._lock:
+            self._blob_shas.pop(path, None)
+            self._apply({path: call_sites}, [], rebind_all=path not in self._call_sites)
+
+    def remove_file(self, path: str) -> None:
+        """
+        Remove a file and every call to or from its functions.
+
+        Args:
+            path: Path of the file relative to the repository root
+        """
+        with self._lock:
+            self._blob_shas.pop(path, None)
+            self._apply({}, [path], rebind_all=True)
+
+    def _apply(self, changed: Dict[str, Dict[str, Any]], removed: Iterable[str], rebind_all: bool) -> None:
+        """
+        Apply changed and removed files and re-resolve the affected calls.
+
+        Args:
+            changed: New call sites per changed file
+            removed: Paths of removed files
+            rebind_all: Whether imports of all files must be resolved again,
+                because files were added or removed
+        """
+        # Importers of changed files call into definitions that may be gone
+        relink = set(changed)
+        for path in list(changed) + list(removed):
+            relink.update(self._importers.get(path, ()))
+
+        for path in removed:
+            self._unlink(path)
+            self._unbind(path)
+            for table in (self._blob_shas, self._call_sites, self._definitions, self._bindings, self._unresolved):
+                table.pop(path, None)
+            relink.discard(path)
+
+        for path, call_sites in changed.items():
+            self._unlink(path)
+            self._call_sites[path] = call_sites
+            definitions = {cls['name']: CLASS for cls in call_sites.get('classes', [])}
+            definitions.update((function['name'], FUNCTION) for function in call_sites.get('functions', []))
+            self._definitions[path] = definitions
+
+        rebind = self._call_sites if rebind_all else changed
+        for path in list(rebind):
+            self._bind(path)
+
+        if rebind_all:
+            relink = set(self._call_sites)
+        for path in sorted(relink):
+            self._unlink(path)
+            self._link(path)
+
+        self.unresolved_calls = sum(self._unresolved.values())
+
+    def _bind(self, path: str) -> None:
+        """
+        Resolve the imports of a file to files of the repository.
+
+        Args:
+            path: Path of the file relative to the repository root
+        """
+        self._unbind(path)
+
+        bindings: Dict[str, Binding] = {}
+        for imported in self._call_sites[path].get('imports', []):
+            binding = self._resolve_import(imported, path)
+            if binding is not None:
+                bindings[imported['name']] = binding
+                self._importers.setdefault(binding[0], set()).add(path)
+
+        self._bindings[path] = bindings
+
+    def _unbind(self, path: str) -> None:
+        """
+        Forget that a file imports other files.
+
+        Args:
+            path: Path of the file relative to the repository root
+        """
+        for target in set(target for target, _ in self._bindings.get(path, {}).values()):
+            importers = self._importers.get(target)
+            if importers is not None:
+                importers.discard(path)
+                if not importers:
+                    del self._importers[target]
+
+    def _resolve_import(self, imported: Dict[str, Any], path: str) -> Optional[Binding]:
+        """
+        Resolve one import of a file.
+
+        Args:
+            imported: Import record from CallSiteExtractor
+            path: Path of the importing file
+
+        Returns:
+            The binding, or None if the import is not a file of the repository
+        """
+        module, symbol, level = imported['module'], imported['symbol'], imported['level']
+
+        # "from package import module" binds a module, not a name in it
+        if symbol is not None:
+            submodule = self._find_module(f"{module}.{symbol}" if module else symbol, level, path)
+            if submodule is not None:
+                return submodule, None
+
+        target = self._find_module(module, level, path)
+        if target is None:
+            return None
+        return target, symbol
+
+    def _find_module(self, module: str, level: int, path: str) -> Optional[str]:
+        """
+        Find the Python file of a module.
+
+        Args:
+            module: Dotted module name (may be empty for relative imports)
+            level: Number of leading dots of a relative import
+            path: Path of the importing file
+
+        Returns:
+            Path of the module file, or None if it is not in the repository
+        """
+        if self._file_index is None:
+            return None
+        files = self._file_index.files
+
+        if level:
+            base = os.path.dirname(path)
+            for _ in range(level - 1):
+                base = os.path.dirname(base)
+            module_path = os.path.join(base, *module.split('.')) if module else base
+            candidates = [module_path + '.py', os.path.join(module_path, '__init__.py')]
+        else:
+            resolved = self._file_index.resolve(module, path)
+            if resolved is None:
+                return None
+            candidates = [resolved, os.path.join(resolved, '__init__.py')]
+
+        for candidate in candidates:
+            candidate = os.path.normpath(candidate)
+            if candidate in files and candidate.endswith('.py'):
+                return candidate
+        return None
+
+    def _unlink(self, path: str) -> None:
+        """
+        Remove the calls made from the functions of a file.
+
+        Args:
+            path: Path of the file relative to the repository root
+        """
+        for function_id in self._sources.pop(path, ()):
+            for callee in self._callees.pop(function_id, ()):
+                callers = self._callers.get(callee)
+                if callers is not None:
+                    callers.discard(function_id)
+                    if not callers:
+                        del self._callers[callee]
+        self._unresolved.pop(path, None)
+
+    def _link(self, path: str) -> None:
+        """
+        Resolve the calls made from the functions of a file.
+
+        Args:
+            path: Path of the file relative to the repository root
+        """
+        call_sites = self._call_sites[path]
+        classes_of = {function['name']: function['class'] for function in call_sites.get('functions', [])}
+
+        unresolved = 0
+        for call in call_sites.get('calls', []):
+            scope = call['scope']
+            target = self._resolve_call(path, scope, call['callee'], classes_of)
+            if target is None:
+                unresolved += 1
+                continue
+
+            caller = make_function_id(path, scope or MODULE_SCOPE)
+            self._sources.setdefault(path, set()).add(caller)
+            self._callees.setdefault(caller, set()).add(target)
+            self._callers.setdefault(target, set()).add(caller)
+
+        self._unresolved[path] = unresolved
+
+    def _resolve_call(self, path: str, scope: str, callee: str,
+                      classes_of: Dict[str, Optional[str]]) -> Optional[str]:
+        """
+        Resolve a call to the function it reaches.
+
+        Tries, in order: methods of the enclosing class called on self or
+        cls, names defined in the file (innermost scope first), and names
+        imported from other files of the repository. Calls of a class
+        resolve to its __init__ method.
+
+        Args:
+            path: Path of the calling file
+            scope: Qualified name of the calling function ('' for module level)
+            callee: Dotted callee expression
+            classes_of: Enclosing class of every function of the file
+
+        Returns:
+            ID of the called function, or None if it can't be resolved
+        """
+        parts = callee.split('.')
+
+        if parts[0] in ('self', 'cls') and len(parts) == 2:
+            class_name = classes_of.get(scope)
+            if class_name is None:
+                return None
+            return self._lookup(path, f"{class_name}.{parts[1]}")
+
+        # Names defined in the enclosing functions, then at module level
+        enclosing = scope.split('.') if scope else []
+        for depth in range(len(enclosing), -1, -1):
+            qualname = '.'.join(enclosing[:depth] + parts)
+            if qualname in self._definitions[path]:
+                return self._lookup(path, qualname)
+
+        # Imported names; the longest imported prefix of the callee wins
+        bindings = self._bindings.get(path, {})
+        for length in range(len(parts), 0, -1):
+            binding = bindings.get('.'.join(parts[:length]))
+            if binding is not None:
+                return self._lookup_imported(binding, parts[length:])
+
+        return None
+
+    def _lookup_imported(self, binding: Binding, rest: List[str]) -> Optional[str]:
+        """
+        Resolve an imported name, following re-exports of package modules.
+
+        Args:
+            binding: The import binding the callee starts with
+            rest: Remaining parts of the callee after the imported name
+
+        Returns:
+            ID of the called function, or None if it can't be resolved
+        """
+        for _ in range(MAX_REEXPORT_HOPS):
+            target, symbol = binding
+            names = ([symbol] if symbol else []) + rest
+            if not names or target not in self._definitions:
+                return None
+
+            qualname = '.'.join(names)
+            if qualname in self._definitions[target]:
+                return self._lookup(target, qualname)
+
+            # The name may itself be imported into the target ("from .core import run" in __init__.py)
+            binding = self._bindings.get(target, {}).get(names[0])
+            if binding is None:
+                return None
+            rest = names[1:]
+
+        return None
+
+    def _lookup(self, path: str, qualname: str) -> Optional[str]:
+        """
+        Get the function a defined name stands for.
+
+        Args:
+            path: Path of the defining file
+            qualname: Qualified name of the definition
+
+        Returns:
+            ID of the function (the __init__ method for classes), or None if
+            there is no such function
+        """
+        kind = self._definitions.get(path, {}).get(qualname)
+        if kind == CLASS:
+            qualname += '.__init__'
+            kind = self._definitions[path].get(qualname)
+        if kind != FUNCTION:
+            return None
+        return make_function_id(path, qualname)
+
+
+# Graphs by repository ID, least recently used first
+_call_graphs: 'OrderedDict[str, ProjectCallGraph]' = OrderedDict()
+_call_graphs_lock = threading.Lock()
+
+
+def get_project_call_graph(repository_id: str) -> ProjectCallGraph:
+    """
+    Get the process-wide call graph of a repository.
+
+    The graph starts empty and is brought up to date with sync. Only the
+    graphs of the DEFAULT_MAX_GRAPHS most recently used repositories are kept
+    in memory; an evicted graph is rebuilt by its next sync.
+
+    Args:
+        repository_id: ID of the repository
+
+    Returns:
+        The shared ProjectCallGraph of the repository
+    """
+    with _call_graphs_lock:
+        graph = _call_graphs.get(repository_id)
+        if graph is None:
+            graph = _call_graphs[repository_id] = ProjectCallGraph()
+        _call_graphs.move_to_end(repository_id)
+        while len(_call_graphs) > DEFAULT_MAX_GRAPHS:
+            _call_graphs.popitem(last=False)
+        return graph
@@ -2,10 +2,12 @@
 Module for extracting method calls and other information from Python AST.
 """
 import ast
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Union
 
+from app.analysis.parsed_module import AnalysisVisitor, ParsedModule, parse_python_module
 
-class MethodCallExtractor(ast.NodeVisitor):
+
+class MethodCallExtractor(AnalysisVisitor):
     """
     Extract method calls from Python AST using the Visitor pattern.
     
@@ -15,9 +17,10 @@ class MethodCallExtractor(ast.NodeVisitor):
     
     def __init__(self):
         """Initialize the extractor with an empty call list."""
+        super().__init__()
         self.calls = []
         
-    def visit_Call(self, node):
+    def enter_Call(self, node):
         """
         Visit Call nodes in the AST to extract method calls.
         
@@ -38,9 +41,6 @@ class MethodCallExtractor(ast.NodeVisitor):
                 'lineno': node.lineno,
                 'col_offset': node.col_offset
             })
-        
-        # Continue traversing the tree (for nested calls)
-        self.generic_visit(node)
     
     def _extract_caller(self, node):
         """
@@ -95,38 +95,17 @@ class MethodCallExtractor(ast.NodeVisitor):
         return args
 
 
-class ObjectCreationExtractor(ast.NodeVisitor):
+class ObjectCreationExtractor(AnalysisVisitor):
     """
     Extract object creation instances (class instantiations) from Python AST.
     """
     
     def __init__(self):
         """Initialize the extractor with an empty creation list."""
+        super().__init__()
         self.creations = []
-        # Keep track of parent nodes to identify assignments
-        self._parent_stack = []
-        
-    def generic_visit(self, node):
-        """
-        Override generic_visit to track parent nodes.
         
-        Args:
-            node: The AST node to visit
-        """
-        # Push current node onto the stack
-        self._parent_stack.append(node)
-        # Visit all children
-        for field, value in ast.iter_fields(node):
-            if isinstance(value, list):
-                for item in value:
-                    if isinstance(item, ast.AST):
-                        self.visit(item)
-            elif isinstance(value, ast.AST):
-                self.visit(value)
-        # Remove current node from the stack
-        self._parent_stack.pop()
-        
-    def visit_Call(self, node):
+    def enter_Call(self, node):
         """
         Visit Call nodes to extract object creations.
         
@@ -148,9 +127,6 @@ class ObjectCreationExtractor(ast.NodeVisitor):
                 'lineno': node.lineno,
                 'col_offset': node.col_offset
             })
-        
-        # Continue traversing the tree
-        self.generic_visit(node)
     
     def _extract_args(self, arg_nodes):
         """
@@ -182,9 +158,9 @@ class ObjectCreationExtractor(ast.NodeVisitor):
         Returns:
             str: The assignment target name or None
         """
-        # Look at the parent nodes to find an assignment
+        # Look at the parent nodes (tracked by the walk) to find an assignment
         # We need to traverse up the stack starting from the most recent parent
-        for parent in reversed(self._parent_stack):
+        for parent in reversed(self.parents):
             # Case 1: Direct assignment - variable = MyClass()
             if isinstance(parent, ast.Assign) and parent.value is node:
                 # For multiple assignments like a = b = MyClass()
@@ -234,12 +210,299 @@ class ObjectCreationExtractor(ast.NodeVisitor):
         return None
 
 
-def extract_method_calls(source_code: str) -> List[Dict[str, Any]]:
+class ImportExtractor(AnalysisVisitor):
+    """
+    Extract import statements from Python AST.
+    
+    Imports are reported in breadth-first order (module level first), so a
+    plain "import module" inside a function does not shadow the symbols of a
+    module-level "from module import name".
+    """
+    
+    def __init__(self):
+        """Initialize the extractor with an empty import list."""
+        super().__init__()
+        self._imports = []
+        
+    def enter_Import(self, node):
+        """
+        Visit Import nodes ("import module").
+        
+        Args:
+            node: The AST Import node to visit
+        """
+        self._imports.append((len(self.parents), node))
+        
+    def enter_ImportFrom(self, node):
+        """
+        Visit ImportFrom nodes ("from module import name").
+        
+        Args:
+            node: The AST ImportFrom node to visit
+        """
+        self._imports.append((len(self.parents), node))
+    
+    def get_imports(self) -> Dict[str, List[str]]:
+        """
+        Get the collected imports.
+        
+        Returns:
+            Dictionary mapping imported module names to lists of imported symbols
+        """
+        imports = {}
+        
+        # A stable sort by depth turns the depth-first walk into breadth-first order
+        for _, node in sorted(self._imports, key=lambda item: item[0]):
+            if isinstance(node, ast.Import):
+                # Handle "import module"
+                for name in node.names:
+                    imports[name.name] = []
+                    
+            elif node.module:
+                # Handle "from module import name"
+                if node.module not in imports:
+                    imports[node.module] = []
+                
+                for name in node.names:
+                    if name.name != '*':
+                        imports[node.module].append(name.name)
+        
+        return imports
+
+
+class CallSiteExtractor(AnalysisVisitor):
+    """
+    Extract the functions of a module and the calls made in each of them.
+    
+    Unlike MethodCallExtractor, every call is recorded with the function it is
+    made in (its scope) and the full callee expression, including plain
+    function calls, and imports are recorded with the names they bind. This
+    is what is needed to resolve calls to definitions in other files.
+    """
+    
+    def __init__(self):
+        """Initialize the extractor with empty function, call and import lists."""
+        super().__init__()
+        self.functions = []
+        self.classes = []
+        self.calls = []
+        self.imports = []
+        # Stack of (qualified name, is a class) for the enclosing definitions
+        self._scopes = []
+    
+    def _enter_scope(self, node, is_class):
+        """
+        Enter a function or class definition.
+        
+        Args:
+            node: The AST FunctionDef, AsyncFunctionDef or ClassDef node
+            is_class: Whether the definition is a class
+        """
+        parent = self._scopes[-1] if self._scopes else None
+        name = f"{parent[0]}.{node.name}" if parent else node.name
+        
+        if is_class:
+            self.classes.append({'name': name, 'lineno': node.lineno})
+        else:
+            self.functions.append({
+                'name': name,
+                'class': parent[0] if parent and parent[1] else None,
+                'lineno': node.lineno
+            })
+        
+        self._scopes.append((name, is_class))
+    
+    def enter_FunctionDef(self, node):
+        """Visit FunctionDef nodes ("def name(...)")."""
+        self._enter_scope(node, False)
+    
+    def leave_FunctionDef(self, node):
+        """Leave FunctionDef nodes."""
+        self._scopes.pop()
+    
+    def enter_AsyncFunctionDef(self, node):
+        """Visit AsyncFunctionDef nodes ("async def name(...)")."""
+        self._enter_scope(node, False)
+    
+    def leave_AsyncFunctionDef(self, node):
+        """Leave AsyncFunctionDef nodes."""
+        self._scopes.pop()
+    
+    def enter_ClassDef(self, node):
+        """Visit ClassDef nodes ("class Name")."""
+        self._enter_scope(node, True)
+    
+    def leave_ClassDef(self, node):
+        """Leave ClassDef nodes."""
+        self._scopes.pop()
+    
+    def enter_Call(self, node):
+        """
+        Visit Call nodes to record the callee and the calling function.
+        
+        Args:
+            node: The AST Call node to visit
+        """
+        callee = self._extract_callee(node.func)
+        if callee is None:
+            return  # Calls on the result of an expression can't be resolved statically
+        
+        # Calls in a class body outside any method run at module level
+        scope = ''
+        for name, is_class in reversed(self._scopes):
+            if not is_class:
+                scope = name
+                break
+        
+        self.calls.append({
+            'scope': scope,
+            'callee': callee,
+            'lineno': node.lineno
+        })
+    
+    def enter_Import(self, node):
+        """
+        Visit Import nodes ("import module").
+        
+        Args:
+            node: The AST Import node to visit
+        """
+        for alias in node.names:
+            self.imports.append({
+                'name': alias.asname or alias.name,
+                'module': alias.name,
+                'symbol': None,
+                'level': 0
+            })
+    
+    def enter_ImportFrom(self, node):
+        """
+        Visit ImportFrom nodes ("from module import name").
+        
+        Args:
+            node: The AST ImportFrom node to visit
+        """
+        for alias in node.names:
+            if alias.name == '*':
+                continue
+            self.imports.append({
+                'name': alias.asname or alias.name,
+                'module': node.module or '',
+                'symbol': alias.name,
+                'level': node.level or 0
+            })
+    
+    def _extract_callee(self, node):
+        """
+        Extract a dotted callee name ('helper', 'self.save', 'mod.func').
+        
+        Args:
+            node: The AST node of the called expression
+            
+        Returns:
+            str: The dotted name, or None if it is not a plain name or attribute chain
+        """
+        parts = []
+        while isinstance(node, ast.Attribute):
+            parts.append(node.attr)
+            node = node.value
+        if not isinstance(node, ast.Name):
+            return None
+        parts.append(node.id)
+        return '.'.join(reversed(parts))
+    
+    def get_call_sites(self) -> Dict[str, Any]:
+        """
+        Get the collected definitions, calls and imports.
+        
+        Returns:
+            Dict with 'functions', 'classes', 'calls' and 'imports' lists
+        """
+        return {
+            'functions': self.functions,
+            'classes': self.classes,
+            'calls': self.calls,
+            'imports': self.imports
+        }
+
+class DefinitionExtractor(AnalysisVisitor):
+    """
+    Extract the classes, functions and methods defined in Python AST.
+    
+    Each definition is recorded with its qualified name, line range,
+    signature and the class it belongs to, for the repository symbol index.
+    """
+    
+    def __init__(self):
+        """Initialize the extractor with an empty definition list."""
+        super().__init__()
+        self.definitions = []
+        # Stack of (qualified name, is a class) for the enclosing definitions
+        self._scopes = []
+    
+    def _enter_definition(self, node, is_class):
+        """
+        Record a function or class definition and enter its scope.
+        
+        Args:
+            node: The AST FunctionDef, AsyncFunctionDef or ClassDef node
+            is_class: Whether the definition is a class
+        """
+        parent = self._scopes[-1] if self._scopes else None
+        name = f"{parent[0]}.{node.name}" if parent else node.name
+        in_class = parent is not None and parent[1]
+        
+        if is_class:
+            kind = 'class'
+            signature = f"({', '.join(ast.unparse(base) for base in node.bases)})" if node.bases else ''
+        else:
+            kind = 'method' if in_class else 'function'
+            signature = f"({ast.unparse(node.args)})"
+            if node.returns is not None:
+                signature += f" -> {ast.unparse(node.returns)}"
+        
+        self.definitions.append({
+            'name': name,
+            'kind': kind,
+            'lineno': node.lineno,
+            'end_lineno': getattr(node, 'end_lineno', None) or node.lineno,
+            'signature': signature,
+            'class': parent[0] if in_class else None,
+            'is_async': isinstance(node, ast.AsyncFunctionDef)
+        })
+        
+        self._scopes.append((name, is_class))
+    
+    def enter_FunctionDef(self, node):
+        """Visit FunctionDef nodes ("def name(...)")."""
+        self._enter_definition(node, False)
+    
+    def leave_FunctionDef(self, node):
+        """Leave FunctionDef nodes."""
+        self._scopes.pop()
+    
+    def enter_AsyncFunctionDef(self, node):
+        """Visit AsyncFunctionDef nodes ("async def name(...)")."""
+        self._enter_definition(node, False)
+    
+    def leave_AsyncFunctionDef(self, node):
+        """Leave AsyncFunctionDef nodes."""
+        self._scopes.pop()
+    
+    def enter_ClassDef(self, node):
+        """Visit ClassDef nodes ("class Name")."""
+        self._enter_definition(node, True)
+    
+    def leave_ClassDef(self, node):
+        """Leave ClassDef nodes."""
+        self._scopes.pop()
+
+def extract_method_calls(source_code: Union[str, ParsedModule]) -> List[Dict[str, Any]]:
     """
     Extract method calls from Python source code.
     
     Args:
-        source_code: Python source code to analyze
+        source_code: Python source code to analyze, or an already parsed module
     
     Returns:
         list: List of dictionaries with method call information
@@ -247,22 +510,16 @@ def extract_method_calls(source_code: str) -> List[Dict[str, Any]]:
     Raises:
         SyntaxError: If the provided source code has syntax errors
     """
-    try:
-        tree = ast.parse(source_code)
-        extractor = MethodCallExtractor()
-        extractor.visit(tree)
-        return extractor.calls
-    except SyntaxError as e:
-        # Re-raise with more context
-        raise SyntaxError(f"Failed to parse Python code: {e}")
+    module = parse_python_module(source_code)
+    return module.get(MethodCallExtractor).calls
 
 
-def extract_object_creations(source_code: str) -> List[Dict[str, Any]]:
+def extract_object_creations(source_code: Union[str, ParsedModule]) -> List[Dict[str, Any]]:
     """
     Extract object creation instances from Python source code.
     
     Args:
-        source_code: Python source code to analyze
+        source_code: Python source code to analyze, or an already parsed module
     
     Returns:
         list: List of dictionaries with object creation information
@@ -270,11 +527,42 @@ def extract_object_creations(source_code: str) -> List[Dict[str, Any]]:
     Raises:
         SyntaxError: If the provided source code has syntax errors
     """
-    try:
-        tree = ast.parse(source_code)
-        extractor = ObjectCreationExtractor()
-        extractor.visit(tree)
-        return extractor.creations
-    except SyntaxError as e:
-        # Re-raise with more context
-        raise SyntaxError(f"Failed to parse Python code: {e}") 
\ No newline at end of file
+    module = parse_python_module(source_code)
+    return module.get(ObjectCreationExtractor).creations
+
+
+def extract_call_sites(source_code: Union[str, ParsedModule]) -> Dict[str, Any]:
+    """
+    Extract the functions, calls and imports of Python source code.
+    
+    Args:
+        source_code: Python source code to analyze, or an already parsed module
+    
+    Returns:
+        Dict with 'functions', 'classes', 'calls' (each with its calling
+        function as 'scope', '' for module level) and 'imports' lists
+    
+    Raises:
+        SyntaxError: If the provided source code has syntax errors
+    """
+    module = parse_python_module(source_code)
+    return module.get(CallSiteExtractor).get_call_sites()
+
+
+def extract_definitions(source_code: Union[str, ParsedModule]) -> List[Dict[str, Any]]:
+    """
+    Extract the classes, functions and methods defined in Python source code.
+    
+    Args:
+        source_code: Python source code to analyze, or an already parsed module
+    
+    Returns:
+        list: Definitions with 'name' (qualified), 'kind' ('class', 'function'
+        or 'method'), 'lineno', 'end_lineno', 'signature', 'class' and
+        'is_async' entries, in source order
+    
+    Raises:
+        SyntaxError: If the provided source code has syntax errors
+    """
+    module = parse_python_module(source_code)
+    return module.get(DefinitionExtractor).definitions
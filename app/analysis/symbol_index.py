@@ -0,0 +1,478 @@
+"""
+Module for the repository-wide symbol index.
+
+A SymbolIndex records where every class, function and method of a repository
+is defined: qualified name, signature, line range, owning class and file. It is
+built in one pass over the code files from the per-file 'definitions' analysis
+(so unchanged files are answered from the analysis cache), and lets sequence
+diagrams resolve the class a method call goes to by lookup rather than by
+guessing from the method name.
+
+Symbols are stored column-wise in flat arrays, with file paths and names
+interned, so the index of a large monorepo stays small in memory and
+serializes to plain lists. Indexes are persisted in the analysis cache under
+the commit SHA they were built at.
+"""
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+
+from app.analysis.analysis_cache import AnalysisCache, SOURCE_ANALYZERS, analyze_sources
+from app.structure.dependency_analyzer import _collect_code_files
+
+
+# Analysis cache kind for persisted indexes; bump the suffix when the format changes
+SYMBOL_INDEX_CACHE_KIND = "symbols-1"
+
+# Number of files analyzed together when building an index
+ANALYSIS_CHUNK_SIZE = 256
+
+# Default number of repository indexes kept in memory by get_symbol_index
+DEFAULT_MAX_INDEXES = 16
+
+# Kinds of symbols, in the order of their codes
+SYMBOL_KINDS = ('class', 'function', 'method')
+_KIND_CODES = {kind: code for code, kind in enumerate(SYMBOL_KINDS)}
+
+# Parent ID of top-level symbols
+NO_PARENT = -1
+
+
+def _normalize(name: str) -> str:
+    """Normalize a name for comparing identifiers across naming styles (user_repo -> userrepo)."""
+    return name.replace('_', '').lower()
+
+
+class SymbolIndex:
+    """
+    Compact index of the definitions of a repository.
+
+    Symbols are identified by their position in the index. Symbols of one
+    file are added together, parents before their members.
+
+    Attributes:
+        commit_sha: Commit the index was built at, if known
+    """
+
+    def __init__(self, commit_sha: Optional[str] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            commit_sha: Commit the index is built at
+        """
+        self.commit_sha = commit_sha
+        self._paths: List[str] = []
+        self._path_ids: Dict[str, int] = {}
+        self._qualnames: List[str] = []
+        self._signatures: List[str] = []
+        self._kinds = bytearray()
+        self._async = bytearray()
+        self._files = array('I')
+        self._starts = array('I')
+        self._ends = array('I')
+        self._parents = array('i')
+        # Short name -> IDs of the symbols with that name
+        self._by_name: Dict[str, List[int]] = {}
+        # File ID -> (first symbol ID, end symbol ID)
+        self._file_ranges: Dict[int, Tuple[int, int]] = {}
+
+    def __len__(self) -> int:
+        """Get the number of symbols."""
+        return len(self._qualnames)
+
+    @property
+    def files(self) -> List[str]:
+        """Paths of the files with symbols, relative to the repository root."""
+        return [self._paths[file_id] for file_id in self._file_ranges]
+
+    def add_file(self, path: str, definitions: List[Dict[str, Any]]) -> None:
+        """
+        Add the definitions of a file.
+
+        Args:
+            path: Path of the file, relative to the repository root
+            definitions: Definitions as returned by extract_definitions
+
+        Raises:
+            ValueError: If the file was already added
+        """
+        file_id = self._path_ids.get(path)
+        if file_id is None:
+            file_id = self._path_ids[path] = len(self._paths)
+            self._paths.append(sys.intern(path))
+        elif file_id in self._file_ranges:
+            raise ValueError(f"File already indexed: {path}")
+
+        first_id = len(self._qualnames)
+        ids_by_qualname: Dict[str, int] = {}
+        for definition in definitions:
+            qualname = definition['name']
+            owner = qualname.rpartition('.')[0]
+            parent_id = ids_by_qualname.get(owner, NO_PARENT) if owner else NO_PARENT
+
+            symbol_id = len(self._qualnames)
+            ids_by_qualname[qualname] = symbol_id
+            self._append(
+                qualname, definition.get('signature') or '', _KIND_CODES[definition['kind']],
+                bool(definition.get('is_async')), file_id, definition['lineno'],
+                definition.get('end_lineno') or definition['lineno'], parent_id
+            )
+
+        self._file_ranges[file_id] = (first_id, len(self._qualnames))
+
+    def _append(self, qualname: str, signature: str, kind: int, is_async: bool,
+                file_id: int, start: int, end: int, parent_id: int) -> None:
+        """Append a symbol to the columns and the name index."""
+        symbol_id = len(self._qualnames)
+        short_name = sys.intern(qualname.rpartition('.')[2])
+        self._qualnames.append(sys.intern(qualname))
+        self._signatures.append(signature)
+        self._kinds.append(kind)
+        self._async.append(is_async)
+        self._files.append(file_id)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._parents.append(parent_id)
+        self._by_name.setdefault(short_name, []).append(symbol_id)
+
+    def get_symbol(self, symbol_id: int) -> Dict[str, Any]:
+        """
+        Get a symbol by ID.
+
+        Args:
+            symbol_id: ID of the symbol
+
+        Returns:
+            Dict with 'name', 'qualname', 'kind', 'path', 'lineno', 'end_lineno',
+            'signature', 'class' (owning class, if a method) and 'is_async'
+        """
+        qualname = self._qualnames[symbol_id]
+        parent_id = self._parents[symbol_id]
+        kind = SYMBOL_KINDS[self._kinds[symbol_id]]
+        owner = None
+        if kind == 'method' and parent_id != NO_PARENT:
+            owner = self._qualnames[parent_id].rpartition('.')[2]
+
+        return {
+            'name': qualname.rpartition('.')[2],
+            'qualname': qualname,
+            'kind': kind,
+            'path': self._paths[self._files[symbol_id]],
+            'lineno': self._starts[symbol_id],
+            'end_lineno': self._ends[symbol_id],
+            'signature': self._signatures[symbol_id],
+            'class': owner,
+            'is_async': bool(self._async[symbol_id])
+        }
+
+    def _find_ids(self, name: str, kind: Optional[str] = None) -> List[int]:
+        """Get the IDs of the symbols with a short or qualified name."""
+        short_name = name.rpartition('.')[2]
+        ids = self._by_name.get(short_name, [])
+        if '.' in name:
+            suffix = '.' + name
+            ids = [i for i in ids if self._qualnames[i] == name or self._qualnames[i].endswith(suffix)]
+        if kind is not None:
+            code = _KIND_CODES[kind]
+            ids = [i for i in ids if self._kinds[i] == code]
+        return ids
+
+    def lookup(self, name: str, kind: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Find the symbols with a name.
+
+        Args:
+            name: Short name ("save"), or qualified name or suffix of one
+                ("UserRepository.save")
+            kind: Only return symbols of this kind ('class', 'function' or 'method')
+
+        Returns:
+            List of symbols (see get_symbol), in index order
+        """
+        return [self.get_symbol(i) for i in self._find_ids(name, kind)]
+
+    def get_members(self, class_name: str) -> List[Dict[str, Any]]:
+        """
+        Get the methods of the classes with a name.
+
+        Args:
+            class_name: Short or qualified name of the class
+
+        Returns:
+            List of method symbols (see get_symbol)
+        """
+        class_ids = set(self._find_ids(class_name, 'class'))
+        method_code = _KIND_CODES['method']
+        return [
+            self.get_symbol(i) for i in range(len(self._qualnames))
+            if self._parents[i] in class_ids and self._kinds[i] == method_code
+        ] if class_ids else []
+
+    def get_symbols(self, path: str) -> List[Dict[str, Any]]:
+        """
+        Get the symbols defined in a file.
+
+        Args:
+            path: Path of the file, relative to the repository root
+
+        Returns:
+            List of symbols (see get_symbol), in source order
+        """
+        file_id = self._path_ids.get(path)
+        if file_id is None or file_id not in self._file_ranges:
+            return []
+        first_id, end_id = self._file_ranges[file_id]
+        return [self.get_symbol(i) for i in range(first_id, end_id)]
+
+    def find_enclosing(self, path: str, lineno: int) -> Optional[Dict[str, Any]]:
+        """
+        Find the innermost symbol whose definition contains a line.
+
+        Args:
+            path: Path of the file, relative to the repository root
+            lineno: Line number (1-based)
+
+        Returns:
+            The symbol (see get_symbol), or None if the line is at module level
+        """
+        file_id = self._path_ids.get(path)
+        if file_id is None or file_id not in self._file_ranges:
+            return None
+
+        first_id, end_id = self._file_ranges[file_id]
+        enclosing = None
+        for i in range(first_id, end_id):
+            # Members come after their parents, so the last match is the innermost
+            if self._starts[i] <= lineno <= self._ends[i]:
+                enclosing = i
+        return self.get_symbol(enclosing) if enclosing is not None else None
+
+    def get_method_owners(self, method: str) -> List[str]:
+        """
+        Get the names of the classes defining a method.
+
+        Args:
+            method: Short name of the method
+
+        Returns:
+            List of class names, without duplicates, in index order
+        """
+        owners: Dict[str, None] = {}
+        for i in self._find_ids(method, 'method'):
+            parent_id = self._parents[i]
+            if parent_id != NO_PARENT:
+                owners[self._qualnames[parent_id].rpartition('.')[2]] = None
+        return list(owners)
+
+    def resolve_callee(self, method: str, caller: str = '') -> Optional[str]:
+        """
+        Resolve the class a method call goes to.
+
+        The call resolves to the class the caller is named after ('self.user_repo'
+        or 'userRepo' -> 'UserRepo') if it defines the method, or else to the
+        only class defining it. When several classes define it, the one whose
+        name contains the caller's name wins ('repo' -> 'UserRepository').
+
+        Args:
+            method: Name of the called method
+            caller: Expression the method is called on, e.g. 'self.repo'
+
+        Returns:
+            Name of the class, or None if the call can't be resolved
+        """
+        owners = self.get_method_owners(method)
+        if not owners:
+            return None
+
+        receiver = _normalize(caller.rpartition('.')[2]) if caller else ''
+        if receiver in ('', 'self', 'this', 'cls', 'super'):
+            receiver = ''
+
+        if receiver:
+            for owner in owners:
+                if _normalize(owner) == receiver:
+                    return owner
+
+        if len(owners) == 1:
+            return owners[0]
+
+        if receiver:
+            matches = [owner for owner in owners if receiver in _normalize(owner)]
+            if len(matches) == 1:
+                return matches[0]
+
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the index to JSON-compatible data.
+
+        Returns:
+            Dict with the symbol columns (see from_dict)
+        """
+        return {
+            'commit_sha': self.commit_sha,
+            'paths': self._paths,
+            'qualnames': self._qualnames,
+            'signatures': self._signatures,
+            'kinds': list(self._kinds),
+            'async': list(self._async),
+            'files': self._files.tolist(),
+            'starts': self._starts.tolist(),
+            'ends': self._ends.tolist(),
+            'parents': self._parents.tolist()
+        }
+
+    @classmethod
+    def from_definitions(cls, definitions: List[Dict[str, Any]]) -> 'SymbolIndex':
+        """
+        Build the index of the definitions of a single file.
+
+        Args:
+            definitions: 'definitions' analysis of the file
+
+        Returns:
+            SymbolIndex: The index, with the file indexed under an empty path
+        """
+        index = cls()
+        index.add_file('', definitions)
+        return index
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'SymbolIndex':
+        """
+        Deserialize an index serialized with to_dict.
+
+        Args:
+            data: Serialized index
+
+        Returns:
+            SymbolIndex: The index
+        """
+        index = cls(commit_sha=data.get('commit_sha'))
+        for path in data['paths']:
+            index._path_ids[path] = len(index._paths)
+            index._paths.append(sys.intern(path))
+
+        columns = zip(
+            data['qualnames'], data['signatures'], data['kinds'], data['async'],
+            data['files'], data['starts'], data['ends'], data['parents']
+        )
+        for symbol_id, (qualname, signature, kind, is_async, file_id, start, end, parent_id) in enumerate(columns):
+            index._append(qualname, signature, kind, bool(is_async), file_id, start, end, parent_id)
+            first_id, _ = index._file_ranges.get(file_id, (symbol_id, symbol_id))
+            index._file_ranges[file_id] = (first_id, symbol_id + 1)
+
+        # Files without symbols were indexed too
+        for file_id in range(len(index._paths)):
+            index._file_ranges.setdefault(file_id, (0, 0))
+
+        return index
+
+
+def build_symbol_index(repo_path: str, cache: Optional[AnalysisCache] = None,
+                       commit_sha: Optional[str] = None) -> SymbolIndex:
+    """
+    Build the symbol index of a repository in one pass over its code files.
+
+    Files that can't be read or decoded are skipped.
+
+    Args:
+        repo_path: Path to the repository root
+        cache: Optional analysis cache, so unchanged files are not parsed again
+        commit_sha: Commit the repository is at, if known
+
+    Returns:
+        SymbolIndex: The index
+    """
+    index = SymbolIndex(commit_sha=commit_sha)
+    code_files = [(file_path, rel_path, ext) for file_path, rel_path, ext in _collect_code_files(repo_path)
+                  if ext in SOURCE_ANALYZERS]
+
+    # Files are analyzed in chunks, so TypeScript files reach the parser workers in batches
+    for start in range(0, len(code_files), ANALYSIS_CHUNK_SIZE):
+        chunk = []
+        for file_path, rel_path, ext in code_files[start:start + ANALYSIS_CHUNK_SIZE]:
+            try:
+                with open(file_path, 'rb') as f:
+                    chunk.append((rel_path, f.read(), ext))
+            except OSError:
+                continue
+
+        analyses = analyze_sources([(content, ext) for _, content, ext in chunk], cache)
+        for (rel_path, _, _), analysis in zip(chunk, analyses):
+            if analysis is not None:
+                index.add_file(rel_path, analysis.get('definitions', []))
+
+    return index
+
+
+def load_symbol_index(repo_path: str, commit_sha: Optional[str],
+                      store: Optional[AnalysisCache] = None) -> SymbolIndex:
+    """
+    Get the symbol index of a repository commit, building it if not persisted.
+
+    Indexes are persisted in (and files analyzed through) the given analysis
+    cache. Indexes without a known commit are always built.
+
+    Args:
+        repo_path: Path to the repository root
+        commit_sha: Commit the repository is at, if known
+        store: Analysis cache indexes are persisted in, if any
+
+    Returns:
+        SymbolIndex: The index
+    """
+    if store is not None and commit_sha is not None:
+        data = store.get(commit_sha, SYMBOL_INDEX_CACHE_KIND)
+        if data is not None:
+            return SymbolIndex.from_dict(data)
+
+    index = build_symbol_index(repo_path, store, commit_sha=commit_sha)
+
+    if store is not None and commit_sha is not None:
+        store.put(commit_sha, SYMBOL_INDEX_CACHE_KIND, index.to_dict())
+
+    return index
+
+
+# Indexes by repository ID, least recently used first
+_symbol_indexes: 'OrderedDict[str, SymbolIndex]' = OrderedDict()
+_symbol_indexes_lock = threading.Lock()
+
+
+def get_symbol_index(repository_id: str, repo_path: str, commit_sha: Optional[str],
+                     store: Optional[AnalysisCache] = None) -> SymbolIndex:
+    """
+    Get the process-wide symbol index of a repository at a commit.
+
+    The index of the previous commit of the repository is replaced, and
+    only the indexes of the DEFAULT_MAX_INDEXES most recently used
+    repositories are kept in memory.
+
+    Args:
+        repository_id: ID of the repository
+        repo_path: Path to the repository root
+        commit_sha: Commit the repository is at, if known (never reused if None)
+        store: Analysis cache indexes are persisted in, if any
+
+    Returns:
+        SymbolIndex: The index
+    """
+    with _symbol_indexes_lock:
+        index = _symbol_indexes.get(repository_id)
+        if index is not None and commit_sha is not None and index.commit_sha == commit_sha:
+            _symbol_indexes.move_to_end(repository_id)
+            return index
+
+    index = load_symbol_index(repo_path, commit_sha, store)
+
+    with _symbol_indexes_lock:
+        _symbol_indexes[repository_id] = index
+        _symbol_indexes.move_to_end(repository_id)
+        while len(_symbol_indexes) > DEFAULT_MAX_INDEXES:
+            _symbol_indexes.popitem(last=False)
+    return index
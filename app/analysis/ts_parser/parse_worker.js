@@ -0,0 +1,353 @@
+/**
+ * Long-lived TypeScript/JavaScript parser worker.
+ *
+ * Reads newline-delimited JSON requests on stdin and answers each with one
+ * line of JSON on stdout, so one process serves any number of files:
+ *
+ *   request:  {"id": 1, "sources": [{"source": "...", "path": "a.ts"}, ...]}
+ *   response: {"id": 1, "results": [{"method_calls": [...], "imports": {...},
+ *              "async_patterns": [...], "conditional_patterns": [...]}, ...]}
+ *
+ * A source that can't be analyzed gets {"error": "..."} in place of its
+ * result. On startup the worker writes {"ready": true}, or
+ * {"ready": false, "error": "..."} if the TypeScript compiler is not installed.
+ * The result formats match the Python extractors in app/analysis.
+ */
+'use strict';
+
+const path = require('path');
+const readline = require('readline');
+
+function send(message) {
+    process.stdout.write(JSON.stringify(message) + '\n');
+}
+
+let ts;
+try {
+    ts = require('typescript');
+} catch (error) {
+    send({ ready: false, error: error.message });
+    process.exitCode = 1;
+}
+
+const SCRIPT_KINDS = {
+    '.js': 'JS',
+    '.jsx': 'JSX',
+    '.ts': 'TS',
+    '.tsx': 'TSX'
+};
+
+/**
+ * Analyze one source file.
+ */
+function analyze(source, filePath) {
+    const fileName = filePath || 'source.ts';
+    const scriptKind = ts.ScriptKind[SCRIPT_KINDS[path.extname(fileName).toLowerCase()] || 'TS'];
+    const sourceFile = ts.createSourceFile(fileName, source, ts.ScriptTarget.Latest, true, scriptKind);
+
+    const methodCalls = [];
+    const imports = {};
+    const asyncPatterns = [];
+    const conditionalPatterns = [];
+
+    function position(node) {
+        const { line, character } = sourceFile.getLineAndCharacterOfPosition(node.getStart(sourceFile));
+        return { lineno: line + 1, col_offset: character };
+    }
+
+    function text(node) {
+        return node ? node.getText(sourceFile) : '';
+    }
+
+    function hasModifier(node, kind) {
+        const modifiers = ts.canHaveModifiers && ts.canHaveModifiers(node) ? ts.getModifiers(node) : node.modifiers;
+        return Boolean(modifiers && modifiers.some(modifier => modifier.kind === kind));
+    }
+
+    function isAsync(node) {
+        return hasModifier(node, ts.SyntaxKind.AsyncKeyword);
+    }
+
+    function addImport(module, symbols) {
+        if (!(module in imports)) {
+            imports[module] = [];
+        }
+        imports[module].push(...symbols);
+    }
+
+    // Name of the function, method or named function expression containing a node
+    function containingFunction(node) {
+        for (let current = node.parent; current; current = current.parent) {
+            if (ts.isFunctionDeclaration(current) || ts.isMethodDeclaration(current)) {
+                return current.name ? current.name.getText(sourceFile) : null;
+            }
+            if (ts.isFunctionExpression(current) || ts.isArrowFunction(current)) {
+                if (current.name) {
+                    return current.name.text;
+                }
+                if (current.parent && ts.isVariableDeclaration(current.parent) && ts.isIdentifier(current.parent.name)) {
+                    return current.parent.name.text;
+                }
+            }
+        }
+        return null;
+    }
+
+    // Leftmost name of an expression ("api" for "api.users.get()")
+    function rootName(expression) {
+        while (ts.isCallExpression(expression) || ts.isPropertyAccessExpression(expression) ||
+               ts.isElementAccessExpression(expression) || ts.isParenthesizedExpression(expression) ||
+               ts.isNonNullExpression(expression)) {
+            expression = expression.expression;
+        }
+        if (ts.isIdentifier(expression)) {
+            return expression.text;
+        }
+        return expression.kind === ts.SyntaxKind.ThisKeyword ? 'this' : null;
+    }
+
+    // Innermost name of an expression ("users" for "api.users", "fetch" for "fetch(url)")
+    function lastName(expression) {
+        while (ts.isCallExpression(expression) || ts.isParenthesizedExpression(expression) ||
+               ts.isNonNullExpression(expression)) {
+            expression = expression.expression;
+        }
+        if (ts.isPropertyAccessExpression(expression)) {
+            return expression.name.text;
+        }
+        return rootName(expression);
+    }
+
+    function isAwaited(node) {
+        let parent = node.parent;
+        while (parent && ts.isParenthesizedExpression(parent)) {
+            parent = parent.parent;
+        }
+        return Boolean(parent && ts.isAwaitExpression(parent));
+    }
+
+    function visitCall(node) {
+        if (ts.isPropertyAccessExpression(node.expression)) {
+            const receiver = node.expression.expression;
+            const method = node.expression.name.text;
+
+            methodCalls.push({
+                caller: text(receiver),
+                method,
+                args: node.arguments.map(text),
+                ...position(node),
+                is_async: isAwaited(node)
+            });
+
+            if (method === 'then' || method === 'catch') {
+                asyncPatterns.push({
+                    type: method === 'then' ? 'promise_then' : 'promise_catch',
+                    caller: lastName(receiver),
+                    lineno: position(node).lineno
+                });
+            } else if (ts.isIdentifier(receiver) && receiver.text === 'Promise' && (method === 'all' || method === 'race')) {
+                asyncPatterns.push({ type: `promise_${method}`, lineno: position(node).lineno });
+            }
+        }
+    }
+
+    function visitImports(node) {
+        if (ts.isImportDeclaration(node) && ts.isStringLiteral(node.moduleSpecifier)) {
+            const symbols = [];
+            const clause = node.importClause;
+            if (clause) {
+                if (clause.name) {
+                    symbols.push('default');
+                }
+                if (clause.namedBindings) {
+                    if (ts.isNamespaceImport(clause.namedBindings)) {
+                        symbols.push('*');
+                    } else {
+                        for (const element of clause.namedBindings.elements) {
+                            symbols.push((element.propertyName || element.name).text);
+                        }
+                    }
+                }
+            }
+            addImport(node.moduleSpecifier.text, symbols);
+        } else if (ts.isExportDeclaration(node) && node.moduleSpecifier && ts.isStringLiteral(node.moduleSpecifier)) {
+            const symbols = node.exportClause && ts.isNamedExports(node.exportClause)
+                ? node.exportClause.elements.map(element => (element.propertyName || element.name).text)
+                : ['*'];
+            addImport(node.moduleSpecifier.text, symbols);
+        } else if (ts.isVariableDeclaration(node) && ts.isIdentifier(node.name) && node.initializer &&
+                   ts.isCallExpression(node.initializer) && ts.isIdentifier(node.initializer.expression) &&
+                   node.initializer.expression.text === 'require' && node.initializer.arguments.length === 1 &&
+                   ts.isStringLiteral(node.initializer.arguments[0])) {
+            const module = node.initializer.arguments[0].text;
+            if (!(module in imports)) {
+                imports[module] = ['default'];
+            }
+        }
+    }
+
+    function visitAsync(node) {
+        if (ts.isFunctionDeclaration(node) && node.name && isAsync(node)) {
+            asyncPatterns.push({ type: 'async_function', name: node.name.text, lineno: position(node).lineno });
+        } else if (ts.isVariableDeclaration(node) && ts.isIdentifier(node.name) && node.initializer &&
+                   (ts.isArrowFunction(node.initializer) || ts.isFunctionExpression(node.initializer)) &&
+                   isAsync(node.initializer)) {
+            asyncPatterns.push({ type: 'async_arrow_function', name: node.name.text, lineno: position(node).lineno });
+        } else if (ts.isMethodDeclaration(node) && isAsync(node) && node.parent &&
+                   (ts.isClassDeclaration(node.parent) || ts.isClassExpression(node.parent))) {
+            asyncPatterns.push({
+                type: 'async_method',
+                class: node.parent.name ? node.parent.name.text : null,
+                method: text(node.name),
+                lineno: position(node).lineno
+            });
+        } else if (ts.isAwaitExpression(node)) {
+            const awaited = rootName(node.expression);
+            if (awaited) {
+                asyncPatterns.push({
+                    type: 'await_expression',
+                    function: containingFunction(node),
+                    awaited,
+                    lineno: position(node).lineno
+                });
+            }
+        } else if (ts.isNewExpression(node) && ts.isIdentifier(node.expression) && node.expression.text === 'Promise') {
+            asyncPatterns.push({ type: 'promise_constructor', function: containingFunction(node), lineno: position(node).lineno });
+        }
+    }
+
+    function containsJump(statement, kind) {
+        const statements = ts.isBlock(statement) ? statement.statements : [statement];
+        return statements.some(child => child.kind === kind);
+    }
+
+    function visitConditional(node) {
+        if (ts.isIfStatement(node)) {
+            // Branches of an if-else if chain are reported with the first if
+            const isElseIf = node.parent && ts.isIfStatement(node.parent) && node.parent.elseStatement === node;
+            if (!isElseIf) {
+                let branches = 1;
+                let last = node;
+                while (last.elseStatement && ts.isIfStatement(last.elseStatement)) {
+                    last = last.elseStatement;
+                    branches += 1;
+                }
+                const pattern = {
+                    type: branches > 1 ? 'if_else_if_chain' : 'if_statement',
+                    condition: text(node.expression),
+                    has_else: Boolean(last.elseStatement),
+                    lineno: position(node).lineno
+                };
+                if (branches > 1) {
+                    pattern.branches = branches;
+                }
+                conditionalPatterns.push(pattern);
+            }
+            if (containsJump(node.thenStatement, ts.SyntaxKind.BreakStatement)) {
+                conditionalPatterns.push({ type: 'if_break', condition: text(node.expression), lineno: position(node).lineno });
+            }
+            if (containsJump(node.thenStatement, ts.SyntaxKind.ContinueStatement)) {
+                conditionalPatterns.push({ type: 'if_continue', condition: text(node.expression), lineno: position(node).lineno });
+            }
+        } else if (ts.isConditionalExpression(node)) {
+            conditionalPatterns.push({ type: 'ternary', condition: text(node.condition), lineno: position(node).lineno });
+        } else if (ts.isSwitchStatement(node)) {
+            const clauses = node.caseBlock.clauses;
+            conditionalPatterns.push({
+                type: 'switch_case',
+                switch_expression: text(node.expression),
+                cases: clauses.filter(clause => ts.isCaseClause(clause)).length,
+                has_default: clauses.some(clause => ts.isDefaultClause(clause)),
+                lineno: position(node).lineno
+            });
+        } else if (ts.isForStatement(node)) {
+            conditionalPatterns.push({
+                type: 'for_loop',
+                condition: [text(node.initializer), text(node.condition), text(node.incrementor)].join('; '),
+                lineno: position(node).lineno
+            });
+        } else if (ts.isForOfStatement(node) || ts.isForInStatement(node)) {
+            const isOf = ts.isForOfStatement(node);
+            conditionalPatterns.push({
+                type: isOf ? 'for_of_loop' : 'for_in_loop',
+                condition: `${text(node.initializer)} ${isOf ? 'of' : 'in'} ${text(node.expression)}`,
+                lineno: position(node).lineno
+            });
+        } else if (ts.isWhileStatement(node)) {
+            conditionalPatterns.push({ type: 'while_loop', condition: text(node.expression), lineno: position(node).lineno });
+        } else if (ts.isDoStatement(node)) {
+            conditionalPatterns.push({ type: 'do_while_loop', condition: text(node.expression), lineno: position(node).lineno });
+        } else if (ts.isTryStatement(node) && node.catchClause) {
+            const declaration = node.catchClause.variableDeclaration;
+            conditionalPatterns.push({
+                type: 'try_catch',
+                error_variable: declaration ? text(declaration.name) : '',
+                has_finally: Boolean(node.finallyBlock),
+                lineno: position(node).lineno
+            });
+        } else if (ts.isBinaryExpression(node) && node.operatorToken.kind === ts.SyntaxKind.QuestionQuestionToken) {
+            conditionalPatterns.push({
+                type: 'nullish_coalescing',
+                left: text(node.left),
+                right: text(node.right),
+                lineno: position(node).lineno
+            });
+        }
+    }
+
+    function visit(node) {
+        if (ts.isCallExpression(node)) {
+            visitCall(node);
+        } else if (ts.isNewExpression(node)) {
+            methodCalls.push({
+                is_constructor: true,
+                class: text(node.expression),
+                args: node.arguments ? node.arguments.map(text) : [],
+                ...position(node)
+            });
+        }
+        visitImports(node);
+        visitAsync(node);
+        visitConditional(node);
+        ts.forEachChild(node, visit);
+    }
+
+    visit(sourceFile);
+
+    const byLine = (a, b) => a.lineno - b.lineno;
+    return {
+        method_calls: methodCalls,
+        imports,
+        async_patterns: asyncPatterns.sort(byLine),
+        conditional_patterns: conditionalPatterns.sort(byLine)
+    };
+}
+
+function handle(line) {
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        send({ id: null, error: `Invalid request: ${error.message}` });
+        return;
+    }
+
+    const results = (request.sources || []).map(item => {
+        try {
+            return analyze(item.source, item.path);
+        } catch (error) {
+            return { error: error.message };
+        }
+    });
+    send({ id: request.id, results });
+}
+
+if (ts) {
+    const input = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+    input.on('line', line => {
+        if (line.trim()) {
+            handle(line);
+        }
+    });
+    send({ ready: true, typescript: ts.version });
+}
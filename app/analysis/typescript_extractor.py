@@ -1,39 +1,50 @@
 """
 Module for extracting method calls and other information from TypeScript/JavaScript code.
 
-Uses the TypeScript Compiler API via Node.js subprocess to parse and analyze TypeScript
-and JavaScript code.
+Uses the TypeScript Compiler API through the pooled Node.js parser workers (see
+typescript_parser) to parse and analyze TypeScript and JavaScript code, and falls
+back to pattern matching when they are not available.
 """
-import os
-import json
-import tempfile
-import subprocess
+import re
 from typing import Dict, List, Any, Optional
 
+from app.analysis.typescript_parser import TypeScriptParserError, get_typescript_parser_pool
 
-def extract_method_calls(source_code: str) -> List[Dict[str, Any]]:
+
+def extract_method_calls(source_code: str, use_compiler: bool = False) -> List[Dict[str, Any]]:
     """
     Extract method calls from TypeScript/JavaScript source code.
     
+    The code is parsed with line-based pattern matching by default. With
+    use_compiler, it is parsed with the TypeScript Compiler API by the pooled
+    parser workers when Node.js and the typescript package are installed, and
+    with pattern matching otherwise.
+    
     Args:
         source_code: TypeScript/JavaScript source code to analyze
+        use_compiler: Whether to try the TypeScript compiler first
     
     Returns:
         list: List of dictionaries with method call information
-    
-    Raises:
-        RuntimeError: If the TypeScript parser fails or Node.js is not available
     """
-    # We'll use a Node.js script to parse the TypeScript code
-    # For now, we'll simulate the extraction with a mock implementation
+    if use_compiler:
+        pool = get_typescript_parser_pool()
+        if pool.available:
+            try:
+                result = pool.parse(source_code)
+                if 'error' not in result:
+                    return result['method_calls']
+            except TypeScriptParserError:
+                pass
+    
     return _mock_typescript_extractor(source_code)
 
 
 def _mock_typescript_extractor(source_code: str) -> List[Dict[str, Any]]:
     """
-    Temporary mock implementation for TypeScript method call extraction.
+    Line-based pattern matching implementation of TypeScript method call extraction.
     
-    This will be replaced with a proper implementation using the TypeScript Compiler API.
+    Used when the TypeScript Compiler API is not available.
     
     Args:
         source_code: TypeScript/JavaScript source code to analyze
@@ -97,188 +108,102 @@ def _mock_typescript_extractor(source_code: str) -> List[Dict[str, Any]]:
     return method_calls
 
 
-def _extract_with_typescript_compiler(source_code: str) -> List[Dict[str, Any]]:
+# Patterns for the definitions found by extract_definitions
+_CLASS_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:default\s+)?(?:abstract\s+)?class\s+(\w+)(?:\s*<[^>]*>)?(?:\s+extends\s+([\w.]+))?'
+)
+_FUNCTION_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:default\s+)?(async\s+)?function\s*\*?\s*(\w+)\s*(?:<[^>]*>)?\s*(\([^)]*\))(\s*:\s*[^{]+)?'
+)
+_ARROW_PATTERN = re.compile(
+    r'^(?:export\s+)?(?:const|let|var)\s+(\w+)\s*(?::[^=]+)?=\s*(async\s+)?(\([^)]*\)|\w+)(\s*:\s*[^=]+)?\s*=>'
+)
+_METHOD_PATTERN = re.compile(
+    r'^(?:(?:public|private|protected|static|readonly|override|abstract)\s+)*(async\s+)?(?:[gs]et\s+)?\*?\s*'
+    r'(\w+)\s*(?:<[^>]*>)?\s*(\([^)]*\))(\s*:\s*[^{;]+)?\s*\{'
+)
+_NOT_METHODS = {'if', 'for', 'while', 'switch', 'catch', 'return', 'function', 'with'}
+_STRING_PATTERN = re.compile(r'"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\'|`(?:\\.|[^`\\])*`')
+
+
+def extract_definitions(source_code: str) -> List[Dict[str, Any]]:
     """
-    Extract method calls using the TypeScript Compiler API.
-    
-    This function creates a temporary file with the source code, runs a Node.js
-    script that uses the TypeScript Compiler API to parse it, and returns the
-    extracted method calls.
+    Extract the classes, functions and methods defined in TypeScript/JavaScript code.
     
-    Note: This requires Node.js to be installed with TypeScript.
+    Definitions are found line by line, and their line ranges by matching
+    braces, so a definition is only recognized when its name and parameter
+    list are on one line.
     
     Args:
         source_code: TypeScript/JavaScript source code to analyze
-        
+    
     Returns:
-        list: List of dictionaries with method call information
-        
-    Raises:
-        RuntimeError: If the parser script fails or Node.js is not available
+        list: Definitions with the same entries as the Python extract_definitions
     """
-    # Create a temporary file to hold the source code
-    with tempfile.NamedTemporaryFile(mode='w', suffix='.ts', delete=False) as temp_file:
-        temp_file_path = temp_file.name
-        temp_file.write(source_code)
-    
-    try:
-        # Path to the parser script (which we'll need to create)
-        parser_script_path = os.path.join(os.path.dirname(__file__), 'ts_parser', 'extract_calls.js')
-        
-        # Check if the parser script exists, if not use mock implementation
-        if not os.path.exists(parser_script_path):
-            return _mock_typescript_extractor(source_code)
+    definitions = []
+    # Open definitions as (definition, brace depth before it, is a class)
+    open_definitions = []
+    depth = 0
+    
+    for line_number, line in enumerate(source_code.split('\n'), start=1):
+        code = _STRING_PATTERN.sub('""', line.split('//')[0]).strip()
+        definition = None
+        is_class = False
+        enclosing = open_definitions[-1] if open_definitions else None
         
-        # Run the Node.js script
-        result = subprocess.run(
-            ['node', parser_script_path, temp_file_path],
-            capture_output=True,
-            text=True,
-            check=True
-        )
-        
-        # Parse the JSON output
-        method_calls = json.loads(result.stdout)
-        return method_calls
-    except (subprocess.SubprocessError, json.JSONDecodeError) as e:
-        raise RuntimeError(f"Failed to parse TypeScript code: {str(e)}")
-    finally:
-        # Clean up the temporary file
-        if os.path.exists(temp_file_path):
-            os.unlink(temp_file_path)
-
-
-def create_typescript_parser():
-    """
-    Create the TypeScript parser script if it doesn't exist.
-    
-    This function creates a Node.js script that uses the TypeScript Compiler API
-    to extract method calls from TypeScript/JavaScript code.
-    """
-    # Directory for the parser script
-    parser_dir = os.path.join(os.path.dirname(__file__), 'ts_parser')
-    os.makedirs(parser_dir, exist_ok=True)
-    
-    # Path to the parser script
-    parser_script_path = os.path.join(parser_dir, 'extract_calls.js')
-    
-    # Check if the script already exists
-    if os.path.exists(parser_script_path):
-        return
-    
-    # Create package.json
-    package_json = {
-        "name": "typescript-method-extractor",
-        "version": "1.0.0",
-        "description": "Extracts method calls from TypeScript/JavaScript code",
-        "main": "extract_calls.js",
-        "dependencies": {
-            "typescript": "^4.5.5"
-        }
-    }
-    
-    with open(os.path.join(parser_dir, 'package.json'), 'w') as f:
-        json.dump(package_json, f, indent=2)
-    
-    # Create the parser script
-    parser_script = """
-    const ts = require('typescript');
-    const fs = require('fs');
-
-    // Get the file path from the command line arguments
-    const filePath = process.argv[2];
-    if (!filePath) {
-        console.error('No file path provided');
-        process.exit(1);
-    }
-
-    // Read the source file
-    const sourceCode = fs.readFileSync(filePath, 'utf8');
-
-    // Create a TypeScript source file
-    const sourceFile = ts.createSourceFile(
-        filePath,
-        sourceCode,
-        ts.ScriptTarget.Latest,
-        true
-    );
-
-    // Array to store method call information
-    const methodCalls = [];
-
-    // Visit each node in the AST
-    function visit(node) {
-        // Check for method calls (CallExpression with PropertyAccessExpression)
-        if (ts.isCallExpression(node) && ts.isPropertyAccessExpression(node.expression)) {
-            const caller = sourceCode.substring(
-                node.expression.expression.pos,
-                node.expression.expression.end
-            );
-            const method = node.expression.name.text;
-            
-            // Extract arguments
-            const args = node.arguments.map(arg => {
-                return sourceCode.substring(arg.pos, arg.end).trim();
-            });
-            
-            // Get line and column information
-            const { line, character } = sourceFile.getLineAndCharacterOfPosition(node.pos);
-            
-            // Check if this is part of an await expression
-            let isAsync = false;
-            if (node.parent && ts.isAwaitExpression(node.parent)) {
-                isAsync = true;
+        match = _CLASS_PATTERN.match(code)
+        if match:
+            is_class = True
+            definition = {
+                'name': match.group(1),
+                'kind': 'class',
+                'signature': f"({match.group(2)})" if match.group(2) else '',
+                'is_async': False
             }
-            
-            methodCalls.push({
-                caller,
-                method,
-                args,
-                lineno: line + 1, // Lines are 0-indexed in TS, but 1-indexed in our API
-                col_offset: character,
-                is_async: isAsync
-            });
-        }
+        elif enclosing is not None and enclosing[2] and depth == enclosing[1] + 1:
+            match = _METHOD_PATTERN.match(code)
+            if match and match.group(2) not in _NOT_METHODS:
+                definition = {
+                    'name': match.group(2),
+                    'kind': 'method',
+                    'signature': match.group(3) + (match.group(4) or '').rstrip(),
+                    'is_async': bool(match.group(1))
+                }
+        else:
+            match = _FUNCTION_PATTERN.match(code)
+            if match:
+                definition = {
+                    'name': match.group(2),
+                    'kind': 'function',
+                    'signature': match.group(3) + (match.group(4) or '').rstrip(),
+                    'is_async': bool(match.group(1))
+                }
+            else:
+                match = _ARROW_PATTERN.match(code)
+                if match:
+                    params = match.group(3)
+                    definition = {
+                        'name': match.group(1),
+                        'kind': 'function',
+                        'signature': (params if params.startswith('(') else f"({params})") + (match.group(4) or '').rstrip(),
+                        'is_async': bool(match.group(2))
+                    }
         
-        // Check for constructor calls (NewExpression)
-        if (ts.isNewExpression(node)) {
-            const className = node.expression.getText(sourceFile);
-            
-            // Extract arguments
-            const args = node.arguments ? node.arguments.map(arg => {
-                return sourceCode.substring(arg.pos, arg.end).trim();
-            }) : [];
-            
-            // Get line and column information
-            const { line, character } = sourceFile.getLineAndCharacterOfPosition(node.pos);
-            
-            methodCalls.push({
-                is_constructor: true,
-                class: className,
-                args,
-                lineno: line + 1,
-                col_offset: character
-            });
-        }
+        if definition is not None:
+            parent = next((entry for entry in reversed(open_definitions)), None)
+            if parent is not None:
+                definition['name'] = f"{parent[0]['name']}.{definition['name']}"
+            definition['class'] = parent[0]['name'] if parent is not None and parent[2] else None
+            definition['lineno'] = definition['end_lineno'] = line_number
+            definitions.append(definition)
+            if '{' in code:
+                open_definitions.append((definition, depth, is_class))
         
-        // Visit child nodes
-        ts.forEachChild(node, visit);
-    }
-
-    // Start visiting from the root
-    visit(sourceFile);
-
-    // Output the method calls as JSON
-    console.log(JSON.stringify(methodCalls, null, 2));
-    """
-    
-    with open(parser_script_path, 'w') as f:
-        f.write(parser_script)
-
-
-# Try to create the TypeScript parser script when the module is imported
-try:
-    create_typescript_parser()
-except Exception as e:
-    print(f"Warning: Failed to create TypeScript parser script: {e}")
-    print("Will use mock implementation for TypeScript method call extraction") 
\ No newline at end of file
+        depth += code.count('{') - code.count('}')
+        while open_definitions and depth <= open_definitions[-1][1]:
+            open_definitions.pop()[0]['end_lineno'] = line_number
+    
+    return [
+        {key: definition[key] for key in ('name', 'kind', 'lineno', 'end_lineno', 'signature', 'class', 'is_async')}
+        for definition in definitions
+    ]
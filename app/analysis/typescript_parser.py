@@ -0,0 +1,390 @@
+"""
+Module for the pooled TypeScript parser workers.
+
+Parsing with the TypeScript Compiler API needs Node.js, and starting Node and
+loading the compiler takes far longer than parsing a typical file. Instead of
+a process per file, a TypeScriptParserPool keeps long-lived worker processes
+(ts_parser/parse_worker.js) that read batches of sources as newline-delimited
+JSON on stdin, and answer with the method calls, imports, async patterns and
+conditional patterns of every source of a batch in one line on stdout.
+
+Workers that crash are replaced, and a request that takes longer than the
+timeout is abandoned by killing its worker. When Node.js or the typescript
+package is not installed, the pool reports itself unavailable and callers fall
+back to the regex-based extractors.
+"""
+import atexit
+import itertools
+import json
+import os
+import queue
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence
+
+
+# Number of worker processes (0 disables the compiler-based parser)
+DEFAULT_POOL_SIZE = int(os.environ.get('REPOMIND_TS_PARSER_WORKERS', '2'))
+
+# Seconds a worker may take to answer one request
+DEFAULT_REQUEST_TIMEOUT = float(os.environ.get('REPOMIND_TS_PARSER_TIMEOUT', '30'))
+
+# Seconds a worker may take to start and load the TypeScript compiler
+STARTUP_TIMEOUT = 15.0
+
+# Maximum number of sources sent to a worker in one request
+MAX_BATCH_SIZE = 64
+
+# The worker script
+WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), 'ts_parser', 'parse_worker.js')
+
+
+class TypeScriptParserError(RuntimeError):
+    """Raised when a parser worker fails or exits while handling a request."""
+
+
+class TypeScriptParserTimeout(TypeScriptParserError):
+    """Raised when a parser worker does not answer a request in time."""
+
+
+class TypeScriptParserUnavailable(TypeScriptParserError):
+    """Raised when Node.js or the TypeScript compiler is not installed."""
+
+
+class TypeScriptParserWorker:
+    """
+    A single long-lived parser process.
+
+    A worker handles one request at a time; TypeScriptParserPool hands each
+    worker to one thread at a time.
+
+    Attributes:
+        command: Command starting the worker process
+    """
+
+    def __init__(self, command: Sequence[str]):
+        """
+        Initialize a worker that has not been started.
+
+        Args:
+            command: Command starting the worker process
+        """
+        self.command = list(command)
+        self._process: Optional[subprocess.Popen] = None
+        self._responses: 'queue.Queue[Optional[bytes]]' = queue.Queue()
+        self._request_ids = itertools.count(1)
+
+    @property
+    def alive(self) -> bool:
+        """Whether the worker process is running."""
+        return self._process is not None and self._process.poll() is None
+
+    def start(self, timeout: float = STARTUP_TIMEOUT) -> None:
+        """
+        Start the worker process and wait until it is ready.
+
+        Args:
+            timeout: Seconds to wait for the worker to be ready
+
+        Raises:
+            TypeScriptParserUnavailable: If Node.js or the TypeScript compiler is not installed
+            TypeScriptParserError: If the worker exits or times out while starting
+        """
+        try:
+            self._process = subprocess.Popen(
+                self.command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL
+            )
+        except OSError as e:
+            raise TypeScriptParserUnavailable(f"Failed to start the TypeScript parser: {e}")
+
+        # Responses are read on a thread, so waiting for one can time out
+        self._responses = queue.Queue()
+        reader = threading.Thread(
+            target=_read_lines,
+            args=(self._process.stdout, self._responses),
+            name='typescript-parser-reader',
+            daemon=True
+        )
+        reader.start()
+
+        message = self._receive(timeout)
+        if not message.get('ready'):
+            self.close()
+            raise TypeScriptParserUnavailable(f"TypeScript parser unavailable: {message.get('error', 'unknown error')}")
+
+    def parse(self, sources: List[Dict[str, Any]], timeout: float = DEFAULT_REQUEST_TIMEOUT) -> List[Dict[str, Any]]:
+        """
+        Analyze a batch of sources in one round trip.
+
+        Args:
+            sources: Dicts with the 'source' code and optional file 'path'
+            timeout: Seconds to wait for the answer
+
+        Returns:
+            One result per source, with 'method_calls', 'imports', 'async_patterns'
+            and 'conditional_patterns', or an 'error' if the source failed
+
+        Raises:
+            TypeScriptParserTimeout: If the worker does not answer in time (it is killed)
+            TypeScriptParserError: If the worker exits or rejects the request
+        """
+        request_id = next(self._request_ids)
+        request = json.dumps({'id': request_id, 'sources': sources}).encode('utf-8') + b'\n'
+
+        try:
+            self._process.stdin.write(request)
+            self._process.stdin.flush()
+        except (OSError, ValueError, AttributeError):
+            self.close()
+            raise TypeScriptParserError("TypeScript parser exited")
+
+        response = self._receive(timeout)
+        if 'error' in response:
+            raise TypeScriptParserError(f"TypeScript parser rejected the request: {response['error']}")
+        if response.get('id') != request_id or len(response.get('results', ())) != len(sources):
+            self.close()
+            raise TypeScriptParserError("TypeScript parser sent an unexpected response")
+
+        return response['results']
+
+    def _receive(self, timeout: float) -> Dict[str, Any]:
+        """Wait for the next message from the worker, killing it on a timeout or bad output."""
+        try:
+            line = self._responses.get(timeout=timeout)
+        except queue.Empty:
+            self.close()
+            raise TypeScriptParserTimeout(f"TypeScript parser did not answer within {timeout} seconds")
+
+        if line is None:
+            self.close()
+            raise TypeScriptParserError("TypeScript parser exited")
+
+        try:
+            return json.loads(line)
+        except ValueError:
+            self.close()
+            raise TypeScriptParserError("TypeScript parser sent invalid output")
+
+    def close(self) -> None:
+        """Stop the worker process."""
+        process, self._process = self._process, None
+        if process is None:
+            return
+
+        if process.poll() is None:
+            process.kill()
+        for stream in (process.stdin, process.stdout):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        process.wait()
+
+
+def _read_lines(stream, lines: 'queue.Queue[Optional[bytes]]') -> None:
+    """Queue the lines a worker writes, followed by None when it exits."""
+    try:
+        for line in iter(stream.readline, b''):
+            lines.put(line)
+    except (OSError, ValueError):
+        pass
+    lines.put(None)
+
+
+class TypeScriptParserPool:
+    """
+    Pool of long-lived parser workers.
+
+    Workers are started on first use, up to the pool size, and reused for
+    later requests. A request whose worker crashed is retried once on a new
+    worker; a request that times out is not retried, since the same input
+    would likely time out again. If the first worker reports that the
+    TypeScript compiler is not installed, the pool stays unavailable.
+
+    Attributes:
+        size: Maximum number of worker processes
+        timeout: Seconds a worker may take to answer one request
+        command: Command starting a worker process
+        restarts: Number of requests retried after their worker crashed
+    """
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE, timeout: float = DEFAULT_REQUEST_TIMEOUT,
+                 command: Optional[Sequence[str]] = None):
+        """
+        Initialize a pool without any running workers.
+
+        Args:
+            size: Maximum number of worker processes (0 disables the pool)
+            timeout: Seconds a worker may take to answer one request
+            command: Command starting a worker process (Node.js running the
+                bundled worker script by default)
+        """
+        self.size = size
+        self.timeout = timeout
+        self.command = list(command) if command else ['node', WORKER_SCRIPT]
+        self.restarts = 0
+        self._idle: List[TypeScriptParserWorker] = []
+        self._started = 0
+        self._closed = False
+        self._unavailable_reason: Optional[str] = None if size > 0 else "TypeScript parser disabled"
+        self._condition = threading.Condition()
+
+    @property
+    def available(self) -> bool:
+        """Whether requests may be sent (False once the compiler was found missing)."""
+        return self._unavailable_reason is None and not self._closed
+
+    def parse(self, source: str, path: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Analyze a single source.
+
+        Args:
+            source: TypeScript/JavaScript source code
+            path: Optional file path, whose extension selects TS, TSX, JS or JSX parsing
+
+        Returns:
+            The result (see TypeScriptParserWorker.parse)
+
+        Raises:
+            TypeScriptParserError: If the source could not be sent or answered
+        """
+        return self.parse_batch([source], [path])[0]
+
+    def parse_batch(self, sources: Sequence[str],
+                    paths: Optional[Sequence[Optional[str]]] = None) -> List[Dict[str, Any]]:
+        """
+        Analyze several sources, in as few round trips as possible.
+
+        Sources are sent in batches of up to MAX_BATCH_SIZE, spread over the
+        workers of the pool.
+
+        Args:
+            sources: TypeScript/JavaScript source codes
+            paths: Optional file paths of the sources
+
+        Returns:
+            One result per source, in order (see TypeScriptParserWorker.parse)
+
+        Raises:
+            TypeScriptParserError: If a batch could not be sent or answered
+        """
+        if paths is None:
+            paths = [None] * len(sources)
+
+        items = [
+            {'source': source, 'path': path} if path else {'source': source}
+            for source, path in zip(sources, paths)
+        ]
+        batches = [items[start:start + MAX_BATCH_SIZE] for start in range(0, len(items), MAX_BATCH_SIZE)]
+
+        if len(batches) <= 1 or self.size <= 1:
+            results = [self._request(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.size, len(batches))) as executor:
+                results = list(executor.map(self._request, batches))
+
+        return [result for batch_results in results for result in batch_results]
+
+    def _request(self, batch: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Send one batch, retrying once on a new worker if the worker crashed."""
+        for attempt in range(2):
+            worker = self._acquire()
+            try:
+                return worker.parse(batch, self.timeout)
+            except TypeScriptParserTimeout:
+                raise
+            except TypeScriptParserError:
+                # A worker that is still running rejected the request, which a retry won't fix
+                if attempt or worker.alive:
+                    raise
+                with self._condition:
+                    self.restarts += 1
+            finally:
+                self._release(worker)
+
+    def _acquire(self) -> TypeScriptParserWorker:
+        """Take an idle worker, starting one if the pool is not full, or wait for one."""
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise TypeScriptParserError("TypeScript parser pool is closed")
+                if self._unavailable_reason is not None:
+                    raise TypeScriptParserUnavailable(self._unavailable_reason)
+
+                if self._idle:
+                    worker = self._idle.pop()
+                    if worker.alive:
+                        return worker
+                    # The worker crashed while idle
+                    worker.close()
+                    self._started -= 1
+                    continue
+
+                if self._started < self.size:
+                    self._started += 1
+                    break
+
+                self._condition.wait()
+
+        worker = TypeScriptParserWorker(self.command)
+        try:
+            worker.start()
+        except TypeScriptParserError as e:
+            with self._condition:
+                self._started -= 1
+                if isinstance(e, TypeScriptParserUnavailable):
+                    self._unavailable_reason = str(e)
+                self._condition.notify_all()
+            raise
+
+        return worker
+
+    def _release(self, worker: TypeScriptParserWorker) -> None:
+        """Return a worker to the pool, dropping it if it is no longer running."""
+        with self._condition:
+            if worker.alive and not self._closed:
+                self._idle.append(worker)
+            else:
+                worker.close()
+                self._started -= 1
+            self._condition.notify()
+
+    def close(self) -> None:
+        """Stop all idle workers; busy workers are stopped when their request ends."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._started -= len(idle)
+            self._condition.notify_all()
+
+        for worker in idle:
+            worker.close()
+
+
+_default_pool: Optional[TypeScriptParserPool] = None
+_default_pool_lock = threading.Lock()
+
+
+def get_typescript_parser_pool() -> TypeScriptParserPool:
+    """
+    Get the process-wide TypeScript parser pool.
+
+    The pool size can be configured with the ``REPOMIND_TS_PARSER_WORKERS``
+    environment variable (0 disables the compiler-based parser) and the
+    request timeout with ``REPOMIND_TS_PARSER_TIMEOUT``.
+
+    Returns:
+        The shared TypeScriptParserPool instance
+    """
+    global _default_pool
+
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = TypeScriptParserPool()
+            atexit.register(_default_pool.close)
+
+    return _default_pool
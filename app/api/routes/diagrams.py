@@ -1,12 +1,17 @@
 """
 API routes for diagram generation from code analysis.
 """
+import os
 from typing import List, Dict, Any, Optional
 from fastapi import APIRouter, HTTPException, Body
 from pydantic import BaseModel, Field
 
+from app.analysis.analysis_cache import get_analysis_cache
+from app.analysis.symbol_index import SymbolIndex, get_symbol_index
 from app.diagrams.sequence.analyzer import analyze_python_code
+from app.diagrams.sequence.reachability import DEFAULT_MAX_CALL_DEPTH
 from app.diagrams.sequence.typescript_analyzer import analyze_typescript_code
+from app.storage.repository_registry import get_checkout_commit, get_repository_path
 
 router = APIRouter(
     prefix="/diagrams",
@@ -20,6 +25,18 @@ class DiagramRequest(BaseModel):
     code: str = Field(..., description="Source code to analyze")
     language: str = Field("python", description="Programming language of the source code")
     diagram_type: str = Field("sequence", description="Type of diagram to generate")
+    function_name: Optional[str] = Field(
+        None,
+        description="Entry-point function (e.g. 'Class.method'); only the calls reachable from it are diagrammed"
+    )
+    max_depth: int = Field(
+        DEFAULT_MAX_CALL_DEPTH, ge=1, le=20,
+        description="Number of call levels followed from the entry-point function"
+    )
+    repository_id: Optional[str] = Field(
+        None,
+        description="Cloned repository the code belongs to; callees are resolved against its symbol index"
+    )
 
 
 class DiagramResponse(BaseModel):
@@ -29,21 +46,52 @@ class DiagramResponse(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict, description="Additional metadata about the diagram")
 
 
+def _get_symbol_index(repository_id: Optional[str]) -> Optional[SymbolIndex]:
+    """
+    Get the symbol index of the repository a diagram's code belongs to.
+    
+    Args:
+        repository_id: ID of the repository, if any
+        
+    Returns:
+        The index at the checked out commit, or None without a repository
+        
+    Raises:
+        ValueError: If the repository is not on disk
+    """
+    if repository_id is None:
+        return None
+    
+    repository_path = get_repository_path(repository_id)
+    if not os.path.isdir(repository_path):
+        raise ValueError(f"Repository {repository_id} not found")
+    commit_sha = get_checkout_commit(repository_id, repository_path)
+    # Indexes are persisted per commit, and files analyzed through the analysis cache
+    return get_symbol_index(repository_id, repository_path, commit_sha, get_analysis_cache())
+
+
 @router.post("/sequence", response_model=DiagramResponse)
 async def generate_sequence_diagram(request: DiagramRequest = Body(...)):
     """
     Generate a sequence diagram from source code.
     
-    Supports Python and TypeScript/JavaScript code analysis.
+    Supports Python and TypeScript/JavaScript code analysis. With a function
+    name, the diagram only shows the calls reachable from that function.
     """
     language = request.language.lower()
     
     try:
+        symbol_index = _get_symbol_index(request.repository_id)
+        
         # Generate the sequence diagram based on language
         if language == "python":
-            mermaid_syntax = analyze_python_code(request.code)
+            mermaid_syntax = analyze_python_code(
+                request.code, symbol_index, function_name=request.function_name, max_depth=request.max_depth
+            )
         elif language in ["typescript", "javascript", "ts", "js"]:
-            mermaid_syntax = analyze_typescript_code(request.code)
+            mermaid_syntax = analyze_typescript_code(
+                request.code, symbol_index, function_name=request.function_name, max_depth=request.max_depth
+            )
         else:
             raise HTTPException(
                 status_code=400,
@@ -55,7 +103,9 @@ async def generate_sequence_diagram(request: DiagramRequest = Body(...)):
             diagram_type="sequence",
             metadata={
                 "language": request.language,
-                "syntax": "mermaid"
+                "syntax": "mermaid",
+                "function_name": request.function_name,
+                "repository_id": request.repository_id
             }
         )
     except Exception as e:
@@ -76,11 +126,13 @@ async def analyze_code(request: DiagramRequest = Body(...)):
     language = request.language.lower()
     
     try:
+        symbol_index = _get_symbol_index(request.repository_id)
+        
         # For now, we only support sequence diagrams
         if language == "python":
-            mermaid_syntax = analyze_python_code(request.code)
+            mermaid_syntax = analyze_python_code(request.code, symbol_index)
         elif language in ["typescript", "javascript", "ts", "js"]:
-            mermaid_syntax = analyze_typescript_code(request.code)
+            mermaid_syntax = analyze_typescript_code(request.code, symbol_index)
         else:
             raise HTTPException(
                 status_code=400,
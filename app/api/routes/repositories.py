@@ -2,14 +2,36 @@
 API routes for GitHub repositories.
 """
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
 import os
+import json
 import uuid
-from typing import Optional
+import logging
+import threading
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
 
 from app.github.url_validator import validate_github_url, extract_repo_info
-from app.github.repository_cloner import clone_repository, ProgressTracker
+from app.github.repository_cloner import (
+    clone_repository_with_strategy,
+    sync_repository,
+    get_checkout_branch,
+    get_clone_path,
+    get_head_commit,
+    is_git_repository,
+    ProgressTracker,
+    CLONE_STRATEGIES,
+    CLONE_STRATEGY_FULL
+)
+from app.storage.repository_registry import get_repository_registry, RepositoryRecord, RepositoryRegistry
+from app.jobs.job_events import EVENT_STATUS
+from app.jobs.job_queue import JobContext, QueueFullError, get_job_queue
+from app.storage.job_store import FINISHED_STATUSES
+from app.api.routes.structure import invalidate_repository_structure, prepare_repository_structure
+
+logger = logging.getLogger(__name__)
 
 # Create a router instance
 router = APIRouter(
@@ -34,6 +56,15 @@ class RepositoryURL(BaseModel):
 class CloneRequest(RepositoryURL):
     """Model for repository clone requests."""
     branch: Optional[str] = None
+    strategy: str = CLONE_STRATEGY_FULL
+    
+    @field_validator('strategy')
+    @classmethod
+    def strategy_must_be_known(cls, v):
+        """Validate that the clone strategy is supported."""
+        if v not in CLONE_STRATEGIES:
+            raise ValueError(f"Clone strategy must be one of: {', '.join(CLONE_STRATEGIES)}")
+        return v
 
 class RepositoryInfo(BaseModel):
     """Model for repository information."""
@@ -42,13 +73,176 @@ class RepositoryInfo(BaseModel):
     branch: Optional[str] = None
     url: str
 
+class SyncRequest(BaseModel):
+    """Model for repository sync requests."""
+    branch: Optional[str] = None
+    commit: Optional[str] = None
+
 class CloneResponse(BaseModel):
     """Model for clone response."""
     task_id: str
     repository: RepositoryInfo
 
-# Create a dictionary to store cloning tasks and their progress
-clone_tasks = {}
+# Clone tasks run on the job queue and their status is kept in the job store;
+# finished clones are also kept in the repository registry, under the task ID
+
+# Seconds between keep-alive comments on an idle event stream. The job store
+# is checked at the same interval, which catches up with jobs run by another
+# API worker, whose events aren't published in this process.
+EVENT_STREAM_KEEPALIVE_SECONDS = 15.0
+
+
+class _JobProgressTracker(ProgressTracker):
+    """
+    Progress tracker that reports clone progress to a job.
+    
+    Every git progress update is streamed to the job's live subscribers, but
+    progress is only written to the job store when the percentage changes,
+    since git reports progress far more often than that.
+    """
+    def __init__(self, job: JobContext):
+        """
+        Initialize the progress tracker.
+        
+        Args:
+            job: The job to report progress to
+        """
+        super().__init__(callback=self._report)
+        self.job = job
+        self._last_percentage = -1
+    
+    def _report(self, event: dict):
+        """
+        Report a progress event to the job.
+        
+        Args:
+            event: Progress event from ProgressTracker.to_event
+        """
+        self.job.publish(**event)
+        
+        percentage = event["percentage"]
+        if percentage != self._last_percentage:
+            self._last_percentage = percentage
+            # Keep 100 for when the clone task has finished
+            self.job.update(progress=min(percentage, 99), operation=event["operation"])
+
+
+def _clone_status_from_record(record: RepositoryRecord) -> dict:
+    """
+    Build a clone task status from a registry entry.
+    
+    Args:
+        record: The registered repository
+        
+    Returns:
+        Dictionary in the same shape as the status of a clone job
+    """
+    status = {
+        "status": record.status,
+        "progress": 100 if record.status == "completed" else 0,
+        "operation": "Clone completed" if record.status == "completed" else "",
+        "repository": {
+            "owner": record.owner,
+            "name": record.name,
+            "branch": record.branch,
+            "url": record.url
+        }
+    }
+    if record.path:
+        status["path"] = record.path
+    if record.error:
+        status["error"] = record.error
+    return status
+
+
+# Locks serializing the clones and syncs of each clone path
+_clone_locks: Dict[str, threading.Lock] = {}
+_clone_locks_lock = threading.Lock()
+
+
+def _get_clone_lock(repo_path: str) -> threading.Lock:
+    """
+    Get the lock serializing the clones and syncs of a clone path.
+    
+    Args:
+        repo_path: Path to the clone
+        
+    Returns:
+        The lock of the path
+    """
+    with _clone_locks_lock:
+        return _clone_locks.setdefault(os.path.abspath(repo_path), threading.Lock())
+
+
+def _find_shared_clones(registry: RepositoryRegistry, repo_path: str, repository_id: str) -> List[RepositoryRecord]:
+    """
+    Find the other repositories registered on a clone.
+    
+    Cloning a URL again reuses its checkout under a new repository ID, so
+    several repositories can share one working tree.
+    
+    Args:
+        registry: The repository registry
+        repo_path: Path to the clone
+        repository_id: ID of the repository to leave out
+        
+    Returns:
+        The records of the other repositories on the clone
+    """
+    repo_path = os.path.abspath(repo_path)
+    return [
+        record for record in registry.list_repositories()
+        if record.id != repository_id and record.path and os.path.abspath(record.path) == repo_path
+    ]
+
+
+def _check_checkout_switch(registry: RepositoryRegistry, repo_path: str, repository_id: str,
+                           branch: Optional[str], commit: Optional[str] = None) -> None:
+    """
+    Refuse to move a shared clone off the branch the other repositories are on.
+    
+    Updating the checked out branch moves every repository on the clone
+    alike, but switching to another branch or a detached commit would
+    silently change the tree the other repositories are analyzed on.
+    
+    Args:
+        registry: The repository registry
+        repo_path: Path to the clone
+        repository_id: ID of the repository being cloned or synced
+        branch: Branch requested for the checkout (None to keep the current one)
+        commit: Commit requested for the checkout, if any
+        
+    Raises:
+        ValueError: If the checkout would switch while other repositories share it
+    """
+    current_branch = get_checkout_branch(repo_path)
+    if commit is None and (branch is None or branch == current_branch):
+        return
+    
+    shared = _find_shared_clones(registry, repo_path, repository_id)
+    if shared:
+        target = f"commit {commit}" if commit else f"branch {branch}"
+        raise ValueError(
+            f"Cannot check out {target}: the clone is shared with repositories "
+            f"{', '.join(sorted(record.id for record in shared))} on branch {current_branch}"
+        )
+
+
+def _update_shared_clones(registry: RepositoryRegistry, repo_path: str, repository_id: str,
+                          commit_sha: Optional[str]) -> None:
+    """
+    Record the checkout of a clone for the other repositories registered on it.
+    
+    Args:
+        registry: The repository registry
+        repo_path: Path to the clone
+        repository_id: ID of the repository that was cloned or synced
+        commit_sha: Commit the clone is now at
+    """
+    branch = get_checkout_branch(repo_path)
+    for record in _find_shared_clones(registry, repo_path, repository_id):
+        if record.commit_sha != commit_sha or (branch and record.branch != branch):
+            registry.update(record.id, commit_sha=commit_sha, branch=branch or record.branch)
 
 @router.post("/validate", response_model=RepositoryInfo)
 async def validate_repository(repo: RepositoryURL):
@@ -66,29 +260,39 @@ async def validate_repository(repo: RepositoryURL):
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
-def clone_repository_task(task_id: str, url: str, branch: Optional[str] = None):
+def clone_repository_task(
+    job: JobContext,
+    url: str,
+    branch: Optional[str] = None,
+    strategy: str = CLONE_STRATEGY_FULL
+) -> dict:
     """
-    Background task for cloning a repository.
+    Job for cloning a repository.
+    
+    An existing clone of the repository is synced instead of cloned again.
+    When the clone is ready, a job to scan and index it is queued.
     
     Args:
-        task_id: The unique ID for this cloning task
+        job: The job running the clone; its ID is also the repository ID
         url: The GitHub repository URL
         branch: The branch to clone (optional)
+        strategy: Clone strategy (see CLONE_STRATEGIES)
+        
+    Returns:
+        Clone details to add to the job status
     """
+    task_id = job.id
+    
     # Create a progress tracker
-    tracker = ProgressTracker()
+    tracker = _JobProgressTracker(job)
     
     # Set up the clone directory (normally would come from config)
     clone_dir = os.path.join(os.getcwd(), "cloned_repos")
     os.makedirs(clone_dir, exist_ok=True)
     
-    # Update task status
-    clone_tasks[task_id] = {
-        "status": "in_progress",
-        "progress": 0,
-        "operation": "Starting clone",
-        "repository": {}
-    }
+    job.update(operation="Starting clone")
+    
+    registry = get_repository_registry()
     
     try:
         # Extract repository info
@@ -98,34 +302,82 @@ def clone_repository_task(task_id: str, url: str, branch: Optional[str] = None):
         if not branch and url_branch:
             branch = url_branch
             
-        # Update repository info
-        clone_tasks[task_id]["repository"] = {
-            "owner": owner,
-            "name": repo_name,
-            "branch": branch,
-            "url": url
-        }
-        
-        # Clone the repository
-        repo_path = clone_repository(url, clone_dir, branch, tracker)
+        registry.register(
+            task_id,
+            url=url,
+            owner=owner,
+            name=repo_name,
+            branch=branch,
+            status="in_progress"
+        )
         
-        # Update task status
-        clone_tasks[task_id]["status"] = "completed"
-        clone_tasks[task_id]["progress"] = 100
-        clone_tasks[task_id]["operation"] = "Clone completed"
-        clone_tasks[task_id]["path"] = repo_path
+        details = {}
+        repo_path = get_clone_path(url, clone_dir)
+        # Clone jobs and syncs of the same clone must not move it concurrently
+        with _get_clone_lock(repo_path):
+            if is_git_repository(repo_path):
+                # Update the existing clone instead of cloning it again
+                _check_checkout_switch(registry, repo_path, task_id, branch)
+                result = sync_repository(repo_path, branch, progress_tracker=tracker)
+                details["changed_files"] = len(result.changed_files)
+                operation = "Sync completed"
+            else:
+                # Clone the repository
+                result = clone_repository_with_strategy(url, clone_dir, branch, tracker, strategy)
+                operation = "Clone completed"
+            repo_path = result.path
+            
+            # Record where the clone lives so it can be found after a restart
+            commit_sha = get_head_commit(repo_path)
+            registry.update(
+                task_id,
+                path=os.path.abspath(repo_path),
+                branch=branch or get_checkout_branch(repo_path),
+                commit_sha=commit_sha,
+                status="completed"
+            )
+            _update_shared_clones(registry, repo_path, task_id, commit_sha)
         
     except Exception as e:
-        # Update task status with error
-        clone_tasks[task_id]["status"] = "error"
-        clone_tasks[task_id]["error"] = str(e)
+        if registry.get(task_id) is not None:
+            registry.update(task_id, status="error", error=str(e))
+        raise
+    
+    # Scan and index the clone now so the first structure request is fast
+    try:
+        details["analysis_job_id"] = get_job_queue().submit(
+            "analysis", prepare_repository_job, task_id
+        )
+    except QueueFullError as e:
+        logger.warning(f"Skipped preparing structure for repository {task_id}: {e}")
+    
+    job.update(operation=operation)
+    details.update({
+        "path": repo_path,
+        "bytes_transferred": result.bytes_transferred,
+        "elapsed_seconds": result.elapsed_seconds
+    })
+    return details
+
+def prepare_repository_job(job: JobContext, repository_id: str):
+    """
+    Job for scanning and indexing a cloned repository.
+    
+    Args:
+        job: The job running the analysis
+        repository_id: ID of the repository
+    """
+    job.update(operation="Preparing repository structure", repository_id=repository_id)
+    prepare_repository_structure(repository_id)
+    job.update(operation="Repository structure prepared")
 
 @router.post("/clone", response_model=CloneResponse, status_code=202)
-async def clone_repo(repo: CloneRequest, background_tasks: BackgroundTasks):
+async def clone_repo(repo: CloneRequest):
     """
     Clone a GitHub repository.
     
-    This endpoint initiates a background task to clone the repository.
+    This endpoint queues a background job to clone the repository, or
+    responds with 503 when too many jobs are already waiting.
     """
     # Create a unique task ID
     task_id = str(uuid.uuid4())
@@ -136,26 +388,163 @@ async def clone_repo(repo: CloneRequest, background_tasks: BackgroundTasks):
     # Use branch from URL if not specified in request
     branch = repo.branch if repo.branch else url_branch
     
-    # Add the cloning task to background tasks
-    background_tasks.add_task(clone_repository_task, task_id, repo.url, branch)
+    repository = RepositoryInfo(
+        owner=owner,
+        name=repo_name,
+        branch=branch,
+        url=repo.url
+    )
     
-    # Return the task ID and repository info
-    return CloneResponse(
-        task_id=task_id,
-        repository=RepositoryInfo(
-            owner=owner,
-            name=repo_name,
-            branch=branch,
-            url=repo.url
+    # Queue the cloning job
+    try:
+        get_job_queue().submit(
+            "clone",
+            clone_repository_task,
+            repo.url,
+            branch,
+            repo.strategy,
+            job_id=task_id,
+            host=urlparse(repo.url).hostname,
+            data={"strategy": repo.strategy, "repository": repository.model_dump()}
         )
-    )
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    # Return the task ID and repository info
+    return CloneResponse(task_id=task_id, repository=repository)
 
 @router.get("/clone/{task_id}")
 async def get_clone_status(task_id: str):
     """
     Get the status of a repository cloning task.
     """
-    if task_id not in clone_tasks:
+    job = get_job_queue().get(task_id)
+    if job is not None:
+        return job.to_status()
+    
+    # Tasks whose job was evicted are only known to the registry
+    record = get_repository_registry().get(task_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        
+    return _clone_status_from_record(record)
+
+def _format_event(name: str, data: dict) -> str:
+    """
+    Format a Server-Sent Event.
+    
+    Args:
+        name: Event name
+        data: Event data, sent as JSON
+        
+    Returns:
+        The event in text/event-stream format
+    """
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/clone/{task_id}/events")
+async def stream_clone_events(task_id: str):
+    """
+    Stream the progress of a repository cloning task as Server-Sent Events.
+    
+    The stream starts with a ``status`` event holding the current task status
+    (as returned by the status endpoint), followed by ``progress`` events with
+    the git transfer details (phase, objects received, bytes received and
+    throughput) and ``status`` events whenever the status changes. The stream
+    ends after the task has completed or failed.
+    """
+    queue = get_job_queue()
+    if queue.get(task_id) is None:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    
+    async def event_stream():
+        subscription = queue.events.subscribe(task_id)
+        try:
+            # Read the status after subscribing, so no change is missed in between
+            job = queue.get(task_id)
+            if job is None:
+                return
+            yield _format_event(EVENT_STATUS, job.to_status())
+            if job.status in FINISHED_STATUSES:
+                return
+            
+            while True:
+                event = await subscription.get(timeout=EVENT_STREAM_KEEPALIVE_SECONDS)
+                if event is None:
+                    job = queue.get(task_id)
+                    if job is None:
+                        return
+                    if job.status in FINISHED_STATUSES:
+                        yield _format_event(EVENT_STATUS, job.to_status())
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                
+                name, data = event
+                yield _format_event(name, data)
+                if name == EVENT_STATUS and data["status"] in FINISHED_STATUSES:
+                    return
+        finally:
+            queue.events.unsubscribe(subscription)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/{repository_id}")
+async def get_repository(repository_id: str):
+    """
+    Get a registered repository, including its clone path and commit.
+    """
+    record = get_repository_registry().get(repository_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Repository {repository_id} not found")
+    
+    return record 
+
+@router.post("/{repository_id}/sync")
+def sync_repo(repository_id: str, request: SyncRequest):
+    """
+    Update a cloned repository to the latest commit of a branch, or to a commit.
+    
+    Returns the old and new commit and the files changed between them, so
+    only those need to be analyzed again.
+    """
+    registry = get_repository_registry()
+    record = registry.get(repository_id)
+    if record is None or not record.path or not is_git_repository(record.path):
+        raise HTTPException(status_code=404, detail=f"Repository {repository_id} not found")
+    
+    branch = request.branch or (record.branch if not request.commit else None)
+    
+    with _get_clone_lock(record.path):
+        try:
+            _check_checkout_switch(registry, record.path, repository_id, branch, request.commit)
+        except ValueError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+        
+        try:
+            result = sync_repository(record.path, branch=branch, commit=request.commit)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-    return clone_tasks[task_id] 
\ No newline at end of file
+        registry.update(repository_id, commit_sha=result.new_commit, branch=branch or record.branch)
+        _update_shared_clones(registry, record.path, repository_id, result.new_commit)
+        
+        if result.new_commit != result.old_commit:
+            invalidate_repository_structure(repository_id)
+            for shared in _find_shared_clones(registry, record.path, repository_id):
+                invalidate_repository_structure(shared.id)
+    
+    return {
+        "old_commit": result.old_commit,
+        "new_commit": result.new_commit,
+        "changed_files": [
+            {"status": changed.status, "path": changed.path}
+            for changed in result.changed_files
+        ],
+        "bytes_transferred": result.bytes_transferred,
+        "elapsed_seconds": result.elapsed_seconds
+    }
@@ -1,16 +1,33 @@
 """
 API routes for file/module structure visualization.
 """
+import os
 from typing import Dict, Any, List, Optional
-from fastapi import APIRouter, HTTPException, Body, Query
+from fastapi import APIRouter, HTTPException, Body, Header, Query, Response
 from pydantic import BaseModel, Field
 
+from app.analysis.analysis_cache import get_analysis_cache
+from app.analysis.project_call_graph import CALLEES, ProjectCallGraph, get_project_call_graph
+from app.storage.repository_registry import get_checkout_commit, get_repository_path, get_repository_registry
 from app.structure.directory_scanner import scan_directory, get_file_stats
-from app.structure.dependency_analyzer import analyze_dependencies
+from app.structure.dependency_analyzer import DEPENDENTS, analyze_dependencies
+from app.structure.dependency_artifact import (
+    DependencyArtifact,
+    get_dependency_artifact_cache,
+    make_artifact_key
+)
+from app.structure.search_index import DEFAULT_PAGE_SIZE
+from app.structure.structure_snapshot import (
+    StructureSnapshot,
+    get_structure_snapshot_cache,
+    make_snapshot_key
+)
 from app.structure.tree_converter import (
+    DEFAULT_CHILDREN_PAGE_SIZE,
+    convert_to_lazy_frontend_tree,
     create_file_structure_tree,
-    create_dependency_visualization,
-    get_file_structure_stats
+    get_file_structure_stats,
+    get_lazy_children
 )
 
 router = APIRouter(
@@ -75,36 +92,319 @@ class DependencyGraphResponse(BaseModel):
     stats: Dict[str, Any]
 
 
+class ImpactedFile(BaseModel):
+    """Model for a file reached by an impact query."""
+    path: str
+    depth: int  # Number of import hops from the nearest queried file
+
+
+class ImpactResponse(BaseModel):
+    """Response model for change impact queries."""
+    paths: List[str]
+    direction: str
+    max_depth: Optional[int]
+    impacted: List[ImpactedFile]
+    count: int
+
+
+class CallsResponse(BaseModel):
+    """Response model for call graph queries."""
+    function: str
+    direction: str
+    functions: List[str]
+    count: int
+
+
+class CallPathResponse(BaseModel):
+    """Response model for call path queries."""
+    source: str
+    target: str
+    path: Optional[List[str]]  # None if the target is not reachable
+
+
+def _get_structure_snapshot(repository_id: str, exclude_dirs: Optional[List[str]]) -> StructureSnapshot:
+    """
+    Get the structure snapshot of a repository, scanning it only if needed.
+    
+    The tree, file type and search endpoints all answer from the same snapshot,
+    which is rebuilt once the checked out commit changes.
+    
+    Args:
+        repository_id: ID of the repository
+        exclude_dirs: Directories to exclude from the scan
+        
+    Returns:
+        StructureSnapshot: The repository snapshot
+    """
+    repository_path = get_repository_path(repository_id)
+    commit_sha = get_checkout_commit(repository_id, repository_path)
+    
+    def build() -> StructureSnapshot:
+        # Scan once and derive both the tree and the statistics from it
+        directory_tree = scan_directory(repository_path, exclude_dirs, classify_files=True, compact=True)
+        tree = create_file_structure_tree(repository_path, exclude_dirs=exclude_dirs, directory_tree=directory_tree)
+        stats = get_file_structure_stats(repository_path, directory_tree=directory_tree)
+        
+        return StructureSnapshot(
+            repository_path,
+            tree,
+            stats,
+            directory_tree=directory_tree,
+            commit_sha=commit_sha,
+            exclude_dirs=exclude_dirs
+        )
+    
+    key = make_snapshot_key(repository_id, commit_sha, exclude_dirs)
+    return get_structure_snapshot_cache().get_or_build(key, build)
+
+
+def prepare_repository_structure(repository_id: str) -> None:
+    """
+    Scan a repository and build its search index ahead of the first request.
+    
+    Args:
+        repository_id: ID of the repository
+    """
+    _get_structure_snapshot(repository_id, None).get_search_index(index_contents=True)
+
+
+def invalidate_repository_structure(repository_id: str) -> None:
+    """
+    Drop the structure snapshots and dependency artifacts of a repository.
+    
+    Called once its checkout moves to another commit, so the memory held by
+    the old commit is freed right away rather than on the next request.
+    
+    Args:
+        repository_id: ID of the repository
+    """
+    get_structure_snapshot_cache().invalidate(repository_id)
+    get_dependency_artifact_cache().invalidate(repository_id)
+
+
+def _get_tree_etag(snapshot: StructureSnapshot) -> Optional[str]:
+    """
+    Get the entity tag of the full tree of a snapshot.
+    
+    Args:
+        snapshot: The structure snapshot
+        
+    Returns:
+        The quoted content hash of the tree root, or None if it has none
+    """
+    tree_hash = snapshot.tree.get("hash")
+    return f'"{tree_hash}"' if tree_hash else None
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check whether an If-None-Match header matches an entity tag.
+    
+    Args:
+        if_none_match: Value of the If-None-Match header
+        etag: The current entity tag
+        
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    
+    return False
+
+
 @router.get("/tree/{repository_id}", response_model=StructureTreeResponse)
 async def get_repository_structure(
     repository_id: str,
+    response: Response,
     exclude_dirs: Optional[List[str]] = Query(None, description="Directories to exclude"),
+    if_none_match: Optional[str] = Header(None),
 ):
     """
     Get the file/directory structure for a repository.
     
     Returns a hierarchical tree representation of files and directories,
     along with statistics about file types, sizes, etc.
-    """
-    # TODO: Replace with actual repository path lookup
-    repository_path = f"./data/repositories/{repository_id}"
     
+    The response carries the content hash of the tree as its ETag; requests
+    with a matching If-None-Match header get an empty 304 response.
+    """
     try:
-        # Create the file structure tree using the new converter
-        tree = create_file_structure_tree(repository_path, exclude_dirs)
+        snapshot = _get_structure_snapshot(repository_id, exclude_dirs)
         
-        # Get statistics about the repository
-        stats = get_file_structure_stats(repository_path)
+        etag = _get_tree_etag(snapshot)
+        if etag:
+            if _etag_matches(if_none_match, etag):
+                return Response(status_code=304, headers={"ETag": etag})
+            response.headers["ETag"] = etag
+        
+        return StructureTreeResponse(
+            tree=snapshot.tree,
+            stats=snapshot.stats
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to get repository structure: {str(e)}"
+        )
+
+
+@router.get("/tree/{repository_id}/lazy", response_model=StructureTreeResponse)
+async def get_lazy_repository_structure(
+    repository_id: str,
+    exclude_dirs: Optional[List[str]] = Query(None, description="Directories to exclude"),
+    levels: int = Query(1, ge=0, le=10, description="Number of directory levels to include"),
+    limit: int = Query(DEFAULT_CHILDREN_PAGE_SIZE, ge=1, le=5000, description="Maximum number of children per directory"),
+):
+    """
+    Get the top of the file/directory structure for a repository.
+    
+    Unlike the full tree, this only includes the first ``levels`` levels and
+    the directories expanded earlier through the children endpoint. Every
+    directory reports its ``childCount`` and whether its children were left
+    out (``collapsed``), so the frontend can load them on demand.
+    """
+    try:
+        snapshot = _get_structure_snapshot(repository_id, exclude_dirs)
+        tree = convert_to_lazy_frontend_tree(snapshot.get_collapsible_tree(), levels=levels, limit=limit)
         
         return StructureTreeResponse(
             tree=tree,
-            stats=stats
+            stats=snapshot.stats
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to get repository structure: {str(e)}"
         )
+
+
+def _find_directory_node(repository_id: str, path: str, exclude_dirs: Optional[List[str]]):
+    """
+    Find a directory in the collapsible tree of a repository.
+    
+    Args:
+        repository_id: ID of the repository
+        path: Path of the directory (as in the tree, or relative to the root)
+        exclude_dirs: Directories excluded from the scan
+        
+    Returns:
+        Tuple of (StructureSnapshot, TreeNode)
+        
+    Raises:
+        HTTPException: 404 if the path doesn't exist, 400 if it is a file or
+            the repository can't be scanned
+    """
+    try:
+        snapshot = _get_structure_snapshot(repository_id, exclude_dirs)
+        node = snapshot.find_tree_node(path)
     except Exception as e:
         raise HTTPException(
             status_code=400,
             detail=f"Failed to get repository structure: {str(e)}"
         )
+    
+    if node is None:
+        raise HTTPException(status_code=404, detail=f"Path not found: {path}")
+    if not node.is_directory:
+        raise HTTPException(status_code=400, detail=f"Not a directory: {path}")
+    
+    return snapshot, node
+
+
+@router.get("/tree/{repository_id}/children")
+async def get_directory_children(
+    repository_id: str,
+    path: str = Query(..., description="Path of the directory, as in the tree or relative to the repository root"),
+    exclude_dirs: Optional[List[str]] = Query(None, description="Directories to exclude"),
+    offset: int = Query(0, ge=0, description="Number of children to skip"),
+    limit: int = Query(DEFAULT_CHILDREN_PAGE_SIZE, ge=1, le=5000, description="Maximum number of children to return"),
+    levels: int = Query(0, ge=0, le=10, description="Number of directory levels to include below each child"),
+):
+    """
+    Get a page of the children of a directory, and mark the directory as expanded.
+    
+    Expanded directories are included by the lazy tree endpoint until they
+    are collapsed again. The expand/collapse state belongs to the cached
+    snapshot of the checkout: it is shared by every client of the repository
+    and reset once the checkout moves to another commit. Checkouts without a
+    known commit are never cached, so their directories are not marked as
+    expanded (``expanded`` is false).
+    """
+    snapshot, node = _find_directory_node(repository_id, path, exclude_dirs)
+    
+    expanded = snapshot.commit_sha is not None
+    if expanded:
+        snapshot.get_collapsible_tree().expand_node(node)
+    
+    return {
+        "path": node.path,
+        "children": get_lazy_children(node, offset=offset, limit=limit, levels=levels),
+        "total": len(node.children),
+        "offset": offset,
+        "limit": limit,
+        "expanded": expanded
+    }
+
+
+@router.post("/tree/{repository_id}/collapse")
+async def collapse_directory(
+    repository_id: str,
+    path: str = Query(..., description="Path of the directory, as in the tree or relative to the repository root"),
+    exclude_dirs: Optional[List[str]] = Query(None, description="Directories to exclude"),
+):
+    """
+    Mark a directory as collapsed, so the lazy tree endpoint leaves out its children.
+    
+    Like expanding, collapsing is shared by every client of the repository
+    (see get_directory_children). Checkouts without a known commit can't keep
+    the state, and are answered with 409.
+    """
+    snapshot, node = _find_directory_node(repository_id, path, exclude_dirs)
+    if snapshot.commit_sha is None:
+        raise HTTPException(
+            status_code=409,
+            detail="The collapse state can't be kept for a checkout without a known commit"
+        )
+    snapshot.get_collapsible_tree().collapse_node(node)
+    
+    return {
+        "path": node.path,
+        "collapsed": node.is_collapsed
+    }
+
+
+def _get_dependency_artifact(repository_id: str, repository_path: str,
+                             exclude_dirs: Optional[List[str]] = None) -> DependencyArtifact:
+    """
+    Get the dependency analysis artifact of a repository, analyzing it only if needed.
+    
+    Artifacts are cached per checked out commit and excluded directories.
+    
+    Args:
+        repository_id: ID of the repository
+        repository_path: Path to the repository on disk
+        exclude_dirs: Directories to leave out of the analysis
+        
+    Returns:
+        DependencyArtifact: The dependency analysis artifact
+    """
+    commit_sha = get_checkout_commit(repository_id, repository_path)
+    
+    def build() -> DependencyArtifact:
+        # Unchanged files are answered from the analysis cache
+        graph = analyze_dependencies(repository_path, get_analysis_cache(), compact=True, exclude_dirs=exclude_dirs)
+        return DependencyArtifact(graph, commit_sha=commit_sha)
+    
+    key = make_artifact_key(repository_id, commit_sha, exclude_dirs)
+    return get_dependency_artifact_cache().get_or_build(key, build)
 
 
 @router.get("/dependencies/{repository_id}", response_model=DependencyGraphResponse)
@@ -118,25 +418,18 @@ async def get_repository_dependencies(
     Returns a graph representation of file dependencies based on import statements,
     along with statistics about dependencies.
     """
-    # TODO: Replace with actual repository path lookup
-    repository_path = f"./data/repositories/{repository_id}"
+    repository_path = get_repository_path(repository_id)
     
     try:
-        # Create dependency visualization using the new converter
-        dependency_data = create_dependency_visualization(repository_path)
-        
-        # Get additional statistics for the dependency graph
-        graph = analyze_dependencies(repository_path)
-        stats = {
-            "total_files": len(dependency_data["nodes"]),
-            "total_dependencies": len(dependency_data["edges"]),
-            "circular_dependencies": graph.find_circular_dependencies()
-        }
+        # Analyzed once per commit; the visualization and the statistics
+        # both come from the same artifact
+        artifact = _get_dependency_artifact(repository_id, repository_path, exclude_dirs)
+        dependency_data = artifact.visualization
         
         return DependencyGraphResponse(
             nodes=dependency_data["nodes"],
             edges=dependency_data["edges"],
-            stats=stats
+            stats=artifact.stats
         )
     except Exception as e:
         raise HTTPException(
@@ -145,6 +438,149 @@ async def get_repository_dependencies(
         )
 
 
+@router.get("/impact/{repository_id}", response_model=ImpactResponse)
+async def get_change_impact(
+    repository_id: str,
+    path: List[str] = Query(..., description="Paths of the changed files, relative to the repository root"),
+    direction: str = Query(DEPENDENTS, description="'dependents' for the files affected by a change, "
+                                                   "'dependencies' for the files relied on"),
+    depth: Optional[int] = Query(None, ge=1, description="Maximum number of import hops to follow"),
+):
+    """
+    Get the files affected by changing some files (their blast radius).
+    
+    Follows imports transitively, up to ``depth`` hops, and reports every
+    reached file with its distance from the nearest changed file.
+    """
+    try:
+        # The graph of the commit's artifact is reused, along with its memoized searches
+        graph = _get_dependency_artifact(repository_id, get_repository_path(repository_id)).graph
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to analyze repository dependencies: {str(e)}"
+        )
+    
+    paths = [os.path.normpath(file_path) for file_path in path]
+    missing = [file_path for file_path in paths if file_path not in graph]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Not in the dependency graph: {', '.join(missing)}")
+    
+    try:
+        impact = graph.get_impact(paths, max_depth=depth, direction=direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    impacted = [
+        ImpactedFile(path=impacted_path, depth=impacted_depth)
+        for impacted_path, impacted_depth in sorted(impact.items(), key=lambda item: (item[1], item[0]))
+    ]
+    return ImpactResponse(
+        paths=paths,
+        direction=direction,
+        max_depth=depth,
+        impacted=impacted,
+        count=len(impacted)
+    )
+
+
+def _get_call_graph(repository_id: str) -> ProjectCallGraph:
+    """
+    Get the call graph of a repository, re-analyzing only changed files.
+    
+    Args:
+        repository_id: ID of the repository
+        
+    Returns:
+        ProjectCallGraph: The call graph, up to date with the checkout
+    """
+    repository_path = get_repository_path(repository_id)
+    commit_sha = get_checkout_commit(repository_id, repository_path)
+    
+    graph = get_project_call_graph(repository_id)
+    if commit_sha is None or graph.commit_sha != commit_sha:
+        # Unchanged files are answered from the analysis cache
+        graph.sync(repository_path, get_analysis_cache(), commit_sha=commit_sha)
+    
+    return graph
+
+
+def _check_function(graph: ProjectCallGraph, function_id: str) -> None:
+    """
+    Check that a function is part of a call graph.
+    
+    Args:
+        graph: The call graph
+        function_id: ID of the function ("<path>:<qualified name>")
+        
+    Raises:
+        HTTPException: If the function is not defined in the graph
+    """
+    if function_id not in graph:
+        raise HTTPException(status_code=404, detail=f"Not in the call graph: {function_id}")
+
+
+@router.get("/calls/{repository_id}", response_model=CallsResponse)
+async def get_function_calls(
+    repository_id: str,
+    function: str = Query(..., description="Function ID, '<path>:<qualified name>' ('<path>:<module>' for module level)"),
+    direction: str = Query(CALLEES, description="'callees' for the functions it calls, "
+                                                "'callers' for the functions calling it"),
+):
+    """
+    Get the functions a function calls, or the functions calling it, across files.
+    """
+    try:
+        graph = _get_call_graph(repository_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to analyze repository calls: {str(e)}"
+        )
+    
+    _check_function(graph, function)
+    
+    try:
+        functions = graph.get_related(function, direction)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return CallsResponse(
+        function=function,
+        direction=direction,
+        functions=functions,
+        count=len(functions)
+    )
+
+
+@router.get("/call-path/{repository_id}", response_model=CallPathResponse)
+async def get_call_path(
+    repository_id: str,
+    source: str = Query(..., description="ID of the calling function"),
+    target: str = Query(..., description="ID of the function to reach"),
+    depth: Optional[int] = Query(None, ge=1, description="Maximum number of calls to follow"),
+):
+    """
+    Get a shortest chain of calls from one function to another.
+    """
+    try:
+        graph = _get_call_graph(repository_id)
+    except Exception as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Failed to analyze repository calls: {str(e)}"
+        )
+    
+    _check_function(graph, source)
+    _check_function(graph, target)
+    
+    return CallPathResponse(
+        source=source,
+        target=target,
+        path=graph.find_path(source, target, max_depth=depth)
+    )
+
+
 @router.get("/file-types/{repository_id}")
 async def get_file_type_distribution(
     repository_id: str,
@@ -155,12 +591,9 @@ async def get_file_type_distribution(
     
     Returns statistics about file types, extensions, and sizes.
     """
-    # TODO: Replace with actual repository path lookup
-    repository_path = f"./data/repositories/{repository_id}"
-    
     try:
         # Get statistics about the repository
-        stats = get_file_structure_stats(repository_path)
+        stats = _get_structure_snapshot(repository_id, exclude_dirs).stats
         
         return {
             "file_types": stats["files_by_type"],
@@ -181,44 +614,39 @@ async def search_repository_files(
     repository_id: str,
     query: str = Query(..., description="Search query"),
     exclude_dirs: Optional[List[str]] = Query(None, description="Directories to exclude"),
+    search_content: bool = Query(True, description="Also search file contents"),
+    offset: int = Query(0, ge=0, description="Number of matching files to skip"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=1000, description="Maximum number of files to return"),
 ):
     """
     Search for files in a repository by name, path, or content.
     
-    Returns a list of files that match the search criteria.
+    Returns a page of files that match the search criteria. Files matching by
+    content include the matching lines. The count is exact unless
+    ``count_exact`` is false, in which case it is an upper bound.
     """
-    # TODO: Replace with actual repository path lookup
-    repository_path = f"./data/repositories/{repository_id}"
-    
     try:
-        import os
-        import re
-        
-        # Create the file structure tree
-        tree = create_file_structure_tree(repository_path, exclude_dirs)
-        
-        # Flatten the tree to get all files
-        all_files = []
-        
-        def collect_files(node):
-            if node["type"] == "file":
-                all_files.append(node)
-            elif "children" in node:
-                for child in node["children"]:
-                    collect_files(child)
-        
-        collect_files(tree)
+        snapshot = _get_structure_snapshot(repository_id, exclude_dirs)
+        results = snapshot.get_search_index().search(
+            query,
+            offset=offset,
+            limit=limit,
+            content=search_content
+        )
         
-        # Filter files based on the search query
-        query_lower = query.lower()
-        matching_files = [
-            file for file in all_files
-            if query_lower in file["name"].lower() or query_lower in file["path"].lower()
-        ]
+        matching_files = []
+        for hit in results.hits:
+            file = snapshot.files[hit.file_id]
+            if hit.line_hits:
+                file = dict(file, matches=hit.line_hits)
+            matching_files.append(file)
         
         return {
             "results": matching_files,
-            "count": len(matching_files)
+            "count": results.count,
+            "count_exact": results.count_exact,
+            "offset": results.offset,
+            "limit": results.limit
         }
     except Exception as e:
         raise HTTPException(
@@ -1,18 +1,41 @@
 """
 Integration module for Python code analysis and sequence diagram generation.
 """
+import ast
 from typing import Dict, List, Any, Optional
 
-from app.analysis.python_extractor import extract_method_calls, extract_object_creations
+from app.analysis.analysis_cache import AnalysisCache, analyze_source
+from app.analysis.parsed_module import ParsedModule, walk_tree
+from app.analysis.python_extractor import (
+    DefinitionExtractor,
+    MethodCallExtractor,
+    ObjectCreationExtractor,
+    extract_definitions,
+    extract_method_calls,
+    extract_object_creations
+)
+from app.analysis.symbol_index import SymbolIndex
 from app.diagrams.sequence.generator import generate_sequence_diagram, create_sequence_diagram_from_code
+from app.diagrams.sequence.reachability import (
+    DEFAULT_MAX_CALL_DEPTH,
+    FunctionCalls,
+    collect_reachable_calls,
+    find_entry_point,
+    find_method
+)
 
 
-def extract_callee_from_method_calls(method_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_callee_from_method_calls(method_calls: List[Dict[str, Any]],
+                                     symbol_index: Optional[SymbolIndex] = None) -> List[Dict[str, Any]]:
     """
     Enhance method calls by inferring the callee from method names if not present.
     
+    When a symbol index is given, the callee is the class defining the called
+    method; the callee is only inferred from names for calls it can't resolve.
+    
     Args:
         method_calls: List of method call dictionaries
+        symbol_index: Optional index of the classes and methods that can be called
         
     Returns:
         List[Dict[str, Any]]: Enhanced method calls with callee information
@@ -27,9 +50,17 @@ def extract_callee_from_method_calls(method_calls: List[Dict[str, Any]]) -> List
             enhanced_calls.append(enhanced_call)
             continue
         
-        # Try to infer callee from method name (e.g., database.query -> Database)
+        # Look up the class defining the method
         method = enhanced_call.get('method', '')
-        if '.' in method:
+        callee = None
+        if symbol_index is not None:
+            callee = symbol_index.resolve_callee(method.rpartition('.')[2], enhanced_call.get('caller', ''))
+        
+        if callee is not None:
+            enhanced_call['method'] = method.rpartition('.')[2]
+            enhanced_call['callee'] = callee
+        # Try to infer callee from method name (e.g., database.query -> Database)
+        elif '.' in method:
             parts = method.split('.')
             if len(parts) >= 2:
                 # Capitalize the first part to make it look like a class/component
@@ -75,39 +106,210 @@ def _infer_target_from_method(method_name: str) -> str:
     return "Service"
 
 
-def analyze_python_file(file_path: str) -> str:
+def analyze_python_file(file_path: str, cache: Optional[AnalysisCache] = None,
+                        symbol_index: Optional[SymbolIndex] = None,
+                        function_name: Optional[str] = None,
+                        max_depth: int = DEFAULT_MAX_CALL_DEPTH) -> str:
     """
     Analyze a Python file and generate a sequence diagram.
     
     Args:
         file_path: Path to the Python file
+        cache: Optional analysis cache, so unchanged files are not parsed again
+        symbol_index: Optional index of the repository the file is part of
+            (callees are resolved against the file's own definitions if None)
+        function_name: Optional entry-point function; only the calls reachable
+            from it are diagrammed (see analyze_python_code)
+        max_depth: Number of call levels followed from the entry point
         
     Returns:
         str: Mermaid.js syntax for a sequence diagram
     """
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        code = f.read()
+    if cache is None or function_name is not None:
+        # Scoped diagrams only walk the reached functions, which the cached analysis doesn't split up
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        
+        return analyze_python_code(code, symbol_index, function_name, max_depth)
     
-    return analyze_python_code(code)
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    
+    analysis = analyze_source(content, '.py', cache)
+    if 'error' in analysis:
+        raise SyntaxError(analysis['error'])
+    
+    if symbol_index is None:
+        symbol_index = SymbolIndex.from_definitions(analysis['definitions'])
+    
+    enhanced_calls = extract_callee_from_method_calls(analysis['method_calls'], symbol_index)
+    return create_sequence_diagram_from_code(enhanced_calls, analysis['object_creations'])
 
 
-def analyze_python_code(code: str) -> str:
+def analyze_python_code(code: str, symbol_index: Optional[SymbolIndex] = None,
+                        function_name: Optional[str] = None,
+                        max_depth: int = DEFAULT_MAX_CALL_DEPTH) -> str:
     """
     Analyze Python code and generate a sequence diagram.
     
+    With an entry-point function, only the calls it makes are diagrammed,
+    followed into the functions and methods of the same code they reach (up
+    to max_depth levels), and only those functions are analyzed.
+    
     Args:
         code: Python source code
+        symbol_index: Optional index of the repository the code is part of
+            (callees are resolved against the code's own definitions if None)
+        function_name: Optional entry-point function, as a qualified name
+            ("Class.method") or unambiguous short name
+        max_depth: Number of call levels followed from the entry point
+            (1 = only the calls the entry point makes itself)
         
     Returns:
         str: Mermaid.js syntax for a sequence diagram
+        
+    Raises:
+        ValueError: If the entry-point function is not defined in the code
     """
-    # Extract method calls and object creations
-    method_calls = extract_method_calls(code)
-    object_creations = extract_object_creations(code)
+    module = ParsedModule.from_source(code)
     
-    # Enhance method calls with inferred callee information
-    enhanced_calls = extract_callee_from_method_calls(method_calls)
+    if function_name is not None:
+        return _analyze_reachable_calls(module, symbol_index, function_name, max_depth)
+    
+    # Extract method calls, object creations and definitions in a single walk
+    module.run(MethodCallExtractor, ObjectCreationExtractor, DefinitionExtractor)
+    method_calls = extract_method_calls(module)
+    object_creations = extract_object_creations(module)
+    
+    if symbol_index is None:
+        symbol_index = SymbolIndex.from_definitions(extract_definitions(module))
+    
+    # Enhance method calls with resolved or inferred callee information
+    enhanced_calls = extract_callee_from_method_calls(method_calls, symbol_index)
     
     # Generate the sequence diagram
-    return create_sequence_diagram_from_code(enhanced_calls, object_creations) 
\ No newline at end of file
+    return create_sequence_diagram_from_code(enhanced_calls, object_creations)
+
+
+def _analyze_reachable_calls(module: ParsedModule, symbol_index: Optional[SymbolIndex],
+                             function_name: str, max_depth: int) -> str:
+    """
+    Generate a sequence diagram of the calls reachable from an entry-point function.
+    
+    Args:
+        module: The parsed code
+        symbol_index: Optional index of the repository the code is part of
+        function_name: Entry-point function
+        max_depth: Number of call levels followed from the entry point
+        
+    Returns:
+        str: Mermaid.js syntax for a sequence diagram
+    """
+    definitions = _find_definition_nodes(module.tree)
+    functions = {name: node for name, node in definitions.items() if not isinstance(node, ast.ClassDef)}
+    entry_point = find_entry_point(functions, function_name)
+    
+    if symbol_index is None:
+        symbol_index = SymbolIndex.from_definitions([
+            {
+                'name': name,
+                'kind': 'class' if isinstance(node, ast.ClassDef) else 'method' if name.rpartition('.')[0] in definitions else 'function',
+                'lineno': node.lineno,
+                'end_lineno': node.end_lineno
+            }
+            for name, node in definitions.items()
+        ])
+    
+    def get_calls(qualname: str) -> FunctionCalls:
+        owner = qualname.rpartition('.')[0]
+        if owner not in definitions:
+            owner = ''
+        # Calls are made by the owning class, or by the function itself
+        participant = (owner or qualname).rpartition('.')[2]
+        
+        method_extractor = MethodCallExtractor()
+        creation_extractor = ObjectCreationExtractor()
+        local_extractor = _LocalCallExtractor()
+        walk_tree(functions[qualname], [method_extractor, creation_extractor, local_extractor])
+        
+        method_calls = []
+        enhanced_calls = extract_callee_from_method_calls(method_extractor.calls, symbol_index)
+        for call, enhanced_call in zip(method_extractor.calls, enhanced_calls):
+            receiver = call['caller']
+            if receiver in ('self', 'cls') and owner:
+                enhanced_call['callee'] = owner.rpartition('.')[2]
+            elif symbol_index.resolve_callee(call['method'], receiver) is None and receiver not in ('chainedCall', 'unknown'):
+                # The caller is replaced by the participant, so name the callee after the receiver
+                enhanced_call['callee'] = receiver.rpartition('.')[2].capitalize()
+            target = find_method(functions, enhanced_call['callee'], call['method'])
+            enhanced_call['caller'] = participant
+            method_calls.append((enhanced_call, target))
+        
+        creations = []
+        for creation in creation_extractor.creations:
+            class_name = creation['class']
+            creations.append(({
+                'caller': participant,
+                'method': class_name,
+                'args': creation['args'],
+                'callee': class_name,
+                'is_creation': True,
+                'lineno': creation['lineno'],
+                'col_offset': creation['col_offset']
+            }, find_method(functions, class_name, '__init__')))
+        
+        local_calls = [
+            (dict(call, caller=participant, callee=call['method']), call['method'])
+            for call in local_extractor.calls if call['method'] in functions
+        ]
+        groups = (creations, local_calls, method_calls)
+        
+        # Calls starting at the same position are nested, and the inner ones run first: a
+        # creation or plain call before the method called on its result ("Repo().save()"),
+        # and method calls in reverse walk order ("query().filter()")
+        function_calls = [
+            (item, (rank, -position)) for rank, calls in enumerate(groups) for position, item in enumerate(calls)
+        ]
+        function_calls.sort(key=lambda entry: (entry[0][0]['lineno'], entry[0][0]['col_offset'], entry[1]))
+        return [item for item, _ in function_calls]
+    
+    return generate_sequence_diagram(collect_reachable_calls(entry_point, get_calls, max_depth))
+
+
+class _LocalCallExtractor(MethodCallExtractor):
+    """Extract calls of plain names ("helper()"), which may reach functions of the same module."""
+    
+    def enter_Call(self, node):
+        """
+        Visit Call nodes whose function is a plain lowercase name.
+        
+        Args:
+            node: The AST Call node to visit
+        """
+        if isinstance(node.func, ast.Name) and not node.func.id[0].isupper():
+            self.calls.append({
+                'method': node.func.id,
+                'args': self._extract_args(node.args),
+                'lineno': node.lineno,
+                'col_offset': node.col_offset
+            })
+
+
+def _find_definition_nodes(tree: ast.AST) -> Dict[str, ast.AST]:
+    """
+    Find the classes, module-level functions and methods of a module by qualified name.
+    
+    Only class bodies are descended into: functions nested in functions are
+    part of the function they are defined in.
+    """
+    definitions = {}
+    pending = [('', tree.body)]
+    while pending:
+        prefix, body = pending.pop()
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                qualname = prefix + node.name
+                definitions[qualname] = node
+                if isinstance(node, ast.ClassDef):
+                    pending.append((qualname + '.', node.body))
+    return definitions
@@ -31,8 +31,9 @@ class SequenceDiagramGenerator:
         self.diagram_syntax = "sequenceDiagram\n"
         self.participants = set()
         
-        # Sort method calls by line number for proper sequence
-        sorted_calls = sorted(method_calls, key=lambda call: call.get('lineno', 0))
+        # Sort method calls by line number for proper sequence, unless they
+        # are already numbered in call order (see collect_reachable_calls)
+        sorted_calls = sorted(method_calls, key=lambda call: (call.get('sequence', 0), call.get('lineno', 0)))
         
         # Extract all participants from method calls
         for call in sorted_calls:
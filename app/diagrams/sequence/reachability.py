@@ -0,0 +1,122 @@
+"""
+Module for function-scoped sequence diagram extraction.
+
+A sequence diagram of a whole module shows every call in the file. Scoped to
+an entry-point function, it only shows the calls that function makes and,
+recursively, the calls made by the functions of the same file it reaches, up
+to a maximum call depth. Functions are only analyzed once they are reached,
+so a large module with a small entry point produces a small diagram quickly.
+
+The language-specific analyzers provide the calls of one function at a time
+(see collect_reachable_calls); this module drives the traversal.
+"""
+from typing import Dict, List, Any, Callable, Iterable, Optional, Tuple
+
+
+# Default number of call levels followed from the entry point
+DEFAULT_MAX_CALL_DEPTH = 3
+
+# The calls made by a function, in source order, with the qualified name of
+# the function of the same file each call reaches (None if it reaches none)
+FunctionCalls = List[Tuple[Dict[str, Any], Optional[str]]]
+
+
+def find_entry_point(qualnames: Iterable[str], function_name: str) -> str:
+    """
+    Find the function a diagram starts from.
+
+    Args:
+        qualnames: Qualified names of the functions defined in the file
+        function_name: Qualified name ("Class.method") or unambiguous short
+            name of the function
+
+    Returns:
+        str: Qualified name of the function
+
+    Raises:
+        ValueError: If no function, or more than one, has that name
+    """
+    qualnames = list(qualnames)
+    if function_name in qualnames:
+        return function_name
+
+    suffix = '.' + function_name
+    matches = [qualname for qualname in qualnames if qualname.endswith(suffix)]
+    if not matches:
+        raise ValueError(f"Function not found: {function_name}")
+    if len(matches) > 1:
+        raise ValueError(f"Ambiguous function name {function_name}: {', '.join(sorted(matches))}")
+
+    return matches[0]
+
+
+def find_method(qualnames: Iterable[str], class_name: Optional[str], method: str) -> Optional[str]:
+    """
+    Find a method of a class defined in the file.
+
+    Args:
+        qualnames: Qualified names of the functions defined in the file
+        class_name: Short name of the class (None if unknown)
+        method: Name of the method
+
+    Returns:
+        Optional[str]: Qualified name of the method, or None if the file
+        defines no such method
+    """
+    if not class_name:
+        return None
+    suffix = f".{class_name}.{method}"
+    for qualname in qualnames:
+        if qualname == f"{class_name}.{method}" or qualname.endswith(suffix):
+            return qualname
+    return None
+
+
+def collect_reachable_calls(entry_point: str, get_calls: Callable[[str], FunctionCalls],
+                            max_depth: int = DEFAULT_MAX_CALL_DEPTH) -> List[Dict[str, Any]]:
+    """
+    Collect the calls reachable from an entry-point function, in call order.
+
+    The calls of a reached function are placed right after the call that
+    reaches it, so the result reads as the sequence the calls happen in. Each
+    function is expanded at most once, which also stops recursion. Every call
+    is given a 'sequence' number with its position, which the diagram
+    generator orders by.
+
+    Args:
+        entry_point: Qualified name of the function to start from
+        get_calls: Function returning the calls made by a function, given its
+            qualified name; only called for reached functions
+        max_depth: Number of call levels to follow (1 = only the calls the
+            entry point makes itself)
+
+    Returns:
+        List of call dictionaries
+
+    Raises:
+        ValueError: If max_depth is less than 1
+    """
+    if max_depth < 1:
+        raise ValueError(f"Invalid call depth: {max_depth}")
+
+    calls = []
+    expanded = {entry_point}
+
+    # Iterators over the calls of the functions being expanded, with the depth of those calls
+    stack = [(iter(get_calls(entry_point)), 1)]
+    while stack:
+        function_calls, depth = stack[-1]
+        item = next(function_calls, None)
+        if item is None:
+            stack.pop()
+            continue
+
+        call, target = item
+        call = dict(call, sequence=len(calls))
+        calls.append(call)
+
+        if target is not None and depth < max_depth and target not in expanded:
+            expanded.add(target)
+            stack.append((iter(get_calls(target)), depth + 1))
+
+    return calls
@@ -1,18 +1,33 @@
 """
 Integration module for TypeScript/JavaScript code analysis and sequence diagram generation.
 """
+import os
 from typing import Dict, List, Any, Optional
 
-from app.analysis.typescript_extractor import extract_method_calls
+from app.analysis.analysis_cache import AnalysisCache, analyze_source
+from app.analysis.symbol_index import SymbolIndex
+from app.analysis.typescript_extractor import extract_method_calls, extract_definitions
 from app.diagrams.sequence.generator import generate_sequence_diagram, create_sequence_diagram_from_code
+from app.diagrams.sequence.reachability import (
+    DEFAULT_MAX_CALL_DEPTH,
+    FunctionCalls,
+    collect_reachable_calls,
+    find_entry_point,
+    find_method
+)
 
 
-def extract_callee_from_ts_method_calls(method_calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def extract_callee_from_ts_method_calls(method_calls: List[Dict[str, Any]],
+                                        symbol_index: Optional[SymbolIndex] = None) -> List[Dict[str, Any]]:
     """
     Enhance TypeScript method calls by inferring the callee from method names if not present.
     
+    When a symbol index is given, the callee is the class defining the called
+    method; the callee is only inferred from names for calls it can't resolve.
+    
     Args:
         method_calls: List of method call dictionaries
+        symbol_index: Optional index of the classes and methods that can be called
         
     Returns:
         List[Dict[str, Any]]: Enhanced method calls with callee information
@@ -36,10 +51,16 @@ def extract_callee_from_ts_method_calls(method_calls: List[Dict[str, Any]]) -> L
             enhanced_calls.append(enhanced_call)
             continue
         
-        # Try to infer callee from caller (this.httpClient -> HttpClient)
+        # Look up the class defining the method
         caller = enhanced_call.get('caller', '')
+        callee = None
+        if symbol_index is not None:
+            callee = symbol_index.resolve_callee(enhanced_call.get('method', ''), caller)
         
-        if '.' in caller:
+        if callee is not None:
+            enhanced_call['callee'] = callee
+        # Try to infer callee from caller (this.httpClient -> HttpClient)
+        elif '.' in caller:
             parts = caller.split('.')
             if parts[0] == 'this':
                 # For 'this.property', use the property name capitalized as the callee
@@ -96,38 +117,129 @@ def _infer_target_from_method(method_name: str) -> str:
     return "Service"
 
 
-def analyze_typescript_file(file_path: str) -> str:
+def analyze_typescript_file(file_path: str, cache: Optional[AnalysisCache] = None,
+                            symbol_index: Optional[SymbolIndex] = None,
+                            function_name: Optional[str] = None,
+                            max_depth: int = DEFAULT_MAX_CALL_DEPTH) -> str:
     """
     Analyze a TypeScript/JavaScript file and generate a sequence diagram.
     
     Args:
         file_path: Path to the TypeScript/JavaScript file
+        cache: Optional analysis cache, so unchanged files are not parsed again
+        symbol_index: Optional index of the repository the file is part of
+            (callees are resolved against the file's own definitions if None)
+        function_name: Optional entry-point function; only the calls reachable
+            from it are diagrammed (see analyze_typescript_code)
+        max_depth: Number of call levels followed from the entry point
         
     Returns:
         str: Mermaid.js syntax for a sequence diagram
     """
-    # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
-        code = f.read()
+    if cache is None or function_name is not None:
+        # Scoped diagrams split the calls up by function, which the cached analysis doesn't do
+        with open(file_path, 'r', encoding='utf-8') as f:
+            code = f.read()
+        
+        return analyze_typescript_code(code, symbol_index, function_name, max_depth)
     
-    return analyze_typescript_code(code)
+    with open(file_path, 'rb') as f:
+        content = f.read()
+    
+    extension = os.path.splitext(file_path)[1] or '.ts'
+    analysis = analyze_source(content, extension, cache)
+    
+    if symbol_index is None:
+        symbol_index = SymbolIndex.from_definitions(analysis['definitions'])
+    
+    enhanced_calls = extract_callee_from_ts_method_calls(analysis['method_calls'], symbol_index)
+    return generate_sequence_diagram(enhanced_calls)
 
 
-def analyze_typescript_code(code: str) -> str:
+def analyze_typescript_code(code: str, symbol_index: Optional[SymbolIndex] = None,
+                            function_name: Optional[str] = None,
+                            max_depth: int = DEFAULT_MAX_CALL_DEPTH) -> str:
     """
     Analyze TypeScript/JavaScript code and generate a sequence diagram.
     
+    With an entry-point function, only the calls it makes are diagrammed,
+    followed into the functions and methods of the same code they reach (up
+    to max_depth levels).
+    
     Args:
         code: TypeScript/JavaScript source code
+        symbol_index: Optional index of the repository the code is part of
+            (callees are resolved against the code's own definitions if None)
+        function_name: Optional entry-point function, as a qualified name
+            ("Class.method") or unambiguous short name
+        max_depth: Number of call levels followed from the entry point
+            (1 = only the calls the entry point makes itself)
         
     Returns:
         str: Mermaid.js syntax for a sequence diagram
+        
+    Raises:
+        ValueError: If the entry-point function is not defined in the code
     """
+    definitions = extract_definitions(code)
+    
+    if symbol_index is None:
+        symbol_index = SymbolIndex.from_definitions(definitions)
+    
+    if function_name is not None:
+        return _analyze_reachable_calls(code, definitions, symbol_index, function_name, max_depth)
+    
     # Extract method calls
     method_calls = extract_method_calls(code)
     
-    # Enhance method calls with inferred callee information
-    enhanced_calls = extract_callee_from_ts_method_calls(method_calls)
+    # Enhance method calls with resolved or inferred callee information
+    enhanced_calls = extract_callee_from_ts_method_calls(method_calls, symbol_index)
     
     # Generate the sequence diagram
-    return generate_sequence_diagram(enhanced_calls) 
\ No newline at end of file
+    return generate_sequence_diagram(enhanced_calls)
+
+
+def _analyze_reachable_calls(code: str, definitions: List[Dict[str, Any]], symbol_index: SymbolIndex,
+                             function_name: str, max_depth: int) -> str:
+    """
+    Generate a sequence diagram of the calls reachable from an entry-point function.
+    
+    Args:
+        code: TypeScript/JavaScript source code
+        definitions: Definitions found in the code by extract_definitions
+        symbol_index: Index callees are resolved against
+        function_name: Entry-point function
+        max_depth: Number of call levels followed from the entry point
+        
+    Returns:
+        str: Mermaid.js syntax for a sequence diagram
+    """
+    functions = {definition['name']: definition for definition in definitions if definition['kind'] != 'class'}
+    entry_point = find_entry_point(functions, function_name)
+    
+    # The calls are extracted from the whole code once, then split up by function
+    all_method_calls = extract_method_calls(code)
+    
+    def get_calls(qualname: str) -> FunctionCalls:
+        definition = functions[qualname]
+        owner = definition['class']
+        # Calls are made by the owning class, or by the function itself
+        participant = owner or qualname.rpartition('.')[2]
+        
+        method_calls = [call for call in all_method_calls
+                        if definition['lineno'] <= call['lineno'] <= definition['end_lineno']]
+        
+        function_calls = []
+        for call, enhanced_call in zip(method_calls, extract_callee_from_ts_method_calls(method_calls, symbol_index)):
+            if call.get('is_constructor', False):
+                target = find_method(functions, call.get('class'), 'constructor')
+            else:
+                if call.get('caller') == 'this' and owner:
+                    enhanced_call['callee'] = owner
+                target = find_method(functions, enhanced_call.get('callee'), call.get('method', ''))
+            enhanced_call['caller'] = participant
+            function_calls.append((enhanced_call, target))
+        
+        return function_calls
+    
+    return generate_sequence_diagram(collect_reachable_calls(entry_point, get_calls, max_depth))
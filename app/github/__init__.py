@@ -7,7 +7,16 @@ token management, and repository analysis.
 """
 
 from app.github.url_validator import validate_github_url, extract_repo_info
-from app.github.repository_cloner import clone_repository, ProgressTracker
+from app.github.repository_cloner import (
+    clone_repository,
+    clone_repository_with_strategy,
+    sync_repository,
+    CloneResult,
+    SyncResult,
+    ChangedFile,
+    CLONE_STRATEGIES,
+    ProgressTracker
+)
 from app.github.authentication import create_oauth_url, exchange_code_for_token, validate_token, OAuthConfig
 from app.github.token_storage import save_token, load_token, delete_token
 from app.github.repository_analyzer import (
@@ -22,6 +31,12 @@ __all__ = [
     'validate_github_url',
     'extract_repo_info',
     'clone_repository',
+    'clone_repository_with_strategy',
+    'sync_repository',
+    'CloneResult',
+    'SyncResult',
+    'ChangedFile',
+    'CLONE_STRATEGIES',
     'ProgressTracker',
     'create_oauth_url',
     'exchange_code_for_token',
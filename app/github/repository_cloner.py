@@ -6,24 +6,118 @@ and tracking the cloning progress.
 """
 
 import os
+import re
+import time
 import shutil
-from typing import Optional, Tuple, Callable
+from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple, Callable
 
 import git
+from git import RemoteProgress
 
 from app.github.url_validator import extract_repo_info
 
 
+# Clone strategies
+CLONE_STRATEGY_FULL = "full"  # Full history of all branches
+CLONE_STRATEGY_SHALLOW = "shallow"  # Only the latest commit (depth 1)
+CLONE_STRATEGY_BLOBLESS = "blobless"  # Partial clone, sparse checkout of analyzable files
+CLONE_STRATEGY_SINGLE_BRANCH = "single_branch"  # Full history of one branch
+
+CLONE_STRATEGIES = (
+    CLONE_STRATEGY_FULL,
+    CLONE_STRATEGY_SHALLOW,
+    CLONE_STRATEGY_BLOBLESS,
+    CLONE_STRATEGY_SINGLE_BRANCH,
+)
+
+# Files checked out by a blobless clone; the contents of all other files are
+# never downloaded
+SPARSE_CHECKOUT_PATTERNS = ['*.py', '*.js', '*.jsx', '*.ts', '*.tsx']
+
+# Names of the git progress phases reported by ProgressTracker
+_PROGRESS_PHASES = {
+    RemoteProgress.COUNTING: "counting",
+    RemoteProgress.COMPRESSING: "compressing",
+    RemoteProgress.WRITING: "writing",
+    RemoteProgress.RECEIVING: "receiving",
+    RemoteProgress.RESOLVING: "resolving",
+    RemoteProgress.FINDING_SOURCES: "finding_sources",
+    RemoteProgress.CHECKING_OUT: "checking_out",
+}
+
+# Transfer size and rate git appends to "Receiving objects" progress,
+# e.g. "1.20 MiB | 2.40 MiB/s"
+_TRANSFER_PATTERN = re.compile(
+    r'([\d.]+) (bytes?|KiB|MiB|GiB|TiB)(?: \| ([\d.]+) (bytes?|KiB|MiB|GiB|TiB)/s)?'
+)
+
+_UNIT_BYTES = {
+    "byte": 1,
+    "bytes": 1,
+    "KiB": 1024,
+    "MiB": 1024 ** 2,
+    "GiB": 1024 ** 3,
+    "TiB": 1024 ** 4,
+}
+
+
+@dataclass
+class ChangedFile:
+    """A file changed between two commits."""
+    status: str  # 'A' (added), 'M' (modified), 'D' (deleted) or 'T' (type changed)
+    path: str  # Path relative to the repository root
+
+
+@dataclass
+class SyncResult:
+    """Result of syncing an existing clone."""
+    path: str  # Path to the repository
+    old_commit: Optional[str]
+    new_commit: str
+    changed_files: List[ChangedFile]
+    bytes_transferred: int  # Size of the git objects downloaded by the fetch
+    elapsed_seconds: float
+
+
+@dataclass
+class CloneResult:
+    """Result of cloning a repository."""
+    path: str  # Path to the cloned repository
+    strategy: str
+    bytes_transferred: int  # Size of the downloaded git objects
+    elapsed_seconds: float
+
+
 class ProgressTracker:
     """
     Tracks progress of repository cloning.
+    
+    Besides the overall percentage, the tracker keeps the details git reports
+    while transferring objects (phase, object counts, bytes received and
+    throughput), and passes them to an optional callback on every update so
+    they can be streamed to clients.
     """
-    def __init__(self):
-        """Initialize the progress tracker."""
+    def __init__(self, callback: Optional[Callable[[Dict[str, Any]], None]] = None):
+        """
+        Initialize the progress tracker.
+        
+        Args:
+            callback: Function called with the progress event (see to_event)
+                after every update (optional)
+        """
         self.current_operation = ""
         self.current_progress = 0
         self.total_progress = 100
         self.is_complete = False
+        self.phase = ""
+        self.objects_received = 0
+        self.total_objects = 0
+        self.bytes_received = 0
+        self.throughput = 0.0  # Bytes per second
+        self.callback = callback
+        self._start_time = time.monotonic()
+        self._percentage = 0
     
     def update(self, op_code: int, cur_count: int, max_count: Optional[int] = None,
                message: str = '') -> Tuple[str, int]:
@@ -55,15 +149,63 @@ class ProgressTracker:
         # Mark as complete when reaching 100%
         if percentage >= 100:
             self.is_complete = True
+        
+        self._percentage = percentage
+        self._update_transfer(op_code, cur_count, max_count, message)
+        
+        if self.callback is not None:
+            self.callback(self.to_event())
             
         return self.current_operation, percentage
+    
+    def _update_transfer(self, op_code: int, cur_count: int, max_count: Optional[int], message: str) -> None:
+        """
+        Update the phase and transfer details from a git progress update.
+        
+        Args:
+            op_code: Git operation code
+            cur_count: Current progress count
+            max_count: Maximum progress count
+            message: Progress message
+        """
+        self.phase = _PROGRESS_PHASES.get(op_code & RemoteProgress.OP_MASK, self.phase)
+        
+        if self.phase == "receiving":
+            self.objects_received = int(cur_count or 0)
+            self.total_objects = int(max_count or self.total_objects)
+        
+        match = _TRANSFER_PATTERN.search(message or '')
+        if match:
+            self.bytes_received = int(float(match.group(1)) * _UNIT_BYTES[match.group(2)])
+            if match.group(3):
+                self.throughput = float(match.group(3)) * _UNIT_BYTES[match.group(4)]
+    
+    def to_event(self) -> Dict[str, Any]:
+        """
+        Get the current progress as an event.
+        
+        Returns:
+            Dictionary with the phase, operation, percentage, object counts,
+            bytes received, throughput (bytes per second) and elapsed seconds
+        """
+        return {
+            "phase": self.phase,
+            "operation": self.current_operation,
+            "percentage": self._percentage,
+            "objects_received": self.objects_received,
+            "total_objects": self.total_objects,
+            "bytes_received": self.bytes_received,
+            "throughput": self.throughput,
+            "elapsed_seconds": round(time.monotonic() - self._start_time, 3)
+        }
 
 
 def clone_repository(
     url: str,
     clone_dir: str,
     branch: Optional[str] = None,
-    progress_tracker: Optional[ProgressTracker] = None
+    progress_tracker: Optional[ProgressTracker] = None,
+    strategy: str = CLONE_STRATEGY_FULL
 ) -> str:
     """
     Clone a GitHub repository to a local directory.
@@ -73,6 +215,7 @@ def clone_repository(
         clone_dir: The directory to clone into
         branch: The branch to clone (optional)
         progress_tracker: Object to track progress (optional)
+        strategy: One of CLONE_STRATEGIES (defaults to a full clone)
         
     Returns:
         Path to the cloned repository
@@ -80,6 +223,86 @@ def clone_repository(
     Raises:
         Exception: If the cloning fails
     """
+    return clone_repository_with_strategy(url, clone_dir, branch, progress_tracker, strategy).path
+
+
+def _get_directory_size(path: str) -> int:
+    """
+    Get the total size of the files in a directory tree.
+    
+    Args:
+        path: Path to the directory
+        
+    Returns:
+        Total size in bytes
+    """
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+
+def get_clone_path(url: str, clone_dir: str) -> str:
+    """
+    Get the directory a repository is cloned into.
+    
+    Args:
+        url: The GitHub repository URL
+        clone_dir: The directory clones are created in
+        
+    Returns:
+        Path of the clone
+    """
+    owner, repo, _ = extract_repo_info(url)
+    
+    # Create target directory name
+    repo_dir_name = f"{owner}_{repo}"
+    return os.path.join(clone_dir, repo_dir_name)
+
+
+def clone_repository_with_strategy(
+    url: str,
+    clone_dir: str,
+    branch: Optional[str] = None,
+    progress_tracker: Optional[ProgressTracker] = None,
+    strategy: str = CLONE_STRATEGY_FULL,
+    sparse_patterns: Optional[List[str]] = None
+) -> CloneResult:
+    """
+    Clone a GitHub repository using a clone strategy.
+    
+    Only analyzing HEAD doesn't need the whole history, so large repositories
+    can be cloned with a cheaper strategy:
+    
+    - ``shallow``: only the latest commit (``--depth 1``)
+    - ``blobless``: a partial clone (``--filter=blob:none``) that only
+      downloads the contents of files matching the sparse checkout patterns
+    - ``single_branch``: the full history, but only of one branch
+    
+    Args:
+        url: The GitHub repository URL
+        clone_dir: The directory to clone into
+        branch: The branch to clone (optional)
+        progress_tracker: Object to track progress (optional)
+        strategy: One of CLONE_STRATEGIES (defaults to a full clone)
+        sparse_patterns: Sparse checkout patterns for blobless clones
+            (defaults to SPARSE_CHECKOUT_PATTERNS)
+        
+    Returns:
+        CloneResult: The clone path, together with the size of the downloaded
+        objects and the time the clone took
+        
+    Raises:
+        ValueError: If the strategy is unknown
+        Exception: If the cloning fails
+    """
+    if strategy not in CLONE_STRATEGIES:
+        raise ValueError(f"Unknown clone strategy: {strategy}")
+    
     # Extract repository info from URL
     owner, repo, url_branch = extract_repo_info(url)
     
@@ -87,9 +310,7 @@ def clone_repository(
     if not branch and url_branch:
         branch = url_branch
     
-    # Create target directory name
-    repo_dir_name = f"{owner}_{repo}"
-    repo_path = os.path.join(clone_dir, repo_dir_name)
+    repo_path = get_clone_path(url, clone_dir)
     
     # Prepare clone options
     clone_opts = {}
@@ -99,10 +320,25 @@ def clone_repository(
     if progress_tracker:
         clone_opts['progress'] = progress_tracker.update
     
+    if strategy == CLONE_STRATEGY_SHALLOW:
+        clone_opts['depth'] = 1
+    elif strategy == CLONE_STRATEGY_SINGLE_BRANCH:
+        clone_opts['single_branch'] = True
+    elif strategy == CLONE_STRATEGY_BLOBLESS:
+        # Check out after setting up the sparse checkout, so only the
+        # blobs of matching files are fetched
+        clone_opts['filter'] = 'blob:none'
+        clone_opts['no_checkout'] = True
+    
+    start_time = time.monotonic()
+    
     try:
         # Clone the repository
-        git.Repo.clone_from(url, repo_path, **clone_opts)
-        return repo_path
+        cloned_repo = git.Repo.clone_from(url, repo_path, **clone_opts)
+        
+        if strategy == CLONE_STRATEGY_BLOBLESS:
+            cloned_repo.git.sparse_checkout('set', '--no-cone', *(sparse_patterns or SPARSE_CHECKOUT_PATTERNS))
+            cloned_repo.git.checkout(branch or cloned_repo.active_branch.name)
     except Exception as e:
         # Cleanup if directory was created
         if os.path.exists(repo_path):
@@ -112,4 +348,189 @@ def clone_repository(
                 pass  # Ignore cleanup errors
         
         # Re-raise the exception with more context
-        raise Exception(f"Failed to clone repository: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"Failed to clone repository: {str(e)}")
+    
+    return CloneResult(
+        path=repo_path,
+        strategy=strategy,
+        # Received packs are stored as-is, so the object store is what was downloaded
+        bytes_transferred=_get_directory_size(os.path.join(repo_path, '.git', 'objects')),
+        elapsed_seconds=time.monotonic() - start_time
+    )
+
+
+def get_head_commit(repo_path: str) -> Optional[str]:
+    """
+    Get the commit SHA checked out in a local repository.
+    
+    Args:
+        repo_path: Path to the local repository
+        
+    Returns:
+        The commit SHA, or None if it can't be determined
+    """
+    try:
+        return git.Repo(repo_path).head.commit.hexsha
+    except Exception:
+        return None
+
+
+def get_checkout_branch(repo_path: str) -> Optional[str]:
+    """
+    Get the branch checked out in a local repository.
+    
+    Args:
+        repo_path: Path to the local repository
+        
+    Returns:
+        The branch name, or None if HEAD is detached or can't be read
+    """
+    try:
+        repo = git.Repo(repo_path)
+        return None if repo.head.is_detached else repo.active_branch.name
+    except Exception:
+        return None
+
+
+def is_git_repository(path: str) -> bool:
+    """
+    Check whether a directory is the root of a git checkout.
+    
+    Args:
+        path: Path to the directory
+        
+    Returns:
+        True if the directory contains a git repository
+    """
+    return os.path.isdir(os.path.join(path, '.git'))
+
+
+def _has_commit(repo: git.Repo, commit: str) -> bool:
+    """
+    Check whether a commit is present in a local repository.
+    
+    Args:
+        repo: The local repository
+        commit: Commit SHA (or any revision)
+        
+    Returns:
+        True if the commit can be resolved locally
+    """
+    try:
+        repo.git.cat_file('-e', f"{commit}^{{commit}}")
+        return True
+    except git.GitCommandError:
+        return False
+
+
+def get_changed_files(repo_path: str, old_commit: str, new_commit: str) -> List[ChangedFile]:
+    """
+    Get the files that differ between two commits (``git diff --name-status``).
+    
+    Renames are reported as a deletion and an addition, so blobless clones
+    don't have to download file contents for rename detection.
+    
+    Args:
+        repo_path: Path to the local repository
+        old_commit: The commit to compare from
+        new_commit: The commit to compare to
+        
+    Returns:
+        List of changed files, in path order
+    """
+    if old_commit == new_commit:
+        return []
+    
+    repo = git.Repo(repo_path)
+    output = repo.git.diff('--name-status', '--no-renames', '-z', old_commit, new_commit)
+    
+    # With -z the output is status and path, each terminated by a NUL
+    fields = output.split('\0')
+    return [
+        ChangedFile(status=status, path=path)
+        for status, path in zip(fields[0::2], fields[1::2])
+        if status
+    ]
+
+
+def sync_repository(
+    repo_path: str,
+    branch: Optional[str] = None,
+    commit: Optional[str] = None,
+    progress_tracker: Optional[ProgressTracker] = None
+) -> SyncResult:
+    """
+    Update an existing clone instead of cloning it again.
+    
+    Fetches from origin and moves the checkout to the requested commit, or to
+    the tip of the requested (or current) branch. Branch updates must be fast
+    forwards, except in shallow clones, which have no history to check this
+    against and are simply moved to the fetched commit.
+    
+    Args:
+        repo_path: Path to the local repository
+        branch: Branch to check out (defaults to the current branch)
+        commit: Commit to check out (detaches HEAD)
+        progress_tracker: Object to track progress (optional)
+        
+    Returns:
+        SyncResult: The old and new commit and the files changed between them
+        
+    Raises:
+        Exception: If the fetch fails or the branch can't be fast-forwarded
+    """
+    start_time = time.monotonic()
+    objects_path = os.path.join(repo_path, '.git', 'objects')
+    size_before = _get_directory_size(objects_path)
+    
+    try:
+        repo = git.Repo(repo_path)
+        old_commit = repo.head.commit.hexsha if repo.head.is_valid() else None
+        shallow = os.path.exists(os.path.join(repo.git_dir, 'shallow'))
+        
+        if not branch and not commit:
+            branch = repo.active_branch.name
+        
+        fetch_opts = {}
+        if progress_tracker:
+            fetch_opts['progress'] = progress_tracker.update
+        if shallow:
+            fetch_opts['depth'] = 1
+        
+        origin = repo.remotes.origin
+        if commit:
+            # Fetch the commit by SHA only if the branches don't bring it in
+            if not _has_commit(repo, commit):
+                origin.fetch(**fetch_opts)
+            if not _has_commit(repo, commit):
+                origin.fetch(commit, **fetch_opts)
+            repo.git.checkout('--detach', commit)
+        else:
+            # Fetch into the remote-tracking branch, even for single-branch clones
+            origin.fetch(f"+refs/heads/{branch}:refs/remotes/origin/{branch}", **fetch_opts)
+            target = f"origin/{branch}"
+            
+            if shallow:
+                repo.git.checkout('-B', branch, target)
+            else:
+                if repo.head.is_detached or repo.active_branch.name != branch:
+                    if branch in repo.heads:
+                        repo.git.checkout(branch)
+                    else:
+                        repo.git.checkout('-b', branch, target)
+                repo.git.merge('--ff-only', target)
+        
+        new_commit = repo.head.commit.hexsha
+        changed_files = get_changed_files(repo_path, old_commit, new_commit) if old_commit else []
+    except Exception as e:
+        # Re-raise the exception with more context
+        raise Exception(f"Failed to sync repository: {str(e)}")
+    
+    return SyncResult(
+        path=repo_path,
+        old_commit=old_commit,
+        new_commit=new_commit,
+        changed_files=changed_files,
+        bytes_transferred=max(0, _get_directory_size(objects_path) - size_before),
+        elapsed_seconds=time.monotonic() - start_time
+    )
@@ -0,0 +1,3 @@
+"""
+Package for running background jobs (cloning and analysis).
+"""
@@ -0,0 +1,146 @@
+"""
+Module for broadcasting job events to live subscribers.
+
+Jobs run on worker threads and publish events (status changes and detailed
+progress) to a JobEventBroker. Streaming endpoints subscribe from the event
+loop and receive the events of one job as they happen, without polling the
+job store. Only status changes and coarse progress are persisted; detailed
+progress events are only delivered to current subscribers.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from typing import Dict, Any, Optional, Set, Tuple
+
+
+# Events buffered per subscriber; older progress events are dropped first,
+# since every progress event supersedes the previous ones
+DEFAULT_MAX_BUFFERED_EVENTS = 100
+
+# Event names
+EVENT_STATUS = "status"
+EVENT_PROGRESS = "progress"
+
+JobEvent = Tuple[str, Dict[str, Any]]
+
+
+class JobSubscription:
+    """
+    Stream of the events of one job, consumed from an asyncio event loop.
+
+    Attributes:
+        job_id: ID of the job
+    """
+
+    def __init__(self, job_id: str, loop: asyncio.AbstractEventLoop, max_buffered: int):
+        """
+        Initialize a subscription.
+
+        Args:
+            job_id: ID of the job
+            loop: Event loop the events are consumed from
+            max_buffered: Maximum number of undelivered events
+        """
+        self.job_id = job_id
+        self._loop = loop
+        self._events: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+
+    def _deliver(self, event: JobEvent) -> None:
+        """Buffer an event, dropping the oldest one if the buffer is full (event loop only)."""
+        if self._events.full():
+            self._events.get_nowait()
+        self._events.put_nowait(event)
+
+    def put(self, event: JobEvent) -> None:
+        """
+        Hand an event to the subscription from any thread.
+
+        Args:
+            event: Tuple of (event name, event data)
+        """
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, event)
+        except RuntimeError:
+            # The event loop has been closed; nobody is listening anymore
+            pass
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[JobEvent]:
+        """
+        Wait for the next event.
+
+        Args:
+            timeout: Maximum number of seconds to wait (optional)
+
+        Returns:
+            Tuple of (event name, event data), or None on timeout
+        """
+        try:
+            return await asyncio.wait_for(self._events.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class JobEventBroker:
+    """
+    In-process publish/subscribe hub for job events.
+
+    Attributes:
+        max_buffered: Maximum number of undelivered events per subscriber
+    """
+
+    def __init__(self, max_buffered: int = DEFAULT_MAX_BUFFERED_EVENTS):
+        """
+        Initialize a broker without subscribers.
+
+        Args:
+            max_buffered: Maximum number of undelivered events per subscriber
+        """
+        self.max_buffered = max_buffered
+        self._subscriptions: Dict[str, Set[JobSubscription]] = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        """
+        Subscribe to the events of a job.
+
+        Must be called from the event loop the events will be consumed in.
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            JobSubscription: The new subscription
+        """
+        subscription = JobSubscription(job_id, asyncio.get_running_loop(), self.max_buffered)
+        with self._lock:
+            self._subscriptions[job_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: JobSubscription) -> None:
+        """
+        Stop delivering events to a subscription.
+
+        Args:
+            subscription: The subscription to remove
+        """
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.job_id)
+            if subscriptions is not None:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.job_id]
+
+    def publish(self, job_id: str, name: str, data: Dict[str, Any]) -> None:
+        """
+        Send an event to the subscribers of a job. Safe to call from any thread.
+
+        Args:
+            job_id: ID of the job
+            name: Event name (EVENT_STATUS or EVENT_PROGRESS)
+            data: Event data
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(job_id, ()))
+
+        for subscription in subscriptions:
+            subscription.put((name, data))
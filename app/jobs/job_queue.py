@@ -0,0 +1,325 @@
+"""
+Module for the bounded background job queue.
+
+Long-running work (cloning and analyzing repositories) is run by a fixed pool
+of worker threads instead of in the request handler. The queue bounds the
+number of waiting jobs, limits how many jobs talk to the same remote host at
+once, persists job state to a JobStore so status can be polled from any API
+worker, and evicts jobs from the store once their TTL has passed. Status
+changes and progress are also published to a JobEventBroker, so clients can
+follow a job live instead of polling.
+"""
+import os
+import uuid
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+
+from app.jobs.job_events import EVENT_PROGRESS, EVENT_STATUS, JobEventBroker
+from app.storage.job_store import (
+    JobStore,
+    JobRecord,
+    JOB_COMPLETED,
+    JOB_ERROR,
+    JOB_IN_PROGRESS,
+    get_job_store
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = int(os.environ.get('REPOMIND_JOB_WORKERS', '4'))
+DEFAULT_MAX_PENDING = int(os.environ.get('REPOMIND_JOB_MAX_PENDING', '100'))
+DEFAULT_PER_HOST_LIMIT = int(os.environ.get('REPOMIND_JOB_HOST_LIMIT', '2'))
+DEFAULT_TTL_SECONDS = float(os.environ.get('REPOMIND_JOB_TTL_SECONDS', '3600'))
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted to a queue that has no room left."""
+
+
+class JobContext:
+    """
+    Handle passed to a running job for reporting its progress.
+
+    Attributes:
+        id: ID of the job
+        queue: The queue running the job
+    """
+
+    def __init__(self, job_id: str, queue: 'JobQueue'):
+        """
+        Initialize a job context.
+
+        Args:
+            job_id: ID of the job
+            queue: The queue running the job
+        """
+        self.id = job_id
+        self.queue = queue
+
+    def update(self, progress: Optional[int] = None, operation: Optional[str] = None, **data) -> None:
+        """
+        Report progress of the job.
+
+        Args:
+            progress: Progress percentage (0-100)
+            operation: Description of the current step
+            **data: Details to merge into the job data
+        """
+        record = self.queue.store.update(self.id, progress=progress, operation=operation, data=data)
+        self.queue.events.publish(self.id, EVENT_STATUS, record.to_status())
+
+    def publish(self, **event) -> None:
+        """
+        Send a progress event to live subscribers without persisting it.
+
+        Meant for frequent, detailed progress (such as transfer rates) that
+        isn't worth a database write.
+
+        Args:
+            **event: Event data
+        """
+        self.queue.events.publish(self.id, EVENT_PROGRESS, event)
+
+
+class _QueuedJob:
+    """A job waiting for, or running on, a worker."""
+
+    __slots__ = ('id', 'host', 'func', 'args', 'kwargs')
+
+    def __init__(self, job_id: str, host: Optional[str], func: Callable, args: tuple, kwargs: Dict[str, Any]):
+        self.id = job_id
+        self.host = host
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+
+
+class JobQueue:
+    """
+    Bounded queue of background jobs run by a pool of worker threads.
+
+    Jobs are functions called with a JobContext followed by their arguments.
+    A job that returns a dict has it merged into its data when it completes;
+    a job that raises is marked as failed with the exception message.
+
+    Attributes:
+        store: Store the job state is persisted to
+        max_workers: Maximum number of jobs running at once
+        max_pending: Maximum number of jobs waiting for a worker
+        per_host_limit: Maximum number of running jobs per remote host
+        ttl_seconds: How long finished jobs are kept in the store
+        events: Broker the job events are published to
+    """
+
+    def __init__(
+        self,
+        store: Optional[JobStore] = None,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        per_host_limit: int = DEFAULT_PER_HOST_LIMIT,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            store: Store to persist job state to (defaults to the process-wide store)
+            max_workers: Maximum number of jobs running at once
+            max_pending: Maximum number of jobs waiting for a worker
+            per_host_limit: Maximum number of running jobs per remote host
+            ttl_seconds: How long finished jobs are kept in the store
+        """
+        self.store = store or get_job_store()
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.per_host_limit = per_host_limit
+        self.ttl_seconds = ttl_seconds
+        self.events = JobEventBroker()
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="repomind-job")
+        self._pending: deque = deque()
+        self._running = 0
+        self._running_per_host: Counter = Counter()
+        # IDs of the jobs pending or running, which must not be evicted
+        self._active_ids: set = set()
+        # Guards the scheduling state; notified whenever a job finishes
+        self._condition = threading.Condition()
+
+    def submit(
+        self,
+        kind: str,
+        func: Callable,
+        *args,
+        job_id: Optional[str] = None,
+        host: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None,
+        **kwargs
+    ) -> str:
+        """
+        Queue a job.
+
+        Args:
+            kind: Kind of job (e.g. 'clone' or 'analysis')
+            func: Function to run, called as func(context, *args, **kwargs)
+            *args: Positional arguments for func
+            job_id: ID for the job (generated if not given)
+            host: Remote host the job talks to, for per-host limits (optional)
+            data: Initial job details shown in its status
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            The job ID
+
+        Raises:
+            QueueFullError: If max_pending jobs are already waiting
+        """
+        job_id = job_id or str(uuid.uuid4())
+
+        with self._condition:
+            active_ids = list(self._active_ids)
+        self.store.evict_expired(self.ttl_seconds, active_ids)
+
+        with self._condition:
+            if len(self._pending) >= self.max_pending:
+                raise QueueFullError(f"Too many queued jobs ({self.max_pending}), try again later")
+
+            self.store.create(job_id, kind, host=host, data=data)
+            self._active_ids.add(job_id)
+            self._pending.append(_QueuedJob(job_id, host, func, args, kwargs))
+            self._dispatch()
+
+        return job_id
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """
+        Get the state of a job.
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            The job, or None if it doesn't exist or was evicted
+        """
+        return self.store.get(job_id)
+
+    def _can_start(self, job: _QueuedJob) -> bool:
+        """Check whether a pending job may start now (called with the lock held)."""
+        return job.host is None or self._running_per_host[job.host] < self.per_host_limit
+
+    def _dispatch(self) -> None:
+        """Start pending jobs while workers are free (called with the lock held)."""
+        if self._running >= self.max_workers or not self._pending:
+            return
+
+        # Jobs for a host at its limit stay queued without blocking jobs behind them
+        waiting = deque()
+        while self._pending and self._running < self.max_workers:
+            job = self._pending.popleft()
+            if not self._can_start(job):
+                waiting.append(job)
+                continue
+
+            self._running += 1
+            if job.host is not None:
+                self._running_per_host[job.host] += 1
+            self._executor.submit(self._run, job)
+
+        waiting.extend(self._pending)
+        self._pending = waiting
+
+    def _set_status(self, job_id: str, **changes) -> None:
+        """
+        Update a job in the store and publish its new status.
+
+        Args:
+            job_id: ID of the job
+            **changes: Arguments for JobStore.update
+        """
+        record = self.store.update(job_id, **changes)
+        self.events.publish(job_id, EVENT_STATUS, record.to_status())
+
+    def _run(self, job: _QueuedJob) -> None:
+        """
+        Run a job on a worker thread and record its outcome.
+
+        Args:
+            job: The job to run
+        """
+        try:
+            self._set_status(job.id, status=JOB_IN_PROGRESS, operation="Started")
+            result = job.func(JobContext(job.id, self), *job.args, **job.kwargs)
+            self._set_status(
+                job.id,
+                status=JOB_COMPLETED,
+                progress=100,
+                data=result if isinstance(result, dict) else None
+            )
+        except Exception as e:
+            logger.warning(f"Job {job.id} failed: {e}")
+            try:
+                self._set_status(job.id, status=JOB_ERROR, error=str(e))
+            except Exception:
+                logger.exception(f"Failed to record the failure of job {job.id}")
+        finally:
+            with self._condition:
+                self._active_ids.discard(job.id)
+                self._running -= 1
+                if job.host is not None:
+                    self._running_per_host[job.host] -= 1
+                    if not self._running_per_host[job.host]:
+                        del self._running_per_host[job.host]
+                self._dispatch()
+                self._condition.notify_all()
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until no jobs are pending or running.
+
+        Args:
+            timeout: Maximum number of seconds to wait (optional)
+
+        Returns:
+            True if the queue became idle, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._pending and not self._running, timeout)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the workers. Jobs that haven't started are dropped.
+
+        Args:
+            wait: Whether to wait for running jobs to finish
+        """
+        with self._condition:
+            self._active_ids.difference_update(job.id for job in self._pending)
+            self._pending.clear()
+        self._executor.shutdown(wait=wait)
+
+
+_default_queue: Optional[JobQueue] = None
+_default_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """
+    Get the process-wide job queue.
+
+    The pool can be configured with the ``REPOMIND_JOB_WORKERS``,
+    ``REPOMIND_JOB_MAX_PENDING``, ``REPOMIND_JOB_HOST_LIMIT`` and
+    ``REPOMIND_JOB_TTL_SECONDS`` environment variables.
+
+    Returns:
+        The shared JobQueue instance
+    """
+    global _default_queue
+
+    with _default_queue_lock:
+        if _default_queue is None:
+            _default_queue = JobQueue()
+
+    return _default_queue
@@ -0,0 +1,3 @@
+"""
+Package for persistent application storage.
+"""
@@ -0,0 +1,54 @@
+"""
+Module for connecting to the application database.
+"""
+import os
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
+
+
+DEFAULT_DATABASE_URL = "sqlite:///./data/repomind.db"
+
+
+def get_database_url() -> str:
+    """
+    Get the URL of the application database.
+
+    The database can be configured with the ``REPOMIND_DATABASE_URL``
+    environment variable.
+
+    Returns:
+        SQLAlchemy database URL
+    """
+    return os.environ.get('REPOMIND_DATABASE_URL', DEFAULT_DATABASE_URL)
+
+
+def create_database_engine(database_url: str) -> Engine:
+    """
+    Create an engine for a database URL.
+
+    SQLite databases are shared between threads, in-memory SQLite databases
+    between all sessions, and the directory of an SQLite file is created if
+    it doesn't exist.
+
+    Args:
+        database_url: SQLAlchemy database URL (``sqlite://`` for in-memory)
+
+    Returns:
+        The SQLAlchemy engine
+    """
+    url = make_url(database_url)
+    engine_options = {}
+    if url.get_backend_name() == "sqlite":
+        # Sessions are used from API handlers and background worker threads
+        engine_options["connect_args"] = {"check_same_thread": False}
+        if url.database in (None, "", ":memory:"):
+            # Share the single in-memory database between all sessions
+            engine_options["poolclass"] = StaticPool
+        else:
+            directory = os.path.dirname(url.database)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+    return create_engine(database_url, **engine_options)
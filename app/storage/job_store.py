@@ -0,0 +1,313 @@
+"""
+Module for persisting background job state.
+
+Job status (progress, current operation, results and errors) is stored in the
+application database rather than in process memory, so any API worker can
+answer status requests for jobs run by another worker, and finished jobs can
+be evicted once they are no longer of interest.
+"""
+import json
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Any, Iterable, Optional
+
+from sqlalchemy import DateTime, Integer, String, Text, and_, delete, func, or_, select
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from app.storage.database import DEFAULT_DATABASE_URL, create_database_engine, get_database_url
+
+
+# Job statuses
+JOB_QUEUED = "queued"
+JOB_IN_PROGRESS = "in_progress"
+JOB_COMPLETED = "completed"
+JOB_ERROR = "error"
+
+FINISHED_STATUSES = (JOB_COMPLETED, JOB_ERROR)
+
+
+def _utcnow() -> datetime:
+    """Get the current time in UTC."""
+    return datetime.now(timezone.utc)
+
+
+class _Base(DeclarativeBase):
+    """Declarative base for the job tables."""
+
+
+class _JobRow(_Base):
+    """Table row for a job."""
+    __tablename__ = "jobs"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    kind: Mapped[str] = mapped_column(String(32))
+    status: Mapped[str] = mapped_column(String(32), default=JOB_QUEUED, index=True)
+    progress: Mapped[int] = mapped_column(Integer, default=0)
+    operation: Mapped[str] = mapped_column(Text, default="")
+    host: Mapped[Optional[str]] = mapped_column(String(255))
+    # JSON object with job specific details and results
+    data: Mapped[str] = mapped_column(Text, default="{}")
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+    finished_at: Mapped[Optional[datetime]] = mapped_column(DateTime(timezone=True))
+
+
+@dataclass
+class JobRecord:
+    """The persisted state of a job."""
+    id: str
+    kind: str  # e.g. 'clone' or 'analysis'
+    status: str  # One of JOB_QUEUED, JOB_IN_PROGRESS, JOB_COMPLETED, JOB_ERROR
+    progress: int  # Percentage (0-100)
+    operation: str  # Description of the current step
+    host: Optional[str]  # Remote host the job talks to, if any
+    data: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    @classmethod
+    def _from_row(cls, row: _JobRow) -> 'JobRecord':
+        return cls(
+            id=row.id,
+            kind=row.kind,
+            status=row.status,
+            progress=row.progress,
+            operation=row.operation,
+            host=row.host,
+            data=json.loads(row.data or "{}"),
+            error=row.error,
+            created_at=row.created_at,
+            updated_at=row.updated_at,
+            finished_at=row.finished_at
+        )
+
+    def to_status(self) -> Dict[str, Any]:
+        """
+        Get the job state as returned by status endpoints.
+
+        Returns:
+            Dictionary with 'status', 'progress' and 'operation', the job
+            data, and 'error' if the job failed
+        """
+        status = {
+            "status": self.status,
+            "progress": self.progress,
+            "operation": self.operation
+        }
+        status.update(self.data)
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+class JobStore:
+    """
+    Database-backed store of job state.
+
+    Attributes:
+        database_url: SQLAlchemy URL of the database
+    """
+
+    def __init__(self, database_url: str = DEFAULT_DATABASE_URL):
+        """
+        Open the store, creating the database and its tables if needed.
+
+        Args:
+            database_url: SQLAlchemy database URL (``sqlite://`` for in-memory)
+        """
+        self.database_url = database_url
+        self._engine = create_database_engine(database_url)
+        _Base.metadata.create_all(self._engine)
+        self._sessions = sessionmaker(self._engine, expire_on_commit=False)
+
+    def create(
+        self,
+        job_id: str,
+        kind: str,
+        host: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> JobRecord:
+        """
+        Create a queued job.
+
+        Args:
+            job_id: Unique ID of the job
+            kind: Kind of job
+            host: Remote host the job talks to, if any
+            data: Initial job details
+
+        Returns:
+            JobRecord: The created job
+
+        Raises:
+            ValueError: If a job with the same ID exists
+        """
+        with self._sessions.begin() as session:
+            if session.get(_JobRow, job_id) is not None:
+                raise ValueError(f"Job {job_id} already exists")
+
+            row = _JobRow(
+                id=job_id,
+                kind=kind,
+                status=JOB_QUEUED,
+                progress=0,
+                operation="Queued",
+                host=host,
+                data=json.dumps(data or {})
+            )
+            session.add(row)
+            session.flush()
+
+            return JobRecord._from_row(row)
+
+    def update(
+        self,
+        job_id: str,
+        status: Optional[str] = None,
+        progress: Optional[int] = None,
+        operation: Optional[str] = None,
+        error: Optional[str] = None,
+        data: Optional[Dict[str, Any]] = None
+    ) -> JobRecord:
+        """
+        Update the state of a job.
+
+        Moving a job to a finished status records when it finished.
+
+        Args:
+            job_id: ID of the job
+            status: New status
+            progress: New progress percentage
+            operation: Description of the current step
+            error: Error message
+            data: Details to merge into the job data
+
+        Returns:
+            JobRecord: The updated job
+
+        Raises:
+            KeyError: If the job doesn't exist
+        """
+        with self._sessions.begin() as session:
+            row = session.get(_JobRow, job_id)
+            if row is None:
+                raise KeyError(job_id)
+
+            if status is not None:
+                row.status = status
+                if status in FINISHED_STATUSES:
+                    row.finished_at = _utcnow()
+            if progress is not None:
+                row.progress = progress
+            if operation is not None:
+                row.operation = operation
+            if error is not None:
+                row.error = error
+            if data:
+                merged = json.loads(row.data or "{}")
+                merged.update(data)
+                row.data = json.dumps(merged)
+            session.flush()
+
+            return JobRecord._from_row(row)
+
+    def get(self, job_id: str) -> Optional[JobRecord]:
+        """
+        Get a job.
+
+        Args:
+            job_id: ID of the job
+
+        Returns:
+            The job, or None if it doesn't exist (or was evicted)
+        """
+        with self._sessions() as session:
+            row = session.get(_JobRow, job_id)
+            return JobRecord._from_row(row) if row is not None else None
+
+    def list_jobs(self, statuses: Optional[Iterable[str]] = None) -> List[JobRecord]:
+        """
+        Get jobs, oldest first.
+
+        Args:
+            statuses: Only return jobs with one of these statuses (optional)
+
+        Returns:
+            List of jobs
+        """
+        query = select(_JobRow).order_by(_JobRow.created_at)
+        if statuses is not None:
+            query = query.where(_JobRow.status.in_(list(statuses)))
+
+        with self._sessions() as session:
+            return [JobRecord._from_row(row) for row in session.scalars(query)]
+
+    def count(self, statuses: Iterable[str]) -> int:
+        """
+        Count the jobs with one of the given statuses.
+
+        Args:
+            statuses: Statuses to count
+
+        Returns:
+            Number of jobs
+        """
+        with self._sessions() as session:
+            return session.scalar(
+                select(func.count()).select_from(_JobRow).where(_JobRow.status.in_(list(statuses)))
+            )
+
+    def evict_expired(self, ttl_seconds: float, active_ids: Iterable[str] = ()) -> int:
+        """
+        Delete jobs that finished, or stopped making progress, too long ago.
+
+        Unfinished jobs that haven't been updated within the TTL were left
+        behind by a worker that went away, and are evicted as well, unless
+        they are still queued or running (a job may wait or run for longer
+        than the TTL without updates).
+
+        Args:
+            ttl_seconds: How long jobs are kept
+            active_ids: IDs of the unfinished jobs still queued or running
+
+        Returns:
+            Number of evicted jobs
+        """
+        cutoff = _utcnow() - timedelta(seconds=ttl_seconds)
+
+        abandoned = _JobRow.updated_at < cutoff
+        active_ids = list(active_ids)
+        if active_ids:
+            abandoned = and_(abandoned, _JobRow.id.not_in(active_ids))
+
+        with self._sessions.begin() as session:
+            result = session.execute(
+                delete(_JobRow).where(or_(_JobRow.finished_at < cutoff, abandoned))
+            )
+            return result.rowcount
+
+
+_default_store: Optional[JobStore] = None
+_default_store_lock = threading.Lock()
+
+
+def get_job_store() -> JobStore:
+    """
+    Get the process-wide job store.
+
+    It lives in the application database (see ``REPOMIND_DATABASE_URL``).
+
+    Returns:
+        The shared JobStore instance
+    """
+    global _default_store
+
+    with _default_store_lock:
+        if _default_store is None:
+            _default_store = JobStore(get_database_url())
+
+    return _default_store
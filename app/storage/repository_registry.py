@@ -0,0 +1,456 @@
+"""
+Module for the persistent repository registry.
+
+The registry maps repository IDs to the local clone path, the checked out
+commit SHA and any analysis artifacts computed for that commit. It is stored
+in SQLite through SQLAlchemy, so clones survive restarts and any process
+(API workers, background jobs) can find a repository without cloning it again.
+"""
+import os
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import (
+    DateTime,
+    ForeignKey,
+    Integer,
+    String,
+    Text,
+    UniqueConstraint,
+    delete,
+    select
+)
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
+
+from app.github.repository_cloner import get_head_commit
+from app.storage.database import DEFAULT_DATABASE_URL, create_database_engine, get_database_url
+
+
+logger = logging.getLogger(__name__)
+
+# Where repositories were expected before they were registered; still used as
+# a fallback for repositories placed there by hand
+LEGACY_REPOSITORY_DIR = "./data/repositories"
+
+# Repository fields that can be changed with RepositoryRegistry.update
+_UPDATABLE_FIELDS = ('url', 'owner', 'name', 'branch', 'path', 'commit_sha', 'status', 'error')
+
+
+def _utcnow() -> datetime:
+    """Get the current time in UTC."""
+    return datetime.now(timezone.utc)
+
+
+class _Base(DeclarativeBase):
+    """Declarative base for the registry tables."""
+
+
+class _RepositoryRow(_Base):
+    """Table row for a registered repository."""
+    __tablename__ = "repositories"
+
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    url: Mapped[Optional[str]] = mapped_column(Text)
+    owner: Mapped[Optional[str]] = mapped_column(String(255))
+    name: Mapped[Optional[str]] = mapped_column(String(255))
+    branch: Mapped[Optional[str]] = mapped_column(String(255))
+    path: Mapped[Optional[str]] = mapped_column(Text)
+    commit_sha: Mapped[Optional[str]] = mapped_column(String(64))
+    status: Mapped[str] = mapped_column(String(32), default="pending")
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow, onupdate=_utcnow)
+
+
+class _ArtifactRow(_Base):
+    """Table row for an analysis artifact of a repository commit."""
+    __tablename__ = "analysis_artifacts"
+    __table_args__ = (UniqueConstraint("repository_id", "commit_sha", "kind"),)
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    repository_id: Mapped[str] = mapped_column(
+        String(64), ForeignKey("repositories.id", ondelete="CASCADE"), index=True
+    )
+    # Empty string when the commit is unknown, so the unique constraint applies
+    commit_sha: Mapped[str] = mapped_column(String(64), default="")
+    kind: Mapped[str] = mapped_column(String(64))
+    path: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=_utcnow)
+
+
+@dataclass
+class RepositoryRecord:
+    """A repository known to the registry."""
+    id: str
+    url: Optional[str]
+    owner: Optional[str]
+    name: Optional[str]
+    branch: Optional[str]
+    path: Optional[str]  # Local clone path
+    commit_sha: Optional[str]  # Commit checked out in the clone
+    status: str  # 'pending', 'in_progress', 'completed' or 'error'
+    error: Optional[str]
+    created_at: datetime
+    updated_at: datetime
+
+    @classmethod
+    def _from_row(cls, row: _RepositoryRow) -> 'RepositoryRecord':
+        return cls(
+            id=row.id,
+            url=row.url,
+            owner=row.owner,
+            name=row.name,
+            branch=row.branch,
+            path=row.path,
+            commit_sha=row.commit_sha,
+            status=row.status,
+            error=row.error,
+            created_at=row.created_at,
+            updated_at=row.updated_at
+        )
+
+
+@dataclass
+class AnalysisArtifact:
+    """An analysis result stored for a repository commit."""
+    repository_id: str
+    kind: str  # e.g. 'dependencies'
+    path: str  # Location of the stored artifact
+    commit_sha: Optional[str]
+    created_at: datetime
+
+    @classmethod
+    def _from_row(cls, row: _ArtifactRow) -> 'AnalysisArtifact':
+        return cls(
+            repository_id=row.repository_id,
+            kind=row.kind,
+            path=row.path,
+            commit_sha=row.commit_sha or None,
+            created_at=row.created_at
+        )
+
+
+class RepositoryRegistry:
+    """
+    SQLite-backed registry of cloned repositories and their analysis artifacts.
+
+    Attributes:
+        database_url: SQLAlchemy URL of the registry database
+    """
+
+    def __init__(self, database_url: str = DEFAULT_DATABASE_URL):
+        """
+        Open the registry, creating the database and its tables if needed.
+
+        Args:
+            database_url: SQLAlchemy database URL (``sqlite://`` for in-memory)
+        """
+        self.database_url = database_url
+        self._engine = create_database_engine(database_url)
+        _Base.metadata.create_all(self._engine)
+        self._sessions = sessionmaker(self._engine, expire_on_commit=False)
+
+    def register(
+        self,
+        repository_id: str,
+        url: Optional[str] = None,
+        owner: Optional[str] = None,
+        name: Optional[str] = None,
+        branch: Optional[str] = None,
+        path: Optional[str] = None,
+        commit_sha: Optional[str] = None,
+        status: str = "pending"
+    ) -> RepositoryRecord:
+        """
+        Register a repository, replacing any existing entry with the same ID.
+
+        Args:
+            repository_id: Unique ID of the repository
+            url: Remote URL of the repository
+            owner: Repository owner
+            name: Repository name
+            branch: Checked out branch
+            path: Local clone path
+            commit_sha: Checked out commit
+            status: Clone status
+
+        Returns:
+            RepositoryRecord: The registered repository
+        """
+        with self._sessions.begin() as session:
+            row = session.get(_RepositoryRow, repository_id)
+            if row is None:
+                row = _RepositoryRow(id=repository_id)
+                session.add(row)
+
+            row.url = url
+            row.owner = owner
+            row.name = name
+            row.branch = branch
+            row.path = path
+            row.commit_sha = commit_sha
+            row.status = status
+            row.error = None
+            session.flush()
+
+            return RepositoryRecord._from_row(row)
+
+    def update(self, repository_id: str, **fields) -> RepositoryRecord:
+        """
+        Update fields of a registered repository.
+
+        Args:
+            repository_id: ID of the repository
+            **fields: Fields to change (url, owner, name, branch, path,
+                commit_sha, status or error)
+
+        Returns:
+            RepositoryRecord: The updated repository
+
+        Raises:
+            KeyError: If the repository is not registered
+            ValueError: If a field can't be updated
+        """
+        unknown = set(fields) - set(_UPDATABLE_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot update repository fields: {', '.join(sorted(unknown))}")
+
+        with self._sessions.begin() as session:
+            row = session.get(_RepositoryRow, repository_id)
+            if row is None:
+                raise KeyError(repository_id)
+
+            for field_name, value in fields.items():
+                setattr(row, field_name, value)
+            session.flush()
+
+            return RepositoryRecord._from_row(row)
+
+    def get(self, repository_id: str) -> Optional[RepositoryRecord]:
+        """
+        Get a registered repository.
+
+        Args:
+            repository_id: ID of the repository
+
+        Returns:
+            The repository, or None if it is not registered
+        """
+        with self._sessions() as session:
+            row = session.get(_RepositoryRow, repository_id)
+            return RepositoryRecord._from_row(row) if row is not None else None
+
+    def list_repositories(self) -> List[RepositoryRecord]:
+        """
+        Get all registered repositories, oldest first.
+
+        Returns:
+            List of repositories
+        """
+        with self._sessions() as session:
+            rows = session.scalars(select(_RepositoryRow).order_by(_RepositoryRow.created_at))
+            return [RepositoryRecord._from_row(row) for row in rows]
+
+    def remove(self, repository_id: str) -> bool:
+        """
+        Remove a repository and its artifacts from the registry.
+
+        The clone and artifact files themselves are left on disk.
+
+        Args:
+            repository_id: ID of the repository
+
+        Returns:
+            True if the repository was registered
+        """
+        with self._sessions.begin() as session:
+            session.execute(delete(_ArtifactRow).where(_ArtifactRow.repository_id == repository_id))
+            result = session.execute(delete(_RepositoryRow).where(_RepositoryRow.id == repository_id))
+            return result.rowcount > 0
+
+    def get_path(self, repository_id: str) -> Optional[str]:
+        """
+        Get the local clone path of a repository.
+
+        Args:
+            repository_id: ID of the repository
+
+        Returns:
+            The clone path, or None if the repository is not registered or
+            has not been cloned yet
+        """
+        record = self.get(repository_id)
+        return record.path if record is not None else None
+
+    def record_artifact(
+        self,
+        repository_id: str,
+        kind: str,
+        path: str,
+        commit_sha: Optional[str] = None
+    ) -> AnalysisArtifact:
+        """
+        Record where an analysis artifact for a repository commit is stored.
+
+        An existing artifact of the same kind for the same commit is replaced.
+
+        Args:
+            repository_id: ID of the repository
+            kind: Kind of artifact (e.g. 'dependencies')
+            path: Location of the stored artifact
+            commit_sha: Commit the artifact was computed for (defaults to the
+                repository's current commit)
+
+        Returns:
+            AnalysisArtifact: The recorded artifact
+
+        Raises:
+            KeyError: If the repository is not registered
+        """
+        with self._sessions.begin() as session:
+            repository = session.get(_RepositoryRow, repository_id)
+            if repository is None:
+                raise KeyError(repository_id)
+
+            commit_sha = commit_sha or repository.commit_sha or ""
+            row = session.scalars(
+                select(_ArtifactRow).where(
+                    _ArtifactRow.repository_id == repository_id,
+                    _ArtifactRow.commit_sha == commit_sha,
+                    _ArtifactRow.kind == kind
+                )
+            ).first()
+            if row is None:
+                row = _ArtifactRow(repository_id=repository_id, commit_sha=commit_sha, kind=kind)
+                session.add(row)
+
+            row.path = path
+            row.created_at = _utcnow()
+            session.flush()
+
+            return AnalysisArtifact._from_row(row)
+
+    def get_artifact(
+        self,
+        repository_id: str,
+        kind: str,
+        commit_sha: Optional[str] = None
+    ) -> Optional[AnalysisArtifact]:
+        """
+        Get an analysis artifact for a repository commit.
+
+        Args:
+            repository_id: ID of the repository
+            kind: Kind of artifact
+            commit_sha: Commit to look up (defaults to the repository's
+                current commit)
+
+        Returns:
+            The artifact, or None if none was recorded for the commit
+        """
+        with self._sessions() as session:
+            repository = session.get(_RepositoryRow, repository_id)
+            if repository is None:
+                return None
+
+            commit_sha = commit_sha or repository.commit_sha or ""
+            row = session.scalars(
+                select(_ArtifactRow).where(
+                    _ArtifactRow.repository_id == repository_id,
+                    _ArtifactRow.commit_sha == commit_sha,
+                    _ArtifactRow.kind == kind
+                )
+            ).first()
+            return AnalysisArtifact._from_row(row) if row is not None else None
+
+    def list_artifacts(self, repository_id: str) -> List[AnalysisArtifact]:
+        """
+        Get all analysis artifacts recorded for a repository.
+
+        Args:
+            repository_id: ID of the repository
+
+        Returns:
+            List of artifacts, oldest first
+        """
+        with self._sessions() as session:
+            rows = session.scalars(
+                select(_ArtifactRow)
+                .where(_ArtifactRow.repository_id == repository_id)
+                .order_by(_ArtifactRow.created_at)
+            )
+            return [AnalysisArtifact._from_row(row) for row in rows]
+
+
+_default_registry: Optional[RepositoryRegistry] = None
+_default_registry_lock = threading.Lock()
+
+
+def get_repository_registry() -> RepositoryRegistry:
+    """
+    Get the process-wide repository registry.
+
+    The database can be configured with the ``REPOMIND_DATABASE_URL``
+    environment variable.
+
+    Returns:
+        The shared RepositoryRegistry instance
+    """
+    global _default_registry
+
+    with _default_registry_lock:
+        if _default_registry is None:
+            _default_registry = RepositoryRegistry(get_database_url())
+
+    return _default_registry
+
+
+def get_repository_path(repository_id: str, registry: Optional[RepositoryRegistry] = None) -> str:
+    """
+    Get the local path of a repository.
+
+    Registered repositories resolve to their clone path. Unregistered IDs fall
+    back to the legacy ``./data/repositories/<id>`` location.
+
+    Args:
+        repository_id: ID of the repository
+        registry: Registry to look in (defaults to the process-wide registry)
+
+    Returns:
+        Path to the repository on disk
+    """
+    registry = registry or get_repository_registry()
+
+    path = registry.get_path(repository_id)
+    if path:
+        return path
+
+    return os.path.join(LEGACY_REPOSITORY_DIR, repository_id)
+
+
+def get_checkout_commit(repository_id: str, repository_path: str,
+                        registry: Optional[RepositoryRegistry] = None) -> Optional[str]:
+    """
+    Get the commit currently checked out for a repository.
+
+    The checkout itself is asked first: several registered repositories can
+    share one clone, and syncing one of them moves the others too. The
+    registered commit is only used when HEAD can't be read.
+
+    Args:
+        repository_id: ID of the repository
+        repository_path: Path to the repository on disk
+        registry: Registry to look in (defaults to the process-wide registry)
+
+    Returns:
+        The commit SHA, or None if it is not known
+    """
+    commit_sha = get_head_commit(repository_path)
+    if commit_sha is not None:
+        return commit_sha
+
+    record = (registry or get_repository_registry()).get(repository_id)
+    return record.commit_sha if record is not None else None
@@ -0,0 +1,167 @@
+"""
+Module for in-memory caches of data derived from repository checkouts.
+
+Structure snapshots and dependency artifacts are both expensive to build and
+only valid for one commit of a repository. A CheckoutCache keeps such values
+per repository, commit and excluded directories, bounded in size, and drops
+the values of a repository's other commits once its checkout moves on.
+"""
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, List, Optional, Tuple, TypeVar
+
+
+V = TypeVar('V')
+
+CheckoutKey = Tuple[str, Optional[str], Optional[Tuple[str, ...]]]
+
+
+def make_checkout_key(
+    repository_id: str,
+    commit_sha: Optional[str],
+    exclude_dirs: Optional[List[str]] = None
+) -> CheckoutKey:
+    """
+    Build the cache key for a value derived from a checkout.
+
+    Excluded directories are compared as a set, so their order and duplicates
+    don't matter. None (the default exclusions) is kept apart from an empty
+    list (no exclusions).
+
+    Args:
+        repository_id: ID of the repository
+        commit_sha: Commit checked out in the repository
+        exclude_dirs: Directories excluded when building the value
+
+    Returns:
+        Hashable key for CheckoutCache
+    """
+    return (repository_id, commit_sha, tuple(sorted(set(exclude_dirs))) if exclude_dirs is not None else None)
+
+
+class CheckoutCache(Generic[V]):
+    """
+    In-memory LRU cache of values derived from repository checkouts.
+
+    Values are keyed by (repository ID, commit, excluded directories).
+    Storing a value for a new commit drops the values of the other commits
+    of the same repository, since the checkout has moved on. Subclasses can
+    keep values on disk too by overriding _load and _store.
+
+    Attributes:
+        max_entries: Maximum number of values kept in memory
+    """
+
+    def __init__(self, max_entries: int):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of values kept in memory
+        """
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[CheckoutKey, V]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: CheckoutKey) -> Optional[V]:
+        """
+        Get a cached value, from memory or else from _load.
+
+        Args:
+            key: Key from make_checkout_key
+
+        Returns:
+            The value, or None if it is not cached
+        """
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = self._load(key)
+        if value is not None:
+            self._remember(key, value)
+
+        with self._lock:
+            if value is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return value
+
+    def put(self, key: CheckoutKey, value: V) -> None:
+        """
+        Store a value, evicting the least recently used ones if full.
+
+        Args:
+            key: Key from make_checkout_key
+            value: The value to store
+        """
+        self._remember(key, value)
+        self._store(key, value)
+
+    def get_or_build(self, key: CheckoutKey, build: Callable[[], V]) -> V:
+        """
+        Get a cached value, building and storing it on a miss.
+
+        Values without a known commit can't be invalidated, so they are
+        built every time and never stored.
+
+        Args:
+            key: Key from make_checkout_key
+            build: Function that builds the value from the checkout
+
+        Returns:
+            The value
+        """
+        if key[1] is None:
+            return build()
+
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.put(key, value)
+
+        return value
+
+    def invalidate(self, repository_id: str) -> None:
+        """
+        Drop all in-memory values of a repository.
+
+        Args:
+            repository_id: ID of the repository
+        """
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == repository_id]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all in-memory values."""
+        with self._lock:
+            self._entries.clear()
+
+    def _remember(self, key: CheckoutKey, value: V) -> None:
+        """Keep a value in memory, evicting the least recently used ones if full."""
+        repository_id, commit_sha, _ = key
+
+        with self._lock:
+            # Values of other commits describe a checkout that is gone
+            for stale_key in [k for k in self._entries if k[0] == repository_id and k[1] != commit_sha]:
+                del self._entries[stale_key]
+
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, key: CheckoutKey) -> Optional[V]:
+        """Load a value missing from memory (none are kept elsewhere by default)."""
+        return None
+
+    def _store(self, key: CheckoutKey, value: V) -> None:
+        """Keep a stored value beyond memory (not done by default)."""
@@ -3,8 +3,89 @@ Collapsible tree module for RepoMind file structure visualization.
 
 This module provides functionality for creating and managing collapsible tree
 structures for representing directory hierarchies with expand/collapse controls.
+
+Trees stay fast to query interactively on large repositories: a CollapsibleTree
+indexes its nodes by path, nodes cache their depth, and every node keeps the
+number of nodes visible in its subtree (with a Fenwick tree over the sizes of
+its children), so toggling, finding and slicing the visible nodes take time
+proportional to the depth of the tree rather than its size.
 """
 
+class _FenwickTree:
+    """
+    Fenwick (binary indexed) tree over a list of non-negative counts.
+    
+    Supports updating a count, prefix sums and finding the position of the
+    k-th counted item in O(log n).
+    """
+    
+    def __init__(self, values):
+        """
+        Build the tree in O(n).
+        
+        Args:
+            values (list): Initial counts
+        """
+        size = len(values)
+        tree = [0] + list(values)
+        for i in range(1, size + 1):
+            parent = i + (i & -i)
+            if parent <= size:
+                tree[parent] += tree[i]
+        self._tree = tree
+        self._size = size
+    
+    def add(self, index, delta):
+        """
+        Add to one count.
+        
+        Args:
+            index (int): Position of the count
+            delta (int): Amount to add
+        """
+        i = index + 1
+        while i <= self._size:
+            self._tree[i] += delta
+            i += i & -i
+    
+    def prefix_sum(self, index):
+        """
+        Get the sum of the counts before a position.
+        
+        Args:
+            index (int): Number of counts to sum
+        
+        Returns:
+            int: Sum of the first ``index`` counts
+        """
+        total = 0
+        i = index
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+    
+    def find(self, k):
+        """
+        Find the position whose count covers the k-th counted item.
+        
+        Args:
+            k (int): Zero-based item number, less than the total count
+        
+        Returns:
+            int: Smallest position whose prefix sum including it exceeds k
+        """
+        position = 0
+        step = 1 << self._size.bit_length()
+        while step:
+            next_position = position + step
+            if next_position <= self._size and self._tree[next_position] <= k:
+                position = next_position
+                k -= self._tree[next_position]
+            step >>= 1
+        return position
+
+
 class TreeNode:
     """
     Represents a node in a tree structure with collapsible functionality.
@@ -28,8 +109,32 @@ class TreeNode:
         self.is_directory = is_directory
         self.parent = parent
         self.children = []
-        self.is_collapsed = False
         self.metadata = {}  # Additional data about the node
+        self.content_hash = None  # Merkle hash of the subtree, once computed
+        self.tree = None  # CollapsibleTree the node belongs to, if any
+        self._is_collapsed = False
+        self._depth = parent._depth + 1 if parent is not None else 0
+        self._child_index = 0  # Position among the children of the parent
+        # Number of visible nodes in the subtree when the node itself is
+        # visible, and the sum of that number over the children
+        self._visible_size = 1
+        self._children_visible_size = 0
+        # Fenwick tree over the visible sizes of the children, built on demand
+        self._child_sizes = None
+    
+    @property
+    def is_collapsed(self):
+        """Whether the children of the node are hidden."""
+        return self._is_collapsed
+    
+    @is_collapsed.setter
+    def is_collapsed(self, collapsed):
+        collapsed = bool(collapsed)
+        if collapsed == self._is_collapsed:
+            return
+        
+        self._is_collapsed = collapsed
+        self._update_visible_size()
     
     def add_child(self, child_node):
         """
@@ -38,34 +143,118 @@ class TreeNode:
         Args:
             child_node (TreeNode): Node to add as a child
         """
+        child_node._child_index = len(self.children)
         self.children.append(child_node)
         child_node.parent = self
+        if child_node.children:
+            child_node._set_depth(self._depth + 1)
+        else:
+            child_node._depth = self._depth + 1
+        
+        # Visible sizes are only maintained for nodes of a CollapsibleTree,
+        # which computes them in one pass when it is created
+        if self.tree is not None:
+            self.tree._register(child_node)
+            self._child_sizes = None
+            _propagate_visible_size(self, child_node._child_index, child_node._visible_size)
     
     def get_depth(self):
         """
-        Calculate the depth of this node in the tree.
+        Get the depth of this node in the tree.
         
         Returns:
             int: Depth (0 for root, 1 for first level, etc.)
         """
-        depth = 0
-        current = self
-        while current.parent:
-            depth += 1
-            current = current.parent
-        return depth
+        return self._depth
+    
+    def _set_depth(self, depth):
+        """
+        Set the cached depth of this node and its descendants.
+        
+        Args:
+            depth (int): New depth of this node
+        """
+        stack = [(self, depth)]
+        while stack:
+            node, node_depth = stack.pop()
+            node._depth = node_depth
+            stack.extend((child, node_depth + 1) for child in node.children)
+    
+    def _update_visible_size(self):
+        """Recompute the visible size of this node after its collapse state changed."""
+        size = 1
+        if self.is_directory and not self._is_collapsed:
+            size += self._children_visible_size
+        
+        delta = size - self._visible_size
+        self._visible_size = size
+        if self.parent is not None:
+            _propagate_visible_size(self.parent, self._child_index, delta)
+    
+    def _get_child_sizes(self):
+        """
+        Get the Fenwick tree over the visible sizes of the children.
+        
+        Returns:
+            _FenwickTree: The tree, built if needed
+        """
+        if self._child_sizes is None:
+            self._child_sizes = _FenwickTree([child._visible_size for child in self.children])
+        return self._child_sizes
     
     def __repr__(self):
         """String representation of the node."""
         return f"TreeNode(name='{self.name}', path='{self.path}', is_directory={self.is_directory})"
 
 
+def _propagate_visible_size(node, child_index, delta):
+    """
+    Apply a change in the visible size of a child to its ancestors.
+    
+    Propagation stops at the first collapsed ancestor, whose own visible
+    size doesn't depend on its children.
+    
+    Args:
+        node (TreeNode): Parent of the changed child
+        child_index (int): Position of the child among the children of node
+        delta (int): Change in the visible size of the child
+    """
+    while node is not None and delta:
+        node._children_visible_size += delta
+        if node._child_sizes is not None:
+            node._child_sizes.add(child_index, delta)
+        
+        if not node.is_directory or node._is_collapsed:
+            break
+        
+        node._visible_size += delta
+        child_index = node._child_index
+        node = node.parent
+
+
+def _compute_visible_sizes(nodes):
+    """
+    Compute the visible sizes of a subtree from scratch.
+    
+    Args:
+        nodes (list): The nodes of the subtree in pre-order
+    """
+    for node in reversed(nodes):
+        children_size = 0
+        for child in node.children:
+            children_size += child._visible_size
+        node._children_visible_size = children_size
+        node._child_sizes = None
+        node._visible_size = 1 + (children_size if node.is_directory and not node._is_collapsed else 0)
+
+
 class CollapsibleTree:
     """
     Manages a collapsible tree structure for directory visualization.
     
     This class provides methods to collapse and expand nodes, find nodes by path,
     and get currently visible nodes based on the collapsed state of directories.
+    Nodes added to the tree later with TreeNode.add_child are indexed as well.
     """
     
     def __init__(self, root_node):
@@ -76,6 +265,26 @@ class CollapsibleTree:
             root_node (TreeNode): The root node of the tree
         """
         self.root = root_node
+        self._nodes_by_path = {}
+        self._register(root_node)
+    
+    def _register(self, node):
+        """
+        Add a node and its descendants to the path index and compute their visible sizes.
+        
+        Args:
+            node (TreeNode): The node to index
+        """
+        nodes = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            current.tree = self
+            self._nodes_by_path.setdefault(current.path, current)
+            nodes.append(current)
+            stack.extend(current.children)
+        
+        _compute_visible_sizes(nodes)
     
     def collapse_node(self, node):
         """
@@ -107,6 +316,11 @@ class CollapsibleTree:
         if node.is_directory:
             node.is_collapsed = not node.is_collapsed
     
+    @property
+    def visible_count(self):
+        """Number of nodes currently visible, including the root."""
+        return self.root._visible_size
+    
     def get_visible_nodes(self):
         """
         Get a list of all nodes that should be visible based on collapse state.
@@ -114,25 +328,93 @@ class CollapsibleTree:
         Returns:
             list: List of visible TreeNode objects
         """
-        visible_nodes = []
-        self._collect_visible_nodes(self.root, visible_nodes)
-        return visible_nodes
+        return self.get_visible_slice(0, self.visible_count)
     
-    def _collect_visible_nodes(self, node, result_list):
+    def get_visible_slice(self, start, stop):
         """
-        Recursively collect visible nodes.
+        Get the visible nodes at positions [start, stop) of the visible node list.
+        
+        The first node is found in O(depth * log(children)); the rest are
+        reached by walking the tree in order.
         
         Args:
-            node (TreeNode): Current node to process
-            result_list (list): List to collect visible nodes
+            start (int): Position of the first node
+            stop (int): Position after the last node
+        
+        Returns:
+            list: List of visible TreeNode objects
         """
-        # Add the current node
-        result_list.append(node)
+        start = max(start, 0)
+        stop = min(stop, self.visible_count)
+        if start >= stop:
+            return []
         
-        # If node is a directory and not collapsed, add its children
-        if node.is_directory and not node.is_collapsed:
-            for child in node.children:
-                self._collect_visible_nodes(child, result_list)
+        nodes = []
+        node = self._get_visible_node_at(start)
+        while node is not None and len(nodes) < stop - start:
+            nodes.append(node)
+            node = self._next_visible_node(node)
+        return nodes
+    
+    def get_visible_position(self, node):
+        """
+        Get the position of a node in the visible node list.
+        
+        Args:
+            node (TreeNode): The node to locate
+        
+        Returns:
+            int: Position of the node, or None if it is hidden by a collapsed ancestor
+        """
+        position = 0
+        current = node
+        while current is not self.root:
+            parent = current.parent
+            if parent is None or parent.is_collapsed:
+                return None
+            position += 1 + parent._get_child_sizes().prefix_sum(current._child_index)
+            current = parent
+        return position
+    
+    def _get_visible_node_at(self, position):
+        """
+        Find the visible node at a position of the visible node list.
+        
+        Args:
+            position (int): Position, less than visible_count
+        
+        Returns:
+            TreeNode: The node at that position
+        """
+        node = self.root
+        while position > 0:
+            # Skip the node itself, then descend into the child covering the position
+            position -= 1
+            child_sizes = node._get_child_sizes()
+            index = child_sizes.find(position)
+            position -= child_sizes.prefix_sum(index)
+            node = node.children[index]
+        return node
+    
+    def _next_visible_node(self, node):
+        """
+        Get the node following a node in the visible node list.
+        
+        Args:
+            node (TreeNode): A visible node
+        
+        Returns:
+            TreeNode: The next visible node, or None if node is the last one
+        """
+        if node.is_directory and not node.is_collapsed and node.children:
+            return node.children[0]
+        
+        while node is not self.root and node.parent is not None:
+            siblings = node.parent.children
+            if node._child_index + 1 < len(siblings):
+                return siblings[node._child_index + 1]
+            node = node.parent
+        return None
     
     def collapse_all(self):
         """Collapse all directory nodes in the tree."""
@@ -144,16 +426,30 @@ class CollapsibleTree:
     
     def _set_collapse_state_recursive(self, node, collapsed):
         """
-        Recursively set collapse state for a node and its children.
+        Set collapse state for a node and its descendants.
+        
+        Visible sizes of the subtree are recomputed in a single pass rather
+        than propagated once per changed node.
         
         Args:
             node (TreeNode): Node to process
             collapsed (bool): Whether to collapse (True) or expand (False)
         """
-        if node.is_directory:
-            node.is_collapsed = collapsed
-            for child in node.children:
-                self._set_collapse_state_recursive(child, collapsed)
+        # Collect the subtree in pre-order; sizes are computed in reverse
+        nodes = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            nodes.append(current)
+            if current.is_directory:
+                current._is_collapsed = collapsed
+                stack.extend(current.children)
+        
+        old_size = node._visible_size
+        _compute_visible_sizes(nodes)
+        
+        if node.parent is not None:
+            _propagate_visible_size(node.parent, node._child_index, node._visible_size - old_size)
     
     def find_node(self, path):
         """
@@ -161,32 +457,11 @@ class CollapsibleTree:
         
         Args:
             path (str): Path to search for
-            
-        Returns:
-            TreeNode: The found node, or None if no node exists with the path
-        """
-        return self._find_node_recursive(self.root, path)
-    
-    def _find_node_recursive(self, node, path):
-        """
-        Recursively search for a node with the given path.
         
-        Args:
-            node (TreeNode): Current node to check
-            path (str): Path to search for
-            
         Returns:
-            TreeNode: The found node, or None if not found
+            TreeNode: The found node, or None if no node exists with the path
         """
-        if node.path == path:
-            return node
-        
-        for child in node.children:
-            result = self._find_node_recursive(child, path)
-            if result:
-                return result
-        
-        return None
+        return self._nodes_by_path.get(path)
     
     def get_expanded_paths(self):
         """
@@ -219,7 +494,7 @@ def build_tree_from_directory_node(dir_node):
     
     Args:
         dir_node: DirectoryNode from directory_scanner
-        
+    
     Returns:
         CollapsibleTree: Tree structure built from the directory node
     """
@@ -251,4 +526,4 @@ def _build_tree_recursive(tree_node, dir_node):
         
         # Recurse for directories
         if is_directory:
-            _build_tree_recursive(child_tree_node, child) 
\ No newline at end of file
+            _build_tree_recursive(child_tree_node, child)
\ No newline at end of file
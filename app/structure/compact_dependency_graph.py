@@ -0,0 +1,815 @@
+"""
+Module for the memory-compact dependency graph backend.
+
+A DependencyGraph keeps one DependencyNode per file, with Python sets of
+node objects and ExternalDependency objects per import. On repositories
+with 100k+ files that is most of the memory of an analysis. The
+CompactDependencyGraph instead interns paths to integer IDs and stores edges
+in CSR (compressed sparse row) arrays: for node ``i``, its dependencies are
+``targets[offsets[i]:offsets[i + 1]]``. Reverse edges are kept the same way.
+
+The graph algorithms (strongly connected components, cycle enumeration,
+topological layers, degrees) work on these integer arrays. DependencyGraph
+uses them too, by converting itself to a CompactDependencyGraph.
+"""
+import os
+from array import array
+from collections import OrderedDict, deque
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+
+# Bounds for enumerating the elementary cycles of a strongly connected component
+DEFAULT_MAX_CYCLES_PER_COMPONENT = 10
+DEFAULT_MAX_CYCLE_LENGTH = 20
+MAX_CYCLE_SEARCH_STEPS = 100000
+
+# Number of transitive dependency queries memoized per graph
+DEFAULT_IMPACT_CACHE_SIZE = 256
+
+# Directions of transitive dependency queries
+DEPENDENTS = "dependents"
+DEPENDENCIES = "dependencies"
+
+
+def _build_csr(num_nodes: int, edges: Sequence[int], num_targets: int) -> Tuple[array, array]:
+    """
+    Build CSR arrays from edges encoded as ``source * num_targets + target``.
+
+    Args:
+        num_nodes: Number of source nodes
+        edges: Sorted, duplicate-free encoded edges
+        num_targets: Number of possible targets
+
+    Returns:
+        Tuple of (offsets, targets); the targets of a node are sorted
+    """
+    offsets = array('l', [0]) * (num_nodes + 1)
+    targets = array('l', [0]) * len(edges)
+    for position, edge in enumerate(edges):
+        source, target = divmod(edge, num_targets)
+        offsets[source + 1] += 1
+        targets[position] = target
+
+    for i in range(num_nodes):
+        offsets[i + 1] += offsets[i]
+
+    return offsets, targets
+
+
+def _transpose(num_nodes: int, offsets: array, targets: array) -> Tuple[array, array]:
+    """
+    Reverse the edges of a CSR graph with a counting sort.
+
+    Args:
+        num_nodes: Number of nodes
+        offsets: CSR offsets
+        targets: CSR targets
+
+    Returns:
+        Tuple of (offsets, sources) of the reversed graph; the sources of a
+        node are sorted
+    """
+    reverse_offsets = array('l', [0]) * (num_nodes + 1)
+    for target in targets:
+        reverse_offsets[target + 1] += 1
+    for i in range(num_nodes):
+        reverse_offsets[i + 1] += reverse_offsets[i]
+
+    sources = array('l', [0]) * len(targets)
+    positions = array('l', reverse_offsets[:num_nodes])
+    for source in range(num_nodes):
+        for edge in range(offsets[source], offsets[source + 1]):
+            target = targets[edge]
+            sources[positions[target]] = source
+            positions[target] += 1
+
+    return reverse_offsets, sources
+
+
+def strongly_connected_components(num_nodes: int, offsets: array, targets: array) -> Tuple[array, int]:
+    """
+    Find the strongly connected components of a CSR graph.
+
+    Tarjan's algorithm with an explicit stack, linear in nodes plus edges.
+    Components are numbered in the order they are completed, which is a
+    reverse topological order: edges only lead to components with a lower
+    or equal number.
+
+    Args:
+        num_nodes: Number of nodes
+        offsets: CSR offsets
+        targets: CSR targets
+
+    Returns:
+        Tuple of (component number of every node, number of components)
+    """
+    unvisited = -1
+    index = array('l', [unvisited]) * num_nodes
+    lowlink = array('l', [0]) * num_nodes
+    component_of = array('l', [unvisited]) * num_nodes
+    next_edge = array('l', offsets[:num_nodes])
+    on_stack = bytearray(num_nodes)
+    stack = []
+    counter = 0
+    component_count = 0
+
+    for root in range(num_nodes):
+        if index[root] != unvisited:
+            continue
+
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack[root] = 1
+        work = [root]
+
+        while work:
+            node = work[-1]
+            edge = next_edge[node]
+            end = offsets[node + 1]
+
+            descended = False
+            while edge < end:
+                target = targets[edge]
+                edge += 1
+                if index[target] == unvisited:
+                    index[target] = lowlink[target] = counter
+                    counter += 1
+                    stack.append(target)
+                    on_stack[target] = 1
+                    work.append(target)
+                    descended = True
+                    break
+                if on_stack[target] and index[target] < lowlink[node]:
+                    lowlink[node] = index[target]
+            next_edge[node] = edge
+            if descended:
+                continue
+
+            work.pop()
+            if work and lowlink[node] < lowlink[work[-1]]:
+                lowlink[work[-1]] = lowlink[node]
+
+            if lowlink[node] == index[node]:
+                # node is the root of a component; pop it off the stack
+                while True:
+                    member = stack.pop()
+                    on_stack[member] = 0
+                    component_of[member] = component_count
+                    if member == node:
+                        break
+                component_count += 1
+
+    return component_of, component_count
+
+
+def enumerate_cycles(
+    adjacency: List[List[int]],
+    max_cycles: int = DEFAULT_MAX_CYCLES_PER_COMPONENT,
+    max_length: int = DEFAULT_MAX_CYCLE_LENGTH
+) -> List[List[int]]:
+    """
+    Enumerate elementary cycles of a strongly connected component, bounded.
+
+    Each cycle is reported once, starting at its smallest node. The search
+    stops after ``max_cycles`` cycles or MAX_CYCLE_SEARCH_STEPS steps; a
+    component always yields at least its shortest cycle through node 0,
+    even if that is longer than ``max_length``.
+
+    Args:
+        adjacency: Successors of every node of the component, numbered 0..n-1
+        max_cycles: Maximum number of cycles
+        max_length: Maximum number of nodes in a cycle
+
+    Returns:
+        List of cycles, each a list of nodes without repeating the first
+    """
+    cycles = []
+    steps = 0
+    for start in range(len(adjacency)):
+        if len(cycles) >= max_cycles or steps >= MAX_CYCLE_SEARCH_STEPS:
+            break
+
+        # Only visit nodes after the start, so every cycle is found from its smallest node
+        path = [start]
+        on_path = {start}
+        successors = [iter(adjacency[start])]
+        while successors and len(cycles) < max_cycles and steps < MAX_CYCLE_SEARCH_STEPS:
+            successor = next(successors[-1], None)
+            if successor is None:
+                successors.pop()
+                on_path.discard(path.pop())
+                continue
+
+            steps += 1
+            if successor == start:
+                cycles.append(list(path))
+            elif successor > start and successor not in on_path and len(path) < max_length:
+                path.append(successor)
+                on_path.add(successor)
+                successors.append(iter(adjacency[successor]))
+
+    if not cycles and len(adjacency) > 1:
+        cycle = _shortest_cycle(adjacency, 0)
+        if cycle:
+            cycles.append(cycle)
+
+    return cycles
+
+
+def _shortest_cycle(adjacency: List[List[int]], start: int) -> List[int]:
+    """
+    Find a shortest cycle through a node with a breadth-first search.
+
+    Args:
+        adjacency: Successors of every node
+        start: The node the cycle goes through
+
+    Returns:
+        Nodes of the cycle, starting at start (empty if there is none)
+    """
+    parents = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        for successor in adjacency[node]:
+            if successor == start:
+                cycle = []
+                while node is not None:
+                    cycle.append(node)
+                    node = parents[node]
+                return cycle[::-1]
+            if successor not in parents:
+                parents[successor] = node
+                queue.append(successor)
+
+    return []
+
+
+class CompactDependencyGraphBuilder:
+    """
+    Collects the files and imports of a repository for a CompactDependencyGraph.
+
+    Edges are buffered as encoded integers and only turned into CSR arrays
+    by build, so no per-file objects are created.
+    """
+
+    def __init__(self):
+        """Initialize an empty builder."""
+        self._ids: Dict[str, int] = {}
+        self._paths: List[str] = []
+        self._file_types: List[str] = []
+        self._type_codes: Dict[str, int] = {}
+        self._node_types = bytearray()
+        self._edge_sources = array('l')
+        self._edge_targets = array('l')
+        self._external_ids: Dict[str, int] = {}
+        self._externals: List[str] = []
+        self._external_sources = array('l')
+        self._external_targets = array('l')
+
+    def add_node(self, path: str, file_type: str) -> int:
+        """
+        Add a file, or get the ID of a file added before.
+
+        Args:
+            path: Path to the file relative to the repository root
+            file_type: Type of the file
+
+        Returns:
+            ID of the file
+        """
+        node_id = self._ids.get(path)
+        if node_id is None:
+            node_id = self._ids[path] = len(self._paths)
+            self._paths.append(path)
+            type_code = self._type_codes.get(file_type)
+            if type_code is None:
+                type_code = self._type_codes[file_type] = len(self._file_types)
+                self._file_types.append(file_type)
+            self._node_types.append(type_code)
+        return node_id
+
+    def add_dependency(self, source: int, target: int) -> None:
+        """
+        Add an import of one file by another.
+
+        Args:
+            source: ID of the importing file
+            target: ID of the imported file
+        """
+        if source != target:  # Avoid self-dependencies
+            self._edge_sources.append(source)
+            self._edge_targets.append(target)
+
+    def add_external_dependency(self, source: int, name: str) -> None:
+        """
+        Add an import of an external module.
+
+        Args:
+            source: ID of the importing file
+            name: Name of the external dependency
+        """
+        external_id = self._external_ids.get(name)
+        if external_id is None:
+            external_id = self._external_ids[name] = len(self._externals)
+            self._externals.append(name)
+        self._external_sources.append(source)
+        self._external_targets.append(external_id)
+
+    def build(self) -> 'CompactDependencyGraph':
+        """
+        Build the graph from everything added so far.
+
+        Returns:
+            CompactDependencyGraph: The graph
+        """
+        num_nodes = len(self._paths)
+        num_externals = max(len(self._externals), 1)
+
+        edges = sorted({
+            source * num_nodes + target
+            for source, target in zip(self._edge_sources, self._edge_targets)
+        })
+        offsets, targets = _build_csr(num_nodes, edges, max(num_nodes, 1))
+
+        external_edges = sorted({
+            source * num_externals + target
+            for source, target in zip(self._external_sources, self._external_targets)
+        })
+        external_offsets, external_targets = _build_csr(num_nodes, external_edges, num_externals)
+
+        return CompactDependencyGraph(
+            self._paths,
+            self._file_types,
+            self._node_types,
+            offsets,
+            targets,
+            self._externals,
+            external_offsets,
+            external_targets
+        )
+
+
+class CompactDependencyGraph:
+    """
+    Dependency graph stored as integer CSR arrays.
+
+    Offers the read-only query API of DependencyGraph (paths in, paths out)
+    plus integer-level access for graph algorithms. External dependencies
+    are kept as module names only, without the imported symbols.
+
+    Attributes:
+        paths: Path of every file, indexed by file ID
+        file_types: Names of the file types, indexed by type code
+    """
+
+    def __init__(
+        self,
+        paths: List[str],
+        file_types: List[str],
+        node_types: bytearray,
+        offsets: array,
+        targets: array,
+        externals: List[str],
+        external_offsets: array,
+        external_targets: array
+    ):
+        """
+        Initialize a graph from its arrays (see CompactDependencyGraphBuilder).
+
+        Args:
+            paths: Path of every file, indexed by file ID
+            file_types: Names of the file types, indexed by type code
+            node_types: Type code of every file
+            offsets: CSR offsets of the dependencies
+            targets: CSR targets of the dependencies
+            externals: Names of the external dependencies
+            external_offsets: CSR offsets of the external dependencies
+            external_targets: CSR targets of the external dependencies
+        """
+        self.paths = paths
+        self.file_types = file_types
+        self._node_types = node_types
+        self._ids = {path: node_id for node_id, path in enumerate(paths)}
+        self._offsets = offsets
+        self._targets = targets
+        self._reverse: Optional[Tuple[array, array]] = None
+        self._externals = externals
+        self._external_offsets = external_offsets
+        self._external_targets = external_targets
+        self._components: Optional[Tuple[array, int]] = None
+        self._impact_cache: 'OrderedDict[Tuple[str, int, Optional[int]], Dict[int, int]]' = OrderedDict()
+
+    @classmethod
+    def from_graph(cls, graph) -> 'CompactDependencyGraph':
+        """
+        Convert a DependencyGraph.
+
+        Args:
+            graph: The DependencyGraph
+
+        Returns:
+            CompactDependencyGraph: The same graph in compact form
+        """
+        builder = CompactDependencyGraphBuilder()
+        for path, node in graph.nodes.items():
+            builder.add_node(path, node.file_type)
+
+        for path, node in graph.nodes.items():
+            source = builder.add_node(path, node.file_type)
+            for dependency in node.dependencies:
+                builder.add_dependency(source, builder.add_node(dependency.path, dependency.file_type))
+            for external in node.external_dependencies:
+                builder.add_external_dependency(source, external.name)
+
+        return builder.build()
+
+    def __len__(self) -> int:
+        """Number of files in the graph."""
+        return len(self.paths)
+
+    def __contains__(self, path: str) -> bool:
+        """Whether a file is part of the graph."""
+        return path in self._ids
+
+    @property
+    def edge_count(self) -> int:
+        """Number of imports between files of the graph."""
+        return len(self._targets)
+
+    def get_id(self, path: str) -> Optional[int]:
+        """
+        Get the ID of a file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            The file ID, or None if the file is not part of the graph
+        """
+        return self._ids.get(path)
+
+    def get_file_type(self, node_id: int) -> str:
+        """
+        Get the type of a file.
+
+        Args:
+            node_id: ID of the file
+
+        Returns:
+            Type of the file ('python', 'javascript', 'typescript', etc.)
+        """
+        return self.file_types[self._node_types[node_id]]
+
+    def successors(self, node_id: int) -> array:
+        """
+        Get the IDs of the files a file imports.
+
+        Args:
+            node_id: ID of the file
+
+        Returns:
+            Sorted array of file IDs
+        """
+        return self._targets[self._offsets[node_id]:self._offsets[node_id + 1]]
+
+    def predecessors(self, node_id: int) -> array:
+        """
+        Get the IDs of the files importing a file.
+
+        Args:
+            node_id: ID of the file
+
+        Returns:
+            Sorted array of file IDs
+        """
+        reverse_offsets, sources = self._get_reverse()
+        return sources[reverse_offsets[node_id]:reverse_offsets[node_id + 1]]
+
+    def _get_reverse(self) -> Tuple[array, array]:
+        """Get the reversed CSR arrays, building them on first use."""
+        if self._reverse is None:
+            self._reverse = _transpose(len(self.paths), self._offsets, self._targets)
+        return self._reverse
+
+    def out_degrees(self) -> array:
+        """
+        Get the number of files every file imports.
+
+        Returns:
+            Array of degrees, indexed by file ID
+        """
+        offsets = self._offsets
+        return array('l', (offsets[i + 1] - offsets[i] for i in range(len(self.paths))))
+
+    def in_degrees(self) -> array:
+        """
+        Get the number of files importing every file.
+
+        Returns:
+            Array of degrees, indexed by file ID
+        """
+        reverse_offsets, _ = self._get_reverse()
+        return array('l', (reverse_offsets[i + 1] - reverse_offsets[i] for i in range(len(self.paths))))
+
+    def get_dependencies_for(self, path: str) -> List[str]:
+        """
+        Get the dependencies for a specific file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            List of paths to dependencies
+        """
+        node_id = self._ids.get(path)
+        if node_id is None:
+            return []
+        return [self.paths[target] for target in self.successors(node_id)]
+
+    def get_dependents_for(self, path: str) -> List[str]:
+        """
+        Get the files that depend on a specific file.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            List of paths to dependent files
+        """
+        node_id = self._ids.get(path)
+        if node_id is None:
+            return []
+        return [self.paths[source] for source in self.predecessors(node_id)]
+
+    def get_impact(
+        self,
+        paths: List[str],
+        max_depth: Optional[int] = None,
+        direction: str = DEPENDENTS
+    ) -> Dict[str, int]:
+        """
+        Get the files reachable from any of several files.
+
+        Searches from each file are memoized on the graph, so repeated
+        queries against the same graph don't walk it again.
+
+        Args:
+            paths: Paths to the files
+            max_depth: Maximum number of import hops to follow (unlimited if None)
+            direction: DEPENDENTS for the files affected by a change to the
+                files, DEPENDENCIES for the files they rely on
+
+        Returns:
+            Dictionary mapping every reachable path, other than the given
+            ones, to the smallest number of hops from any of them
+
+        Raises:
+            ValueError: If the direction is unknown
+        """
+        if direction not in (DEPENDENTS, DEPENDENCIES):
+            raise ValueError(f"Unknown direction: {direction}")
+
+        sources = {self._ids[path] for path in paths if path in self._ids}
+        impact: Dict[int, int] = {}
+        for source in sources:
+            for node_id, depth in self._get_reachable(source, direction, max_depth).items():
+                if node_id not in sources and depth < impact.get(node_id, depth + 1):
+                    impact[node_id] = depth
+        return {self.paths[node_id]: depth for node_id, depth in impact.items()}
+
+    def _get_reachable(self, start: int, direction: str, max_depth: Optional[int]) -> Dict[int, int]:
+        """
+        Breadth-first search along dependencies or dependents, memoized.
+
+        Args:
+            start: ID of the file to start from
+            direction: DEPENDENTS or DEPENDENCIES
+            max_depth: Maximum number of hops (unlimited if None)
+
+        Returns:
+            Dictionary mapping reachable file IDs to their distance; shared
+            with the memo, so it must not be modified
+        """
+        key = (direction, start, max_depth)
+        reachable = self._impact_cache.get(key)
+        if reachable is not None:
+            self._impact_cache.move_to_end(key)
+            return reachable
+
+        neighbors = self.predecessors if direction == DEPENDENTS else self.successors
+        reachable = {start: 0}
+        frontier = [start]
+        depth = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            next_frontier = []
+            for node_id in frontier:
+                for neighbor in neighbors(node_id):
+                    if neighbor not in reachable:
+                        reachable[neighbor] = depth
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        del reachable[start]
+
+        self._impact_cache[key] = reachable
+        while len(self._impact_cache) > DEFAULT_IMPACT_CACHE_SIZE:
+            self._impact_cache.popitem(last=False)
+        return reachable
+
+    def get_external_dependencies_for(self, path: str) -> List[str]:
+        """
+        Get the external modules a file imports.
+
+        Args:
+            path: Path to the file
+
+        Returns:
+            List of external dependency names
+        """
+        node_id = self._ids.get(path)
+        if node_id is None:
+            return []
+        start, end = self._external_offsets[node_id], self._external_offsets[node_id + 1]
+        return [self._externals[external] for external in self._external_targets[start:end]]
+
+    def _get_components(self) -> Tuple[array, int]:
+        """Get the strongly connected components, computing them on first use."""
+        if self._components is None:
+            self._components = strongly_connected_components(len(self.paths), self._offsets, self._targets)
+        return self._components
+
+    def _get_component_members(self) -> List[List[int]]:
+        """Get the file IDs of every component with more than one file."""
+        component_of, component_count = self._get_components()
+        sizes = array('l', [0]) * component_count
+        for component in component_of:
+            sizes[component] += 1
+
+        members: Dict[int, List[int]] = {}
+        for node_id, component in enumerate(component_of):
+            if sizes[component] > 1:
+                members.setdefault(component, []).append(node_id)
+        return list(members.values())
+
+    def find_strongly_connected_components(self) -> List[List[str]]:
+        """
+        Find the clusters of files that import each other, directly or indirectly.
+
+        Returns:
+            List of strongly connected components with more than one file,
+            largest first; each component is a sorted list of paths
+        """
+        components = [sorted(self.paths[node_id] for node_id in members) for members in self._get_component_members()]
+        components.sort(key=lambda component: (-len(component), component[0]))
+        return components
+
+    def find_elementary_cycles(
+        self,
+        component: Optional[List[str]] = None,
+        max_cycles: int = DEFAULT_MAX_CYCLES_PER_COMPONENT,
+        max_length: int = DEFAULT_MAX_CYCLE_LENGTH
+    ) -> List[List[str]]:
+        """
+        Enumerate elementary import cycles, a bounded number per component.
+
+        See enumerate_cycles for the bounds.
+
+        Args:
+            component: Paths of one strongly connected component (all
+                components if not given)
+            max_cycles: Maximum number of cycles per component
+            max_length: Maximum number of files in a cycle
+
+        Returns:
+            List of cycles, each a list of paths without repeating the first
+        """
+        if component is None:
+            cycles = []
+            for scc in self.find_strongly_connected_components():
+                cycles.extend(self.find_elementary_cycles(scc, max_cycles, max_length))
+            return cycles
+
+        component = sorted(component)
+        positions = {self._ids[path]: i for i, path in enumerate(component)}
+        adjacency = [
+            [positions[target] for target in self.successors(self._ids[path]) if target in positions]
+            for path in component
+        ]
+        adjacency = [sorted(successors) for successors in adjacency]
+
+        return [[component[i] for i in cycle] for cycle in enumerate_cycles(adjacency, max_cycles, max_length)]
+
+    def find_circular_dependencies(self, max_cycles_per_component: int = DEFAULT_MAX_CYCLES_PER_COMPONENT) -> List[List[str]]:
+        """
+        Find circular dependencies in the graph.
+
+        Args:
+            max_cycles_per_component: Maximum number of cycles reported per cluster
+
+        Returns:
+            List of lists, where each inner list is a cycle of files
+        """
+        return self.find_elementary_cycles(max_cycles=max_cycles_per_component)
+
+    def topological_layers(self) -> List[List[str]]:
+        """
+        Group files into layers by how deep their imports go.
+
+        Layer 0 holds files without dependencies in the repository; every
+        other file is one layer above its deepest dependency. Files in an
+        import cycle share a layer.
+
+        Returns:
+            List of layers, each a sorted list of paths
+        """
+        component_of, component_count = self._get_components()
+        num_nodes = len(self.paths)
+
+        # Components are numbered dependencies first, so visiting the files
+        # by component number sees every dependency's final layer
+        order = sorted(range(num_nodes), key=component_of.__getitem__)
+        layer_of = array('l', [0]) * component_count
+        for node_id in order:
+            component = component_of[node_id]
+            for target in self.successors(node_id):
+                target_component = component_of[target]
+                if target_component != component and layer_of[target_component] + 1 > layer_of[component]:
+                    layer_of[component] = layer_of[target_component] + 1
+
+        layers: List[List[str]] = [[] for _ in range(max(layer_of, default=-1) + 1)]
+        for node_id in range(num_nodes):
+            layers[layer_of[component_of[node_id]]].append(self.paths[node_id])
+        for layer in layers:
+            layer.sort()
+        return layers
+
+    def to_visualization(self) -> Dict[str, Any]:
+        """
+        Get the graph in the format of create_dependency_visualization.
+
+        Returns:
+            Dict with 'nodes' and 'edges' lists
+        """
+        paths = self.paths
+        nodes = [
+            {
+                "id": path,
+                "name": os.path.basename(path),
+                "path": path,
+                "type": self.get_file_type(node_id)
+            }
+            for node_id, path in enumerate(paths)
+        ]
+
+        edges = []
+        offsets, targets = self._offsets, self._targets
+        for source, path in enumerate(paths):
+            for edge in range(offsets[source], offsets[source + 1]):
+                edges.append({"source": path, "target": paths[targets[edge]], "type": "dependency"})
+
+        return {
+            "nodes": nodes,
+            "edges": edges
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the graph to JSON-compatible data.
+
+        Returns:
+            Dict of plain lists (see from_dict)
+        """
+        return {
+            "paths": self.paths,
+            "file_types": self.file_types,
+            "node_types": list(self._node_types),
+            "offsets": self._offsets.tolist(),
+            "targets": self._targets.tolist(),
+            "externals": self._externals,
+            "external_offsets": self._external_offsets.tolist(),
+            "external_targets": self._external_targets.tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CompactDependencyGraph':
+        """
+        Deserialize a graph serialized with to_dict.
+
+        Args:
+            data: Serialized graph
+
+        Returns:
+            CompactDependencyGraph: The graph
+        """
+        return cls(
+            list(data["paths"]),
+            list(data["file_types"]),
+            bytearray(data["node_types"]),
+            array('l', data["offsets"]),
+            array('l', data["targets"]),
+            list(data["externals"]),
+            array('l', data["external_offsets"]),
+            array('l', data["external_targets"])
+        )
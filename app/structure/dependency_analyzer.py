@@ -6,8 +6,23 @@ files and build a dependency graph representing the relationships between module
 """
 import os
 import re
-import ast
-from typing import Dict, List, Any, Optional, Set, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Set, Tuple, Union
+
+from app.analysis.analysis_cache import AnalysisCache, analyze_source, analyze_sources
+from app.analysis.parsed_module import ParsedModule, parse_python_module
+from app.analysis.python_extractor import ImportExtractor
+from app.structure.compact_dependency_graph import (
+    DEFAULT_IMPACT_CACHE_SIZE,
+    DEFAULT_MAX_CYCLES_PER_COMPONENT,
+    DEFAULT_MAX_CYCLE_LENGTH,
+    DEPENDENCIES,
+    DEPENDENTS,
+    CompactDependencyGraph,
+    CompactDependencyGraphBuilder
+)
+from app.structure.file_index import RepositoryFileIndex, candidate_paths
 
 
 class DependencyNode:
@@ -17,6 +32,7 @@ class DependencyNode:
     Attributes:
         path: Path to the file relative to the repository root
         dependencies: Set of dependency nodes
+        dependents: Set of nodes that depend on this node
         external_dependencies: Set of external dependencies (e.g., imported libraries)
     """
     
@@ -32,7 +48,9 @@ class DependencyNode:
         self.name = os.path.basename(path)
         self.file_type = file_type
         self.dependencies = set()  # Internal dependencies (other files in the repository)
+        self.dependents = set()  # Files in the repository depending on this one
         self.external_dependencies = set()  # External dependencies (libraries)
+        self.graph = None  # DependencyGraph the node belongs to, if any
         
     def add_dependency(self, dependency: 'DependencyNode') -> None:
         """
@@ -41,8 +59,11 @@ class DependencyNode:
         Args:
             dependency: The dependency node
         """
-        if dependency != self:  # Avoid self-dependencies
+        if dependency != self and dependency not in self.dependencies:  # Avoid self-dependencies
             self.dependencies.add(dependency)
+            dependency.dependents.add(self)
+            if self.graph is not None:
+                self.graph._impact_cache.clear()
             
     def add_external_dependency(self, name: str, imports: Optional[List[str]] = None) -> None:
         """
@@ -96,6 +117,8 @@ class DependencyGraph:
     def __init__(self):
         """Initialize an empty dependency graph."""
         self.nodes = {}
+        # Memoized transitive queries, cleared whenever an edge is added
+        self._impact_cache: 'OrderedDict[Tuple[str, str, Optional[int]], Dict[str, int]]' = OrderedDict()
         
     def add_node(self, path: str, file_type: str) -> DependencyNode:
         """
@@ -109,47 +132,63 @@ class DependencyGraph:
             The new or existing node
         """
         if path not in self.nodes:
-            self.nodes[path] = DependencyNode(path, file_type)
+            node = DependencyNode(path, file_type)
+            node.graph = self
+            self.nodes[path] = node
         return self.nodes[path]
         
-    def find_circular_dependencies(self) -> List[List[str]]:
+    def find_strongly_connected_components(self) -> List[List[str]]:
         """
-        Find circular dependencies in the graph.
+        Find the clusters of files that import each other, directly or indirectly.
+        
+        Runs Tarjan's algorithm on a compact copy of the graph (see
+        CompactDependencyGraph), in time linear in the number of files and
+        imports.
         
         Returns:
-            List of lists, where each inner list is a cycle of files
+            List of strongly connected components with more than one file,
+            largest first; each component is a sorted list of paths
         """
-        cycles = []
-        visited = set()
-        path = []
-        path_set = set()
-        
-        def dfs(node):
-            if node.path in path_set:
-                # Found a cycle
-                cycle_start = path.index(node.path)
-                cycles.append(path[cycle_start:])
-                return
-                
-            if node.path in visited:
-                return
-                
-            visited.add(node.path)
-            path.append(node.path)
-            path_set.add(node.path)
+        return CompactDependencyGraph.from_graph(self).find_strongly_connected_components()
+    
+    def find_elementary_cycles(
+        self,
+        component: Optional[List[str]] = None,
+        max_cycles: int = DEFAULT_MAX_CYCLES_PER_COMPONENT,
+        max_length: int = DEFAULT_MAX_CYCLE_LENGTH
+    ) -> List[List[str]]:
+        """
+        Enumerate elementary import cycles, a bounded number per component.
+        
+        Each cycle is reported once, starting at its smallest path. A
+        component always yields at least its shortest cycle through its first
+        file, even if that is longer than ``max_length``.
+        
+        Args:
+            component: Paths of one strongly connected component (all
+                components if not given)
+            max_cycles: Maximum number of cycles per component
+            max_length: Maximum number of files in a cycle
             
-            for dep in node.dependencies:
-                dfs(dep)
-                
-            path.pop()
-            path_set.remove(node.path)
+        Returns:
+            List of cycles, each a list of paths without repeating the first
+        """
+        return CompactDependencyGraph.from_graph(self).find_elementary_cycles(component, max_cycles, max_length)
+    
+    def find_circular_dependencies(self, max_cycles_per_component: int = DEFAULT_MAX_CYCLES_PER_COMPONENT) -> List[List[str]]:
+        """
+        Find circular dependencies in the graph.
         
-        # Run DFS from each node
-        for node in self.nodes.values():
-            if node.path not in visited:
-                dfs(node)
-                
-        return cycles
+        Every cluster of mutually dependent files (see
+        find_strongly_connected_components) contributes at least one cycle.
+        
+        Args:
+            max_cycles_per_component: Maximum number of cycles reported per cluster
+            
+        Returns:
+            List of lists, where each inner list is a cycle of files
+        """
+        return self.find_elementary_cycles(max_cycles=max_cycles_per_component)
         
     def get_dependencies_for(self, path: str) -> List[str]:
         """
@@ -179,20 +218,118 @@ class DependencyGraph:
         if path not in self.nodes:
             return []
             
-        dependents = []
-        for node_path, node in self.nodes.items():
-            if self.nodes[path] in node.dependencies:
-                dependents.append(node_path)
-                
-        return dependents
+        return [dependent.path for dependent in self.nodes[path].dependents]
+        
+    def get_transitive_dependents(self, path: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """
+        Get the files affected by a change to a file (its blast radius).
+        
+        Args:
+            path: Path to the file
+            max_depth: Maximum number of import hops to follow (unlimited if None)
+            
+        Returns:
+            Dictionary mapping the path of every file that depends on the
+            file, directly or indirectly, to the number of hops in between
+        """
+        return dict(self._get_reachable(path, DEPENDENTS, max_depth))
+        
+    def get_transitive_dependencies(self, path: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """
+        Get the files a file depends on, directly or indirectly.
+        
+        Args:
+            path: Path to the file
+            max_depth: Maximum number of import hops to follow (unlimited if None)
+            
+        Returns:
+            Dictionary mapping the path of every dependency to the number of
+            hops in between
+        """
+        return dict(self._get_reachable(path, DEPENDENCIES, max_depth))
+        
+    def get_impact(
+        self,
+        paths: List[str],
+        max_depth: Optional[int] = None,
+        direction: str = DEPENDENTS
+    ) -> Dict[str, int]:
+        """
+        Get the files reachable from any of several files.
+        
+        Args:
+            paths: Paths to the files
+            max_depth: Maximum number of import hops to follow (unlimited if None)
+            direction: DEPENDENTS for the files affected by a change to the
+                files, DEPENDENCIES for the files they rely on
+            
+        Returns:
+            Dictionary mapping every reachable path, other than the given
+            ones, to the smallest number of hops from any of them
+            
+        Raises:
+            ValueError: If the direction is unknown
+        """
+        if direction not in (DEPENDENTS, DEPENDENCIES):
+            raise ValueError(f"Unknown direction: {direction}")
+        
+        sources = set(paths)
+        impact = {}
+        for path in sources:
+            for reachable_path, depth in self._get_reachable(path, direction, max_depth).items():
+                if reachable_path not in sources and depth < impact.get(reachable_path, depth + 1):
+                    impact[reachable_path] = depth
+        return impact
+        
+    def _get_reachable(self, path: str, direction: str, max_depth: Optional[int]) -> Dict[str, int]:
+        """
+        Breadth-first search along dependencies or dependents, memoized.
+        
+        Args:
+            path: Path to start from
+            direction: DEPENDENTS or DEPENDENCIES
+            max_depth: Maximum number of hops (unlimited if None)
+            
+        Returns:
+            Dictionary mapping reachable paths to their distance; shared with
+            the memo, so it must not be modified
+        """
+        key = (direction, path, max_depth)
+        reachable = self._impact_cache.get(key)
+        if reachable is not None:
+            self._impact_cache.move_to_end(key)
+            return reachable
+        
+        reachable = {}
+        start = self.nodes.get(path)
+        if start is not None:
+            reachable[path] = 0
+            frontier = [start]
+            depth = 0
+            while frontier and (max_depth is None or depth < max_depth):
+                depth += 1
+                next_frontier = []
+                for node in frontier:
+                    neighbors = node.dependents if direction == DEPENDENTS else node.dependencies
+                    for neighbor in neighbors:
+                        if neighbor.path not in reachable:
+                            reachable[neighbor.path] = depth
+                            next_frontier.append(neighbor)
+                frontier = next_frontier
+            del reachable[path]
+        
+        self._impact_cache[key] = reachable
+        while len(self._impact_cache) > DEFAULT_IMPACT_CACHE_SIZE:
+            self._impact_cache.popitem(last=False)
+        return reachable
 
 
-def extract_python_imports(code: str) -> Dict[str, List[str]]:
+def extract_python_imports(code: Union[str, ParsedModule]) -> Dict[str, List[str]]:
     """
     Extract import statements from Python code.
     
     Args:
-        code: Python source code
+        code: Python source code, or an already parsed module
         
     Returns:
         Dictionary mapping imported module names to lists of imported symbols
@@ -200,25 +337,9 @@ def extract_python_imports(code: str) -> Dict[str, List[str]]:
     imports = {}
     
     try:
-        # Parse the code into an AST
-        tree = ast.parse(code)
-        
-        # Find all import statements
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                # Handle "import module"
-                for name in node.names:
-                    imports[name.name] = []
-                    
-            elif isinstance(node, ast.ImportFrom):
-                # Handle "from module import name"
-                if node.module:
-                    if node.module not in imports:
-                        imports[node.module] = []
-                    
-                    for name in node.names:
-                        if name.name != '*':
-                            imports[node.module].append(name.name)
+        # Parse the code (or reuse an already parsed module) and find all imports
+        module = parse_python_module(code)
+        imports = module.get(ImportExtractor).get_imports()
     except SyntaxError:
         # If the code has syntax errors, try a regex-based approach
         import_regex = re.compile(r'^(?:from\s+([.\w]+)\s+import\s+([*\w, ]+)|import\s+([.\w, ]+))', re.MULTILINE)
@@ -298,7 +419,8 @@ def extract_js_imports(code: str) -> Dict[str, List[str]]:
     return imports
 
 
-def resolve_import_path(import_path: str, file_path: str, root_path: str) -> Optional[str]:
+def resolve_import_path(import_path: str, file_path: str, root_path: str,
+                        file_index: Optional[RepositoryFileIndex] = None) -> Optional[str]:
     """
     Resolve an import path to a file path in the repository.
     
@@ -306,10 +428,15 @@ def resolve_import_path(import_path: str, file_path: str, root_path: str) -> Opt
         import_path: The import path from the code
         file_path: Path to the file containing the import
         root_path: Path to the repository root
+        file_index: Optional index of the repository files; when given, the
+            candidates are looked up in memory instead of on disk
         
     Returns:
         Resolved path or None if it can't be resolved
     """
+    if file_index is not None:
+        return file_index.resolve(import_path, os.path.relpath(file_path, file_index.root_path))
+    
     # Check if it's a relative import
     if import_path.startswith('.'):
         # Convert the file path to a directory path
@@ -329,44 +456,15 @@ def resolve_import_path(import_path: str, file_path: str, root_path: str) -> Opt
             # Implicit same directory: .module
             relative_path = import_path[1:]
         
-        # Construct potential file paths
-        potential_paths = [
-            os.path.join(dir_path, relative_path),
-            os.path.join(dir_path, relative_path + '.py'),
-            os.path.join(dir_path, relative_path + '.js'),
-            os.path.join(dir_path, relative_path + '.jsx'),
-            os.path.join(dir_path, relative_path + '.ts'),
-            os.path.join(dir_path, relative_path + '.tsx'),
-            os.path.join(dir_path, relative_path, '__init__.py'),
-            os.path.join(dir_path, relative_path, 'index.js'),
-            os.path.join(dir_path, relative_path, 'index.jsx'),
-            os.path.join(dir_path, relative_path, 'index.ts'),
-            os.path.join(dir_path, relative_path, 'index.tsx')
-        ]
-        
         # Check if any potential path exists
-        for path in potential_paths:
+        for path in candidate_paths(dir_path, relative_path):
             if os.path.exists(path):
                 # Convert to a path relative to the repository root
                 rel_path = os.path.relpath(path, root_path)
                 return rel_path
     
     # Check if it's a package-relative import (e.g., 'src/module')
-    potential_paths = [
-        os.path.join(root_path, import_path),
-        os.path.join(root_path, import_path + '.py'),
-        os.path.join(root_path, import_path + '.js'),
-        os.path.join(root_path, import_path + '.jsx'),
-        os.path.join(root_path, import_path + '.ts'),
-        os.path.join(root_path, import_path + '.tsx'),
-        os.path.join(root_path, import_path, '__init__.py'),
-        os.path.join(root_path, import_path, 'index.js'),
-        os.path.join(root_path, import_path, 'index.jsx'),
-        os.path.join(root_path, import_path, 'index.ts'),
-        os.path.join(root_path, import_path, 'index.tsx')
-    ]
-    
-    for path in potential_paths:
+    for path in candidate_paths(root_path, import_path):
         if os.path.exists(path):
             # Convert to a path relative to the repository root
             rel_path = os.path.relpath(path, root_path)
@@ -405,73 +503,308 @@ def resolve_import_path(import_path: str, file_path: str, root_path: str) -> Opt
     return None
 
 
-def analyze_dependencies(repo_path: str) -> DependencyGraph:
+# File extensions analyzed for dependencies and their file types
+CODE_FILE_TYPES = {
+    '.py': 'python',
+    '.js': 'javascript',
+    '.jsx': 'javascript',
+    '.ts': 'typescript',
+    '.tsx': 'typescript',
+}
+
+# Default number of worker processes for analyze_dependencies (1 = serial)
+DEFAULT_WORKERS = int(os.environ.get('REPOMIND_DEPENDENCY_WORKERS', '1'))
+
+# Number of files handed to a worker process at a time
+DEFAULT_CHUNK_SIZE = 256
+
+# Analysis cache used by the current worker process (set by _init_worker)
+_worker_cache: Optional[AnalysisCache] = None
+
+
+def _read_python_imports(file_path: str, cache: Optional[AnalysisCache] = None) -> Optional[Dict[str, List[str]]]:
     """
-    Analyze dependencies between files in a repository.
+    Read a Python file and extract its imports.
+    
+    Args:
+        file_path: Absolute path to the file
+        cache: Optional analysis cache
+        
+    Returns:
+        Dictionary mapping imported module names to lists of imported symbols,
+        or None if the file can't be read
+    """
+    try:
+        if cache is not None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            
+            return analyze_source(content, '.py', cache)['imports']
+        
+        with open(file_path, 'r', encoding='utf-8') as f:
+            return extract_python_imports(f.read())
+    except (UnicodeDecodeError, PermissionError):
+        # Skip files that can't be read
+        return None
+
+
+def _read_imports_batch(items: List[Tuple[str, str]],
+                        cache: Optional[AnalysisCache] = None) -> List[Optional[Dict[str, List[str]]]]:
+    """
+    Read a batch of code files and extract their imports.
+    
+    Python files are read one at a time. TypeScript/JavaScript files are
+    analyzed together with analyze_sources, with or without the cache, so the
+    TypeScript parser workers get them in one batch and the imports are the
+    same whether or not the cache is used.
+    
+    Args:
+        items: List of (file_path, ext) pairs
+        cache: Optional analysis cache
+        
+    Returns:
+        Imports per file, or None for files that can't be read
+    """
+    results: List[Optional[Dict[str, List[str]]]] = [None] * len(items)
+    # (position, raw content, ext) of the TypeScript/JavaScript files
+    scripts = []
+    
+    for position, (file_path, ext) in enumerate(items):
+        if ext == '.py':
+            results[position] = _read_python_imports(file_path, cache)
+            continue
+        
+        try:
+            with open(file_path, 'rb') as f:
+                scripts.append((position, f.read(), ext))
+        except PermissionError:
+            continue
+    
+    if scripts:
+        analyses = analyze_sources([(content, ext) for _, content, ext in scripts], cache)
+        for (position, _, _), analysis in zip(scripts, analyses):
+            if analysis is not None:
+                results[position] = analysis['imports']
+    
+    return results
+
+
+def _read_imports(items: List[Tuple[str, str]], cache: Optional[AnalysisCache],
+                  chunk_size: int) -> List[Optional[Dict[str, List[str]]]]:
+    """
+    Read code files and extract their imports, in batches of chunk_size files.
+    
+    Args:
+        items: List of (file_path, ext) pairs
+        cache: Optional analysis cache
+        chunk_size: Number of files per batch
+        
+    Returns:
+        Imports per file, in the same order as items
+    """
+    results = []
+    for i in range(0, len(items), chunk_size):
+        results.extend(_read_imports_batch(items[i:i + chunk_size], cache))
+    return results
+
+
+def _init_worker(cache: Optional[AnalysisCache]) -> None:
+    """
+    Initialize a worker process with its own copy of the analysis cache.
+    
+    Args:
+        cache: Analysis cache to use in this process, if any
+    """
+    global _worker_cache
+    _worker_cache = cache
+
+
+def _read_imports_chunk(chunk: List[Tuple[str, str]]) -> Tuple[List[Optional[Dict[str, List[str]]]], int, int]:
+    """
+    Extract the imports for a chunk of files in a worker process.
+    
+    Args:
+        chunk: List of (file_path, ext) pairs
+        
+    Returns:
+        Tuple of (imports per file, cache hits, cache misses)
+    """
+    cache = _worker_cache
+    hits = cache.hits if cache else 0
+    misses = cache.misses if cache else 0
+    
+    results = _read_imports_batch(chunk, cache)
+    
+    if cache is None:
+        return results, 0, 0
+    return results, cache.hits - hits, cache.misses - misses
+
+
+def _collect_code_files(repo_path: str,
+                        file_index: Optional[RepositoryFileIndex] = None,
+                        exclude_dirs: Optional[List[str]] = None) -> List[Tuple[str, str, str]]:
+    """
+    Walk the repository and collect the code files to analyze.
     
     Args:
         repo_path: Path to the repository root
+        file_index: Optional file index to populate during the same walk
+        exclude_dirs: Names of directories whose files are not analyzed
         
     Returns:
-        DependencyGraph: Graph representing the dependencies between files
+        List of (file_path, rel_path, ext) tuples in walk order
     """
-    graph = DependencyGraph()
+    code_files = []
+    excluded = set(exclude_dirs or ())
     
-    # Walk the repository and process each file
-    for root, _, files in os.walk(repo_path):
+    for root, dirs, files in os.walk(repo_path):
+        if file_index is not None:
+            # Index everything, including ignored directories, as imports may point there
+            file_index.add_walk_entry(os.path.abspath(root), dirs, files)
+        
         # Skip common directories to ignore
         if any(ignored in root for ignored in ['/node_modules/', '/.git/', '/__pycache__/']):
             continue
+        if excluded and not excluded.isdisjoint(os.path.relpath(root, repo_path).split(os.sep)):
+            continue
         
         for filename in files:
-            file_path = os.path.join(root, filename)
-            rel_path = os.path.relpath(file_path, repo_path)
-            
-            # Determine file type
+            # Skip non-code files
             ext = os.path.splitext(filename)[1].lower()
-            
-            if ext == '.py':
-                file_type = 'python'
-                import_extractor = extract_python_imports
-            elif ext in ['.js', '.jsx']:
-                file_type = 'javascript'
-                import_extractor = extract_js_imports
-            elif ext in ['.ts', '.tsx']:
-                file_type = 'typescript'
-                import_extractor = extract_js_imports
-            else:
-                # Skip non-code files
+            if ext not in CODE_FILE_TYPES:
                 continue
             
-            # Create a node for this file
-            node = graph.add_node(rel_path, file_type)
+            file_path = os.path.join(root, filename)
+            code_files.append((file_path, os.path.relpath(file_path, repo_path), ext))
+    
+    return code_files
+
+
+def _read_imports_parallel(code_files: List[Tuple[str, str, str]], cache: Optional[AnalysisCache],
+                           workers: int, chunk_size: int) -> List[Optional[Dict[str, List[str]]]]:
+    """
+    Extract imports for many files using a process pool.
+    
+    Only Python files are handed to the worker processes. TypeScript/JavaScript
+    files are analyzed in this process while the workers run: the TypeScript
+    parser workers already run in parallel, and a parser pool started in each
+    worker process would split the batches and multiply the Node.js processes.
+    
+    Args:
+        code_files: List of (file_path, rel_path, ext) tuples
+        cache: Optional analysis cache
+        workers: Number of worker processes
+        chunk_size: Number of files per task
+        
+    Returns:
+        Imports per file, in the same order as code_files
+    """
+    python_positions = [i for i, (_, _, ext) in enumerate(code_files) if ext == '.py']
+    script_positions = [i for i, (_, _, ext) in enumerate(code_files) if ext != '.py']
+    
+    items = [(code_files[i][0], code_files[i][2]) for i in python_positions]
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    
+    results: List[Optional[Dict[str, List[str]]]] = [None] * len(code_files)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(cache,)) as executor:
+        chunk_results = executor.map(_read_imports_chunk, chunks)
+        
+        script_items = [(code_files[i][0], code_files[i][2]) for i in script_positions]
+        for position, imports in zip(script_positions, _read_imports(script_items, cache, chunk_size)):
+            results[position] = imports
+        
+        python_results = []
+        for imports, hits, misses in chunk_results:
+            python_results.extend(imports)
+            if cache is not None:
+                # Keep the parent's counters in step with the workers
+                cache.hits += hits
+                cache.misses += misses
+    
+    for position, imports in zip(python_positions, python_results):
+        results[position] = imports
+    
+    return results
+
+
+def analyze_dependencies(repo_path: str, cache: Optional[AnalysisCache] = None,
+                         workers: Optional[int] = None,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE,
+                         compact: bool = False,
+                         exclude_dirs: Optional[List[str]] = None) -> Union[DependencyGraph, CompactDependencyGraph]:
+    """
+    Analyze dependencies between files in a repository.
+    
+    Reading files and extracting imports can be fanned out to a process pool;
+    the import maps are then merged into the graph in the parent process in
+    walk order, so the result is identical to the serial analysis.
+    
+    Args:
+        repo_path: Path to the repository root
+        cache: Optional analysis cache, so unchanged files are not parsed again
+        workers: Number of worker processes (1 for serial, 0 for one per CPU,
+            None for REPOMIND_DEPENDENCY_WORKERS)
+        chunk_size: Number of files handed to a worker process at a time
+        compact: Build a CompactDependencyGraph, which takes far less memory
+            on large repositories but only keeps the names of external
+            dependencies and can't be modified
+        exclude_dirs: Names of directories whose files are left out of the
+            graph (imports of other files still resolve into them)
+        
+    Returns:
+        Graph representing the dependencies between files
+    """
+    if workers is None:
+        workers = DEFAULT_WORKERS
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    
+    graph = DependencyGraph()
+    builder = CompactDependencyGraphBuilder() if compact else None
+    
+    # Walk the repository, collecting each code file and indexing every path
+    # so imports are resolved without touching the filesystem
+    file_index = RepositoryFileIndex(repo_path)
+    code_files = _collect_code_files(repo_path, file_index, exclude_dirs)
+    
+    # Extract imports, in parallel when there is more than one chunk of work
+    if workers > 1 and len(code_files) > chunk_size:
+        all_imports = _read_imports_parallel(code_files, cache, workers, chunk_size)
+    else:
+        all_imports = _read_imports([(file_path, ext) for file_path, _, ext in code_files], cache, chunk_size)
+    
+    for (file_path, rel_path, ext), imports in zip(code_files, all_imports):
+        # Create a node for this file
+        if builder is not None:
+            node_id = builder.add_node(rel_path, CODE_FILE_TYPES[ext])
+        else:
+            node = graph.add_node(rel_path, CODE_FILE_TYPES[ext])
+        
+        if imports is None:
+            continue
+        
+        # Process each import
+        for module, imported_symbols in imports.items():
+            # Try to resolve the import to a file in the repository
+            resolved_path = file_index.resolve(module, rel_path)
             
-            # Extract imports
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    code = f.read()
-                
-                imports = import_extractor(code)
-                
-                # Process each import
-                for module, imported_symbols in imports.items():
-                    # Try to resolve the import to a file in the repository
-                    resolved_path = resolve_import_path(module, file_path, repo_path)
-                    
-                    if resolved_path:
-                        # This is an internal dependency
-                        dep_node = graph.add_node(
-                            resolved_path, 
-                            'python' if resolved_path.endswith('.py') else 
-                            'typescript' if resolved_path.endswith(('.ts', '.tsx')) else 
-                            'javascript'
-                        )
-                        node.add_dependency(dep_node)
-                    else:
-                        # This is an external dependency
-                        node.add_external_dependency(module, imported_symbols)
-            except (UnicodeDecodeError, PermissionError):
-                # Skip files that can't be read
-                continue
+            if resolved_path:
+                # This is an internal dependency
+                dep_type = (
+                    'python' if resolved_path.endswith('.py') else 
+                    'typescript' if resolved_path.endswith(('.ts', '.tsx')) else 
+                    'javascript'
+                )
+                if builder is not None:
+                    builder.add_dependency(node_id, builder.add_node(resolved_path, dep_type))
+                else:
+                    node.add_dependency(graph.add_node(resolved_path, dep_type))
+            elif builder is not None:
+                builder.add_external_dependency(node_id, module)
+            else:
+                # This is an external dependency
+                node.add_external_dependency(module, imported_symbols)
     
-    return graph 
\ No newline at end of file
+    if builder is not None:
+        return builder.build()
+    return graph
@@ -0,0 +1,196 @@
+"""
+Module for memoized dependency analysis artifacts.
+
+The dependency endpoint needs the dependency graph of a repository together
+with its import cycles, which are expensive to find on large repositories. A
+DependencyArtifact holds one analysis of a checkout: the compact graph (files,
+imports and external dependencies), its strongly connected components and the
+statistics derived from them. A DependencyArtifactCache keeps artifacts in
+memory per repository and commit, and persists them in the analysis cache
+under the commit SHA, so a commit is analyzed once even across restarts.
+"""
+from typing import Dict, Any, List, Optional
+
+from app.analysis.analysis_cache import AnalysisCache, get_analysis_cache
+from app.structure.checkout_cache import CheckoutCache, CheckoutKey, make_checkout_key
+from app.structure.compact_dependency_graph import CompactDependencyGraph
+
+
+# Default number of artifacts kept in memory
+DEFAULT_MAX_ARTIFACTS = 16
+
+# Analysis cache kind for persisted artifacts; bump the suffix when the format changes
+ARTIFACT_CACHE_KIND = "dependencies-1"
+
+
+class DependencyArtifact:
+    """
+    A single dependency analysis of a repository checkout.
+
+    Attributes:
+        graph: The compact dependency graph
+        stats: Dependency statistics (file and import counts, circular
+            dependencies and dependency clusters)
+        commit_sha: Commit the checkout was at when analyzed, if known
+    """
+
+    def __init__(
+        self,
+        graph: CompactDependencyGraph,
+        stats: Optional[Dict[str, Any]] = None,
+        commit_sha: Optional[str] = None
+    ):
+        """
+        Initialize an artifact.
+
+        Args:
+            graph: The compact dependency graph
+            stats: Dependency statistics (computed from the graph if not given)
+            commit_sha: Commit the checkout was at when analyzed
+        """
+        self.graph = graph
+        self.stats = stats if stats is not None else compute_dependency_stats(graph)
+        self.commit_sha = commit_sha
+        self._visualization: Optional[Dict[str, Any]] = None
+
+    @property
+    def visualization(self) -> Dict[str, Any]:
+        """
+        Get the graph in the format of create_dependency_visualization.
+
+        Returns:
+            Dict with 'nodes' and 'edges' lists
+        """
+        if self._visualization is None:
+            self._visualization = self.graph.to_visualization()
+        return self._visualization
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the artifact to JSON-compatible data.
+
+        Returns:
+            Dict with the serialized graph and statistics (see from_dict)
+        """
+        return {
+            "graph": self.graph.to_dict(),
+            "stats": self.stats,
+            "commit_sha": self.commit_sha
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DependencyArtifact':
+        """
+        Deserialize an artifact serialized with to_dict.
+
+        Args:
+            data: Serialized artifact
+
+        Returns:
+            DependencyArtifact: The artifact
+        """
+        return cls(
+            CompactDependencyGraph.from_dict(data["graph"]),
+            stats=data["stats"],
+            commit_sha=data.get("commit_sha")
+        )
+
+
+def compute_dependency_stats(graph: CompactDependencyGraph) -> Dict[str, Any]:
+    """
+    Compute the statistics reported with a dependency graph.
+
+    Args:
+        graph: The compact dependency graph
+
+    Returns:
+        Dict with 'total_files', 'total_dependencies', 'circular_dependencies'
+        and 'dependency_clusters'
+    """
+    return {
+        "total_files": len(graph),
+        "total_dependencies": graph.edge_count,
+        "circular_dependencies": graph.find_circular_dependencies(),
+        "dependency_clusters": graph.find_strongly_connected_components()
+    }
+
+
+def make_artifact_key(
+    repository_id: str,
+    commit_sha: Optional[str],
+    exclude_dirs: Optional[List[str]] = None
+) -> CheckoutKey:
+    """
+    Build the cache key for an artifact.
+
+    Args:
+        repository_id: ID of the repository
+        commit_sha: Commit checked out in the repository
+        exclude_dirs: Directories excluded from the analysis
+
+    Returns:
+        Hashable key for DependencyArtifactCache (see make_checkout_key)
+    """
+    return make_checkout_key(repository_id, commit_sha, exclude_dirs)
+
+
+class DependencyArtifactCache(CheckoutCache[DependencyArtifact]):
+    """
+    In-memory LRU cache of dependency artifacts, backed by the analysis cache.
+
+    Artifacts are keyed and evicted as described for CheckoutCache. Artifacts
+    of the whole repository are persisted under their commit SHA, which
+    identifies the repository content; artifacts with excluded directories
+    are kept in memory only.
+
+    Attributes:
+        store: Analysis cache artifacts are persisted in, if any
+    """
+
+    def __init__(self, store: Optional[AnalysisCache] = None, max_artifacts: int = DEFAULT_MAX_ARTIFACTS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            store: Analysis cache artifacts are persisted in (memory only if None)
+            max_artifacts: Maximum number of artifacts kept in memory
+        """
+        super().__init__(max_artifacts)
+        self.store = store
+
+    def _persisted(self, key: CheckoutKey) -> bool:
+        """Whether the artifact of a key is kept on disk."""
+        _, commit_sha, exclude_dirs = key
+        return self.store is not None and commit_sha is not None and not exclude_dirs
+
+    def _load(self, key: CheckoutKey) -> Optional[DependencyArtifact]:
+        """Load a persisted artifact."""
+        if not self._persisted(key):
+            return None
+        data = self.store.get(key[1], ARTIFACT_CACHE_KIND)
+        return DependencyArtifact.from_dict(data) if data is not None else None
+
+    def _store(self, key: CheckoutKey, artifact: DependencyArtifact) -> None:
+        """Persist an artifact of the whole repository."""
+        if self._persisted(key):
+            self.store.put(key[1], ARTIFACT_CACHE_KIND, artifact.to_dict())
+
+
+_default_artifact_cache: Optional[DependencyArtifactCache] = None
+
+
+def get_dependency_artifact_cache() -> DependencyArtifactCache:
+    """
+    Get the process-wide dependency artifact cache.
+
+    Artifacts are persisted in the process-wide analysis cache.
+
+    Returns:
+        The shared DependencyArtifactCache instance
+    """
+    global _default_artifact_cache
+
+    if _default_artifact_cache is None:
+        _default_artifact_cache = DependencyArtifactCache(get_analysis_cache())
+
+    return _default_artifact_cache
@@ -5,8 +5,12 @@ Provides functionality to scan directories recursively, collect file metadata,
 and build a hierarchical representation of the repository structure.
 """
 import os
+import stat
 import pathlib
-from typing import Dict, List, Any, Optional, Set
+from array import array
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+from app.structure.file_type_detector import FileTypeDetector, FileType
 
 
 class FileNode:
@@ -19,6 +23,9 @@ class FileNode:
         metadata: Dictionary of file metadata (size, modified time, etc.)
     """
     
+    __slots__ = ('name', 'path', 'metadata')
+    node_type = 'file'
+    
     def __init__(self, name: str, path: str, metadata: Optional[Dict[str, Any]] = None):
         """
         Initialize a FileNode.
@@ -31,7 +38,6 @@ class FileNode:
         self.name = name
         self.path = path
         self.metadata = metadata or {}
-        self.node_type = 'file'
         
     def get_extension(self) -> str:
         """
@@ -90,6 +96,9 @@ class DirectoryNode:
         children: List of child nodes (files and directories)
     """
     
+    __slots__ = ('name', 'path', 'children')
+    node_type = 'directory'
+    
     def __init__(self, name: str, path: str):
         """
         Initialize a DirectoryNode.
@@ -101,7 +110,6 @@ class DirectoryNode:
         self.name = name
         self.path = path
         self.children = []
-        self.node_type = 'directory'
         
     def add_child(self, node: Any) -> None:
         """
@@ -145,13 +153,24 @@ class DirectoryNode:
         return files
 
 
-def scan_directory(root_path: str, exclude_dirs: Optional[List[str]] = None) -> DirectoryNode:
+def scan_directory(
+    root_path: str,
+    exclude_dirs: Optional[List[str]] = None,
+    classify_files: bool = False,
+    compact: bool = False
+) -> DirectoryNode:
     """
     Scan a directory recursively and build a tree structure.
     
     Args:
         root_path: Path to the root directory to scan
         exclude_dirs: List of directory names to exclude (e.g., 'node_modules', '.git')
+        classify_files: Whether to detect the type of every file during the
+            scan and store it as the 'file_type' metadata (a FileType), so
+            the tree doesn't have to be read from disk again to show it
+        compact: Whether to keep the scan in a CompactDirectoryTree and return
+            a read-only view of it, instead of one object per file; much
+            cheaper for large checkouts
         
     Returns:
         DirectoryNode: Root node of the directory tree
@@ -162,6 +181,10 @@ def scan_directory(root_path: str, exclude_dirs: Optional[List[str]] = None) ->
     # Normalize the root path
     root_path = os.path.abspath(root_path)
     
+    if compact or classify_files:
+        tree = CompactDirectoryTree.scan(root_path, exclude_dirs, classify_files)
+        return tree.root if compact else tree.materialize()
+    
     # Create the root directory node
     root_name = os.path.basename(root_path)
     root_node = DirectoryNode(root_name, root_path)
@@ -208,6 +231,384 @@ def scan_directory(root_path: str, exclude_dirs: Optional[List[str]] = None) ->
     return root_node
 
 
+class CompactDirectoryTree:
+    """
+    Memory-compact result of a directory scan.
+    
+    Instead of one Python object per file, entries are stored in parallel
+    arrays indexed by entry number (0 is the root directory): the names
+    concatenated into one string with offsets, the parent index, the range of
+    child entries, and the size, modified time, created time and detected
+    file type. The entries of a directory are contiguous, subdirectories
+    first and then files, as with the os.walk based scan.
+    
+    The tree is read through lazy FileNode/DirectoryNode views (see root),
+    so code written against scan_directory keeps working.
+    
+    Attributes:
+        root_path: Absolute path of the scanned directory
+    """
+    
+    def __init__(self, root_path: str):
+        """
+        Initialize a tree holding only the root directory.
+        
+        Args:
+            root_path: Absolute path of the scanned directory
+        """
+        self.root_path = root_path
+        self._name_data = os.path.basename(root_path)
+        self._name_offsets = array('L', [0, len(self._name_data)])
+        self._parents = array('l', [-1])
+        self._is_dir = bytearray([1])
+        self._first_child = array('l', [0])
+        self._child_counts = array('L', [0])
+        self._sizes = array('q', [0])
+        self._modified = array('d', [0.0])
+        self._created = array('d', [0.0])
+        # FileType values; 0 when the file type was not detected
+        self._file_types = bytearray(1)
+    
+    @classmethod
+    def scan(
+        cls,
+        root_path: str,
+        exclude_dirs: Iterable[str],
+        classify_files: bool = False
+    ) -> 'CompactDirectoryTree':
+        """
+        Scan a directory tree with os.scandir.
+        
+        The entries returned by os.scandir already tell files from
+        directories, so only files are stat'ed. With classify_files, the type
+        of most files follows from the extension; only files with an unknown
+        extension are read, together in one batch after the walk.
+        
+        Args:
+            root_path: Absolute path of the directory to scan
+            exclude_dirs: Names of directories to skip
+            classify_files: Whether to detect the type of every file
+            
+        Returns:
+            CompactDirectoryTree: The scanned tree
+        """
+        tree = cls(root_path)
+        exclude_dirs = set(exclude_dirs)
+        detector = FileTypeDetector() if classify_files else None
+        unclassified: List[int] = []
+        
+        names = [tree.get_name(0)]
+        append_parent = tree._parents.append
+        append_size = tree._sizes.append
+        append_modified = tree._modified.append
+        append_created = tree._created.append
+        
+        stack = [(0, root_path)]
+        while stack:
+            dir_index, dir_path = stack.pop()
+            directories = []
+            files = []
+            
+            try:
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        try:
+                            is_dir = entry.is_dir()
+                        except OSError:
+                            is_dir = False
+                        
+                        if is_dir:
+                            if entry.name not in exclude_dirs:
+                                # Like os.walk, don't descend into symlinked directories
+                                directories.append((entry.name, entry.path, not entry.is_symlink()))
+                            continue
+                        
+                        try:
+                            files.append((entry.name, entry.stat()))
+                        except OSError:
+                            # Skip files that can't be accessed
+                            continue
+            except OSError:
+                # Directories that can't be listed stay empty, as with os.walk
+                pass
+            
+            tree._first_child[dir_index] = len(names)
+            tree._child_counts[dir_index] = len(directories) + len(files)
+            
+            # Subdirectories first, then files, as with os.walk
+            for name, path, descend in directories:
+                index = len(names)
+                names.append(name)
+                append_parent(dir_index)
+                tree._is_dir.append(1)
+                tree._first_child.append(0)
+                tree._child_counts.append(0)
+                append_size(0)
+                append_modified(0.0)
+                append_created(0.0)
+                tree._file_types.append(0)
+                if descend:
+                    stack.append((index, path))
+            
+            for name, file_stat in files:
+                index = len(names)
+                names.append(name)
+                append_parent(dir_index)
+                tree._is_dir.append(0)
+                tree._first_child.append(0)
+                tree._child_counts.append(0)
+                append_size(file_stat.st_size)
+                append_modified(file_stat.st_mtime)
+                append_created(file_stat.st_ctime)
+                
+                file_type_value = 0
+                if detector is not None:
+                    file_type = detector.detect_by_extension(name)
+                    if file_type is None:
+                        # Sniffed after the walk; special files stay unknown
+                        if stat.S_ISREG(file_stat.st_mode):
+                            unclassified.append(index)
+                        file_type = FileType.UNKNOWN
+                    file_type_value = file_type.value
+                tree._file_types.append(file_type_value)
+        
+        tree._set_names(names)
+        
+        if unclassified:
+            file_types = detector.detect_types_by_content([tree.get_path(index) for index in unclassified])
+            for index, file_type in zip(unclassified, file_types):
+                tree._file_types[index] = file_type.value
+        
+        return tree
+    
+    def _set_names(self, names: List[str]) -> None:
+        """
+        Store the entry names as one string with offsets.
+        
+        Args:
+            names: Name of every entry, by entry number
+        """
+        offsets = array('L', [0])
+        position = 0
+        for name in names:
+            position += len(name)
+            offsets.append(position)
+        
+        self._name_offsets = offsets
+        self._name_data = "".join(names)
+    
+    def __len__(self) -> int:
+        """Get the number of entries, including the root directory."""
+        return len(self._parents)
+    
+    @property
+    def root(self) -> 'DirectoryNode':
+        """
+        Get a view of the root directory.
+        
+        Returns:
+            DirectoryNode: Lazy view of the root
+        """
+        return _CompactDirectoryNode(self, 0)
+    
+    def get_name(self, index: int) -> str:
+        """
+        Get the name of an entry.
+        
+        Args:
+            index: Entry number
+            
+        Returns:
+            The file or directory name
+        """
+        return self._name_data[self._name_offsets[index]:self._name_offsets[index + 1]]
+    
+    def get_path(self, index: int) -> str:
+        """
+        Get the absolute path of an entry.
+        
+        Args:
+            index: Entry number
+            
+        Returns:
+            The path, built from the names of the entry and its ancestors
+        """
+        parts = []
+        while index > 0:
+            parts.append(self.get_name(index))
+            index = self._parents[index]
+        
+        return os.path.join(self.root_path, *reversed(parts))
+    
+    def is_directory(self, index: int) -> bool:
+        """
+        Check whether an entry is a directory.
+        
+        Args:
+            index: Entry number
+            
+        Returns:
+            True for directories
+        """
+        return bool(self._is_dir[index])
+    
+    def get_children(self, index: int) -> range:
+        """
+        Get the entry numbers of the children of a directory.
+        
+        Args:
+            index: Entry number of the directory
+            
+        Returns:
+            Range of child entry numbers (empty for files)
+        """
+        first = self._first_child[index]
+        return range(first, first + self._child_counts[index])
+    
+    def get_metadata(self, index: int) -> Dict[str, Any]:
+        """
+        Get the metadata of a file entry, as stored by scan_directory.
+        
+        Args:
+            index: Entry number
+            
+        Returns:
+            Dict with 'size', 'modified' and 'created', and 'file_type' when
+            file types were detected
+        """
+        metadata = {
+            'size': self._sizes[index],
+            'modified': self._modified[index],
+            'created': self._created[index]
+        }
+        if self._file_types[index]:
+            metadata['file_type'] = FileType(self._file_types[index])
+        return metadata
+    
+    def node(self, index: int) -> Any:
+        """
+        Get a view of an entry.
+        
+        Args:
+            index: Entry number
+            
+        Returns:
+            A DirectoryNode or FileNode view
+        """
+        if self._is_dir[index]:
+            return _CompactDirectoryNode(self, index)
+        return _CompactFileNode(self, index)
+    
+    def materialize(self, index: int = 0) -> 'DirectoryNode':
+        """
+        Copy a directory into regular (mutable) DirectoryNode/FileNode objects.
+        
+        Args:
+            index: Entry number of the directory (the root by default)
+            
+        Returns:
+            DirectoryNode: The copied directory tree
+        """
+        root_node = DirectoryNode(self.get_name(index), self.get_path(index))
+        stack = [(index, root_node)]
+        while stack:
+            dir_index, dir_node = stack.pop()
+            for child in self.get_children(dir_index):
+                if self._is_dir[child]:
+                    child_node = DirectoryNode(self.get_name(child), os.path.join(dir_node.path, self.get_name(child)))
+                    stack.append((child, child_node))
+                else:
+                    child_node = FileNode(
+                        self.get_name(child),
+                        os.path.join(dir_node.path, self.get_name(child)),
+                        self.get_metadata(child)
+                    )
+                dir_node.add_child(child_node)
+        
+        return root_node
+
+
+class _CompactFileNode(FileNode):
+    """Read-only FileNode view of an entry of a CompactDirectoryTree."""
+    
+    __slots__ = ('_tree', '_index')
+    
+    def __init__(self, tree: CompactDirectoryTree, index: int):
+        self._tree = tree
+        self._index = index
+    
+    @property
+    def name(self) -> str:
+        """Name of the file."""
+        return self._tree.get_name(self._index)
+    
+    @property
+    def path(self) -> str:
+        """Absolute path to the file."""
+        return self._tree.get_path(self._index)
+    
+    @property
+    def metadata(self) -> Dict[str, Any]:
+        """Metadata of the file, as recorded by the scan."""
+        return self._tree.get_metadata(self._index)
+
+
+class _CompactDirectoryNode(DirectoryNode):
+    """
+    Read-only DirectoryNode view of an entry of a CompactDirectoryTree.
+    
+    Child views are created on access and not kept, so walking the tree
+    doesn't grow it back to one object per file.
+    """
+    
+    __slots__ = ('_tree', '_index')
+    
+    def __init__(self, tree: CompactDirectoryTree, index: int):
+        self._tree = tree
+        self._index = index
+    
+    @property
+    def name(self) -> str:
+        """Name of the directory."""
+        return self._tree.get_name(self._index)
+    
+    @property
+    def path(self) -> str:
+        """Absolute path to the directory."""
+        return self._tree.get_path(self._index)
+    
+    @property
+    def children(self) -> List[Any]:
+        """Views of the child entries, created on each access."""
+        tree = self._tree
+        return [tree.node(child) for child in tree.get_children(self._index)]
+    
+    @property
+    def tree(self) -> CompactDirectoryTree:
+        """The CompactDirectoryTree this is a view of."""
+        return self._tree
+    
+    def add_child(self, node: Any) -> None:
+        """Refuse to add a child, since compact scans are read-only."""
+        raise TypeError("Directories of a compact scan are read-only; use materialize() for a mutable copy")
+    
+    def get_all_files_recursive(self) -> List[FileNode]:
+        """Get views of all files in this directory and its subdirectories."""
+        tree = self._tree
+        files = []
+        directories = []
+        for child in tree.get_children(self._index):
+            if tree.is_directory(child):
+                directories.append(child)
+            else:
+                files.append(_CompactFileNode(tree, child))
+        
+        for child in directories:
+            files.extend(_CompactDirectoryNode(tree, child).get_all_files_recursive())
+        
+        return files
+
+
 def get_file_stats(directory_node: DirectoryNode) -> Dict[str, Any]:
     """
     Get statistics about the files in a directory tree.
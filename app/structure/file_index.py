@@ -0,0 +1,285 @@
+"""
+Module for indexing the files of a repository in memory.
+
+Resolving an import tries many candidate paths per import. Checking them with
+os.path.exists costs a stat syscall each, so this module provides an index of
+every file and directory in the repository, built once from a directory walk,
+that answers those checks with in-memory lookups.
+"""
+import os
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.structure.directory_scanner import DirectoryNode
+
+
+# Suffixes tried, in order, when resolving an import to a file or package
+_CANDIDATE_SUFFIXES = ['', '.py', '.js', '.jsx', '.ts', '.tsx']
+_CANDIDATE_INDEX_FILES = ['__init__.py', 'index.js', 'index.jsx', 'index.ts', 'index.tsx']
+
+
+def candidate_paths(base_path: str, import_path: str) -> List[str]:
+    """
+    Get the paths an import may refer to, in resolution order.
+
+    Args:
+        base_path: Directory the import is resolved against
+        import_path: The import path (without leading './' or '../')
+
+    Returns:
+        List of candidate file and directory paths
+    """
+    module_path = os.path.join(base_path, import_path)
+    candidates = [module_path + suffix for suffix in _CANDIDATE_SUFFIXES]
+    candidates.extend(os.path.join(module_path, index_file) for index_file in _CANDIDATE_INDEX_FILES)
+    return candidates
+
+
+class RepositoryFileIndex:
+    """
+    In-memory index of the files and directories in a repository.
+
+    Attributes:
+        root_path: Absolute path to the repository root
+        files: Set of file paths relative to the root
+        directories: Map of directory path relative to the root ('.' for the
+            root itself) to the names of its children
+    """
+
+    def __init__(self, root_path: str):
+        """
+        Initialize an empty index.
+
+        Args:
+            root_path: Path to the repository root
+        """
+        self.root_path = os.path.abspath(root_path)
+        self.files: Set[str] = set()
+        self.directories: Dict[str, List[str]] = {'.': []}
+        # Memo of (importing directory, import path) -> resolved path
+        self._resolved: Dict[Tuple[str, str], Optional[str]] = {}
+
+    @classmethod
+    def build(cls, root_path: str) -> 'RepositoryFileIndex':
+        """
+        Build an index by walking the whole repository.
+
+        Args:
+            root_path: Path to the repository root
+
+        Returns:
+            RepositoryFileIndex: The populated index
+        """
+        index = cls(root_path)
+        for dirpath, dirnames, filenames in os.walk(index.root_path):
+            index.add_walk_entry(dirpath, dirnames, filenames)
+        return index
+
+    @classmethod
+    def from_directory_node(cls, root_node: DirectoryNode) -> 'RepositoryFileIndex':
+        """
+        Build an index from a directory tree produced by scan_directory.
+
+        Directories excluded from the scan are missing from the index, so imports
+        pointing into them will not resolve.
+
+        Args:
+            root_node: Root DirectoryNode of the scanned repository
+
+        Returns:
+            RepositoryFileIndex: The populated index
+        """
+        index = cls(root_node.path)
+        stack = [root_node]
+        while stack:
+            directory = stack.pop()
+            dir_rel = os.path.relpath(directory.path, index.root_path)
+            for child in directory.children:
+                child_rel = os.path.normpath(os.path.join(dir_rel, child.name))
+                if isinstance(child, DirectoryNode):
+                    index.add_directory(child_rel)
+                    stack.append(child)
+                else:
+                    index.add_file(child_rel)
+        return index
+
+    def add_walk_entry(self, dirpath: str, dirnames: List[str], filenames: List[str]) -> None:
+        """
+        Add one step of an os.walk over the repository to the index.
+
+        Args:
+            dirpath: Absolute directory path from os.walk
+            dirnames: Subdirectory names from os.walk
+            filenames: File names from os.walk
+        """
+        dir_rel = os.path.relpath(dirpath, self.root_path)
+        for dirname in dirnames:
+            self.add_directory(os.path.normpath(os.path.join(dir_rel, dirname)))
+        for filename in filenames:
+            self.add_file(os.path.normpath(os.path.join(dir_rel, filename)))
+
+    def _add_child(self, rel_path: str) -> None:
+        """
+        Register a path as a child of its parent directory.
+
+        Args:
+            rel_path: Normalized path relative to the root
+        """
+        parent, name = os.path.split(rel_path)
+        self.directories.setdefault(parent or '.', []).append(name)
+
+    def add_file(self, rel_path: str) -> None:
+        """
+        Add a file to the index.
+
+        Args:
+            rel_path: Normalized file path relative to the root
+        """
+        if rel_path not in self.files:
+            self.files.add(rel_path)
+            self._add_child(rel_path)
+            self._resolved.clear()
+
+    def add_directory(self, rel_path: str) -> None:
+        """
+        Add a directory to the index.
+
+        Args:
+            rel_path: Normalized directory path relative to the root
+        """
+        if rel_path not in self.directories:
+            self.directories[rel_path] = []
+            self._add_child(rel_path)
+            self._resolved.clear()
+
+    def exists(self, rel_path: str) -> bool:
+        """
+        Check whether a file or directory exists in the index.
+
+        Args:
+            rel_path: Normalized path relative to the root
+
+        Returns:
+            True if the path is a file or directory in the repository
+        """
+        return rel_path in self.files or rel_path in self.directories
+
+    def get_children(self, rel_path: str) -> List[str]:
+        """
+        Get the names of the entries in a directory.
+
+        Args:
+            rel_path: Normalized directory path relative to the root
+
+        Returns:
+            List of child names (empty if the directory is unknown)
+        """
+        return self.directories.get(rel_path, [])
+
+    def _lookup(self, candidate: str) -> Optional[str]:
+        """
+        Check whether a candidate path exists.
+
+        Paths that leave the repository can't be answered from the index and
+        are checked on disk instead.
+
+        Args:
+            candidate: Candidate path relative to the root
+
+        Returns:
+            The normalized path if it exists, None otherwise
+        """
+        rel_path = os.path.normpath(candidate)
+
+        if rel_path == os.pardir or rel_path.startswith(os.pardir + os.sep) or os.path.isabs(rel_path):
+            if os.path.exists(os.path.join(self.root_path, rel_path)):
+                return os.path.relpath(os.path.join(self.root_path, rel_path), self.root_path)
+            return None
+
+        return rel_path if self.exists(rel_path) else None
+
+    def resolve(self, import_path: str, file_rel_path: str) -> Optional[str]:
+        """
+        Resolve an import to a path in the repository.
+
+        Follows the same rules as resolve_import_path, using the index
+        instead of the filesystem. Results are memoized per importing
+        directory.
+
+        Args:
+            import_path: The import path from the code
+            file_rel_path: Path of the importing file relative to the root
+
+        Returns:
+            Resolved path relative to the root, or None if it can't be resolved
+        """
+        dir_path = os.path.dirname(file_rel_path)
+        key = (dir_path, import_path)
+
+        if key not in self._resolved:
+            self._resolved[key] = self._resolve_uncached(import_path, dir_path)
+
+        return self._resolved[key]
+
+    def _resolve_uncached(self, import_path: str, dir_path: str) -> Optional[str]:
+        """
+        Resolve an import without consulting the memo.
+
+        Args:
+            import_path: The import path from the code
+            dir_path: Directory of the importing file relative to the root
+
+        Returns:
+            Resolved path relative to the root, or None if it can't be resolved
+        """
+        # Check if it's a relative import
+        if import_path.startswith('.'):
+            # Handle different types of relative imports
+            if import_path.startswith('./'):
+                # Same directory: ./module
+                relative_path = import_path[2:]
+            elif import_path.startswith('../'):
+                # Parent directory: ../module
+                relative_path = import_path
+                while relative_path.startswith('../'):
+                    dir_path = os.path.normpath(os.path.join(dir_path, os.pardir))
+                    relative_path = relative_path[3:]
+            else:
+                # Implicit same directory: .module
+                relative_path = import_path[1:]
+
+            for path in candidate_paths(dir_path, relative_path):
+                resolved = self._lookup(path)
+                if resolved is not None:
+                    return resolved
+
+        # Check if it's a package-relative import (e.g., 'src/module')
+        for path in candidate_paths('', import_path):
+            resolved = self._lookup(path)
+            if resolved is not None:
+                return resolved
+
+        # Python package imports (e.g., 'package.module')
+        if '.' in import_path and not import_path.startswith('.'):
+            parts = import_path.split('.')
+
+            # Try different combinations of package paths
+            for i in range(len(parts)):
+                package_path = os.path.join(*parts[:i+1])
+                init_path = self._lookup(os.path.join(package_path, '__init__.py'))
+
+                if init_path is not None:
+                    # Found a package, try to resolve the rest
+                    remaining_parts = parts[i+1:]
+                    if not remaining_parts:
+                        # This is the module we're looking for
+                        return init_path
+
+                    # Try to find the submodule
+                    submodule_path = os.path.join(package_path, *remaining_parts)
+                    for path in [submodule_path + '.py', os.path.join(submodule_path, '__init__.py')]:
+                        resolved = self._lookup(path)
+                        if resolved is not None:
+                            return resolved
+
+        # Couldn't resolve to a file in the repository (likely an external dependency)
+        return None
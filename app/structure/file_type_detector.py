@@ -8,8 +8,12 @@ and provides icons and language names for different file types.
 import os
 import pathlib
 import re
+from concurrent.futures import ThreadPoolExecutor
 from enum import Enum, auto
 
+# Maximum number of threads reading files in detect_types_by_content
+MAX_CONTENT_SNIFF_WORKERS = 8
+
 class FileType(Enum):
     """Enumeration of supported file types."""
     PYTHON = auto()
@@ -129,13 +133,46 @@ class FileTypeDetector:
             raise FileNotFoundError(f"File not found: {file_path}")
         
         # First try to detect by extension
-        ext = pathlib.Path(file_path).suffix.lower()
-        if ext in self._extension_map:
-            return self._extension_map[ext]
+        file_type = self.detect_by_extension(file_path)
+        if file_type is not None:
+            return file_type
         
         # If no extension or unrecognized extension, try to detect by content
         return self._detect_by_content(file_path)
     
+    def detect_by_extension(self, file_name):
+        """
+        Detect the type of a file from its extension alone, without any I/O.
+        
+        Args:
+            file_name (str): Name or path of the file
+            
+        Returns:
+            FileType: The detected file type, or None if the extension is
+            missing or not recognized
+        """
+        return self._extension_map.get(pathlib.Path(file_name).suffix.lower())
+    
+    def detect_types_by_content(self, file_paths):
+        """
+        Detect the types of several files by examining their content.
+        
+        Meant for the files whose extension wasn't recognized; the files are
+        read concurrently, since the time goes into waiting for I/O.
+        
+        Args:
+            file_paths (list): Paths to the files
+            
+        Returns:
+            list: The detected FileType of each file, in the same order
+        """
+        if len(file_paths) <= 1:
+            return [self._detect_by_content(file_path) for file_path in file_paths]
+        
+        workers = min(MAX_CONTENT_SNIFF_WORKERS, len(file_paths))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self._detect_by_content, file_paths))
+    
     def _detect_by_content(self, file_path):
         """
         Detect file type by examining its content.
@@ -0,0 +1,297 @@
+"""
+Module for searching repository files by path and content.
+
+A SearchIndex keeps trigram posting lists for the paths and the contents of
+the files in a repository. A query is answered by intersecting the posting
+lists of its trigrams, which narrows the search down to a few candidate
+files, and then verifying the candidates: paths are checked in memory and
+contents line by line from disk, so the index never holds file contents.
+"""
+import threading
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Iterable, Optional, Set
+
+
+# Files larger than this are searched by path only
+DEFAULT_MAX_INDEXED_FILE_SIZE = 1024 * 1024
+
+# Queries shorter than a trigram can't use the content index
+MIN_CONTENT_QUERY_LENGTH = 3
+
+DEFAULT_PAGE_SIZE = 100
+DEFAULT_MAX_LINE_HITS = 20
+
+# Longer matching lines are cut off in the results
+MAX_LINE_HIT_LENGTH = 240
+
+# Bytes checked for NUL characters to detect binary files
+_BINARY_SNIFF_SIZE = 8192
+
+
+def _trigrams(text: str) -> Set[str]:
+    """
+    Get the distinct trigrams of a string.
+
+    Args:
+        text: The string (already lowercased)
+
+    Returns:
+        Set of three-character substrings
+    """
+    return set(map(''.join, zip(text, text[1:], text[2:])))
+
+
+def _add_postings(postings: Dict[str, array], text: str, file_id: int) -> None:
+    """
+    Add the trigrams of a text to posting lists.
+
+    Files must be added in increasing file_id order, so every posting list
+    stays sorted.
+
+    Args:
+        postings: Map of trigram to file IDs
+        text: The lowercased text
+        file_id: ID of the file the text belongs to
+    """
+    for trigram in _trigrams(text):
+        file_ids = postings.get(trigram)
+        if file_ids is None:
+            file_ids = postings[trigram] = array('I')
+        file_ids.append(file_id)
+
+
+def _lookup_candidates(postings: Dict[str, array], query: str) -> List[int]:
+    """
+    Get the files that contain every trigram of a query.
+
+    Args:
+        postings: Map of trigram to file IDs
+        query: The lowercased query (at least three characters)
+
+    Returns:
+        Sorted list of candidate file IDs
+    """
+    posting_lists = []
+    for trigram in _trigrams(query):
+        file_ids = postings.get(trigram)
+        if file_ids is None:
+            return []
+        posting_lists.append(file_ids)
+
+    # Intersect starting from the rarest trigram
+    posting_lists.sort(key=len)
+    candidates = set(posting_lists[0])
+    for file_ids in posting_lists[1:]:
+        candidates.intersection_update(file_ids)
+        if not candidates:
+            break
+
+    return sorted(candidates)
+
+
+@dataclass
+class SearchHit:
+    """A file matching a search query."""
+    file_id: int  # Position of the file in SearchIndex.paths
+    path: str
+    path_match: bool  # Whether the query matched the path (or name)
+    line_hits: List[Dict[str, Any]] = field(default_factory=list)  # {'line': number, 'text': line}
+
+
+@dataclass
+class SearchResults:
+    """One page of search results."""
+    hits: List[SearchHit]
+    count: int  # Total number of matching files (an upper bound unless count_exact)
+    count_exact: bool
+    offset: int
+    limit: int
+
+
+class SearchIndex:
+    """
+    Trigram index over the paths and contents of a set of files.
+
+    Attributes:
+        paths: Paths of the indexed files; a file's ID is its position here
+        max_file_size: Files larger than this are not content indexed
+    """
+
+    def __init__(self, paths: Iterable[str], max_file_size: int = DEFAULT_MAX_INDEXED_FILE_SIZE):
+        """
+        Initialize the index and index the file paths.
+
+        File contents are indexed separately by index_contents, or on the
+        first content search.
+
+        Args:
+            paths: Paths of the files to index
+            max_file_size: Files larger than this are not content indexed
+        """
+        self.paths = list(paths)
+        self.max_file_size = max_file_size
+
+        self._lower_paths = [path.lower() for path in self.paths]
+        self._path_postings: Dict[str, array] = {}
+        for file_id, path in enumerate(self._lower_paths):
+            _add_postings(self._path_postings, path, file_id)
+
+        self._content_postings: Optional[Dict[str, array]] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, paths: Iterable[str], max_file_size: int = DEFAULT_MAX_INDEXED_FILE_SIZE) -> 'SearchIndex':
+        """
+        Build an index of both the paths and the contents of files.
+
+        Args:
+            paths: Paths of the files to index
+            max_file_size: Files larger than this are not content indexed
+
+        Returns:
+            SearchIndex: The populated index
+        """
+        index = cls(paths, max_file_size)
+        index.index_contents()
+        return index
+
+    @property
+    def contents_indexed(self) -> bool:
+        """Whether file contents have been indexed."""
+        return self._content_postings is not None
+
+    def _read_text(self, file_id: int) -> Optional[str]:
+        """
+        Read a file as text for indexing or verification.
+
+        Args:
+            file_id: ID of the file
+
+        Returns:
+            The file contents, or None for missing, binary and oversized files
+        """
+        try:
+            with open(self.paths[file_id], 'rb') as f:
+                content = f.read(self.max_file_size + 1)
+        except OSError:
+            return None
+
+        if len(content) > self.max_file_size or b'\0' in content[:_BINARY_SNIFF_SIZE]:
+            return None
+
+        return content.decode('utf-8', errors='replace')
+
+    def index_contents(self) -> None:
+        """Index the contents of all files, if not done yet."""
+        with self._lock:
+            if self._content_postings is not None:
+                return
+
+            postings: Dict[str, array] = {}
+            for file_id in range(len(self.paths)):
+                text = self._read_text(file_id)
+                if text:
+                    _add_postings(postings, text.lower(), file_id)
+
+            self._content_postings = postings
+
+    def _find_lines(self, file_id: int, query: str, max_line_hits: int) -> List[Dict[str, Any]]:
+        """
+        Find the lines of a file containing a query.
+
+        Args:
+            file_id: ID of the file
+            query: The lowercased query
+            max_line_hits: Maximum number of lines to return
+
+        Returns:
+            List of {'line': number, 'text': line} entries (1-based line numbers)
+        """
+        text = self._read_text(file_id)
+        if not text or query not in text.lower():
+            return []
+
+        line_hits = []
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if query in line.lower():
+                line_hits.append({'line': line_number, 'text': line[:MAX_LINE_HIT_LENGTH]})
+                if len(line_hits) >= max_line_hits:
+                    break
+
+        return line_hits
+
+    def search(
+        self,
+        query: str,
+        offset: int = 0,
+        limit: int = DEFAULT_PAGE_SIZE,
+        content: bool = True,
+        max_line_hits: int = DEFAULT_MAX_LINE_HITS
+    ) -> SearchResults:
+        """
+        Search files by path and content (case-insensitive substring match).
+
+        Results are in file order. Path matches are exact; content candidates
+        are only verified until the requested page is full, so when a page
+        ends early the count includes unverified candidates and is an upper
+        bound. Content is only searched for queries of at least three
+        characters.
+
+        Args:
+            query: Text to search for
+            offset: Number of matching files to skip
+            limit: Maximum number of files to return
+            content: Whether to search file contents
+            max_line_hits: Maximum number of matching lines per file
+
+        Returns:
+            SearchResults: The requested page of results
+        """
+        query = query.lower()
+
+        # Path matches are verified in memory
+        if len(query) >= 3:
+            path_candidates = _lookup_candidates(self._path_postings, query)
+        else:
+            path_candidates = range(len(self.paths))
+        path_matches = {file_id for file_id in path_candidates if query in self._lower_paths[file_id]}
+
+        content_candidates: Set[int] = set()
+        if content and len(query) >= MIN_CONTENT_QUERY_LENGTH:
+            self.index_contents()
+            content_candidates = set(_lookup_candidates(self._content_postings, query))
+
+        candidates = sorted(path_matches | content_candidates)
+
+        hits = []
+        matched = 0
+        remaining_unverified = 0
+        for position, file_id in enumerate(candidates):
+            if matched >= offset + limit:
+                remaining_unverified = sum(1 for f in candidates[position:] if f not in path_matches)
+                matched += len(candidates) - position - remaining_unverified
+                break
+
+            in_page = matched >= offset
+            line_hits = []
+            if file_id in content_candidates and (in_page or file_id not in path_matches):
+                line_hits = self._find_lines(file_id, query, max_line_hits)
+
+            if file_id in path_matches or line_hits:
+                if in_page:
+                    hits.append(SearchHit(
+                        file_id=file_id,
+                        path=self.paths[file_id],
+                        path_match=file_id in path_matches,
+                        line_hits=line_hits
+                    ))
+                matched += 1
+
+        return SearchResults(
+            hits=hits,
+            count=matched + remaining_unverified,
+            count_exact=remaining_unverified == 0,
+            offset=offset,
+            limit=limit
+        )
@@ -0,0 +1,204 @@
+"""
+Module for memoized repository structure snapshots.
+
+The structure endpoints (tree, file types and search) all need the same scan of
+a repository. A StructureSnapshot holds one scan together with everything
+derived from it, and a StructureSnapshotCache keeps snapshots per repository,
+checked out commit and excluded directories, so a checkout is only scanned
+again when it changes.
+"""
+import os
+import threading
+from typing import Dict, List, Any, Optional
+
+from app.structure.checkout_cache import CheckoutCache, CheckoutKey, make_checkout_key
+from app.structure.collapsible_tree import CollapsibleTree, TreeNode, build_tree_from_directory_node
+from app.structure.directory_scanner import DirectoryNode, scan_directory
+from app.structure.search_index import SearchIndex
+
+
+# Default number of snapshots kept in memory
+DEFAULT_MAX_SNAPSHOTS = 32
+
+
+class StructureSnapshot:
+    """
+    A single scan of a repository checkout and the data derived from it.
+
+    Attributes:
+        repo_path: Path to the repository root
+        tree: Frontend tree structure (see create_file_structure_tree)
+        stats: File structure statistics (see get_file_structure_stats)
+        directory_tree: The scanned DirectoryNode tree, if available
+        commit_sha: Commit the checkout was at when scanned, if known
+        exclude_dirs: Directories excluded from the scan
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        tree: Dict[str, Any],
+        stats: Dict[str, Any],
+        directory_tree: Optional[DirectoryNode] = None,
+        commit_sha: Optional[str] = None,
+        exclude_dirs: Optional[List[str]] = None
+    ):
+        """
+        Initialize a snapshot.
+
+        Args:
+            repo_path: Path to the repository root
+            tree: Frontend tree structure
+            stats: File structure statistics
+            directory_tree: The scanned DirectoryNode tree
+            commit_sha: Commit the checkout was at when scanned
+            exclude_dirs: Directories excluded from the scan
+        """
+        self.repo_path = repo_path
+        self.tree = tree
+        self.stats = stats
+        self.directory_tree = directory_tree
+        self.commit_sha = commit_sha
+        self.exclude_dirs = exclude_dirs
+        self._files: Optional[List[Dict[str, Any]]] = None
+        self._search_index: Optional[SearchIndex] = None
+        self._collapsible_tree: Optional[CollapsibleTree] = None
+        self._lock = threading.Lock()
+
+    @property
+    def files(self) -> List[Dict[str, Any]]:
+        """
+        Get the file nodes of the frontend tree as a flat list, in tree order.
+
+        Returns:
+            List of frontend file nodes
+        """
+        if self._files is None:
+            files = []
+            stack = [self.tree]
+            while stack:
+                node = stack.pop()
+                if node["type"] == "file":
+                    files.append(node)
+                elif "children" in node:
+                    stack.extend(reversed(node["children"]))
+            self._files = files
+
+        return self._files
+
+    def get_search_index(self, index_contents: bool = False) -> SearchIndex:
+        """
+        Get the search index over the files of the snapshot, building it if needed.
+
+        File IDs in the index are positions in ``files``.
+
+        Args:
+            index_contents: Whether to also index file contents right away
+                (otherwise they are indexed on the first content search)
+
+        Returns:
+            SearchIndex: The search index
+        """
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = SearchIndex(file["path"] for file in self.files)
+
+        if index_contents:
+            self._search_index.index_contents()
+
+        return self._search_index
+
+    def get_collapsible_tree(self) -> CollapsibleTree:
+        """
+        Get the collapsible tree of the snapshot, building it if needed.
+
+        The tree keeps the expand/collapse state of the lazily loaded tree
+        endpoints. It starts with only the root expanded.
+
+        Returns:
+            CollapsibleTree: The collapsible tree
+        """
+        with self._lock:
+            if self._collapsible_tree is None:
+                directory_tree = self.directory_tree
+                if directory_tree is None:
+                    directory_tree = scan_directory(self.repo_path, self.exclude_dirs, classify_files=True, compact=True)
+
+                collapsible_tree = build_tree_from_directory_node(directory_tree)
+                collapsible_tree.collapse_all()
+                collapsible_tree.expand_node(collapsible_tree.root)
+                self._collapsible_tree = collapsible_tree
+
+        return self._collapsible_tree
+
+    def find_tree_node(self, path: str) -> Optional[TreeNode]:
+        """
+        Find a node of the collapsible tree by path.
+
+        Args:
+            path: Path as reported in the tree, or relative to the
+                repository root ('' for the root)
+
+        Returns:
+            The node, or None if the path is not part of the snapshot
+        """
+        collapsible_tree = self.get_collapsible_tree()
+        root_path = collapsible_tree.root.path
+        if not os.path.isabs(path):
+            path = os.path.join(root_path, path)
+
+        return collapsible_tree.find_node(os.path.normpath(path))
+
+
+def make_snapshot_key(
+    repository_id: str,
+    commit_sha: Optional[str],
+    exclude_dirs: Optional[List[str]]
+) -> CheckoutKey:
+    """
+    Build the cache key for a snapshot.
+
+    Args:
+        repository_id: ID of the repository
+        commit_sha: Commit checked out in the repository
+        exclude_dirs: Directories excluded from the scan
+
+    Returns:
+        Hashable key for StructureSnapshotCache (see make_checkout_key)
+    """
+    return make_checkout_key(repository_id, commit_sha, exclude_dirs)
+
+
+class StructureSnapshotCache(CheckoutCache[StructureSnapshot]):
+    """
+    In-memory LRU cache of structure snapshots.
+
+    Snapshots are keyed and evicted as described for CheckoutCache.
+    """
+
+    def __init__(self, max_snapshots: int = DEFAULT_MAX_SNAPSHOTS):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_snapshots: Maximum number of snapshots kept
+        """
+        super().__init__(max_snapshots)
+
+
+_default_snapshot_cache: Optional[StructureSnapshotCache] = None
+
+
+def get_structure_snapshot_cache() -> StructureSnapshotCache:
+    """
+    Get the process-wide structure snapshot cache.
+
+    Returns:
+        The shared StructureSnapshotCache instance
+    """
+    global _default_snapshot_cache
+
+    if _default_snapshot_cache is None:
+        _default_snapshot_cache = StructureSnapshotCache()
+
+    return _default_snapshot_cache
@@ -8,15 +8,24 @@ This module provides functions to convert between different tree representation
 """
 
 import os
-import uuid
-from typing import Dict, List, Any, Optional
+import hashlib
+from typing import Dict, List, Any, Optional, Union
 
+from app.analysis.analysis_cache import AnalysisCache
 from app.structure.directory_scanner import DirectoryNode, FileNode, scan_directory
 from app.structure.collapsible_tree import TreeNode, CollapsibleTree, build_tree_from_directory_node
-from app.structure.dependency_analyzer import analyze_dependencies
+from app.structure.compact_dependency_graph import CompactDependencyGraph
+from app.structure.dependency_analyzer import DependencyGraph, analyze_dependencies
 from app.structure.file_type_detector import FileTypeDetector, FileType
 
 
+# Default number of children returned per directory by the lazy tree functions
+DEFAULT_CHILDREN_PAGE_SIZE = 500
+
+# Number of hex digits kept of node IDs and content hashes
+NODE_HASH_LENGTH = 16
+
+
 def convert_directory_to_collapsible_tree(directory_node: DirectoryNode) -> CollapsibleTree:
     """
     Convert a DirectoryNode tree to a CollapsibleTree.
@@ -34,6 +43,10 @@ def convert_to_frontend_tree(collapsible_tree: CollapsibleTree) -> Dict[str, Any
     """
     Convert a CollapsibleTree to a frontend-compatible tree structure.
     
+    Node IDs are derived from the path relative to the root, and every node
+    carries the content hash of its subtree (see compute_content_hashes), so
+    the same checkout always converts to the same tree.
+    
     Args:
         collapsible_tree: The CollapsibleTree to convert
         
@@ -41,22 +54,115 @@ def convert_to_frontend_tree(collapsible_tree: CollapsibleTree) -> Dict[str, Any
         Dict: A JSON-serializable tree structure for the frontend
     """
     file_detector = FileTypeDetector()
-    return _convert_node_to_frontend_format(collapsible_tree.root, file_detector)
+    root = collapsible_tree.root
+    _ensure_content_hashes(root)
+    return _convert_node_to_frontend_format(root, file_detector, root.path)
 
 
-def _convert_node_to_frontend_format(node: TreeNode, file_detector: FileTypeDetector) -> Dict[str, Any]:
+def make_node_id(relative_path: str) -> str:
     """
-    Convert a TreeNode to frontend-compatible format recursively.
+    Get the stable ID of a tree node.
+    
+    Args:
+        relative_path: Path of the node relative to the tree root, with '/'
+            separators ('' for the root)
+        
+    Returns:
+        str: Short hex digest of the path
+    """
+    digest = hashlib.sha1(relative_path.encode("utf-8", "surrogateescape")).hexdigest()
+    return digest[:NODE_HASH_LENGTH]
+
+
+def _relative_path(path: str, root_path: str) -> str:
+    """
+    Get the path of a node relative to the tree root, with '/' separators.
+    
+    Args:
+        path: Path of the node
+        root_path: Path of the tree root
+        
+    Returns:
+        str: The relative path ('' for the root)
+    """
+    if path == root_path:
+        return ""
+    
+    prefix = root_path.rstrip(os.sep) + os.sep
+    if path.startswith(prefix):
+        relative_path = path[len(prefix):]
+    else:
+        relative_path = os.path.relpath(path, root_path)
+    
+    return relative_path.replace(os.sep, "/")
+
+
+def compute_content_hashes(node: TreeNode) -> str:
+    """
+    Compute Merkle-style content hashes for a node and everything below it.
+    
+    A file is hashed from its size and modification time, as recorded by
+    the scan, so no file is read. A directory is hashed from the names, kinds
+    and hashes of its children, so its hash only changes when something
+    below it changes. Hashes are stored in ``content_hash`` of every node.
+    
+    Args:
+        node: The TreeNode to hash
+        
+    Returns:
+        str: The content hash of the node
+    """
+    digest = hashlib.sha1()
+    
+    if node.is_directory:
+        digest.update(b"directory\0")
+        for child in node.children:
+            child_hash = compute_content_hashes(child)
+            kind = "d" if child.is_directory else "f"
+            digest.update(f"{kind} {child.name}\0{child_hash}\n".encode("utf-8", "surrogateescape"))
+    else:
+        size = node.metadata.get("size", "")
+        modified = node.metadata.get("modified", "")
+        digest.update(f"file\0{size}\0{modified!r}".encode("utf-8"))
+    
+    node.content_hash = digest.hexdigest()[:NODE_HASH_LENGTH]
+    return node.content_hash
+
+
+def _ensure_content_hashes(node: TreeNode) -> str:
+    """
+    Make sure the tree a node belongs to has content hashes.
+    
+    Args:
+        node: Any TreeNode of the tree
+        
+    Returns:
+        str: Path of the tree root
+    """
+    root = node
+    while root.parent:
+        root = root.parent
+    
+    if root.content_hash is None:
+        compute_content_hashes(root)
+    
+    return root.path
+
+
+def _create_frontend_node(node: TreeNode, file_detector: FileTypeDetector, root_path: str) -> Dict[str, Any]:
+    """
+    Convert a TreeNode to frontend-compatible format, without its children.
     
     Args:
         node: The TreeNode to convert
         file_detector: FileTypeDetector instance for file type information
+        root_path: Path of the tree root, which node IDs are relative to
         
     Returns:
         Dict: A JSON-serializable node representation
     """
-    # Generate a unique ID for the node
-    node_id = str(uuid.uuid4())
+    # Derive the ID from the relative path, so it is the same on every request
+    node_id = make_node_id(_relative_path(node.path, root_path))
     
     # Create base node representation
     frontend_node = {
@@ -66,6 +172,9 @@ def _convert_node_to_frontend_format(node: TreeNode, file_detector: FileTypeDete
         "type": "directory" if node.is_directory else "file"
     }
     
+    if node.content_hash is not None:
+        frontend_node["hash"] = node.content_hash
+    
     # Add file-specific properties
     if not node.is_directory:
         # Get file extension
@@ -77,8 +186,9 @@ def _convert_node_to_frontend_format(node: TreeNode, file_detector: FileTypeDete
             frontend_node["size"] = node.metadata["size"]
         
         try:
-            # Detect file type and add icon information
-            file_type = file_detector.detect_file_type(node.path)
+            # Detect file type and add icon information (files classified
+            # during the scan need no filesystem access here)
+            file_type = node.metadata.get("file_type") or file_detector.detect_file_type(node.path)
             frontend_node["fileType"] = file_type.name.lower()
             frontend_node["icon"] = file_detector.get_icon_for_file_type(file_type)
         except:
@@ -86,29 +196,148 @@ def _convert_node_to_frontend_format(node: TreeNode, file_detector: FileTypeDete
             frontend_node["fileType"] = "unknown"
             frontend_node["icon"] = "file-icon"
     
+    return frontend_node
+
+
+def _convert_node_to_frontend_format(node: TreeNode, file_detector: FileTypeDetector, root_path: str) -> Dict[str, Any]:
+    """
+    Convert a TreeNode to frontend-compatible format recursively.
+    
+    Args:
+        node: The TreeNode to convert
+        file_detector: FileTypeDetector instance for file type information
+        root_path: Path of the tree root, which node IDs are relative to
+        
+    Returns:
+        Dict: A JSON-serializable node representation
+    """
+    frontend_node = _create_frontend_node(node, file_detector, root_path)
+    
     # Add children for directories
     if node.is_directory and node.children:
         frontend_node["children"] = [
-            _convert_node_to_frontend_format(child, file_detector) 
+            _convert_node_to_frontend_format(child, file_detector, root_path) 
             for child in node.children
         ]
     
     return frontend_node
 
 
-def create_file_structure_tree(repo_path: str, exclude_dirs: Optional[List[str]] = None) -> Dict[str, Any]:
+def convert_to_lazy_frontend_tree(
+    collapsible_tree: CollapsibleTree,
+    node: Optional[TreeNode] = None,
+    levels: int = 1,
+    limit: int = DEFAULT_CHILDREN_PAGE_SIZE
+) -> Dict[str, Any]:
+    """
+    Convert part of a CollapsibleTree to the frontend format, for loading on demand.
+    
+    Directories include the children the frontend needs right away: those
+    of the first ``levels`` levels below the node, and those of directories
+    expanded in the tree. Every directory reports its ``childCount`` and
+    whether its children were left out (``collapsed``); at most ``limit``
+    children are included per directory, the rest are fetched page by page
+    with get_lazy_children.
+    
+    Args:
+        collapsible_tree: The CollapsibleTree to convert
+        node: Node to start from (the root by default)
+        levels: Number of levels to include regardless of the collapse state
+        limit: Maximum number of children included per directory
+        
+    Returns:
+        Dict: A JSON-serializable tree structure for the frontend
+    """
+    file_detector = FileTypeDetector()
+    node = node or collapsible_tree.root
+    root_path = _ensure_content_hashes(node)
+    return _convert_node_lazily(node, file_detector, root_path, levels, limit)
+
+
+def get_lazy_children(
+    node: TreeNode,
+    offset: int = 0,
+    limit: int = DEFAULT_CHILDREN_PAGE_SIZE,
+    levels: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    Convert one page of the children of a directory to the frontend format.
+    
+    Args:
+        node: The directory TreeNode
+        offset: Number of children to skip
+        limit: Maximum number of children to return
+        levels: Number of levels to include below each child, besides those
+            of expanded directories (see convert_to_lazy_frontend_tree)
+        
+    Returns:
+        List of JSON-serializable child nodes
+    """
+    file_detector = FileTypeDetector()
+    root_path = _ensure_content_hashes(node)
+    return [
+        _convert_node_lazily(child, file_detector, root_path, levels, limit)
+        for child in node.children[offset:offset + limit]
+    ]
+
+
+def _convert_node_lazily(
+    node: TreeNode,
+    file_detector: FileTypeDetector,
+    root_path: str,
+    levels: int,
+    limit: int
+) -> Dict[str, Any]:
+    """
+    Convert a TreeNode and the children that are shown to frontend format.
+    
+    Args:
+        node: The TreeNode to convert
+        file_detector: FileTypeDetector instance for file type information
+        root_path: Path of the tree root, which node IDs are relative to
+        levels: Number of levels to include regardless of the collapse state
+        limit: Maximum number of children included per directory
+        
+    Returns:
+        Dict: A JSON-serializable node representation
+    """
+    frontend_node = _create_frontend_node(node, file_detector, root_path)
+    
+    if node.is_directory:
+        show_children = levels > 0 or not node.is_collapsed
+        frontend_node["childCount"] = len(node.children)
+        frontend_node["collapsed"] = not show_children
+        
+        if show_children and node.children:
+            frontend_node["children"] = [
+                _convert_node_lazily(child, file_detector, root_path, levels - 1, limit)
+                for child in node.children[:limit]
+            ]
+    
+    return frontend_node
+
+
+def create_file_structure_tree(
+    repo_path: str,
+    exclude_dirs: Optional[List[str]] = None,
+    directory_tree: Optional[DirectoryNode] = None
+) -> Dict[str, Any]:
     """
     Create a complete file structure tree for a repository path.
     
     Args:
         repo_path: Path to the repository root
         exclude_dirs: List of directories to exclude
+        directory_tree: Result of an earlier scan_directory call, so the
+            repository is not scanned again; when scanned with
+            classify_files, no files are read at all (optional)
         
     Returns:
         Dict: A JSON-serializable tree structure for the frontend
     """
     # Scan the directory
-    directory_tree = scan_directory(repo_path, exclude_dirs)
+    if directory_tree is None:
+        directory_tree = scan_directory(repo_path, exclude_dirs, classify_files=True, compact=True)
     
     # Convert to collapsible tree
     collapsible_tree = convert_directory_to_collapsible_tree(directory_tree)
@@ -117,18 +346,29 @@ def create_file_structure_tree(repo_path: str, exclude_dirs: Optional[List[str]]
     return convert_to_frontend_tree(collapsible_tree)
 
 
-def create_dependency_visualization(repo_path: str) -> Dict[str, Any]:
+def create_dependency_visualization(
+    repo_path: str,
+    cache: Optional[AnalysisCache] = None,
+    graph: Optional[Union[DependencyGraph, CompactDependencyGraph]] = None
+) -> Dict[str, Any]:
     """
     Create a dependency visualization data structure for a repository.
     
     Args:
         repo_path: Path to the repository root
+        cache: Optional analysis cache, so unchanged files are not parsed again
+        graph: Result of an earlier analyze_dependencies call, so the
+            repository is not analyzed again (optional)
         
     Returns:
         Dict: A JSON-serializable graph structure for visualization
     """
+    # Compact graphs serialize straight from their arrays
+    if isinstance(graph, CompactDependencyGraph):
+        return graph.to_visualization()
+    
     # Analyze dependencies
-    dependency_graph = analyze_dependencies(repo_path)
+    dependency_graph = graph if graph is not None else analyze_dependencies(repo_path, cache)
     
     # Create nodes list
     nodes = []
@@ -159,12 +399,14 @@ def create_dependency_visualization(repo_path: str) -> Dict[str, Any]:
     }
 
 
-def get_file_structure_stats(repo_path: str) -> Dict[str, Any]:
+def get_file_structure_stats(repo_path: str, directory_tree: Optional[DirectoryNode] = None) -> Dict[str, Any]:
     """
     Get statistics about the file structure of a repository.
     
     Args:
         repo_path: Path to the repository root
+        directory_tree: Result of an earlier scan_directory call, so the
+            repository is not scanned again (optional)
         
     Returns:
         Dict: Statistics about the repository file structure
@@ -172,7 +414,8 @@ def get_file_structure_stats(repo_path: str) -> Dict[str, Any]:
     from app.structure.directory_scanner import get_file_stats
     
     # Scan the directory
-    directory_tree = scan_directory(repo_path)
+    if directory_tree is None:
+        directory_tree = scan_directory(repo_path, compact=True)
     
     # Get statistics
     stats = get_file_stats(directory_tree)
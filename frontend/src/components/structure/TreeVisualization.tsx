@@ -6,6 +6,7 @@ import { TreeStats } from './TreeStats';
 import { TreeSearch } from './TreeSearch';
 
 export interface TreeNode {
+  // Stable ID derived from the path relative to the repository root
   id: string;
   name: string;
   type: 'file' | 'directory';
@@ -15,6 +16,11 @@ export interface TreeNode {
   size?: number;
   metadata?: Record<string, any>;
   isCollapsed?: boolean;
+  // Set by the lazy tree endpoints: number of children, and whether they were left out
+  childCount?: number;
+  collapsed?: boolean;
+  // Content hash of the subtree; unchanged hashes mean the subtree is unchanged
+  hash?: string;
 }
 
 export interface TreeVisualizationProps {
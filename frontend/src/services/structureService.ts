@@ -5,6 +5,19 @@ export interface RepositoryStructureResponse {
   stats: Record<string, any>;
 }
 
+export interface LazyRepositoryStructureResponse {
+  tree: TreeNode;
+  stats: Record<string, any>;
+}
+
+export interface DirectoryChildrenResponse {
+  path: string;
+  children: TreeNode[];
+  total: number;
+  offset: number;
+  limit: number;
+}
+
 export interface DependencyNode {
   id: string;
   name: string;
@@ -24,6 +37,14 @@ export interface DependencyGraphResponse {
   stats: Record<string, any>;
 }
 
+export interface ChangeImpactResponse {
+  paths: string[];
+  direction: 'dependents' | 'dependencies';
+  max_depth: number | null;
+  impacted: { path: string; depth: number }[];
+  count: number;
+}
+
 /**
  * Service for fetching repository structure and dependency data
  */
@@ -60,6 +81,101 @@ export const structureService = {
     return await response.json();
   },
   
+  /**
+   * Fetch the top levels of the repository structure tree
+   * 
+   * Directories whose children are left out have `collapsed` set; their
+   * children are loaded with getDirectoryChildren.
+   * 
+   * @param repositoryId - ID of the repository
+   * @param levels - Number of directory levels to include
+   * @param excludeDirs - Optional directories to exclude
+   * @returns Promise with the partial repository structure
+   */
+  async getLazyRepositoryStructure(
+    repositoryId: string,
+    levels: number = 1,
+    excludeDirs?: string[]
+  ): Promise<LazyRepositoryStructureResponse> {
+    const params = new URLSearchParams({ levels: String(levels) });
+    excludeDirs?.forEach(dir => params.append('exclude_dirs', dir));
+    
+    const response = await fetch(`/api/structure/tree/${repositoryId}/lazy?${params.toString()}`);
+    
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(
+        error.detail || `Failed to fetch repository structure: ${response.statusText}`
+      );
+    }
+    
+    return await response.json();
+  },
+  
+  /**
+   * Fetch a page of the children of a directory (marks it as expanded)
+   * 
+   * @param repositoryId - ID of the repository
+   * @param path - Path of the directory
+   * @param offset - Number of children to skip
+   * @param limit - Maximum number of children to return
+   * @param excludeDirs - Optional directories to exclude
+   * @returns Promise with the page of children
+   */
+  async getDirectoryChildren(
+    repositoryId: string,
+    path: string,
+    offset: number = 0,
+    limit: number = 500,
+    excludeDirs?: string[]
+  ): Promise<DirectoryChildrenResponse> {
+    const params = new URLSearchParams({
+      path,
+      offset: String(offset),
+      limit: String(limit)
+    });
+    excludeDirs?.forEach(dir => params.append('exclude_dirs', dir));
+    
+    const response = await fetch(`/api/structure/tree/${repositoryId}/children?${params.toString()}`);
+    
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(
+        error.detail || `Failed to fetch directory children: ${response.statusText}`
+      );
+    }
+    
+    return await response.json();
+  },
+  
+  /**
+   * Mark a directory as collapsed on the server
+   * 
+   * @param repositoryId - ID of the repository
+   * @param path - Path of the directory
+   * @param excludeDirs - Optional directories to exclude
+   */
+  async collapseDirectory(
+    repositoryId: string,
+    path: string,
+    excludeDirs?: string[]
+  ): Promise<void> {
+    const params = new URLSearchParams({ path });
+    excludeDirs?.forEach(dir => params.append('exclude_dirs', dir));
+    
+    const response = await fetch(
+      `/api/structure/tree/${repositoryId}/collapse?${params.toString()}`,
+      { method: 'POST' }
+    );
+    
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(
+        error.detail || `Failed to collapse directory: ${response.statusText}`
+      );
+    }
+  },
+  
   /**
    * Fetch repository dependency graph
    * 
@@ -89,6 +205,40 @@ export const structureService = {
       );
     }
     
+    return await response.json();
+  },
+  
+  /**
+   * Fetch the files affected by changing some files (their blast radius)
+   * 
+   * @param repositoryId - ID of the repository
+   * @param paths - Paths of the changed files, relative to the repository root
+   * @param depth - Optional maximum number of import hops to follow
+   * @param direction - 'dependents' (default) or 'dependencies'
+   * @returns Promise with the impacted files and their distance
+   */
+  async getChangeImpact(
+    repositoryId: string,
+    paths: string[],
+    depth?: number,
+    direction: 'dependents' | 'dependencies' = 'dependents'
+  ): Promise<ChangeImpactResponse> {
+    const params = new URLSearchParams();
+    paths.forEach(path => params.append('path', path));
+    params.append('direction', direction);
+    if (depth !== undefined) {
+      params.append('depth', String(depth));
+    }
+    
+    const response = await fetch(`/api/structure/impact/${repositoryId}?${params.toString()}`);
+    
+    if (!response.ok) {
+      const error = await response.json().catch(() => ({}));
+      throw new Error(
+        error.detail || `Failed to fetch change impact: ${response.statusText}`
+      );
+    }
+    
     return await response.json();
   }
 }; 
\ No newline at end of file
@@ -0,0 +1,121 @@
+import pytest
+from unittest import mock
+from app.analysis.analysis_cache import (
+    AnalysisCache,
+    compute_blob_sha,
+    analyze_source
+)
+from app.structure.dependency_analyzer import analyze_dependencies
+from app.diagrams.sequence.analyzer import analyze_python_file, analyze_python_code
+
+PYTHON_CODE = b"""import os
+from utils.helpers import format_date
+
+def main():
+    service = Service()
+    service.run(os.getcwd())
+"""
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Fixture providing an empty analysis cache in a temporary directory."""
+    return AnalysisCache(str(tmp_path / "cache"))
+
+
+def test_compute_blob_sha_matches_git():
+    """Test that the cache key is the git blob SHA of the content."""
+    assert compute_blob_sha(b"") == "e69de29bb2d1d6434b8b29ae775ad8c2e48c5391"
+    assert compute_blob_sha("hello\n") == "ce013625030ba8dba906f756967f9e9ca394464a"
+
+def test_analyze_source_counts_hits_and_misses(cache):
+    """Test that a second analysis of the same content is a cache hit."""
+    first = analyze_source(PYTHON_CODE, '.py', cache)
+    second = analyze_source(PYTHON_CODE, '.py', cache)
+
+    assert first == second
+    stats = cache.get_stats()
+    assert stats['hits'] == 1
+    assert stats['misses'] == 1
+    assert stats['entries'] == 1
+
+def test_cache_persists_across_instances(tmp_path):
+    """Test that entries written by one cache instance are read by another."""
+    cache_dir = str(tmp_path / "cache")
+    AnalysisCache(cache_dir).put("ab" * 20, 'python', {'imports': {}})
+
+    assert AnalysisCache(cache_dir).get("ab" * 20, 'python') == {'imports': {}}
+
+def test_analyzer_version_is_part_of_key(tmp_path):
+    """Test that entries from a different analyzer version are not reused."""
+    cache_dir = str(tmp_path / "cache")
+    AnalysisCache(cache_dir, analyzer_version="1").put("ab" * 20, 'python', {'imports': {}})
+
+    assert AnalysisCache(cache_dir, analyzer_version="2").get("ab" * 20, 'python') is None
+
+def test_eviction_keeps_cache_under_max_size(tmp_path):
+    """Test that least recently used entries are evicted when the cache is full."""
+    cache = AnalysisCache(str(tmp_path / "cache"), max_size_bytes=2000)
+    payload = {'data': 'x' * 400}
+
+    for i in range(10):
+        cache.put(f"{i:040x}", 'python', payload)
+
+    stats = cache.get_stats()
+    assert stats['size_bytes'] <= 2000
+    assert stats['evictions'] > 0
+    # The most recent entry survives
+    assert cache.get(f"{9:040x}", 'python') == payload
+
+def test_analyze_source_python(cache):
+    """Test that Python analysis stores every analyzer's results."""
+    result = analyze_source(PYTHON_CODE, '.py', cache)
+
+    assert result['imports']['utils.helpers'] == ['format_date']
+    assert [call['method'] for call in result['method_calls']] == ['run', 'getcwd']
+    assert result['object_creations'][0]['class'] == 'Service'
+    assert 'async_patterns' in result
+    assert 'conditional_patterns' in result
+
+def test_analyze_source_records_syntax_errors(cache):
+    """Test that files with syntax errors are cached with their error."""
+    result = analyze_source(b"import os\ndef broken(:\n", '.py', cache)
+
+    assert 'error' in result
+    assert 'os' in result['imports']
+
+def test_analyze_dependencies_with_cache_matches_uncached(tmp_path, cache):
+    """Test that cached dependency analysis gives the same graph without re-parsing."""
+    repo = tmp_path / "repo"
+    (repo / "utils").mkdir(parents=True)
+    (repo / "main.py").write_bytes(PYTHON_CODE)
+    (repo / "utils" / "__init__.py").write_bytes(b"")
+    (repo / "utils" / "helpers.py").write_bytes(b"import datetime\n")
+    (repo / "app.js").write_bytes(b"import axios from 'axios';\nimport { run } from './main';\n")
+
+    uncached = analyze_dependencies(str(repo))
+    first = analyze_dependencies(str(repo), cache)
+    assert cache.get_stats()['hits'] == 0
+
+    with mock.patch('app.analysis.analysis_cache.analyze_python_source') as mock_analyze:
+        second = analyze_dependencies(str(repo), cache)
+        mock_analyze.assert_not_called()
+
+    assert cache.get_stats()['hits'] == 4
+    for graph in (first, second):
+        assert set(graph.nodes) == set(uncached.nodes)
+        for path, node in uncached.nodes.items():
+            assert graph.get_dependencies_for(path) == uncached.get_dependencies_for(path)
+            assert ({dep.name for dep in graph.nodes[path].external_dependencies} ==
+                    {dep.name for dep in node.external_dependencies})
+
+def test_analyze_python_file_with_cache(tmp_path, cache):
+    """Test that cached file analysis produces the same diagram."""
+    file_path = tmp_path / "main.py"
+    file_path.write_bytes(PYTHON_CODE)
+
+    expected = analyze_python_code(PYTHON_CODE.decode('utf-8'))
+
+    assert analyze_python_file(str(file_path), cache) == expected
+    assert analyze_python_file(str(file_path), cache) == expected
+    assert cache.get_stats()['hits'] == 1
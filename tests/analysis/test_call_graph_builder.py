@@ -291,6 +291,27 @@ class TestCallGraphBuilder:
         assert conditional_node.is_conditional
         assert conditional_node.condition == 'if input_valid'
 
+    def test_call_graph_with_partial_caller_paths(self):
+        """Test that long chains of partial caller paths resolve to their parents."""
+        method_calls = [{'caller': 'main', 'method': 'step0', 'args': [], 'lineno': 1}]
+        for i in range(1, 2000):
+            method_calls.append({
+                'caller': f'step{i - 1}.body',
+                'method': f'step{i}',
+                'args': [],
+                'lineno': i + 1
+            })
+        
+        graph = build_call_graph(list(reversed(method_calls)))
+        
+        assert len(graph) == 1
+        node, depth = graph[0], 0
+        while node.children:
+            assert len(node.children) == 1
+            node, depth = node.children[0], depth + 1
+        assert node.method == 'step1999'
+        assert depth == 1999
+
 
 class TestObjectLifetimeGraph:
     """Test cases for the object lifetime graph builder."""
@@ -0,0 +1,103 @@
+import pytest
+from unittest import mock
+from app.analysis.parsed_module import ParsedModule, parse_python_module
+from app.analysis.python_extractor import (
+    MethodCallExtractor,
+    ObjectCreationExtractor,
+    extract_method_calls,
+    extract_object_creations
+)
+from app.analysis.async_pattern_detector import AsyncPatternDetector, detect_async_patterns
+from app.analysis.conditional_pattern_detector import detect_conditional_patterns
+from app.structure.dependency_analyzer import extract_python_imports
+
+CODE = """
+import os
+from utils.helpers import format_date
+
+class DataService:
+    async def load(self):
+        client = HttpClient()
+        if client.ready:
+            data = await client.fetch(os.getcwd())
+        return data
+
+def run():
+    import json
+    service = DataService()
+    service.load()
+"""
+
+
+def test_analyze_matches_individual_wrappers():
+    """Test that the single-walk analysis matches the per-analyzer functions."""
+    results = ParsedModule.from_source(CODE).analyze()
+
+    assert results['method_calls'] == extract_method_calls(CODE)
+    assert results['object_creations'] == extract_object_creations(CODE)
+    assert results['async_patterns'] == detect_async_patterns(CODE)
+    assert results['conditional_patterns'] == detect_conditional_patterns(CODE)
+    assert results['imports'] == extract_python_imports(CODE)
+
+def test_wrappers_reuse_parsed_module():
+    """Test that wrappers accept a ParsedModule and do not parse it again."""
+    module = ParsedModule.from_source(CODE)
+
+    with mock.patch('ast.parse') as mock_parse:
+        calls = extract_method_calls(module)
+        creations = extract_object_creations(module)
+        patterns = detect_async_patterns(module)
+        imports = extract_python_imports(module)
+
+    mock_parse.assert_not_called()
+    assert {call['method'] for call in calls} == {'fetch', 'getcwd', 'load'}
+    assert [creation['class'] for creation in creations] == ['HttpClient', 'DataService']
+    assert patterns[0]['type'] == 'async_method'
+    assert patterns[0]['class'] == 'DataService'
+    assert imports['utils.helpers'] == ['format_date']
+
+def test_run_walks_each_analyzer_once():
+    """Test that analyzers already run on a module are cached."""
+    module = ParsedModule.from_source(CODE)
+
+    first_calls, first_creations = module.run(MethodCallExtractor, ObjectCreationExtractor)
+    second_calls = module.get(MethodCallExtractor)
+
+    assert first_calls is second_calls
+    assert module.get(ObjectCreationExtractor) is first_creations
+    assert isinstance(module.get(AsyncPatternDetector), AsyncPatternDetector)
+
+def test_parse_python_module_returns_existing_module():
+    """Test that an existing ParsedModule is passed through unchanged."""
+    module = ParsedModule.from_source(CODE)
+
+    assert parse_python_module(module) is module
+    assert parse_python_module(CODE) is not module
+
+def test_syntax_error_has_context():
+    """Test that syntax errors are re-raised with context."""
+    with pytest.raises(SyntaxError) as exc_info:
+        ParsedModule.from_source("def broken(:\n    pass")
+
+    assert "Failed to parse Python code" in str(exc_info.value)
+
+def test_visitors_track_their_own_parents():
+    """Test that analyzers walked separately don't share their ancestor lists."""
+    first = MethodCallExtractor()
+    second = ObjectCreationExtractor()
+    assert first.parents == [] and first.parents is not second.parents
+
+    first.visit(ParsedModule.from_source(CODE).tree)
+    assert second.parents == []
+
+def test_enter_and_leave_dispatch_single_nodes():
+    """Test that enter and leave call the hooks for the type of a node, if any."""
+    detector = AsyncPatternDetector()
+    function = ParsedModule.from_source("async def load():\n    pass\n").tree.body[0]
+
+    detector.enter(function)
+    assert detector.current_function == "load"
+    detector.leave(function)
+    assert detector.current_function is None
+
+    detector.enter(function.body[0])  # No hooks for Pass
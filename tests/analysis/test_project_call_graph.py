@@ -0,0 +1,136 @@
+import threading
+
+import pytest
+from app.analysis.analysis_cache import AnalysisCache
+from app.analysis.project_call_graph import CALLERS, ProjectCallGraph
+from app.analysis.python_extractor import extract_call_sites
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Fixture providing a small repository whose calls cross files."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("from .core import run\n")
+    (tmp_path / "pkg" / "core.py").write_text(
+        "from pkg import util as u\n"
+        "\n"
+        "class Engine:\n"
+        "    def __init__(self):\n"
+        "        self.start()\n"
+        "\n"
+        "    def start(self):\n"
+        "        u.helper()\n"
+        "\n"
+        "def run():\n"
+        "    def build():\n"
+        "        return Engine()\n"
+        "    build()\n"
+    )
+    (tmp_path / "pkg" / "util.py").write_text("import os\n\ndef helper():\n    os.getcwd()\n")
+    (tmp_path / "main.py").write_text("import pkg\n\ndef main():\n    pkg.run()\n\nmain()\n")
+    return tmp_path
+
+
+def test_extract_call_sites_records_scopes():
+    """Test that calls are recorded with their enclosing function and import bindings."""
+    call_sites = extract_call_sites(
+        "from a.b import c as d\n"
+        "class K:\n"
+        "    def m(self):\n"
+        "        d(self.n())\n"
+        "top()\n"
+    )
+
+    assert call_sites['functions'] == [{'name': 'K.m', 'class': 'K', 'lineno': 3}]
+    assert call_sites['classes'] == [{'name': 'K', 'lineno': 2}]
+    assert [(call['scope'], call['callee']) for call in call_sites['calls']] == [
+        ('K.m', 'd'), ('K.m', 'self.n'), ('', 'top')
+    ]
+    assert call_sites['imports'] == [{'name': 'd', 'module': 'a.b', 'symbol': 'c', 'level': 0}]
+
+def test_calls_resolve_across_files(repo):
+    """Test that calls resolve through imports, re-exports, self and constructors."""
+    graph = ProjectCallGraph()
+    graph.sync(str(repo))
+
+    assert graph.get_callees("main.py:main") == ["pkg/core.py:run"]
+    assert graph.get_callees("pkg/core.py:run") == ["pkg/core.py:run.build"]
+    assert graph.get_callees("pkg/core.py:run.build") == ["pkg/core.py:Engine.__init__"]
+    assert graph.get_callees("pkg/core.py:Engine.start") == ["pkg/util.py:helper"]
+    assert graph.get_related("pkg/util.py:helper", CALLERS) == ["pkg/core.py:Engine.start"]
+    assert graph.unresolved_calls == 1  # os.getcwd()
+
+    assert graph.find_path("main.py:<module>", "pkg/util.py:helper") == [
+        "main.py:<module>", "main.py:main", "pkg/core.py:run", "pkg/core.py:run.build",
+        "pkg/core.py:Engine.__init__", "pkg/core.py:Engine.start", "pkg/util.py:helper"
+    ]
+    assert graph.find_path("main.py:main", "pkg/util.py:helper", max_depth=2) is None
+    with pytest.raises(ValueError):
+        graph.get_related("main.py:main", "sideways")
+
+def test_sync_only_reanalyzes_changed_files(repo, tmp_path):
+    """Test that a sync re-analyzes changed files and re-links the files calling into them."""
+    cache = AnalysisCache(str(tmp_path / "cache"))
+    graph = ProjectCallGraph()
+    assert graph.sync(str(repo), cache) == {'updated': 4, 'removed': 0, 'unchanged': 0}
+
+    # Renaming helper breaks the call from core.py until it is renamed there too
+    (repo / "pkg" / "util.py").write_text("def assist():\n    pass\n")
+    assert graph.sync(str(repo), cache) == {'updated': 1, 'removed': 0, 'unchanged': 3}
+    assert graph.get_callees("pkg/core.py:Engine.start") == []
+    assert "pkg/util.py:helper" not in graph
+
+    (repo / "pkg" / "core.py").write_text("from pkg.util import assist\n\ndef run():\n    assist()\n")
+    graph.sync(str(repo), cache)
+    assert graph.get_callers("pkg/util.py:assist") == ["pkg/core.py:run"]
+
+    (repo / "main.py").unlink()
+    assert graph.sync(str(repo), cache)['removed'] == 1
+    assert graph.get_callers("pkg/core.py:run") == []
+
+def test_edit_after_removing_importer(tmp_path):
+    """Test that a removed file is no longer re-linked when a file it imported changes."""
+    (tmp_path / "a.py").write_text("def f():\n    pass\n")
+    (tmp_path / "b.py").write_text("from a import f\n\ndef g():\n    f()\n")
+    graph = ProjectCallGraph()
+    graph.sync(str(tmp_path), commit_sha="1")
+    assert graph.get_callers("a.py:f") == ["b.py:g"]
+
+    (tmp_path / "b.py").unlink()
+    graph.sync(str(tmp_path), commit_sha="2")
+
+    (tmp_path / "a.py").write_text("def f():\n    h()\n\ndef h():\n    pass\n")
+    assert graph.sync(str(tmp_path), commit_sha="3") == {'updated': 1, 'removed': 0, 'unchanged': 0}
+    assert graph.get_callees("a.py:f") == ["a.py:h"]
+    assert graph.commit_sha == "3"
+
+def test_reads_wait_for_sync_in_progress(repo):
+    """Test that readers see the graph before or after a sync, never halfway through."""
+    graph = ProjectCallGraph()
+    graph.sync(str(repo))
+    (repo / "main.py").write_text("import pkg\n\ndef main():\n    pass\n")
+
+    applying = threading.Event()
+    release = threading.Event()
+    apply = graph._apply
+
+    def slow_apply(*args, **kwargs):
+        applying.set()
+        release.wait(10)
+        apply(*args, **kwargs)
+
+    graph._apply = slow_apply
+    syncing = threading.Thread(target=graph.sync, args=(str(repo),))
+    syncing.start()
+    assert applying.wait(10)
+
+    callees = []
+    reader = threading.Thread(target=lambda: callees.append(graph.get_callees("main.py:main")))
+    reader.start()
+    reader.join(0.1)
+    assert reader.is_alive()
+
+    release.set()
+    syncing.join(10)
+    reader.join(10)
+    assert callees == [[]]
@@ -0,0 +1,130 @@
+from collections import OrderedDict
+
+import pytest
+from app.analysis import symbol_index
+from app.analysis.analysis_cache import AnalysisCache
+from app.analysis.python_extractor import extract_definitions
+from app.analysis.symbol_index import SYMBOL_INDEX_CACHE_KIND, SymbolIndex, build_symbol_index, load_symbol_index
+from app.analysis.typescript_extractor import extract_definitions as extract_ts_definitions
+from app.diagrams.sequence.analyzer import extract_callee_from_method_calls
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Fixture providing a small repository with Python and TypeScript definitions."""
+    (tmp_path / "repo.py").write_text(
+        "class UserRepository:\n"
+        "    def save(self, user: dict) -> None:\n"
+        "        pass\n"
+        "\n"
+        "class OrderRepository:\n"
+        "    def save(self, order):\n"
+        "        pass\n"
+        "\n"
+        "    async def find(self, order_id):\n"
+        "        pass\n"
+    )
+    (tmp_path / "client.ts").write_text(
+        "export class ApiClient {\n"
+        "  request(url: string): Promise<any> {\n"
+        "    return fetch(url);\n"
+        "  }\n"
+        "}\n"
+    )
+    return tmp_path
+
+
+def test_extract_definitions_records_signatures_and_ranges():
+    """Test that Python definitions carry qualified names, signatures and line ranges."""
+    definitions = extract_definitions(
+        "class K(Base):\n"
+        "    async def m(self, x: int = 1) -> str:\n"
+        "        return ''\n"
+        "def f(*args):\n"
+        "    pass\n"
+    )
+
+    assert [(d['name'], d['kind'], d['lineno'], d['end_lineno']) for d in definitions] == [
+        ('K', 'class', 1, 3), ('K.m', 'method', 2, 3), ('f', 'function', 4, 5)
+    ]
+    assert definitions[0]['signature'] == '(Base)'
+    assert definitions[1]['signature'] == '(self, x: int=1) -> str'
+    assert definitions[1]['class'] == 'K' and definitions[1]['is_async']
+
+
+def test_extract_typescript_definitions():
+    """Test that TypeScript classes, methods and functions are found with their line ranges."""
+    definitions = extract_ts_definitions(
+        "class Service {\n"
+        "  async load(id: string): Promise<void> {\n"
+        "    if (id) { return; }\n"
+        "  }\n"
+        "}\n"
+        "const format = (s: string) => s.trim();\n"
+    )
+
+    assert [(d['name'], d['kind'], d['lineno'], d['end_lineno']) for d in definitions] == [
+        ('Service', 'class', 1, 5), ('Service.load', 'method', 2, 4), ('format', 'function', 6, 6)
+    ]
+    assert definitions[1]['class'] == 'Service' and definitions[1]['is_async']
+
+
+def test_build_symbol_index_covers_all_files(repo):
+    """Test that one pass indexes the definitions of every code file."""
+    index = build_symbol_index(str(repo))
+
+    assert sorted(index.files) == ['client.ts', 'repo.py']
+    assert index.get_method_owners('save') == ['UserRepository', 'OrderRepository']
+    assert [s['qualname'] for s in index.get_members('OrderRepository')] == [
+        'OrderRepository.save', 'OrderRepository.find'
+    ]
+
+    [request] = index.lookup('ApiClient.request')
+    assert request['path'] == 'client.ts'
+    assert request['signature'] == '(url: string): Promise<any>'
+    assert index.find_enclosing('repo.py', 10)['qualname'] == 'OrderRepository.find'
+    assert index.find_enclosing('repo.py', 4) is None
+
+
+def test_resolve_callee_by_lookup(repo):
+    """Test that method calls resolve to the class defining the method."""
+    index = build_symbol_index(str(repo))
+
+    assert index.resolve_callee('find', 'self.repo') == 'OrderRepository'
+    assert index.resolve_callee('save', 'self.user_repository') == 'UserRepository'
+    assert index.resolve_callee('save', 'orders') is None
+    assert index.resolve_callee('missing', 'x') is None
+
+    calls = extract_callee_from_method_calls(
+        [{'caller': 'self.repo', 'method': 'find'}, {'caller': 'db', 'method': 'getData'}], index
+    )
+    assert [call['callee'] for call in calls] == ['OrderRepository', 'Data']
+
+
+def test_index_is_persisted_per_commit(repo, tmp_path_factory):
+    """Test that indexes round-trip through the analysis cache under their commit."""
+    store = AnalysisCache(str(tmp_path_factory.mktemp('cache')))
+
+    index = load_symbol_index(str(repo), 'abc123', store)
+    assert store.get('abc123', SYMBOL_INDEX_CACHE_KIND) is not None
+
+    (repo / "repo.py").unlink()
+    restored = load_symbol_index(str(repo), 'abc123', store)
+
+    assert isinstance(restored, SymbolIndex)
+    assert restored.commit_sha == 'abc123'
+    assert restored.to_dict() == index.to_dict()
+    assert restored.get_symbols('repo.py') == index.get_symbols('repo.py')
+
+
+def test_repository_indexes_are_bounded(repo, monkeypatch):
+    """Test that only the most recently used repository indexes are kept in memory."""
+    monkeypatch.setattr(symbol_index, "_symbol_indexes", OrderedDict())
+    monkeypatch.setattr(symbol_index, "DEFAULT_MAX_INDEXES", 2)
+
+    first = symbol_index.get_symbol_index('repo-1', str(repo), 'abc123')
+    symbol_index.get_symbol_index('repo-2', str(repo), 'abc123')
+    assert symbol_index.get_symbol_index('repo-1', str(repo), 'abc123') is first
+
+    symbol_index.get_symbol_index('repo-3', str(repo), 'abc123')
+    assert list(symbol_index._symbol_indexes) == ['repo-1', 'repo-3']
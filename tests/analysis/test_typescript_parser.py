@@ -0,0 +1,200 @@
+import os
+import shutil
+import subprocess
+import sys
+import textwrap
+
+import pytest
+from app.analysis import analysis_cache, typescript_parser
+from app.analysis.typescript_parser import (
+    WORKER_SCRIPT,
+    TypeScriptParserError,
+    TypeScriptParserPool,
+    TypeScriptParserTimeout
+)
+
+
+# Speaks the worker protocol: crashes on "crash", hangs on "hang", otherwise
+# reports its process ID and the number of sources in the batch
+FAKE_WORKER = textwrap.dedent("""
+    import json, os, sys, time
+    if os.environ.get('FAKE_WORKER_UNAVAILABLE'):
+        print(json.dumps({'ready': False, 'error': "Cannot find module 'typescript'"}), flush=True)
+        sys.exit(1)
+    print(json.dumps({'ready': True}), flush=True)
+    for line in sys.stdin:
+        request = json.loads(line)
+        sources = [item['source'] for item in request['sources']]
+        if 'crash' in sources:
+            sys.exit(1)
+        if 'hang' in sources:
+            time.sleep(60)
+        results = [
+            {'method_calls': [{'source': source, 'pid': os.getpid(), 'batch': len(sources)}],
+             'imports': {}, 'async_patterns': [], 'conditional_patterns': []}
+            for source in sources
+        ]
+        print(json.dumps({'id': request['id'], 'results': results}), flush=True)
+""")
+
+
+@pytest.fixture
+def fake_worker(tmp_path):
+    """Fixture providing the command of a stand-in parser worker."""
+    script = tmp_path / "fake_worker.py"
+    script.write_text(FAKE_WORKER)
+    return [sys.executable, str(script)]
+
+
+def test_batch_is_answered_by_one_long_lived_worker(fake_worker):
+    """Test that a batch takes one round trip and later requests reuse the worker."""
+    pool = TypeScriptParserPool(size=1, command=fake_worker)
+    try:
+        results = pool.parse_batch(['a', 'b', 'c'])
+        assert [r['method_calls'][0]['source'] for r in results] == ['a', 'b', 'c']
+        assert {r['method_calls'][0]['batch'] for r in results} == {3}
+
+        pid = results[0]['method_calls'][0]['pid']
+        assert pool.parse('d')['method_calls'][0]['pid'] == pid
+    finally:
+        pool.close()
+
+
+def test_crashed_worker_is_restarted(fake_worker):
+    """Test that a request whose worker crashed is retried once on a new worker."""
+    pool = TypeScriptParserPool(size=1, command=fake_worker)
+    try:
+        pid = pool.parse('a')['method_calls'][0]['pid']
+
+        # The retry crashes too, so the error is raised
+        with pytest.raises(TypeScriptParserError):
+            pool.parse('crash')
+        assert pool.restarts == 1
+
+        # The pool recovers with a fresh worker
+        assert pool.parse('b')['method_calls'][0]['pid'] != pid
+        assert pool.available
+    finally:
+        pool.close()
+
+
+def test_request_timeout_kills_worker(fake_worker):
+    """Test that a request taking too long raises and is not retried."""
+    pool = TypeScriptParserPool(size=1, timeout=0.5, command=fake_worker)
+    try:
+        with pytest.raises(TypeScriptParserTimeout):
+            pool.parse('hang')
+        assert pool.restarts == 0
+        assert pool.parse('a')['method_calls'][0]['source'] == 'a'
+    finally:
+        pool.close()
+
+
+def test_missing_compiler_falls_back_to_pattern_matching(fake_worker, monkeypatch):
+    """Test that the pool becomes unavailable and analysis falls back to pattern matching."""
+    monkeypatch.setenv('FAKE_WORKER_UNAVAILABLE', '1')
+    pool = TypeScriptParserPool(size=2, command=fake_worker)
+    monkeypatch.setattr(typescript_parser, "_default_pool", pool)
+
+    result = analysis_cache.analyze_typescript_source("import x from './x';\nclient.send(x);\n")
+
+    assert not pool.available
+    assert result['imports'] == {'./x': ['default']}
+    assert result['method_calls'][0]['method'] == 'send'
+    assert 'definitions' in result
+
+
+def test_analyze_sources_batches_typescript_misses(fake_worker, monkeypatch, tmp_path):
+    """Test that TypeScript cache misses are sent together and cached."""
+    pool = TypeScriptParserPool(size=1, command=fake_worker)
+    monkeypatch.setattr(typescript_parser, "_default_pool", pool)
+    cache = analysis_cache.AnalysisCache(str(tmp_path / "cache"))
+    try:
+        files = [(b'a.b()', '.ts'), (b'x = 1\n', '.py'), (b'c.d()', '.tsx'), (b'\xff', '.ts')]
+        results = analysis_cache.analyze_sources(files, cache)
+
+        assert [r['method_calls'][0]['batch'] for r in (results[0], results[2])] == [2, 2]
+        assert results[1]['method_calls'] == [] and results[3] is None
+        assert analysis_cache.analyze_source(b'a.b()', '.ts', cache) == results[0]
+    finally:
+        pool.close()
+
+
+def test_dependency_imports_batched_with_or_without_cache(fake_worker, monkeypatch, tmp_path):
+    """Test that dependency analysis batches TypeScript files and uses the same imports with or without the cache."""
+    from app.structure.dependency_analyzer import analyze_dependencies
+
+    pool = TypeScriptParserPool(size=1, command=fake_worker)
+    monkeypatch.setattr(typescript_parser, "_default_pool", pool)
+    batches = []
+    parse_batch = pool.parse_batch
+    monkeypatch.setattr(pool, "parse_batch", lambda sources, paths=None: batches.append(len(sources)) or parse_batch(sources, paths))
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    (repo / "a.ts").write_text("import b from './b';\n")
+    (repo / "b.ts").write_text("export default 1;\n")
+    try:
+        uncached = analyze_dependencies(str(repo), workers=1)
+        cached = analyze_dependencies(str(repo), cache=analysis_cache.AnalysisCache(str(tmp_path / "cache")), workers=1)
+
+        assert batches == [2, 2]
+        # The fake worker reports no imports, where pattern matching would find './b'
+        assert uncached.get_dependencies_for("a.ts") == cached.get_dependencies_for("a.ts") == []
+    finally:
+        pool.close()
+
+
+def test_fallback_results_are_replaced_once_the_compiler_works(fake_worker, monkeypatch, tmp_path):
+    """Test that pattern-matching results are not served in place of compiler results."""
+    cache = analysis_cache.AnalysisCache(str(tmp_path / "cache"))
+    monkeypatch.setenv('FAKE_WORKER_UNAVAILABLE', '1')
+    monkeypatch.setattr(typescript_parser, "_default_pool", TypeScriptParserPool(size=1, command=fake_worker))
+
+    fallback = analysis_cache.analyze_source(b'client.send(x)', '.ts', cache)
+    assert fallback['method_calls'][0]['method'] == 'send'
+    # Still answered from the cache while the compiler is unavailable
+    assert analysis_cache.analyze_source(b'client.send(x)', '.ts', cache) == fallback
+    assert cache.hits == 1
+
+    monkeypatch.delenv('FAKE_WORKER_UNAVAILABLE')
+    pool = TypeScriptParserPool(size=1, command=fake_worker)
+    monkeypatch.setattr(typescript_parser, "_default_pool", pool)
+    try:
+        result = analysis_cache.analyze_source(b'client.send(x)', '.ts', cache)
+        assert result['method_calls'][0]['source'] == 'client.send(x)'
+        assert analysis_cache.analyze_sources([(b'client.send(x)', '.ts')], cache) == [result]
+    finally:
+        pool.close()
+
+
+def _typescript_installed() -> bool:
+    """Check whether Node.js can load the TypeScript compiler for the worker script."""
+    if shutil.which('node') is None:
+        return False
+    check = subprocess.run(['node', '-e', "require('typescript')"], cwd=os.path.dirname(WORKER_SCRIPT),
+                           capture_output=True)
+    return check.returncode == 0
+
+
+@pytest.mark.skipif(not _typescript_installed(), reason="requires Node.js with the typescript package")
+def test_worker_parses_with_typescript_compiler():
+    """Test the real worker script against the TypeScript compiler."""
+    pool = TypeScriptParserPool(size=1)
+    try:
+        result = pool.parse(
+            "import { a as b } from './a';\n"
+            "async function load() {\n"
+            "  const users = await api.get('/users');\n"
+            "  return users.length > 0 ? users : [];\n"
+            "}\n",
+            'load.ts'
+        )
+    finally:
+        pool.close()
+
+    assert result['imports'] == {'./a': ['a']}
+    assert result['method_calls'][0]['caller'] == 'api'
+    assert result['method_calls'][0]['is_async'] is True
+    assert [p['type'] for p in result['async_patterns']] == ['async_function', 'await_expression']
+    assert result['conditional_patterns'][0]['type'] == 'ternary'
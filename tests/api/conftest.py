@@ -0,0 +1,83 @@
+"""
+Shared fixtures for the API tests.
+"""
+from collections import OrderedDict
+
+import pytest
+
+from app.analysis import analysis_cache, project_call_graph, symbol_index
+from app.analysis.analysis_cache import AnalysisCache
+from app.jobs import job_queue
+from app.jobs.job_queue import JobQueue
+from app.storage import job_store, repository_registry
+from app.storage.job_store import JobStore
+from app.storage.repository_registry import RepositoryRegistry
+from app.structure import dependency_artifact, structure_snapshot
+from app.structure.dependency_artifact import DependencyArtifactCache
+from app.structure.structure_snapshot import StructureSnapshotCache
+
+
+@pytest.fixture
+def database_url(tmp_path_factory):
+    """URL of a fresh application database."""
+    # A database file rather than in-memory, since jobs use it from worker threads
+    return f"sqlite:///{tmp_path_factory.mktemp('database') / 'repomind.db'}"
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch, database_url):
+    """Use a fresh repository registry for every API test."""
+    registry = RepositoryRegistry(database_url)
+    monkeypatch.setattr(repository_registry, "_default_registry", registry)
+    return registry
+
+
+@pytest.fixture(autouse=True)
+def jobs(monkeypatch, database_url):
+    """Use a fresh job store and job queue for every API test."""
+    store = JobStore(database_url)
+    queue = JobQueue(store, max_workers=2)
+    monkeypatch.setattr(job_store, "_default_store", store)
+    monkeypatch.setattr(job_queue, "_default_queue", queue)
+    yield queue
+    queue.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def file_analysis_cache(monkeypatch, tmp_path_factory):
+    """Use an empty analysis cache outside the repository for every API test."""
+    cache = AnalysisCache(str(tmp_path_factory.mktemp('analysis_cache')))
+    monkeypatch.setattr(analysis_cache, "_default_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def snapshot_cache(monkeypatch):
+    """Use an empty structure snapshot cache for every API test."""
+    cache = StructureSnapshotCache()
+    monkeypatch.setattr(structure_snapshot, "_default_snapshot_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def artifact_cache(monkeypatch):
+    """Use an empty, memory-only dependency artifact cache for every API test."""
+    cache = DependencyArtifactCache()
+    monkeypatch.setattr(dependency_artifact, "_default_artifact_cache", cache)
+    return cache
+
+
+@pytest.fixture(autouse=True)
+def call_graphs(monkeypatch):
+    """Start every API test without any repository call graphs."""
+    graphs = OrderedDict()
+    monkeypatch.setattr(project_call_graph, "_call_graphs", graphs)
+    return graphs
+
+
+@pytest.fixture(autouse=True)
+def symbol_indexes(monkeypatch):
+    """Start every API test without any repository symbol indexes."""
+    indexes = OrderedDict()
+    monkeypatch.setattr(symbol_index, "_symbol_indexes", indexes)
+    return indexes
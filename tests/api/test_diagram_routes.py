@@ -0,0 +1,29 @@
+"""
+Tests for the diagram API routes.
+"""
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+
+client = TestClient(app)
+
+
+def test_sequence_diagram_resolves_callees_in_repository(registry, symbol_indexes, tmp_path):
+    """Test that callees defined in other files of a repository are resolved by its symbol index."""
+    (tmp_path / "store.py").write_text("class AccountLedger:\n    def persist(self, record):\n        pass\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+    code = "def handle(target, record):\n    target.persist(record)\n"
+
+    response = client.post("/diagrams/sequence", json={"code": code})
+    assert response.status_code == 200
+    assert "AccountLedger" not in response.json()["diagram"]
+
+    response = client.post("/diagrams/sequence", json={"code": code, "repository_id": "cloned-repo"})
+    assert response.status_code == 200
+    assert "AccountLedger" in response.json()["diagram"]
+    assert response.json()["metadata"]["repository_id"] == "cloned-repo"
+    assert symbol_indexes["cloned-repo"].commit_sha == "a" * 40
+
+    response = client.post("/diagrams/sequence", json={"code": code, "repository_id": "missing-repo"})
+    assert response.status_code == 400
@@ -2,11 +2,18 @@
 Tests for the repositories API endpoints.
 """
 
+import os
+import json
+import threading
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock
 
 from app.main import app
+from app.api.routes.repositories import clone_repository_task
+from app.jobs.job_queue import QueueFullError
+from app.github.repository_cloner import CloneResult
+from app.structure.structure_snapshot import make_snapshot_key
 
 client = TestClient(app)
 
@@ -44,8 +51,8 @@ def test_clone_repository():
     with patch('app.github.url_validator.extract_repo_info') as mock_extract_info:
         mock_extract_info.return_value = ("username", "repo", None)
         
-        # Mock the background task
-        with patch('app.api.routes.repositories.BackgroundTasks.add_task') as mock_add_task:
+        # Mock the job queue
+        with patch('app.jobs.job_queue.JobQueue.submit') as mock_add_task:
             response = client.post(
                 "/repositories/clone",
                 json={"url": "https://github.com/username/repo"}
@@ -58,7 +65,7 @@ def test_clone_repository():
             assert data["repository"]["owner"] == "username"
             assert data["repository"]["name"] == "repo"
             
-            # Verify background task was added
+            # Verify the clone job was queued
             mock_add_task.assert_called_once()
 
 def test_clone_repository_with_branch():
@@ -67,8 +74,8 @@ def test_clone_repository_with_branch():
     with patch('app.github.url_validator.extract_repo_info') as mock_extract_info:
         mock_extract_info.return_value = ("username", "repo", None)
         
-        # Mock the background task
-        with patch('app.api.routes.repositories.BackgroundTasks.add_task') as mock_add_task:
+        # Mock the job queue
+        with patch('app.jobs.job_queue.JobQueue.submit') as mock_add_task:
             response = client.post(
                 "/repositories/clone",
                 json={"url": "https://github.com/username/repo", "branch": "feature-branch"}
@@ -79,13 +86,13 @@ def test_clone_repository_with_branch():
             data = response.json()
             assert data["repository"]["branch"] == "feature-branch"
             
-            # Verify background task was added
+            # Verify the clone job was queued
             mock_add_task.assert_called_once()
             
             # Get call arguments and check that branch is included
             call_args = mock_add_task.call_args[0]
-            # First parameter should be the task function
-            # Second parameter should be task_id
+            # First parameter should be the job kind
+            # Second parameter should be the task function
             # Third parameter should be URL
             # Fourth parameter should be branch
             assert len(call_args) >= 4  # Make sure we have enough parameters
@@ -96,19 +103,208 @@ def test_get_clone_status_not_found():
     response = client.get("/repositories/clone/non-existent-task")
     assert response.status_code == 404
 
-def test_get_clone_status_found():
+def test_get_clone_status_found(jobs):
     """Test getting clone status for an existing task."""
-    # Add a mock task to the clone_tasks dictionary
+    # Add a job to the job store
     test_task_id = "test-task-id"
-    with patch('app.api.routes.repositories.clone_tasks', {
-        test_task_id: {
-            "status": "in_progress",
-            "progress": 50,
-            "operation": "Downloading objects"
-        }
-    }):
-        response = client.get(f"/repositories/clone/{test_task_id}")
+    jobs.store.create(test_task_id, "clone")
+    jobs.store.update(test_task_id, status="in_progress", progress=50, operation="Downloading objects")
+    
+    response = client.get(f"/repositories/clone/{test_task_id}")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "in_progress"
+    assert data["progress"] == 50 
+
+def test_get_clone_status_from_registry(registry):
+    """Test that clones from before a restart are reported from the registry."""
+    registry.register("old-task-id", url="https://github.com/username/repo", owner="username",
+                      name="repo", path="/clones/username_repo", status="completed")
+
+    response = client.get("/repositories/clone/old-task-id")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["path"] == "/clones/username_repo"
+    assert data["repository"]["name"] == "repo"
+
+def test_clone_task_registers_repository(registry, jobs):
+    """Test that a finished clone is recorded in the registry."""
+    with patch('app.api.routes.repositories.clone_repository_with_strategy') as mock_clone, \
+         patch('app.api.routes.repositories.get_head_commit') as mock_head:
+        mock_clone.return_value = CloneResult("/clones/username_repo", "shallow", 1024, 0.5)
+        mock_head.return_value = "a" * 40
+
+        jobs.submit("clone", clone_repository_task, "https://github.com/username/repo",
+                    job_id="new-task-id", strategy="shallow", data={"strategy": "shallow"})
+        assert jobs.join(timeout=10)
+
+    assert mock_clone.call_args[0][4] == "shallow"
+    status = client.get("/repositories/clone/new-task-id").json()
+    assert status["status"] == "completed"
+    assert status["progress"] == 100
+    assert status["strategy"] == "shallow"
+    assert status["bytes_transferred"] == 1024
+    assert status["elapsed_seconds"] == 0.5
+
+    record = registry.get("new-task-id")
+    assert record.status == "completed"
+    assert record.path == os.path.abspath("/clones/username_repo")
+    assert record.commit_sha == "a" * 40
+
+    response = client.get("/repositories/new-task-id")
+    assert response.status_code == 200
+    assert response.json()["owner"] == "username"
+
+
+def test_clone_repository_invalid_strategy():
+    """Test that unknown clone strategies are rejected."""
+    response = client.post(
+        "/repositories/clone",
+        json={"url": "https://github.com/username/repo", "strategy": "everything"}
+    )
+    assert response.status_code == 422
+
+def test_clone_repository_queue_full():
+    """Test that clone requests are rejected while the job queue is full."""
+    with patch('app.jobs.job_queue.JobQueue.submit') as mock_submit:
+        mock_submit.side_effect = QueueFullError("Too many queued jobs")
+        response = client.post(
+            "/repositories/clone",
+            json={"url": "https://github.com/username/repo"}
+        )
+    assert response.status_code == 503
+
+def test_clone_task_failure_reported(registry, jobs):
+    """Test that a failed clone is reported by the status endpoint and the registry."""
+    with patch('app.api.routes.repositories.clone_repository_with_strategy') as mock_clone:
+        mock_clone.side_effect = RuntimeError("Repository not found")
+
+        jobs.submit("clone", clone_repository_task, "https://github.com/username/missing",
+                    job_id="failed-task-id")
+        assert jobs.join(timeout=10)
+
+    status = client.get("/repositories/clone/failed-task-id").json()
+    assert status["status"] == "error"
+    assert status["error"] == "Repository not found"
+    assert registry.get("failed-task-id").status == "error"
+
+def test_sync_repository_endpoint(registry, snapshot_cache, tmp_path):
+    """Test that syncing a registered clone updates its commit and lists changed files."""
+    import git
+
+    source_path = tmp_path / "source"
+    source = git.Repo.init(str(source_path), initial_branch="main")
+    with source.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    (source_path / "main.py").write_text("import os\n")
+    source.index.add(["main.py"])
+    old_commit = source.index.commit("first").hexsha
+
+    clone_path = tmp_path / "clone"
+    git.Repo.clone_from(str(source_path), str(clone_path))
+    registry.register("synced-repo", path=str(clone_path), branch="main",
+                      commit_sha=old_commit, status="completed")
+    # A second clone of the same URL shares the checkout
+    registry.register("same-clone-repo", path=str(clone_path), branch="main",
+                      commit_sha=old_commit, status="completed")
+
+    (source_path / "utils.py").write_text("pass\n")
+    source.index.add(["utils.py"])
+    new_commit = source.index.commit("second").hexsha
+    snapshot_key = make_snapshot_key("same-clone-repo", old_commit, None)
+    snapshot_cache.put(snapshot_key, MagicMock())
+
+    response = client.post("/repositories/synced-repo/sync", json={})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["old_commit"] == old_commit
+    assert data["new_commit"] == new_commit
+    assert data["changed_files"] == [{"status": "A", "path": "utils.py"}]
+    assert registry.get("synced-repo").commit_sha == new_commit
+    assert registry.get("same-clone-repo").commit_sha == new_commit
+    assert registry.get("same-clone-repo").branch == "main"
+    # The old checkout's structure is dropped for every repository on the clone
+    assert snapshot_cache.get(snapshot_key) is None
+
+    # Switching the shared clone would move the other repository too
+    response = client.post("/repositories/synced-repo/sync", json={"branch": "feature"})
+    assert response.status_code == 409
+    assert "same-clone-repo" in response.json()["detail"]
+    response = client.post("/repositories/synced-repo/sync", json={"commit": old_commit})
+    assert response.status_code == 409
+    assert registry.get("synced-repo").commit_sha == new_commit
+
+    response = client.post("/repositories/unknown-repo/sync", json={})
+    assert response.status_code == 404
+
+def _read_events(response):
+    """Parse a Server-Sent Events response into (event name, data) tuples."""
+    events = []
+    name = None
+    for line in response.iter_lines():
+        if line.startswith("event: "):
+            name = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((name, json.loads(line[len("data: "):])))
+    return events
+
+def test_stream_clone_events_finished(jobs):
+    """Test that the event stream of a finished task only sends its final status."""
+    jobs.store.create("done-task-id", "clone", data={"strategy": "shallow"})
+    jobs.store.update("done-task-id", status="completed", progress=100)
+
+    with client.stream("GET", "/repositories/clone/done-task-id/events") as response:
         assert response.status_code == 200
-        data = response.json()
-        assert data["status"] == "in_progress"
-        assert data["progress"] == 50 
\ No newline at end of file
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = _read_events(response)
+
+    assert events == [("status", {"status": "completed", "progress": 100,
+                                  "operation": "Queued", "strategy": "shallow"})]
+
+    response = client.get("/repositories/clone/non-existent-task/events")
+    assert response.status_code == 404
+
+def test_stream_clone_events_live(jobs, monkeypatch):
+    """Test that progress events of a running task are streamed as they happen."""
+    subscribed = threading.Event()
+    listening = threading.Event()
+    subscribe = jobs.events.subscribe
+    get = jobs.get
+
+    def subscribe_and_notify(job_id):
+        subscription = subscribe(job_id)
+        subscribed.set()
+        return subscription
+
+    def get_and_notify(job_id):
+        # The stream reads the initial status right after subscribing
+        job = get(job_id)
+        if subscribed.is_set():
+            listening.set()
+        return job
+
+    monkeypatch.setattr(jobs.events, "subscribe", subscribe_and_notify)
+    monkeypatch.setattr(jobs, "get", get_and_notify)
+
+    def job(context):
+        # Report progress only once the client has the initial status
+        listening.wait(10)
+        context.publish(phase="receiving", objects_received=5, total_objects=10)
+        context.update(progress=50, operation="Receiving objects")
+        return {"path": "/clones/username_repo"}
+
+    jobs.submit("clone", job, job_id="live-task-id")
+
+    with client.stream("GET", "/repositories/clone/live-task-id/events") as response:
+        events = _read_events(response)
+
+    assert events[0][0] == "status"
+    assert events[0][1]["status"] in ("queued", "in_progress")
+    progress_events = [data for name, data in events if name == "progress"]
+    assert progress_events == [{"phase": "receiving", "objects_received": 5, "total_objects": 10}]
+    assert any(name == "status" and data["progress"] == 50 for name, data in events)
+    assert events[-1][0] == "status"
+    assert events[-1][1]["status"] == "completed"
+    assert events[-1][1]["path"] == "/clones/username_repo"
@@ -7,7 +7,9 @@ from unittest import mock
 from fastapi.testclient import TestClient
 
 from app.main import app
-from app.structure.directory_scanner import DirectoryNode, FileNode
+from app.structure.compact_dependency_graph import CompactDependencyGraphBuilder
+from app.structure.dependency_analyzer import analyze_dependencies
+from app.structure.directory_scanner import DirectoryNode, FileNode, scan_directory
 
 
 client = TestClient(app)
@@ -99,55 +101,18 @@ def mock_get_file_structure_stats():
         yield mock_stats
 
 
-@pytest.fixture
-def mock_create_dependency_visualization():
-    with mock.patch("app.api.routes.structure.create_dependency_visualization") as mock_deps:
-        # Create mock dependency visualization
-        mock_deps.return_value = {
-            "nodes": [
-                {
-                    "id": "/repo/src/file1.py",
-                    "name": "file1.py",
-                    "path": "/repo/src/file1.py",
-                    "type": "python"
-                },
-                {
-                    "id": "/repo/src/file2.py",
-                    "name": "file2.py",
-                    "path": "/repo/src/file2.py",
-                    "type": "python"
-                },
-                {
-                    "id": "/repo/tests/test_file.py",
-                    "name": "test_file.py",
-                    "path": "/repo/tests/test_file.py",
-                    "type": "python"
-                }
-            ],
-            "edges": [
-                {
-                    "source": "/repo/src/file2.py",
-                    "target": "/repo/src/file1.py",
-                    "type": "dependency"
-                },
-                {
-                    "source": "/repo/tests/test_file.py",
-                    "target": "/repo/src/file1.py",
-                    "type": "dependency"
-                }
-            ]
-        }
-        yield mock_deps
-
-
 @pytest.fixture
 def mock_analyze_dependencies():
     with mock.patch("app.api.routes.structure.analyze_dependencies") as mock_analyze:
-        # Create a mock dependency graph
-        mock_graph = mock.MagicMock()
-        mock_graph.find_circular_dependencies.return_value = []
+        # Create a compact dependency graph: file2 -> file1, test_file -> file1
+        builder = CompactDependencyGraphBuilder()
+        file1 = builder.add_node("/repo/src/file1.py", "python")
+        file2 = builder.add_node("/repo/src/file2.py", "python")
+        test_file = builder.add_node("/repo/tests/test_file.py", "python")
+        builder.add_dependency(file2, file1)
+        builder.add_dependency(test_file, file1)
         
-        mock_analyze.return_value = mock_graph
+        mock_analyze.return_value = builder.build()
         yield mock_analyze
 
 
@@ -193,7 +158,7 @@ def test_get_repository_structure_with_exclude_dirs(mock_create_file_structure_t
     assert kwargs.get("exclude_dirs") == ["tests", ".git"]
 
 
-def test_get_repository_dependencies(mock_create_dependency_visualization, mock_analyze_dependencies):
+def test_get_repository_dependencies(mock_analyze_dependencies):
     """Test the repository dependencies endpoint."""
     response = client.get("/structure/dependencies/test-repo")
     assert response.status_code == 200
@@ -217,10 +182,45 @@ def test_get_repository_dependencies(mock_create_dependency_visualization, mock_
     assert any(edge["source"].endswith("test_file.py") and edge["target"].endswith("file1.py") for edge in edges)
 
 
-def test_get_repository_dependencies_with_exclude_dirs(mock_create_dependency_visualization, mock_analyze_dependencies):
+def test_get_repository_dependencies_with_exclude_dirs(mock_analyze_dependencies):
     """Test the repository dependencies endpoint with exclude_dirs parameter."""
     response = client.get("/structure/dependencies/test-repo?exclude_dirs=tests&exclude_dirs=.git")
     assert response.status_code == 200
+    
+    # Verify that exclude_dirs was passed to analyze_dependencies
+    mock_analyze_dependencies.assert_called_once()
+    args, kwargs = mock_analyze_dependencies.call_args
+    assert kwargs.get("exclude_dirs") == ["tests", ".git"]
+
+
+def test_dependencies_exclude_dirs_are_part_of_the_artifact_key(registry, tmp_path):
+    """Test that excluded directories are left out of the graph and cached apart."""
+    (tmp_path / "tests").mkdir()
+    (tmp_path / "a.py").write_text("value = 1\n")
+    (tmp_path / "tests" / "test_a.py").write_text("import a\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    full = client.get("/structure/dependencies/cloned-repo").json()
+    filtered = client.get("/structure/dependencies/cloned-repo?exclude_dirs=tests").json()
+
+    assert len(full["nodes"]) == 2
+    assert [node["id"] for node in filtered["nodes"]] == ["a.py"]
+
+
+def test_dependencies_are_analyzed_once_per_commit(registry, tmp_path):
+    """Test that the dependency graph and its statistics come from one analysis per commit."""
+    (tmp_path / "a.py").write_text("import b\n")
+    (tmp_path / "b.py").write_text("import a\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    with mock.patch("app.api.routes.structure.analyze_dependencies", wraps=analyze_dependencies) as mock_analyze:
+        first = client.get("/structure/dependencies/cloned-repo").json()
+        second = client.get("/structure/dependencies/cloned-repo").json()
+
+    assert mock_analyze.call_count == 1
+    assert first == second
+    assert first["stats"]["total_dependencies"] == 2
+    assert first["stats"]["dependency_clusters"] == [["a.py", "b.py"]]
 
 
 def test_get_file_type_distribution(mock_get_file_structure_stats):
@@ -265,4 +265,225 @@ def test_search_repository_files(mock_create_file_structure_tree):
     response = client.get("/structure/search/test-repo?query=nonexistent")
     data = response.json()
     assert data["count"] == 0
-    assert len(data["results"]) == 0 
\ No newline at end of file
+    assert len(data["results"]) == 0 
+
+
+def test_routes_use_registered_repository_path(registry, mock_get_file_structure_stats):
+    """Test that registered repositories are looked up at their clone path."""
+    registry.register("cloned-repo", path="/clones/owner_repo", status="completed")
+
+    response = client.get("/structure/file-types/cloned-repo")
+    assert response.status_code == 200
+    mock_get_file_structure_stats.assert_called_once()
+    assert mock_get_file_structure_stats.call_args[0][0] == "/clones/owner_repo"
+
+
+def test_structure_endpoints_share_one_scan(registry, tmp_path):
+    """Test that the structure endpoints answer from a single scan per commit."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("print('hello')\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    with mock.patch("app.api.routes.structure.scan_directory",
+                    wraps=scan_directory) as mock_scan:
+        tree = client.get("/structure/tree/cloned-repo").json()
+        file_types = client.get("/structure/file-types/cloned-repo").json()
+        search = client.get("/structure/search/cloned-repo?query=main").json()
+        assert mock_scan.call_count == 1
+
+        # A new checkout is scanned again
+        registry.update("cloned-repo", commit_sha="b" * 40)
+        client.get("/structure/tree/cloned-repo")
+        assert mock_scan.call_count == 2
+
+    assert tree["stats"]["total_files"] == 1
+    assert file_types["file_types"] == {"python": 1}
+    assert search["count"] == 1
+    assert search["results"][0]["name"] == "main.py"
+
+
+def test_search_repository_file_contents(registry, tmp_path):
+    """Test that search matches file contents and returns the matching lines."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("from config import load_settings\n\nload_settings()\n")
+    (tmp_path / "src" / "config.py").write_text("def load_settings():\n    pass\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    response = client.get("/structure/search/cloned-repo?query=load_settings")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert data["count_exact"]
+
+    main = next(result for result in data["results"] if result["name"] == "main.py")
+    assert [match["line"] for match in main["matches"]] == [1, 3]
+
+    # Paging and path-only search
+    response = client.get("/structure/search/cloned-repo?query=load_settings&limit=1&offset=1")
+    assert len(response.json()["results"]) == 1
+    response = client.get("/structure/search/cloned-repo?query=load_settings&search_content=false")
+    assert response.json()["count"] == 0
+
+
+def test_tree_supports_conditional_requests(registry, tmp_path):
+    """Test that the tree is tagged with its content hash and unchanged trees get a 304."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("pass\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    response = client.get("/structure/tree/cloned-repo")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert etag == '"%s"' % response.json()["tree"]["hash"]
+
+    response = client.get("/structure/tree/cloned-repo", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert not response.content
+
+    response = client.get("/structure/tree/cloned-repo", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_lazy_tree_loads_directories_on_demand(registry, tmp_path):
+    """Test that the lazy tree only returns the top levels and children are fetched by path."""
+    (tmp_path / "src" / "pkg").mkdir(parents=True)
+    for i in range(3):
+        (tmp_path / "src" / f"module{i}.py").write_text("pass\n")
+    (tmp_path / "src" / "pkg" / "core.py").write_text("pass\n")
+    (tmp_path / "README.md").write_text("# Readme\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    response = client.get("/structure/tree/cloned-repo/lazy")
+    assert response.status_code == 200
+    tree = response.json()["tree"]
+    assert tree["childCount"] == 2
+    src = next(child for child in tree["children"] if child["name"] == "src")
+    assert src["childCount"] == 4
+    assert src["collapsed"]
+    assert "children" not in src
+
+    # A page of the children of src, which marks it as expanded
+    response = client.get("/structure/tree/cloned-repo/children",
+                          params={"path": "src", "offset": 1, "limit": 2})
+    assert response.status_code == 200
+    page = response.json()
+    assert page["total"] == 4
+    assert page["path"] == src["path"]
+    assert len(page["children"]) == 2
+    assert page["expanded"]
+
+    tree = client.get("/structure/tree/cloned-repo/lazy").json()["tree"]
+    src = next(child for child in tree["children"] if child["name"] == "src")
+    assert not src["collapsed"]
+    assert len(src["children"]) == 4
+    pkg = next(child for child in src["children"] if child["name"] == "pkg")
+    assert pkg["collapsed"]
+
+    # Collapsing is remembered as well
+    response = client.post("/structure/tree/cloned-repo/collapse", params={"path": src["path"]})
+    assert response.json()["collapsed"]
+    tree = client.get("/structure/tree/cloned-repo/lazy").json()["tree"]
+    src = next(child for child in tree["children"] if child["name"] == "src")
+    assert "children" not in src
+
+    response = client.get("/structure/tree/cloned-repo/children", params={"path": "missing"})
+    assert response.status_code == 404
+    response = client.get("/structure/tree/cloned-repo/children", params={"path": "README.md"})
+    assert response.status_code == 400
+
+
+def test_directory_state_needs_a_known_commit(registry, tmp_path):
+    """Test that the expand/collapse state is not recorded for checkouts without a known commit."""
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "main.py").write_text("pass\n")
+    registry.register("cloned-repo", path=str(tmp_path), status="completed")
+
+    response = client.get("/structure/tree/cloned-repo/children", params={"path": "src"})
+    assert response.status_code == 200
+    assert len(response.json()["children"]) == 1
+    assert not response.json()["expanded"]
+
+    response = client.post("/structure/tree/cloned-repo/collapse", params={"path": "src"})
+    assert response.status_code == 409
+
+
+def test_directory_endpoints_report_scan_failures(registry, tmp_path):
+    """Test that scan errors of the children and collapse endpoints become 400 responses."""
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    with mock.patch("app.api.routes.structure.scan_directory", side_effect=OSError("Permission denied")):
+        response = client.get("/structure/tree/cloned-repo/children", params={"path": "src"})
+        assert response.status_code == 400
+        assert "Permission denied" in response.json()["detail"]
+
+        response = client.post("/structure/tree/cloned-repo/collapse", params={"path": "src"})
+        assert response.status_code == 400
+
+
+def test_change_impact(registry, tmp_path):
+    """Test that the impact endpoint reports transitive dependents with their distance."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "db.py").write_text("value = 1\n")
+    (tmp_path / "pkg" / "models.py").write_text("from pkg.db import value\n")
+    (tmp_path / "pkg" / "app.py").write_text("from pkg.models import value\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    response = client.get("/structure/impact/cloned-repo", params={"path": "pkg/db.py"})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["count"] == 2
+    assert data["impacted"] == [
+        {"path": os.path.join("pkg", "models.py"), "depth": 1},
+        {"path": os.path.join("pkg", "app.py"), "depth": 2}
+    ]
+
+    response = client.get("/structure/impact/cloned-repo", params={"path": "pkg/db.py", "depth": 1})
+    assert [file["path"] for file in response.json()["impacted"]] == [os.path.join("pkg", "models.py")]
+
+    response = client.get("/structure/impact/cloned-repo",
+                          params={"path": "pkg/app.py", "direction": "dependencies"})
+    assert response.json()["count"] == 2
+
+    response = client.get("/structure/impact/cloned-repo", params={"path": "pkg/missing.py"})
+    assert response.status_code == 404
+    response = client.get("/structure/impact/cloned-repo", params={"path": "pkg/db.py", "direction": "sideways"})
+    assert response.status_code == 400
+
+
+def test_change_impact_reuses_the_commit_graph(registry, tmp_path):
+    """Test that impact queries for one commit share a single dependency analysis."""
+    (tmp_path / "a.py").write_text("import b\n")
+    (tmp_path / "b.py").write_text("value = 1\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    with mock.patch("app.api.routes.structure.analyze_dependencies", wraps=analyze_dependencies) as mock_analyze:
+        for _ in range(2):
+            response = client.get("/structure/impact/cloned-repo", params={"path": "b.py"})
+            assert response.json()["impacted"] == [{"path": "a.py", "depth": 1}]
+        client.get("/structure/dependencies/cloned-repo")
+
+    assert mock_analyze.call_count == 1
+
+
+def test_function_calls_and_call_path(registry, tmp_path):
+    """Test that the call graph endpoints follow calls across files."""
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "db.py").write_text("def save():\n    pass\n")
+    (tmp_path / "pkg" / "app.py").write_text("from pkg.db import save\n\ndef handle():\n    save()\n")
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    response = client.get("/structure/calls/cloned-repo", params={"function": "pkg/db.py:save", "direction": "callers"})
+    assert response.status_code == 200
+    assert response.json()["functions"] == ["pkg/app.py:handle"]
+
+    response = client.get("/structure/call-path/cloned-repo",
+                          params={"source": "pkg/app.py:handle", "target": "pkg/db.py:save"})
+    assert response.json()["path"] == ["pkg/app.py:handle", "pkg/db.py:save"]
+
+    response = client.get("/structure/calls/cloned-repo", params={"function": "pkg/db.py:missing"})
+    assert response.status_code == 404
+    response = client.get("/structure/calls/cloned-repo", params={"function": "pkg/db.py:save", "direction": "sideways"})
+    assert response.status_code == 400
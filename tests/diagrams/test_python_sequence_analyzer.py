@@ -105,4 +105,47 @@ class TestPythonSequenceAnalyzer:
         # Check diagram contains the method chain
         assert "complex_operation->>Database: query" in diagram
         # The rest might be more complex to verify directly, but the diagram should be generated
-        assert "sequenceDiagram" in diagram 
\ No newline at end of file
+        assert "sequenceDiagram" in diagram 
+    def test_analyze_function_reachable_calls(self):
+        """Test that a function-scoped diagram only follows the calls reachable from the entry point."""
+        code = """
+class Repository:
+    def save(self, order):
+        self.db.insert(order)
+
+class OrderService:
+    def place(self, order):
+        self.validate(order)
+        Repository().save(order)
+        notify(order)
+
+    def validate(self, order):
+        rules.check(order)
+
+def notify(order):
+    mailer.send(order)
+
+def unrelated():
+    reports.generate()
+"""
+
+        diagram = analyze_python_code(code, function_name="OrderService.place")
+        lines = [line.strip() for line in diagram.splitlines() if "->>" in line]
+
+        assert lines == [
+            "OrderService->>OrderService: validate(order)",
+            "OrderService->>Rules: check(order)",
+            "OrderService->>+Repository: new Repository()",
+            "OrderService->>Repository: save(order)",
+            "Repository->>Db: insert(order)",
+            "OrderService->>notify: notify(order)",
+            "notify->>Mailer: send(order)"
+        ]
+        assert "generate" not in diagram
+
+        shallow = analyze_python_code(code, function_name="place", max_depth=1)
+        assert "check" not in shallow and "insert" not in shallow
+        assert "OrderService->>Repository: save(order)" in shallow
+
+        with pytest.raises(ValueError):
+            analyze_python_code(code, function_name="missing")
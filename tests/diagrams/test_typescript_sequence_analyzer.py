@@ -117,4 +117,41 @@ class TestTypeScriptSequenceAnalyzer:
         assert "sequenceDiagram" in diagram
         assert "loadUserData-)UserService: findById" in diagram  # Note the async arrow notation
         assert "loadUserData-)PermissionService: getForUser" in diagram
-        assert "loadUserData->>ErrorService: log" in diagram 
\ No newline at end of file
+        assert "loadUserData->>ErrorService: log" in diagram 
+    def test_analyze_function_reachable_calls(self):
+        """Test that a function-scoped diagram only follows the calls reachable from the entry point."""
+        code = """class UserService {
+  register(user: User) {
+    this.validate(user);
+    repository.save(user);
+  }
+
+  validate(user: User) {
+    rules.check(user);
+  }
+}
+
+class UserRepository {
+  save(user: User) {
+    db.insert(user);
+  }
+}
+
+function unrelated() {
+  reports.generate();
+}
+"""
+
+        diagram = analyze_typescript_code(code, function_name="UserService.register")
+        lines = [line.strip() for line in diagram.splitlines() if "->>" in line]
+
+        assert lines == [
+            "UserService->>UserService: validate()",
+            "UserService->>Rules: check()",
+            "UserService->>UserRepository: save()",
+            "UserRepository->>Db: insert()"
+        ]
+        assert "generate" not in diagram
+
+        shallow = analyze_typescript_code(code, function_name="register", max_depth=1)
+        assert "check" not in shallow and "insert" not in shallow
@@ -7,7 +7,15 @@ import shutil
 import pytest
 from unittest.mock import patch, MagicMock
 
-from app.github.repository_cloner import clone_repository, ProgressTracker
+import git
+
+from app.github.repository_cloner import (
+    clone_repository,
+    clone_repository_with_strategy,
+    get_head_commit,
+    sync_repository,
+    ProgressTracker
+)
 
 
 @pytest.fixture
@@ -40,6 +48,26 @@ def test_progress_tracker_update():
     assert tracker.is_complete
 
 
+def test_progress_tracker_transfer_details():
+    """Test that the tracker reports the git transfer details to its callback."""
+    events = []
+    tracker = ProgressTracker(callback=events.append)
+
+    tracker.update(git.RemoteProgress.RECEIVING | git.RemoteProgress.BEGIN, 450, 1000,
+                   "1.50 MiB | 512.00 KiB/s")
+
+    assert events[-1]["phase"] == "receiving"
+    assert events[-1]["percentage"] == 45
+    assert events[-1]["objects_received"] == 450
+    assert events[-1]["total_objects"] == 1000
+    assert events[-1]["bytes_received"] == int(1.5 * 1024 * 1024)
+    assert events[-1]["throughput"] == 512 * 1024
+
+    tracker.update(git.RemoteProgress.RESOLVING, 10, 20, "")
+    assert events[-1]["phase"] == "resolving"
+    assert events[-1]["objects_received"] == 450
+
+
 def test_clone_repository_success(temp_clone_dir):
     """Test successful repository cloning."""
     url = "https://github.com/username/repo"
@@ -110,4 +138,170 @@ def test_clone_repository_failure(temp_clone_dir):
         with pytest.raises(Exception) as exc_info:
             clone_repository(url, temp_clone_dir)
         
-        assert "Failed to clone repository" in str(exc_info.value) 
\ No newline at end of file
+        assert "Failed to clone repository" in str(exc_info.value) 
+
+@pytest.fixture
+def source_repo(tmp_path):
+    """
+    Fixture to create a local repository with two commits to clone from.
+    """
+    repo_path = tmp_path / "source"
+    repo = git.Repo.init(str(repo_path), initial_branch="main")
+    with repo.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+        # Allow partial clones from this repository
+        config.set_value("uploadpack", "allowFilter", "true")
+    
+    (repo_path / "src").mkdir()
+    (repo_path / "src" / "main.py").write_text("import os\n")
+    (repo_path / "data.bin").write_bytes(os.urandom(200000))
+    repo.index.add(["src/main.py", "data.bin"])
+    repo.index.commit("first")
+    (repo_path / "src" / "main.py").write_text("import os\nimport sys\n")
+    repo.index.add(["src/main.py"])
+    repo.index.commit("second")
+    
+    return f"file://{repo_path}"
+
+
+@pytest.mark.parametrize("strategy, expected_commits, checks_out_data", [
+    ("full", 2, True),
+    ("shallow", 1, True),
+    ("single_branch", 2, True),
+    ("blobless", 2, False),
+])
+def test_clone_strategies(source_repo, temp_clone_dir, strategy, expected_commits, checks_out_data):
+    """Test that each clone strategy checks out HEAD and reports its cost."""
+    with patch('app.github.repository_cloner.extract_repo_info') as mock_extract_info:
+        mock_extract_info.return_value = ("username", "repo", None)
+        
+        result = clone_repository_with_strategy(source_repo, temp_clone_dir, strategy=strategy)
+    
+    assert result.strategy == strategy
+    assert result.bytes_transferred > 0
+    assert result.elapsed_seconds >= 0
+    
+    # The analyzable files are always checked out at HEAD
+    with open(os.path.join(result.path, "src", "main.py")) as f:
+        assert f.read() == "import os\nimport sys\n"
+    assert os.path.exists(os.path.join(result.path, "data.bin")) == checks_out_data
+    assert int(git.Repo(result.path).git.rev_list("--count", "HEAD")) == expected_commits
+
+
+def test_blobless_clone_downloads_less(source_repo, temp_clone_dir, tmp_path):
+    """Test that a blobless clone skips the contents of non-analyzable files."""
+    with patch('app.github.repository_cloner.extract_repo_info') as mock_extract_info:
+        mock_extract_info.return_value = ("username", "repo", None)
+        
+        full = clone_repository_with_strategy(source_repo, temp_clone_dir, strategy="full")
+        blobless = clone_repository_with_strategy(source_repo, str(tmp_path), strategy="blobless")
+    
+    assert blobless.bytes_transferred < full.bytes_transferred - 100000
+
+
+def test_clone_repository_unknown_strategy(temp_clone_dir):
+    """Test that unknown clone strategies are rejected."""
+    with pytest.raises(ValueError):
+        clone_repository("https://github.com/username/repo", temp_clone_dir, strategy="everything")
+
+
+def commit_to_source(source_repo, changes, message="update", branch=None):
+    """
+    Commit changes to the source repository of a clone.
+    
+    Args:
+        source_repo: file:// URL from the source_repo fixture
+        changes: Map of relative path to new content (None deletes the file)
+        message: Commit message
+        branch: Branch to commit to (created from HEAD if needed)
+        
+    Returns:
+        SHA of the new commit
+    """
+    repo_path = source_repo[len("file://"):]
+    repo = git.Repo(repo_path)
+    if branch:
+        repo.git.checkout("-B", branch)
+    for rel_path, content in changes.items():
+        full_path = os.path.join(repo_path, rel_path)
+        if content is None:
+            repo.index.remove([rel_path], working_tree=True)
+        else:
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            with open(full_path, "w") as f:
+                f.write(content)
+            repo.index.add([rel_path])
+    sha = repo.index.commit(message).hexsha
+    if branch:
+        repo.git.checkout("main")
+    return sha
+
+
+def clone_source(source_repo, clone_dir, strategy="full"):
+    """Clone the source repository with a strategy."""
+    with patch('app.github.repository_cloner.extract_repo_info') as mock_extract_info:
+        mock_extract_info.return_value = ("username", "repo", None)
+        return clone_repository_with_strategy(source_repo, clone_dir, strategy=strategy)
+
+
+@pytest.mark.parametrize("strategy", ["full", "shallow", "blobless"])
+def test_sync_repository_fast_forwards_and_lists_changes(source_repo, temp_clone_dir, strategy):
+    """Test that syncing fetches new commits and reports the changed files."""
+    clone = clone_source(source_repo, temp_clone_dir, strategy)
+    old_commit = get_head_commit(clone.path)
+    new_commit = commit_to_source(source_repo, {
+        "src/main.py": "import os\nimport sys\nimport json\n",
+        "src/new.py": "pass\n",
+        "data.bin": None,
+    })
+    
+    result = sync_repository(clone.path)
+    
+    assert result.old_commit == old_commit
+    assert result.new_commit == new_commit == get_head_commit(clone.path)
+    assert [(f.status, f.path) for f in result.changed_files] == [
+        ("D", "data.bin"),
+        ("M", "src/main.py"),
+        ("A", "src/new.py"),
+    ]
+    with open(os.path.join(clone.path, "src", "new.py")) as f:
+        assert f.read() == "pass\n"
+    
+    # Nothing changed since the last sync
+    assert sync_repository(clone.path).changed_files == []
+
+
+def test_sync_repository_to_branch_and_commit(source_repo, temp_clone_dir):
+    """Test syncing to another branch and to a specific commit."""
+    clone = clone_source(source_repo, temp_clone_dir)
+    first_commit = git.Repo(clone.path).git.rev_list("--max-parents=0", "HEAD")
+    feature_commit = commit_to_source(source_repo, {"src/feature.py": "pass\n"}, branch="feature")
+    
+    result = sync_repository(clone.path, branch="feature")
+    assert result.new_commit == feature_commit
+    assert git.Repo(clone.path).active_branch.name == "feature"
+    
+    result = sync_repository(clone.path, commit=first_commit)
+    assert result.new_commit == first_commit
+    assert ("D", "src/feature.py") in [(f.status, f.path) for f in result.changed_files]
+
+
+def test_sync_repository_refuses_diverged_branch(source_repo, temp_clone_dir):
+    """Test that a branch that can't be fast-forwarded is not overwritten."""
+    clone = clone_source(source_repo, temp_clone_dir)
+    local = git.Repo(clone.path)
+    with local.config_writer() as config:
+        config.set_value("user", "name", "Test")
+        config.set_value("user", "email", "test@example.com")
+    with open(os.path.join(clone.path, "local.txt"), "w") as f:
+        f.write("local change\n")
+    local.index.add(["local.txt"])
+    local_commit = local.index.commit("local").hexsha
+    commit_to_source(source_repo, {"src/main.py": "import re\n"})
+    
+    with pytest.raises(Exception) as exc_info:
+        sync_repository(clone.path)
+    
+    assert "Failed to sync repository" in str(exc_info.value)
+    assert get_head_commit(clone.path) == local_commit
@@ -0,0 +1,55 @@
+"""
+Tests for broadcasting job events.
+"""
+import asyncio
+import threading
+from app.jobs.job_events import JobEventBroker, EVENT_PROGRESS, EVENT_STATUS
+
+
+def test_events_delivered_to_job_subscribers():
+    """Test that subscribers only receive the events of their job, including from other threads."""
+    broker = JobEventBroker()
+
+    async def consume():
+        subscription = broker.subscribe("job-1")
+        other = broker.subscribe("job-2")
+
+        publisher = threading.Thread(
+            target=broker.publish, args=("job-1", EVENT_PROGRESS, {"percentage": 10})
+        )
+        publisher.start()
+        publisher.join()
+
+        event = await subscription.get(timeout=5)
+        missing = await other.get(timeout=0.05)
+        broker.unsubscribe(subscription)
+        broker.unsubscribe(other)
+        return event, missing
+
+    event, missing = asyncio.run(consume())
+    assert event == (EVENT_PROGRESS, {"percentage": 10})
+    assert missing is None
+
+def test_slow_subscriber_keeps_latest_events():
+    """Test that a full subscriber buffer drops the oldest events."""
+    broker = JobEventBroker(max_buffered=2)
+
+    async def consume():
+        subscription = broker.subscribe("job-1")
+        for percentage in range(5):
+            broker.publish("job-1", EVENT_PROGRESS, {"percentage": percentage})
+        broker.publish("job-1", EVENT_STATUS, {"status": "completed"})
+        # Let the loop run the deliveries scheduled by publish
+        await asyncio.sleep(0)
+
+        events = []
+        while True:
+            event = await subscription.get(timeout=0.05)
+            if event is None:
+                return events
+            events.append(event)
+
+    assert asyncio.run(consume()) == [
+        (EVENT_PROGRESS, {"percentage": 4}),
+        (EVENT_STATUS, {"status": "completed"})
+    ]
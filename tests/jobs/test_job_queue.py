@@ -0,0 +1,136 @@
+"""
+Tests for the bounded background job queue.
+"""
+import threading
+import pytest
+from app.jobs.job_queue import JobQueue, QueueFullError
+from app.storage.job_store import JobStore, JOB_COMPLETED, JOB_ERROR, JOB_QUEUED
+
+
+@pytest.fixture
+def store(tmp_path):
+    """Fixture providing an empty job store."""
+    return JobStore(f"sqlite:///{tmp_path / 'jobs.db'}")
+
+
+@pytest.fixture
+def make_queue(store):
+    """Fixture creating job queues that are shut down after the test."""
+    queues = []
+
+    def make(**options):
+        queue = JobQueue(store, **options)
+        queues.append(queue)
+        return queue
+
+    yield make
+    for queue in queues:
+        queue.shutdown(wait=False)
+
+
+def test_job_result_recorded(make_queue):
+    """Test that a job's progress and returned details are recorded."""
+    queue = make_queue()
+
+    def job(context, value):
+        context.update(progress=50, operation="Halfway", step=1)
+        return {"value": value * 2}
+
+    job_id = queue.submit("test", job, 21, data={"input": 21})
+    assert queue.join(timeout=10)
+
+    status = queue.get(job_id).to_status()
+    assert status["status"] == JOB_COMPLETED
+    assert status["progress"] == 100
+    assert status["operation"] == "Halfway"
+    assert status["input"] == 21
+    assert status["step"] == 1
+    assert status["value"] == 42
+
+def test_job_error_recorded(make_queue):
+    """Test that an exception raised by a job marks it as failed."""
+    queue = make_queue()
+
+    def job(context):
+        raise RuntimeError("boom")
+
+    job_id = queue.submit("test", job)
+    assert queue.join(timeout=10)
+
+    job = queue.get(job_id)
+    assert job.status == JOB_ERROR
+    assert job.error == "boom"
+
+def test_queue_is_bounded(make_queue):
+    """Test that submitting beyond the pending limit raises QueueFullError."""
+    queue = make_queue(max_workers=1, max_pending=1)
+    release = threading.Event()
+
+    queue.submit("test", lambda context: release.wait(10))  # Running
+    queued_id = queue.submit("test", lambda context: None)  # Pending
+    with pytest.raises(QueueFullError):
+        queue.submit("test", lambda context: None)
+
+    assert queue.get(queued_id).status == JOB_QUEUED
+    release.set()
+    assert queue.join(timeout=10)
+    assert queue.get(queued_id).status == JOB_COMPLETED
+
+def test_per_host_limit(make_queue):
+    """Test that jobs for a busy host wait without blocking other hosts."""
+    queue = make_queue(max_workers=3, per_host_limit=1)
+    release = threading.Event()
+    started = []
+    lock = threading.Lock()
+
+    def job(context, name):
+        with lock:
+            started.append(name)
+        release.wait(10)
+
+    queue.submit("test", job, "a1", host="a.example.com")
+    queue.submit("test", job, "a2", host="a.example.com")
+    queue.submit("test", job, "b1", host="b.example.com")
+
+    # Give the workers a moment to pick up the jobs that may start
+    for _ in range(100):
+        with lock:
+            if len(started) >= 2:
+                break
+        threading.Event().wait(0.01)
+
+    with lock:
+        assert sorted(started) == ["a1", "b1"]
+    release.set()
+    assert queue.join(timeout=10)
+    assert sorted(started) == ["a1", "a2", "b1"]
+
+def test_finished_jobs_evicted_after_ttl(make_queue):
+    """Test that finished jobs are evicted once their TTL has passed."""
+    queue = make_queue(ttl_seconds=0)
+
+    first_id = queue.submit("test", lambda context: None)
+    assert queue.join(timeout=10)
+
+    queue.submit("test", lambda context: None)
+    assert queue.get(first_id) is None
+
+def test_queued_jobs_outlive_ttl(make_queue):
+    """Test that jobs waiting or running longer than the TTL are not evicted."""
+    queue = make_queue(max_workers=1, ttl_seconds=0.05)
+    release = threading.Event()
+
+    running_id = queue.submit("test", lambda context: release.wait(10))
+    queued_id = queue.submit("test", lambda context: {"ran": True})
+    threading.Event().wait(0.1)
+
+    # Evicts expired jobs, but not the two still queued or running
+    queue.submit("test", lambda context: None)
+    assert queue.get(running_id) is not None
+    assert queue.get(queued_id) is not None
+
+    release.set()
+    assert queue.join(timeout=10)
+    status = queue.get(queued_id).to_status()
+    assert status["status"] == JOB_COMPLETED
+    assert status["ran"]
@@ -0,0 +1,79 @@
+"""
+Tests for the persistent job store.
+"""
+import time
+import pytest
+from app.storage.job_store import JobStore, JOB_COMPLETED, JOB_IN_PROGRESS, JOB_QUEUED
+
+
+@pytest.fixture
+def store():
+    """Fixture providing an empty in-memory job store."""
+    return JobStore("sqlite://")
+
+
+def test_create_and_get(store):
+    """Test that a created job is queued and can be looked up by ID."""
+    store.create("job-1", "clone", host="github.com", data={"strategy": "shallow"})
+
+    job = store.get("job-1")
+    assert job.status == JOB_QUEUED
+    assert job.host == "github.com"
+    assert job.data == {"strategy": "shallow"}
+    assert store.get("missing") is None
+    with pytest.raises(ValueError):
+        store.create("job-1", "clone")
+
+def test_update_merges_data(store):
+    """Test that updates merge job data and record when a job finished."""
+    store.create("job-1", "clone", data={"strategy": "full"})
+
+    store.update("job-1", status=JOB_IN_PROGRESS, progress=40, data={"path": "/clones/repo"})
+    job = store.update("job-1", status=JOB_COMPLETED, progress=100)
+
+    assert job.finished_at is not None
+    assert job.to_status() == {
+        "status": JOB_COMPLETED,
+        "progress": 100,
+        "operation": "Queued",
+        "strategy": "full",
+        "path": "/clones/repo"
+    }
+    with pytest.raises(KeyError):
+        store.update("missing", status=JOB_COMPLETED)
+
+def test_count_and_list(store):
+    """Test counting and listing jobs by status."""
+    store.create("job-1", "clone")
+    store.create("job-2", "analysis")
+    store.update("job-2", status=JOB_COMPLETED)
+
+    assert store.count([JOB_QUEUED]) == 1
+    assert [job.id for job in store.list_jobs()] == ["job-1", "job-2"]
+    assert [job.id for job in store.list_jobs([JOB_COMPLETED])] == ["job-2"]
+
+def test_evict_expired(store):
+    """Test that only jobs older than the TTL are evicted."""
+    store.create("old", "clone")
+    store.update("old", status=JOB_COMPLETED)
+    time.sleep(0.05)
+    store.create("new", "clone")
+
+    assert store.evict_expired(ttl_seconds=0.02) == 1
+    assert store.get("old") is None
+    assert store.get("new") is not None
+
+    # Unfinished jobs are only evicted if they are no longer queued or running
+    store.create("waiting", "clone")
+    store.create("abandoned", "clone")
+    time.sleep(0.05)
+    assert store.evict_expired(ttl_seconds=0.02, active_ids=["waiting"]) == 2
+    assert store.get("waiting") is not None
+    assert store.get("abandoned") is None
+
+def test_jobs_shared_between_instances(tmp_path):
+    """Test that job state written by one store is visible to another."""
+    database_url = f"sqlite:///{tmp_path / 'jobs.db'}"
+    JobStore(database_url).create("job-1", "clone")
+
+    assert JobStore(database_url).get("job-1").status == JOB_QUEUED
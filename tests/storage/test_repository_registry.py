@@ -0,0 +1,89 @@
+"""
+Tests for the persistent repository registry.
+"""
+import os
+import unittest.mock as mock
+import pytest
+from app.storage.repository_registry import RepositoryRegistry, get_checkout_commit, get_repository_path
+
+
+@pytest.fixture
+def registry():
+    """Fixture providing an empty in-memory registry."""
+    return RepositoryRegistry("sqlite://")
+
+
+def test_register_and_get(registry):
+    """Test that a registered repository can be looked up by ID."""
+    registry.register("repo-1", url="https://github.com/owner/repo", owner="owner", name="repo",
+                      path="/clones/owner_repo", commit_sha="a" * 40, status="completed")
+
+    record = registry.get("repo-1")
+    assert record.owner == "owner"
+    assert record.path == "/clones/owner_repo"
+    assert record.commit_sha == "a" * 40
+    assert registry.get("missing") is None
+    assert [r.id for r in registry.list_repositories()] == ["repo-1"]
+
+def test_update(registry):
+    """Test updating fields of a registered repository."""
+    registry.register("repo-1", status="in_progress")
+
+    record = registry.update("repo-1", path="/clones/repo", status="completed")
+
+    assert record.status == "completed"
+    assert registry.get_path("repo-1") == "/clones/repo"
+    with pytest.raises(KeyError):
+        registry.update("missing", status="completed")
+    with pytest.raises(ValueError):
+        registry.update("repo-1", id="other")
+
+def test_registry_persists_across_instances(tmp_path):
+    """Test that repositories survive reopening the database."""
+    database_url = f"sqlite:///{tmp_path / 'data' / 'registry.db'}"
+    RepositoryRegistry(database_url).register("repo-1", path="/clones/repo", status="completed")
+
+    assert RepositoryRegistry(database_url).get_path("repo-1") == "/clones/repo"
+
+def test_artifacts_are_keyed_by_commit(registry):
+    """Test that artifacts are recorded per commit and default to the current one."""
+    registry.register("repo-1", commit_sha="a" * 40)
+    registry.record_artifact("repo-1", "dependencies", "/artifacts/old.json")
+    registry.record_artifact("repo-1", "dependencies", "/artifacts/new.json")
+
+    assert registry.get_artifact("repo-1", "dependencies").path == "/artifacts/new.json"
+    assert registry.get_artifact("repo-1", "dependencies", "b" * 40) is None
+
+    registry.update("repo-1", commit_sha="b" * 40)
+    assert registry.get_artifact("repo-1", "dependencies") is None
+    assert len(registry.list_artifacts("repo-1")) == 1
+
+    with pytest.raises(KeyError):
+        registry.record_artifact("missing", "dependencies", "/artifacts/x.json")
+
+def test_remove(registry):
+    """Test that removing a repository also removes its artifacts."""
+    registry.register("repo-1", commit_sha="a" * 40)
+    registry.record_artifact("repo-1", "dependencies", "/artifacts/deps.json")
+
+    assert registry.remove("repo-1")
+    assert not registry.remove("repo-1")
+    assert registry.list_artifacts("repo-1") == []
+
+def test_get_repository_path_falls_back_to_legacy_location(registry):
+    """Test that unregistered repositories resolve to the legacy data directory."""
+    registry.register("repo-1", path="/clones/repo", status="completed")
+
+    assert get_repository_path("repo-1", registry) == "/clones/repo"
+    assert get_repository_path("repo-2", registry) == os.path.join("./data/repositories", "repo-2")
+
+def test_checkout_commit_is_read_from_head(registry, tmp_path):
+    """Test that a clone moved by another repository's sync is not served from its old commit."""
+    registry.register("cloned-repo", path=str(tmp_path), commit_sha="a" * 40, status="completed")
+
+    with mock.patch("app.storage.repository_registry.get_head_commit", return_value="b" * 40):
+        assert get_checkout_commit("cloned-repo", str(tmp_path), registry) == "b" * 40
+
+    # Falls back to the registered commit when HEAD can't be read
+    with mock.patch("app.storage.repository_registry.get_head_commit", return_value=None):
+        assert get_checkout_commit("cloned-repo", str(tmp_path), registry) == "a" * 40
@@ -1,3 +1,4 @@
+import random
 import unittest
 from app.structure.collapsible_tree import TreeNode, CollapsibleTree
 
@@ -159,6 +160,53 @@ class TestCollapsibleTree(unittest.TestCase):
         self.assertNotIn("root/src", expanded_paths)
         self.assertIn("root/docs", expanded_paths)
 
+    
+    def test_find_node_after_add_child(self):
+        """Test that nodes added to a tree are indexed and get their depth."""
+        tests_dir = TreeNode("tests", "root/tests", is_directory=True)
+        tests_dir.add_child(TreeNode("test_main.py", "root/tests/test_main.py"))
+        self.root.add_child(tests_dir)
+        
+        found_node = self.tree.find_node("root/tests/test_main.py")
+        self.assertIs(found_node, tests_dir.children[0])
+        self.assertEqual(found_node.get_depth(), 2)
+        self.assertEqual(self.tree.visible_count, 10)
+    
+    def test_visible_slice_and_position(self):
+        """Test visible slices and positions against a full walk of the tree."""
+        rng = random.Random(42)
+        root = TreeNode("root", "root", is_directory=True)
+        directories = [root]
+        for i in range(300):
+            parent = rng.choice(directories)
+            node = TreeNode(f"n{i}", f"{parent.path}/n{i}", is_directory=rng.random() < 0.3)
+            parent.add_child(node)
+            if node.is_directory:
+                directories.append(node)
+        tree = CollapsibleTree(root)
+        
+        def walk(node):
+            nodes = [node]
+            if node.is_directory and not node.is_collapsed:
+                for child in node.children:
+                    nodes.extend(walk(child))
+            return nodes
+        
+        for _ in range(50):
+            tree.toggle_node(rng.choice(directories))
+            expected = walk(root)
+            self.assertEqual(tree.visible_count, len(expected))
+            self.assertEqual(tree.get_visible_nodes(), expected)
+            
+            start = rng.randrange(len(expected))
+            self.assertEqual(tree.get_visible_slice(start, start + 10), expected[start:start + 10])
+            for position in rng.sample(range(len(expected)), min(5, len(expected))):
+                self.assertEqual(tree.get_visible_position(expected[position]), position)
+        
+        tree.collapse_all()
+        self.assertEqual(tree.get_visible_nodes(), [root])
+        self.assertIsNone(tree.get_visible_position(directories[-1]))
+
 
 if __name__ == "__main__":
     unittest.main() 
\ No newline at end of file
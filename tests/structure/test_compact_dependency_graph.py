@@ -0,0 +1,103 @@
+"""
+Tests for the compact dependency graph backend.
+"""
+import json
+import os
+import tempfile
+import pytest
+
+from app.structure.compact_dependency_graph import CompactDependencyGraph, CompactDependencyGraphBuilder
+from app.structure.dependency_analyzer import analyze_dependencies
+
+
+def build_graph(edges, externals=()):
+    """Build a compact graph from (source, target) path pairs."""
+    builder = CompactDependencyGraphBuilder()
+    for source, target in edges:
+        builder.add_dependency(builder.add_node(source, "python"), builder.add_node(target, "python"))
+    for source, name in externals:
+        builder.add_external_dependency(builder.add_node(source, "python"), name)
+    return builder.build()
+
+
+class TestCompactDependencyGraph:
+    """Tests for CompactDependencyGraph."""
+
+    def test_queries_and_degrees(self):
+        """Test that duplicate and self imports are dropped and both edge directions are indexed."""
+        graph = build_graph(
+            [("app.py", "models.py"), ("app.py", "models.py"), ("app.py", "app.py"), ("cli.py", "models.py")],
+            externals=[("app.py", "os"), ("app.py", "os"), ("cli.py", "sys")]
+        )
+
+        assert len(graph) == 3
+        assert graph.edge_count == 2
+        assert graph.get_dependencies_for("app.py") == ["models.py"]
+        assert graph.get_dependents_for("models.py") == ["app.py", "cli.py"]
+        assert graph.get_dependents_for("missing.py") == []
+        assert graph.get_external_dependencies_for("app.py") == ["os"]
+        assert list(graph.out_degrees()) == [1, 0, 1]
+        assert list(graph.in_degrees()) == [0, 2, 0]
+
+    def test_cycles_and_layers(self):
+        """Test strongly connected components, cycles and topological layers."""
+        graph = build_graph([
+            ("a.py", "b.py"), ("b.py", "c.py"), ("c.py", "a.py"), ("c.py", "b.py"),
+            ("c.py", "d.py"), ("d.py", "e.py"), ("e.py", "d.py"), ("f.py", "a.py"), ("d.py", "g.py")
+        ])
+
+        assert graph.find_strongly_connected_components() == [["a.py", "b.py", "c.py"], ["d.py", "e.py"]]
+        assert sorted(graph.find_circular_dependencies()) == [["a.py", "b.py", "c.py"], ["b.py", "c.py"], ["d.py", "e.py"]]
+        assert graph.topological_layers() == [["g.py"], ["d.py", "e.py"], ["a.py", "b.py", "c.py"], ["f.py"]]
+
+    def test_impact_is_memoized(self):
+        """Test depth-limited impact queries in both directions and their memo."""
+        graph = build_graph([("app.py", "service.py"), ("service.py", "models.py"),
+                             ("cli.py", "models.py"), ("models.py", "db.py")])
+
+        assert graph.get_impact(["db.py"]) == {"models.py": 1, "service.py": 2, "cli.py": 2, "app.py": 3}
+        assert graph.get_impact(["db.py"], max_depth=1) == {"models.py": 1}
+        assert graph.get_impact(["service.py", "cli.py"], direction="dependencies") == {"models.py": 1, "db.py": 2}
+        assert ("dependents", graph.get_id("db.py"), None) in graph._impact_cache
+
+        with pytest.raises(ValueError):
+            graph.get_impact(["db.py"], direction="sideways")
+
+    def test_serialization(self):
+        """Test the JSON round trip and the visualization format."""
+        graph = build_graph([("pkg/a.py", "pkg/b.py")], externals=[("pkg/b.py", "json")])
+
+        restored = CompactDependencyGraph.from_dict(json.loads(json.dumps(graph.to_dict())))
+        assert restored.paths == graph.paths
+        assert restored.get_dependents_for("pkg/b.py") == ["pkg/a.py"]
+        assert restored.get_external_dependencies_for("pkg/b.py") == ["json"]
+
+        assert restored.to_visualization() == {
+            "nodes": [
+                {"id": "pkg/a.py", "name": "a.py", "path": "pkg/a.py", "type": "python"},
+                {"id": "pkg/b.py", "name": "b.py", "path": "pkg/b.py", "type": "python"}
+            ],
+            "edges": [{"source": "pkg/a.py", "target": "pkg/b.py", "type": "dependency"}]
+        }
+
+    def test_analyze_dependencies_compact(self):
+        """Test that the compact analysis matches the object graph."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, 'pkg'))
+            with open(os.path.join(temp_dir, 'pkg', '__init__.py'), 'w') as f:
+                f.write("")
+            for i in range(10):
+                with open(os.path.join(temp_dir, 'pkg', f'mod_{i}.py'), 'w') as f:
+                    f.write(f"import os\nfrom pkg.mod_{(i + 1) % 10} import value\nvalue = {i}\n")
+
+            graph = analyze_dependencies(temp_dir, workers=1)
+            compact = analyze_dependencies(temp_dir, workers=1, compact=True)
+
+            assert compact.paths == list(graph.nodes)
+            for path, node in graph.nodes.items():
+                assert compact.get_dependencies_for(path) == sorted(graph.get_dependencies_for(path))
+                assert compact.get_dependents_for(path) == sorted(graph.get_dependents_for(path))
+                assert compact.get_external_dependencies_for(path) == sorted(
+                    dep.name for dep in node.external_dependencies
+                )
+            assert compact.find_strongly_connected_components() == graph.find_strongly_connected_components()
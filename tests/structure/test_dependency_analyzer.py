@@ -164,6 +164,57 @@ class TestDependencyAnalyzer:
             
             assert detected
 
+    def test_strongly_connected_components(self):
+        """Test that every import cycle cluster is found, including cycles through visited files."""
+        graph = DependencyGraph()
+        edges = [
+            ("a.py", "b.py"), ("b.py", "c.py"), ("c.py", "a.py"), ("c.py", "b.py"),
+            ("c.py", "d.py"), ("d.py", "e.py"), ("e.py", "d.py"), ("f.py", "a.py")
+        ]
+        for source, target in edges:
+            graph.add_node(source, "python").add_dependency(graph.add_node(target, "python"))
+        
+        assert graph.find_strongly_connected_components() == [["a.py", "b.py", "c.py"], ["d.py", "e.py"]]
+        
+        cycles = graph.find_elementary_cycles()
+        assert sorted(cycles) == [["a.py", "b.py", "c.py"], ["b.py", "c.py"], ["d.py", "e.py"]]
+        assert graph.find_circular_dependencies(max_cycles_per_component=1) == [["a.py", "b.py", "c.py"], ["d.py", "e.py"]]
+        
+        # A cycle longer than the limit is still reported once
+        assert graph.find_elementary_cycles(["a.py", "b.py", "c.py"], max_length=1) == [["a.py", "b.py", "c.py"]]
+    
+    def test_strongly_connected_components_on_long_chains(self):
+        """Test that a cycle through many files is found without recursion limits."""
+        graph = DependencyGraph()
+        count = 20000
+        for i in range(count):
+            graph.add_node(f"m{i}.py", "python").add_dependency(graph.add_node(f"m{(i + 1) % count}.py", "python"))
+        
+        components = graph.find_strongly_connected_components()
+        assert len(components) == 1
+        assert len(components[0]) == count
+        assert len(graph.find_circular_dependencies()[0]) == count
+    
+    def test_transitive_dependents(self):
+        """Test reverse edges and depth-limited, memoized blast radius queries."""
+        graph = DependencyGraph()
+        edges = [("app.py", "service.py"), ("service.py", "models.py"), ("cli.py", "models.py"), ("models.py", "db.py")]
+        for source, target in edges:
+            graph.add_node(source, "python").add_dependency(graph.add_node(target, "python"))
+        
+        assert sorted(graph.get_dependents_for("models.py")) == ["cli.py", "service.py"]
+        assert graph.get_transitive_dependents("db.py") == {"models.py": 1, "service.py": 2, "cli.py": 2, "app.py": 3}
+        assert graph.get_transitive_dependents("db.py", max_depth=2) == {"models.py": 1, "service.py": 2, "cli.py": 2}
+        assert graph.get_transitive_dependencies("app.py", max_depth=1) == {"service.py": 1}
+        assert graph.get_impact(["service.py", "cli.py"], direction="dependencies") == {"models.py": 1, "db.py": 2}
+        
+        # Adding an edge invalidates memoized results
+        graph.add_node("worker.py", "python").add_dependency(graph.nodes["db.py"])
+        assert graph.get_transitive_dependents("db.py", max_depth=1) == {"models.py": 1, "worker.py": 1}
+        
+        with pytest.raises(ValueError):
+            graph.get_impact(["db.py"], direction="sideways")
+    
     def test_mixed_language_dependencies(self):
         """Test analysis of mixed language dependencies (Python and JS/TS)."""
         with tempfile.TemporaryDirectory() as temp_dir:
@@ -246,4 +297,32 @@ class TestDependencyAnalyzer:
             assert graph.nodes[models_py] in graph.nodes[api_py].dependencies
             
             # Check JS dependencies
-            assert graph.nodes[api_js] in graph.nodes[userlist_jsx].dependencies 
\ No newline at end of file
+            assert graph.nodes[api_js] in graph.nodes[userlist_jsx].dependencies 
+
+    def test_parallel_analysis_matches_serial(self):
+        """Test that process-pool dependency analysis gives the same graph as serial."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, 'pkg'))
+            with open(os.path.join(temp_dir, 'pkg', '__init__.py'), 'w') as f:
+                f.write("")
+            
+            # Enough files for several chunks, importing each other and externals
+            for i in range(40):
+                with open(os.path.join(temp_dir, 'pkg', f'mod_{i}.py'), 'w') as f:
+                    f.write(f"import os\nfrom pkg.mod_{(i + 1) % 40} import value\nvalue = {i}\n")
+                with open(os.path.join(temp_dir, 'pkg', f'comp_{i}.js'), 'w') as f:
+                    f.write(f"import React from 'react';\nimport {{ x }} from './comp_{(i + 3) % 40}';\n")
+            
+            serial = analyze_dependencies(temp_dir, workers=1)
+            parallel = analyze_dependencies(temp_dir, workers=2, chunk_size=16)
+            
+            assert list(parallel.nodes) == list(serial.nodes)
+            for path, node in serial.nodes.items():
+                parallel_node = parallel.nodes[path]
+                assert parallel_node.file_type == node.file_type
+                assert sorted(parallel.get_dependencies_for(path)) == sorted(serial.get_dependencies_for(path))
+                assert ({(dep.name, tuple(dep.imports)) for dep in parallel_node.external_dependencies} ==
+                        {(dep.name, tuple(dep.imports)) for dep in node.external_dependencies})
+            
+            mod_0 = os.path.join('pkg', 'mod_0.py')
+            assert serial.get_dependencies_for(mod_0) == [os.path.join('pkg', 'mod_1.py')]
@@ -0,0 +1,86 @@
+"""
+Tests for memoized dependency analysis artifacts.
+"""
+import tempfile
+from unittest import mock
+
+from app.analysis.analysis_cache import AnalysisCache
+from app.structure.compact_dependency_graph import CompactDependencyGraphBuilder
+from app.structure.dependency_artifact import (
+    DependencyArtifact,
+    DependencyArtifactCache,
+    make_artifact_key
+)
+
+
+def make_artifact():
+    """Create an artifact for a small graph with one import cycle."""
+    builder = CompactDependencyGraphBuilder()
+    a = builder.add_node("a.py", "python")
+    b = builder.add_node("b.py", "python")
+    c = builder.add_node("c.py", "python")
+    builder.add_dependency(a, b)
+    builder.add_dependency(b, a)
+    builder.add_dependency(c, a)
+    builder.add_external_dependency(c, "requests")
+    return DependencyArtifact(builder.build(), commit_sha="a" * 40)
+
+
+def test_stats_are_derived_from_the_graph():
+    """Test that the statistics and the visualization describe the same graph."""
+    artifact = make_artifact()
+
+    assert artifact.stats == {
+        "total_files": 3,
+        "total_dependencies": 3,
+        "circular_dependencies": [["a.py", "b.py"]],
+        "dependency_clusters": [["a.py", "b.py"]]
+    }
+    assert len(artifact.visualization["nodes"]) == 3
+    assert len(artifact.visualization["edges"]) == 3
+
+def test_get_or_build_builds_once_per_key():
+    """Test that an artifact is only built once for the same key."""
+    cache = DependencyArtifactCache()
+    build = mock.Mock(side_effect=make_artifact)
+    key = make_artifact_key("repo-1", "a" * 40)
+
+    first = cache.get_or_build(key, build)
+    second = cache.get_or_build(key, build)
+
+    assert first is second
+    assert build.call_count == 1
+
+def test_new_commit_replaces_old_artifacts():
+    """Test that storing an artifact for a new commit drops the old commit's artifact."""
+    cache = DependencyArtifactCache()
+    old_key = make_artifact_key("repo-1", "a" * 40)
+    cache.put(old_key, make_artifact())
+
+    cache.put(make_artifact_key("repo-1", "b" * 40), make_artifact())
+
+    assert cache.get(old_key) is None
+
+def test_artifacts_without_commit_are_not_cached():
+    """Test that artifacts of checkouts without a known commit are always rebuilt."""
+    cache = DependencyArtifactCache()
+    build = mock.Mock(side_effect=make_artifact)
+    key = make_artifact_key("repo-1", None)
+
+    cache.get_or_build(key, build)
+    cache.get_or_build(key, build)
+
+    assert build.call_count == 2
+
+def test_artifacts_are_persisted_by_commit():
+    """Test that a new cache loads artifacts stored on disk instead of rebuilding them."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        key = make_artifact_key("repo-1", "a" * 40)
+        DependencyArtifactCache(AnalysisCache(temp_dir)).put(key, make_artifact())
+
+        build = mock.Mock(side_effect=make_artifact)
+        artifact = DependencyArtifactCache(AnalysisCache(temp_dir)).get_or_build(key, build)
+
+        assert build.call_count == 0
+        assert artifact.stats["circular_dependencies"] == [["a.py", "b.py"]]
+        assert artifact.graph.get_external_dependencies_for("c.py") == ["requests"]
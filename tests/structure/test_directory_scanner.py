@@ -6,6 +6,7 @@ import tempfile
 import unittest.mock as mock
 import pytest
 from app.structure.directory_scanner import scan_directory, FileNode, DirectoryNode
+from app.structure.file_type_detector import FileType
 
 
 class TestDirectoryScanner:
@@ -180,4 +181,68 @@ class TestDirectoryScanner:
             dir1 = next(node for node in result.children 
                        if isinstance(node, DirectoryNode) and node.name == 'dir1')
             assert len(dir1.children) == 1
-            assert dir1.children[0].name == 'file2.js' 
\ No newline at end of file
+            assert dir1.children[0].name == 'file2.js'
+
+    def test_classify_files_during_scan(self):
+        """Test that file types are detected during the scan when requested."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, 'src'))
+            os.makedirs(os.path.join(temp_dir, 'node_modules'))
+            with open(os.path.join(temp_dir, 'src', 'main.py'), 'w') as f:
+                f.write('print("Hello")')
+            with open(os.path.join(temp_dir, 'deploy'), 'w') as f:
+                f.write('#!/bin/bash\necho "Hello"\n')
+            with open(os.path.join(temp_dir, 'LICENSE'), 'w') as f:
+                f.write('Permission is hereby granted')
+            
+            result = scan_directory(temp_dir, classify_files=True)
+            
+            # Same shape as a plain scan: subdirectories first, then files
+            assert [node.name for node in result.children[:1]] == ['src']
+            assert sorted(node.name for node in result.children[1:]) == ['LICENSE', 'deploy']
+            
+            files = {node.name: node for node in result.get_all_files_recursive()}
+            assert files['main.py'].metadata['file_type'] == FileType.PYTHON
+            assert files['deploy'].metadata['file_type'] == FileType.SHELL
+            assert files['LICENSE'].metadata['file_type'] == FileType.UNKNOWN
+            assert files['main.py'].metadata['size'] == len('print("Hello")')
+
+    def test_compact_scan_matches_regular_scan(self):
+        """Test that a compact scan exposes the same tree through DirectoryNode/FileNode views."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            os.makedirs(os.path.join(temp_dir, 'src', 'pkg'))
+            os.makedirs(os.path.join(temp_dir, '.git'))
+            with open(os.path.join(temp_dir, 'src', 'pkg', 'module.py'), 'w') as f:
+                f.write('x = 1\n')
+            with open(os.path.join(temp_dir, 'README.md'), 'w') as f:
+                f.write('# Readme\n')
+            with open(os.path.join(temp_dir, '.git', 'config'), 'w') as f:
+                f.write('')
+            
+            def describe(node):
+                if isinstance(node, DirectoryNode):
+                    return (node.name, node.path, sorted(describe(child) for child in node.children))
+                return (node.name, node.path, node.metadata['size'], node.metadata['modified'])
+            
+            regular = scan_directory(temp_dir)
+            compact = scan_directory(temp_dir, compact=True)
+            
+            assert isinstance(compact, DirectoryNode)
+            assert describe(compact) == describe(regular)
+            assert sorted(f.path for f in compact.get_all_files_recursive()) == \
+                sorted(f.path for f in regular.get_all_files_recursive())
+            assert len(compact.tree) == 5  # root, src, src/pkg and two files
+            # Neither the views nor the regular nodes carry a per-instance __dict__
+            assert not hasattr(compact, '__dict__')
+            assert not hasattr(regular.children[0], '__dict__')
+            
+            src = compact.get_directories()[0]
+            assert src.get_directories()[0].get_files()[0].get_type() == 'python'
+            with pytest.raises(TypeError):
+                src.add_child(FileNode('new.py', os.path.join(src.path, 'new.py')))
+            
+            # A materialized copy is made of regular, mutable nodes
+            copy = compact.tree.materialize()
+            assert type(copy) is DirectoryNode
+            assert describe(copy) == describe(regular)
+
@@ -0,0 +1,76 @@
+"""
+Tests for the in-memory repository file index.
+"""
+import os
+from unittest import mock
+import pytest
+from app.structure.file_index import RepositoryFileIndex, candidate_paths
+from app.structure.dependency_analyzer import resolve_import_path
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Fixture providing a small mixed-language repository."""
+    (tmp_path / "pkg" / "sub").mkdir(parents=True)
+    (tmp_path / "web" / "components").mkdir(parents=True)
+    (tmp_path / "pkg" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "core.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "__init__.py").write_text("")
+    (tmp_path / "pkg" / "sub" / "tools.py").write_text("")
+    (tmp_path / "web" / "app.js").write_text("")
+    (tmp_path / "web" / "components" / "index.tsx").write_text("")
+    (tmp_path / "web" / "components" / "Button.jsx").write_text("")
+    return tmp_path
+
+
+def test_candidate_paths_order():
+    """Test that candidates are tried as files first, then as index files."""
+    candidates = candidate_paths('src', 'utils')
+
+    assert candidates[:3] == [os.path.join('src', 'utils'), os.path.join('src', 'utils.py'),
+                              os.path.join('src', 'utils.js')]
+    assert candidates[-1] == os.path.join('src', 'utils', 'index.tsx')
+    assert len(candidates) == 11
+
+def test_build_indexes_files_and_directories(repo):
+    """Test that building an index records every file and directory."""
+    index = RepositoryFileIndex.build(str(repo))
+
+    assert index.exists(os.path.join('pkg', 'sub', 'tools.py'))
+    assert index.exists(os.path.join('web', 'components'))
+    assert not index.exists(os.path.join('pkg', 'missing.py'))
+    assert sorted(index.get_children('pkg')) == ['__init__.py', 'core.py', 'sub']
+
+@pytest.mark.parametrize("import_path, importer, expected", [
+    ('./components/Button', os.path.join('web', 'app.js'), os.path.join('web', 'components', 'Button.jsx')),
+    ('../app', os.path.join('web', 'components', 'Button.jsx'), os.path.join('web', 'app.js')),
+    ('.core', os.path.join('pkg', 'sub', 'tools.py'), None),
+    ('pkg.sub.tools', 'main.py', os.path.join('pkg', 'sub', 'tools.py')),
+    ('pkg.sub', 'main.py', os.path.join('pkg', 'sub', '__init__.py')),
+    ('pkg.core.missing', 'main.py', None),
+    ('react', os.path.join('web', 'app.js'), None),
+])
+def test_resolve_matches_filesystem_resolution(repo, import_path, importer, expected):
+    """Test that index resolution gives the same answer as checking the filesystem."""
+    index = RepositoryFileIndex.build(str(repo))
+
+    assert index.resolve(import_path, importer) == expected
+    assert resolve_import_path(import_path, str(repo / importer), str(repo)) == expected
+
+def test_resolve_is_memoized_per_directory(repo):
+    """Test that repeated imports from the same directory are not resolved again."""
+    index = RepositoryFileIndex.build(str(repo))
+
+    with mock.patch.object(index, '_resolve_uncached', wraps=index._resolve_uncached) as resolve:
+        index.resolve('pkg.core', os.path.join('web', 'app.js'))
+        index.resolve('pkg.core', os.path.join('web', 'other.js'))
+
+    assert resolve.call_count == 1
+
+def test_paths_outside_root_are_checked_on_disk(repo):
+    """Test that imports leaving the repository fall back to the filesystem."""
+    (repo / "pkg" / "outside.py").write_text("")
+    index = RepositoryFileIndex.build(str(repo / "pkg" / "sub"))
+
+    assert index.resolve('../outside', 'tools.py') == os.path.join('..', 'outside.py')
+    assert index.resolve('../nowhere', 'tools.py') is None
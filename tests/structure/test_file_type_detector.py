@@ -98,6 +98,35 @@ class TestFileTypeDetector(unittest.TestCase):
         self.assertEqual(self.detector.get_language_for_file_type(FileType.YAML), "YAML")
         self.assertEqual(self.detector.get_language_for_file_type(FileType.SHELL), "Shell")
         self.assertEqual(self.detector.get_language_for_file_type(FileType.UNKNOWN), "Plain Text")
+    
+    def test_detect_by_extension(self):
+        """Test that extension detection needs no file and reports unknown extensions as None."""
+        self.assertEqual(self.detector.detect_by_extension("/missing/example.PY"), FileType.PYTHON)
+        self.assertIsNone(self.detector.detect_by_extension("/missing/Makefile"))
+        self.assertIsNone(self.detector.detect_by_extension("unknown.xyz"))
+    
+    def test_detect_types_by_content(self):
+        """Test detecting the types of a batch of files by content."""
+        import tempfile
+        with tempfile.TemporaryDirectory() as temp_dir:
+            contents = {
+                "script": "#!/usr/bin/env python\nprint('hi')\n",
+                "run": "#!/bin/bash\necho hi\n",
+                "page": "<!DOCTYPE html><html></html>",
+                "notes": "just some text\n",
+            }
+            paths = []
+            for name, content in contents.items():
+                path = os.path.join(temp_dir, name)
+                with open(path, "w") as f:
+                    f.write(content)
+                paths.append(path)
+            
+            self.assertEqual(
+                self.detector.detect_types_by_content(paths),
+                [FileType.PYTHON, FileType.SHELL, FileType.HTML, FileType.UNKNOWN]
+            )
+        self.assertEqual(self.detector.detect_types_by_content([]), [])
 
 def mock_open(read_data=""):
     """Helper function to create a mock file object."""
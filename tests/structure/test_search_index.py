@@ -0,0 +1,96 @@
+"""
+Tests for path and content search.
+"""
+import pytest
+from app.structure.search_index import SearchIndex
+
+
+@pytest.fixture
+def files(tmp_path):
+    """Fixture providing a few files to index."""
+    contents = {
+        "src/main.py": "import os\n\ndef main():\n    return Config.load()\n",
+        "src/config.py": "class Config:\n    @classmethod\n    def load(cls):\n        return cls()\n",
+        "docs/config.md": "# Configuration\n",
+        "logo.png": "\x89PNG\x00\x00pixeldata config",
+    }
+    paths = []
+    for rel_path, content in contents.items():
+        path = tmp_path / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content)
+        paths.append(str(path))
+    return paths
+
+
+def test_path_search_is_case_insensitive_substring(files):
+    """Test that path queries match substrings of paths, ignoring case."""
+    index = SearchIndex(files)
+
+    results = index.search("CONFIG", content=False)
+
+    assert [hit.path for hit in results.hits] == [files[1], files[2]]
+    assert results.count == 2
+    assert results.count_exact
+    assert not index.contents_indexed
+
+def test_short_queries_match_paths(files):
+    """Test that queries shorter than a trigram still match paths."""
+    results = SearchIndex(files).search("md")
+
+    assert [hit.path for hit in results.hits] == [files[2]]
+
+def test_content_search_returns_line_hits(files):
+    """Test that content matches include the matching lines."""
+    results = SearchIndex.build(files).search("config.load")
+
+    assert [hit.path for hit in results.hits] == [files[0]]
+    hit = results.hits[0]
+    assert not hit.path_match
+    assert hit.line_hits == [{'line': 4, 'text': '    return Config.load()'}]
+
+def test_binary_and_oversized_files_are_not_content_searched(files):
+    """Test that binary files and files over the size limit are skipped."""
+    assert SearchIndex(files).search("pixeldata").count == 0
+    assert SearchIndex(files, max_file_size=10).search("return").count == 0
+
+def test_trigram_candidates_are_verified(files):
+    """Test that files containing all trigrams but not the query are not returned."""
+    # "return" and "cls" both occur in config.py, but not "return cls."
+    results = SearchIndex(files).search("return cls.")
+
+    assert results.count == 0
+
+def test_pagination(tmp_path):
+    """Test that results are paged in file order with an exact total for path matches."""
+    paths = []
+    for i in range(5):
+        path = tmp_path / f"module_{i}.py"
+        path.write_text("pass\n")
+        paths.append(str(path))
+    index = SearchIndex(paths)
+
+    first = index.search("module", offset=0, limit=2)
+    second = index.search("module", offset=2, limit=2)
+    last = index.search("module", offset=4, limit=2)
+
+    assert [hit.path for hit in first.hits] == paths[:2]
+    assert [hit.path for hit in second.hits] == paths[2:4]
+    assert [hit.path for hit in last.hits] == paths[4:]
+    assert first.count == second.count == last.count == 5
+    assert first.count_exact
+
+def test_count_is_an_upper_bound_when_page_ends_early(tmp_path):
+    """Test that unverified content candidates are reported as an upper bound."""
+    paths = []
+    for i in range(4):
+        path = tmp_path / f"file_{i}.txt"
+        # Every file has the trigrams of "abcd", only even files contain it
+        path.write_text("abcd\n" if i % 2 == 0 else "abc bcd\n")
+        paths.append(str(path))
+
+    results = SearchIndex(paths).search("abcd", limit=1)
+
+    assert [hit.path for hit in results.hits] == [paths[0]]
+    assert not results.count_exact
+    assert results.count >= 2
@@ -0,0 +1,89 @@
+"""
+Tests for memoized repository structure snapshots.
+"""
+from unittest import mock
+from app.structure.structure_snapshot import (
+    StructureSnapshot,
+    StructureSnapshotCache,
+    make_snapshot_key
+)
+
+
+def make_snapshot(name="repo"):
+    """Create a snapshot with a small frontend tree."""
+    tree = {
+        "name": name, "type": "directory", "path": "/repo", "children": [
+            {"name": "src", "type": "directory", "path": "/repo/src", "children": [
+                {"name": "a.py", "type": "file", "path": "/repo/src/a.py"},
+                {"name": "b.py", "type": "file", "path": "/repo/src/b.py"},
+            ]},
+            {"name": "README.md", "type": "file", "path": "/repo/README.md"},
+        ]
+    }
+    return StructureSnapshot("/repo", tree, {"total_files": 3})
+
+
+def test_files_are_flattened_in_tree_order():
+    """Test that the flat file list follows the tree order."""
+    snapshot = make_snapshot()
+
+    assert [f["name"] for f in snapshot.files] == ["a.py", "b.py", "README.md"]
+
+def test_get_or_build_builds_once_per_key():
+    """Test that a snapshot is only built once for the same key."""
+    cache = StructureSnapshotCache()
+    build = mock.Mock(side_effect=make_snapshot)
+    key = make_snapshot_key("repo-1", "a" * 40, ["node_modules"])
+
+    first = cache.get_or_build(key, build)
+    second = cache.get_or_build(key, build)
+
+    assert first is second
+    assert build.call_count == 1
+    assert cache.get(make_snapshot_key("repo-1", "a" * 40, None)) is None
+
+def test_excluded_directories_are_compared_as_a_set():
+    """Test that the order of excluded directories doesn't change the key, but defaults do."""
+    key = make_snapshot_key("repo-1", "a" * 40, ["node_modules", "dist"])
+
+    assert make_snapshot_key("repo-1", "a" * 40, ["dist", "node_modules", "dist"]) == key
+    assert make_snapshot_key("repo-1", "a" * 40, None) != make_snapshot_key("repo-1", "a" * 40, [])
+
+def test_new_commit_replaces_old_snapshots():
+    """Test that storing a snapshot for a new commit drops the old commit's snapshots."""
+    cache = StructureSnapshotCache()
+    old_key = make_snapshot_key("repo-1", "a" * 40, None)
+    other_key = make_snapshot_key("repo-2", "a" * 40, None)
+    cache.put(old_key, make_snapshot())
+    cache.put(other_key, make_snapshot())
+
+    cache.put(make_snapshot_key("repo-1", "b" * 40, None), make_snapshot())
+
+    assert cache.get(old_key) is None
+    assert cache.get(other_key) is not None
+
+def test_snapshots_without_commit_are_not_cached():
+    """Test that snapshots of checkouts without a known commit are always rebuilt."""
+    cache = StructureSnapshotCache()
+    build = mock.Mock(side_effect=make_snapshot)
+    key = make_snapshot_key("repo-1", None, None)
+
+    cache.get_or_build(key, build)
+    cache.get_or_build(key, build)
+
+    assert build.call_count == 2
+
+def test_least_recently_used_snapshot_is_evicted():
+    """Test that the cache is bounded and evicts the least recently used snapshot."""
+    cache = StructureSnapshotCache(max_snapshots=2)
+    keys = [make_snapshot_key(f"repo-{i}", "a" * 40, None) for i in range(3)]
+    cache.put(keys[0], make_snapshot())
+    cache.put(keys[1], make_snapshot())
+    cache.get(keys[0])
+
+    cache.put(keys[2], make_snapshot())
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    cache.invalidate("repo-0")
+    assert cache.get(keys[0]) is None
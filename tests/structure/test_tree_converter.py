@@ -5,10 +5,14 @@ import unittest
 from unittest.mock import MagicMock, patch
 from app.structure.directory_scanner import DirectoryNode, FileNode
 from app.structure.collapsible_tree import TreeNode
+from app.structure.file_type_detector import FileType
 from app.structure.tree_converter import (
     convert_directory_to_collapsible_tree,
     convert_to_frontend_tree,
-    create_dependency_visualization
+    convert_to_lazy_frontend_tree,
+    create_dependency_visualization,
+    get_lazy_children,
+    make_node_id
 )
 
 
@@ -122,6 +126,76 @@ class TestTreeConverter:
         assert readme_node["size"] == 1024
         assert "children" not in readme_node
     
+    def test_convert_to_frontend_tree_uses_scanned_file_types(self):
+        """Test that file types detected during the scan are used without touching the files."""
+        root = DirectoryNode("project", "/path/to/project")
+        root.add_child(FileNode("deploy", "/path/to/project/deploy", {"size": 10, "file_type": FileType.SHELL}))
+        collapsible_tree = convert_directory_to_collapsible_tree(root)
+        
+        with patch("os.path.isfile") as mock_isfile, patch("builtins.open") as mock_open:
+            frontend_tree = convert_to_frontend_tree(collapsible_tree)
+        
+        mock_isfile.assert_not_called()
+        mock_open.assert_not_called()
+        deploy_node = frontend_tree["children"][0]
+        assert deploy_node["fileType"] == "shell"
+        assert deploy_node["icon"] == "shell-icon"
+    
+    def test_convert_to_lazy_frontend_tree(self):
+        """Test that the lazy tree stops at the requested levels and limits children."""
+        dir_tree = self.setup_mock_directory_tree()
+        collapsible_tree = convert_directory_to_collapsible_tree(dir_tree)
+        collapsible_tree.collapse_all()
+        
+        frontend_tree = convert_to_lazy_frontend_tree(collapsible_tree, levels=1, limit=2)
+        
+        assert frontend_tree["childCount"] == 3
+        assert not frontend_tree["collapsed"]
+        assert len(frontend_tree["children"]) == 2
+        src_node = frontend_tree["children"][0]
+        assert src_node["childCount"] == 2
+        assert src_node["collapsed"]
+        assert "children" not in src_node
+        
+        # Expanded directories are included below the requested levels
+        src = collapsible_tree.find_node("/path/to/project/src")
+        collapsible_tree.expand_node(src)
+        frontend_tree = convert_to_lazy_frontend_tree(collapsible_tree, levels=1)
+        src_node = frontend_tree["children"][0]
+        assert [child["name"] for child in src_node["children"]] == ["main.py", "utils.py"]
+        
+        assert [child["name"] for child in get_lazy_children(src, offset=1, limit=5)] == ["utils.py"]
+    
+    def test_node_ids_and_hashes_are_stable(self):
+        """Test that node IDs follow the relative path and hashes only change with the content below."""
+        first = convert_to_frontend_tree(convert_directory_to_collapsible_tree(self.setup_mock_directory_tree()))
+        second = convert_to_frontend_tree(convert_directory_to_collapsible_tree(self.setup_mock_directory_tree()))
+        assert first == second
+        
+        src_node = next(node for node in first["children"] if node["name"] == "src")
+        assert first["id"] == make_node_id("")
+        assert src_node["id"] == make_node_id("src")
+        assert src_node["children"][0]["id"] == make_node_id("src/main.py")
+        
+        # Changing a file changes the hashes on its path to the root only
+        changed_tree = self.setup_mock_directory_tree()
+        changed_tree.children[0].children[0].metadata["size"] = 4096
+        changed = convert_to_frontend_tree(convert_directory_to_collapsible_tree(changed_tree))
+        changed_src = next(node for node in changed["children"] if node["name"] == "src")
+        changed_docs = next(node for node in changed["children"] if node["name"] == "docs")
+        docs_node = next(node for node in first["children"] if node["name"] == "docs")
+        assert changed["hash"] != first["hash"]
+        assert changed_src["hash"] != src_node["hash"]
+        assert changed_src["children"][1]["hash"] == src_node["children"][1]["hash"]
+        assert changed_docs["hash"] == docs_node["hash"]
+        
+        # The lazy tree reports the same IDs and hashes
+        collapsible_tree = convert_directory_to_collapsible_tree(self.setup_mock_directory_tree())
+        lazy_tree = convert_to_lazy_frontend_tree(collapsible_tree, levels=2)
+        assert lazy_tree["hash"] == first["hash"]
+        src = collapsible_tree.find_node("/path/to/project/src")
+        assert get_lazy_children(src)[0]["id"] == make_node_id("src/main.py")
+    
     def test_create_dependency_visualization(self):
         """Test creation of dependency visualization tree."""
         # Setup